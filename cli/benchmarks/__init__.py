@@ -0,0 +1,8 @@
+"""
+Benchmarks for the Cataklism CLI
+Runs CLI commands end to end and at the API level against a local Hardhat
+chain seeded by scripts/bench-fixture.js and a stand-in for the stats API,
+and reports latency percentiles, RPC calls by method and peak memory.
+
+    cd cli && python -m benchmarks --pools 20 --stakers 500 --output bench.json
+"""
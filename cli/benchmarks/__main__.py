@@ -0,0 +1,249 @@
+"""
+Benchmark runner
+Each scenario runs `iterations` times end to end, as a CLI subprocess, and
+at the API level, calling the same client methods in-process on a fresh
+CataklismCLI so every run starts with cold caches. RPC calls are counted
+by the proxy per run; peak memory is the child's max RSS end to end and
+the tracemalloc peak in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .chain import NODE_URL, HardhatNode, deploy_fixture, write_cli_config
+from .stubs import StubServices
+
+CLI_ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class Scenario:
+    name: str
+    argv: Callable[[Dict[str, Any], Path], List[str]]
+    api: Callable[[Any, Dict[str, Any]], Awaitable[Any]]
+
+
+async def _status(cli_app, fixture):
+    await cli_app.protocol_client.get_protocol_stats()
+    await cli_app.protocol_client.get_vault_stats()
+    await cli_app.prices.token_info()
+
+
+async def _stake_pools(cli_app, fixture):
+    await cli_app.staking.get_all_pools(False)
+
+
+async def _wallet_balance(cli_app, fixture):
+    await cli_app.wallet.get_balance(fixture['stakers'][0], 'CTKL')
+    await cli_app.prices.price('CTKL')
+
+
+async def _analytics(cli_app, fixture):
+    async for _ in cli_app.reports.run():
+        pass
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario('status', lambda fixture, workdir: ['status'], _status),
+        Scenario('stake-pools', lambda fixture, workdir: ['stake', 'pools'], _stake_pools),
+        Scenario('wallet-balance', lambda fixture, workdir: ['wallet', 'balance', fixture['stakers'][0]],
+                 _wallet_balance),
+        # A store path that does not exist keeps the report on the chain, not a local history store
+        Scenario('analytics', lambda fixture, workdir: [
+            'analytics', '--format', 'json', '--output', str(workdir / 'report.json'),
+            '--store', str(workdir / 'no-store.duckdb'),
+        ], _analytics),
+    ]
+}
+
+
+@dataclass
+class Run:
+    seconds: float
+    peak_bytes: int
+    rpc_calls: Counter
+    rpc_http_requests: int
+    api_requests: Counter
+    error: Optional[str] = None
+
+
+def _max_rss_bytes(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+
+
+def run_e2e(scenario: Scenario, config_path: Path, fixture: Dict[str, Any], workdir: Path,
+            stubs: StubServices) -> Run:
+    argv = [sys.executable, '-m', 'cataklism_cli.main', '--config', str(config_path), *scenario.argv(fixture, workdir)]
+    stubs.reset()
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(argv, cwd=CLI_ROOT, stdout=output, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        output.seek(0)
+        text = output.read().decode(errors='replace')
+
+    # Commands report most failures on the console and still exit 0
+    error = None
+    if process.returncode != 0 or '❌' in text:
+        error = text.strip().splitlines()[-1] if text.strip() else f"exit code {process.returncode}"
+    return Run(seconds, _max_rss_bytes(rusage), stubs.proxy.calls, stubs.proxy.http_requests,
+               stubs.api.requests, error)
+
+
+def run_api(scenario: Scenario, config_path: Path, fixture: Dict[str, Any], stubs: StubServices) -> Run:
+    from cataklism_cli.main import CataklismCLI
+
+    async def _run():
+        cli_app = CataklismCLI(str(config_path))
+        await cli_app.initialize()
+        await scenario.api(cli_app, fixture)
+
+    stubs.reset()
+    error = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        asyncio.run(_run())
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Run(seconds, peak, stubs.proxy.calls, stubs.proxy.http_requests, stubs.api.requests, error)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks, as numpy's default"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(runs: List[Run]) -> Dict[str, Any]:
+    ok = [run for run in runs if run.error is None]
+    latencies = sorted(run.seconds * 1000 for run in ok)
+    per_run = max(len(ok), 1)
+
+    rpc_calls: Counter = Counter()
+    api_requests: Counter = Counter()
+    for run in ok:
+        rpc_calls.update(run.rpc_calls)
+        api_requests.update(run.api_requests)
+
+    return {
+        'runs': len(runs),
+        'failures': len(runs) - len(ok),
+        'errors': sorted({run.error for run in runs if run.error}),
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 0.50), 2),
+            'p90': round(_percentile(latencies, 0.90), 2),
+            'p99': round(_percentile(latencies, 0.99), 2),
+            'min': round(latencies[0], 2) if latencies else 0.0,
+            'max': round(latencies[-1], 2) if latencies else 0.0,
+        },
+        # Means per run; they only vary between runs if a command's reads do
+        'rpc_calls': {
+            'total': round(sum(rpc_calls.values()) / per_run, 1),
+            'http_requests': round(sum(run.rpc_http_requests for run in ok) / per_run, 1),
+            'by_method': {method: round(count / per_run, 1) for method, count in rpc_calls.most_common()},
+        },
+        'api_requests': {path: round(count / per_run, 1) for path, count in api_requests.most_common()},
+        'peak_memory_mb': round(max((run.peak_bytes for run in ok), default=0) / 2 ** 20, 1),
+    }
+
+
+def benchmark(args, fixture: Dict[str, Any], workdir: Path) -> Dict[str, Any]:
+    report = {
+        'fixture': {
+            'pools': fixture['pools'],
+            'stakers': len(fixture['stakers']),
+            'vault_positions': fixture['vaultPositions'],
+            'block': fixture['block'],
+        },
+        'iterations': args.iterations,
+        'scenarios': {},
+    }
+    modes = ['e2e', 'api'] if args.mode == 'both' else [args.mode]
+
+    with StubServices(NODE_URL, fixture) as stubs:
+        config_path = write_cli_config(workdir / 'cli-config.yaml', fixture, stubs.rpc_url, stubs.api_url)
+
+        for name in args.scenario or list(SCENARIOS):
+            scenario = SCENARIOS[name]
+            results = report['scenarios'][name] = {}
+            for mode in modes:
+                def _once() -> Run:
+                    if mode == 'e2e':
+                        return run_e2e(scenario, config_path, fixture, workdir, stubs)
+                    return run_api(scenario, config_path, fixture, stubs)
+
+                for _ in range(args.warmup):
+                    _once()
+                runs = [_once() for _ in range(args.iterations)]
+                results[mode] = summarize(runs)
+
+                latency = results[mode]['latency_ms']
+                print(f"{name:<16} {mode:<4} p50 {latency['p50']:>9.1f} ms  p99 {latency['p99']:>9.1f} ms  "
+                      f"rpc {results[mode]['rpc_calls']['total']:>8.1f}  "
+                      f"peak {results[mode]['peak_memory_mb']:>7.1f} MB  "
+                      f"failures {results[mode]['failures']}", file=sys.stderr)
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pools', type=int, default=10, help='Staking pools in the fixture')
+    parser.add_argument('--stakers', type=int, default=100, help='Staker wallets in the fixture')
+    parser.add_argument('--vault-positions', type=int, default=50, help='Stakers that also hold a vault position')
+    parser.add_argument('--iterations', '-n', type=int, default=10, help='Measured runs per scenario and mode')
+    parser.add_argument('--warmup', type=int, default=1, help='Unmeasured runs before each series')
+    parser.add_argument('--scenario', '-s', action='append', choices=list(SCENARIOS),
+                        help='Scenario to run (repeatable; defaults to all)')
+    parser.add_argument('--mode', choices=['e2e', 'api', 'both'], default='both')
+    parser.add_argument('--fixture', type=Path,
+                        help='Reuse a fixture already deployed to a running node on 127.0.0.1:8545')
+    parser.add_argument('--output', '-o', type=Path, help='Report path (defaults to stdout)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='cataklism-bench-') as tmp:
+        workdir = Path(tmp)
+        if args.fixture:
+            report = benchmark(args, json.loads(args.fixture.read_text()), workdir)
+        else:
+            with HardhatNode():
+                fixture = deploy_fixture(workdir / 'fixture.json', args.pools, args.stakers, args.vault_positions)
+                report = benchmark(args, fixture, workdir)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+        print(f"Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    failures = sum(mode['failures'] for modes in report['scenarios'].values() for mode in modes.values())
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
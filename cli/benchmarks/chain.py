@@ -0,0 +1,106 @@
+"""
+Local Hardhat chain for the benchmarks
+Starts `npx hardhat node` and seeds it with scripts/bench-fixture.js.
+Hardhat's localhost network is fixed at 127.0.0.1:8545, so the node
+always listens there.
+"""
+
+import json
+import os
+import subprocess
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+NODE_URL = 'http://127.0.0.1:8545'
+
+# First of Hardhat's well-known development accounts; it holds test ETH only
+DEV_ACCOUNT_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+
+
+def _rpc(url: str, method: str, params=()) -> Any:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': list(params)}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)['result']
+
+
+class HardhatNode:
+    """A hardhat node subprocess, stopped on exit"""
+
+    def __init__(self, url: str = NODE_URL, startup_timeout: float = 60):
+        self.url = url
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> 'HardhatNode':
+        self._process = subprocess.Popen(
+            ['npx', 'hardhat', 'node'],
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                _rpc(self.url, 'eth_chainId')
+                return self
+            except OSError:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"hardhat node exited with code {self._process.returncode}")
+                if time.monotonic() > deadline:
+                    self._process.terminate()
+                    raise RuntimeError(f"hardhat node did not answer on {self.url} within {self.startup_timeout}s")
+                time.sleep(0.5)
+
+    def __exit__(self, *exc_info):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def deploy_fixture(path: Path, pools: int, stakers: int, vault_positions: int) -> Dict[str, Any]:
+    """Deploy and seed the protocol on the localhost node and return the fixture"""
+    env = dict(
+        os.environ,
+        PRIVATE_KEY=DEV_ACCOUNT_KEY,
+        BENCH_POOLS=str(pools),
+        BENCH_STAKERS=str(stakers),
+        BENCH_VAULT_POSITIONS=str(vault_positions),
+        BENCH_FIXTURE=str(path.resolve()),
+    )
+    subprocess.run(
+        ['npx', 'hardhat', 'run', 'scripts/bench-fixture.js', '--network', 'localhost'],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+    )
+    return json.loads(path.read_text())
+
+
+def write_cli_config(path: Path, fixture: Dict[str, Any], rpc_url: str, api_url: str) -> Path:
+    """CLI config pointing at the counting proxy and the stats stand-in
+
+    JSON is valid YAML, so the file loads whichever format the loader expects.
+    """
+    config = {
+        'network': {
+            'name': 'localhost',
+            'chain_id': fixture['chainId'],
+            'rpc_url': rpc_url,
+            'explorer': '',
+        },
+        'contracts': dict(fixture['contracts'], deploy_block=0),
+        'wallet': {'address': fixture['stakers'][0] if fixture['stakers'] else fixture['deployer']},
+        'api': {'base_url': api_url},
+    }
+    path.write_text(json.dumps(config, indent=2))
+    return path
@@ -0,0 +1,169 @@
+"""
+Local stand-ins the benchmarked commands talk to
+A JSON-RPC proxy in front of the Hardhat node counts every call by method,
+batched or not, and a stats API serves fixed responses shaped after the
+backend's /api routes. Both run on one event loop in a background thread,
+so they serve CLI subprocesses and in-process API calls alike.
+"""
+
+import asyncio
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+
+class CountingRpcProxy:
+    """Forwards JSON-RPC requests to the node and counts them"""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.calls: Counter = Counter()
+        self.http_requests = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def reset(self):
+        self.calls = Counter()
+        self.http_requests = 0
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/', self._handle)
+        app.on_cleanup.append(self._close)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        payload = json.loads(body)
+        self.http_requests += 1
+        for entry in payload if isinstance(payload, list) else [payload]:
+            self.calls[entry.get('method', '?')] += 1
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(self.upstream, data=body,
+                                      headers={'Content-Type': 'application/json'}) as response:
+            return web.Response(body=await response.read(), status=response.status,
+                                content_type='application/json')
+
+    async def _close(self, app: web.Application):
+        if self._session is not None:
+            await self._session.close()
+
+
+class StatsApi:
+    """Fixed protocol, vault, pool and token responses derived from the fixture"""
+
+    def __init__(self, fixture: Dict[str, Any]):
+        self.fixture = fixture
+        self.requests: Counter = Counter()
+
+    def reset(self):
+        self.requests = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        routes = {
+            '/health': self._health,
+            '/api/protocol/stats': self._protocol_stats,
+            '/api/protocol/token': self._token_info,
+            '/api/protocol/token/prices': self._token_prices,
+            '/api/protocol/token/{symbol}/price': self._token_price,
+            '/api/vault/stats': self._vault_stats,
+            '/api/staking/pools': self._pools,
+        }
+        for path, handler in routes.items():
+            app.router.add_get(path, self._counted(handler))
+        return app
+
+    def _counted(self, handler):
+        async def _handler(request: web.Request) -> web.Response:
+            self.requests[request.match_info.route.resource.canonical] += 1
+            return web.json_response(await handler(request))
+        return _handler
+
+    async def _health(self, request):
+        return {'status': 'ok'}
+
+    async def _protocol_stats(self, request):
+        return {
+            'tvl': 12_500_000.0,
+            'total_stakers': len(self.fixture['stakers']),
+            'active_pools': self.fixture['pools'],
+            'avg_apy': 14.2,
+            'total_volume_24h': 830_000.0,
+            'total_users': len(self.fixture['stakers']),
+        }
+
+    async def _vault_stats(self, request):
+        return {
+            'total_assets': 3_200_000.0,
+            'apy': 9.8,
+            'positions': self.fixture['vaultPositions'],
+        }
+
+    async def _pools(self, request):
+        return [
+            {'id': pool_id, 'apy': 8.0 + pool_id % 7, 'tvl_usd': 250_000.0 * (pool_id + 1)}
+            for pool_id in range(self.fixture['pools'])
+        ]
+
+    async def _token_info(self, request):
+        return {
+            'symbol': 'CTKL',
+            'price': 1.25,
+            'market_cap': 125_000_000.0,
+            'circulating_supply': 100_000_000.0,
+        }
+
+    async def _token_prices(self, request):
+        symbols = request.query.get('symbols', 'CTKL').split(',')
+        return {symbol.upper(): 1.25 if symbol.upper() == 'CTKL' else 1.0 for symbol in symbols}
+
+    async def _token_price(self, request):
+        symbol = request.match_info['symbol'].upper()
+        return {'symbol': symbol, 'price': 1.25 if symbol == 'CTKL' else 1.0}
+
+
+class StubServices:
+    """Runs the proxy and the stats API on ephemeral ports in a background thread"""
+
+    def __init__(self, node_url: str, fixture: Dict[str, Any], host: str = '127.0.0.1'):
+        self.host = host
+        self.proxy = CountingRpcProxy(node_url)
+        self.api = StatsApi(fixture)
+        self.rpc_url = ''
+        self.api_url = ''
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='bench-stubs', daemon=True)
+        self._runners = []
+
+    def __enter__(self) -> 'StubServices':
+        self._thread.start()
+        self.rpc_url = self._call(self._serve(self.proxy.app()))
+        self.api_url = f"{self._call(self._serve(self.api.app()))}/api"
+        return self
+
+    def __exit__(self, *exc_info):
+        for runner in self._runners:
+            self._call(runner.cleanup())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def reset(self):
+        self.proxy.reset()
+        self.api.reset()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _serve(self, app: web.Application) -> str:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, 0)
+        await site.start()
+        self._runners.append(runner)
+        return f"http://{self.host}:{runner.addresses[0][1]}"
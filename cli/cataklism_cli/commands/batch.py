@@ -0,0 +1,511 @@
+"""
+Batch transaction execution for staking and vault operations
+Reads a CSV or JSON manifest and submits its operations with local nonce
+management, bulk gas estimation and asynchronous receipt tracking
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from eth_account import Account
+from web3 import Web3
+
+from ..core.abi import CORE_ABI, VAULT_ABI
+from ..core.rpc import AsyncRpcBatcher, RpcError
+from ..core.rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ACTIONS = ('stake_deposit', 'stake_withdraw', 'vault_deposit')
+
+# Journal states; confirmed and failed (reverted on chain) are final and
+# skipped on resume, rejected operations never reached the chain and are retried
+STATUS_ESTIMATED = 'estimated'
+STATUS_SUBMITTED = 'submitted'
+STATUS_CONFIRMED = 'confirmed'
+STATUS_FAILED = 'failed'
+STATUS_REJECTED = 'rejected'
+FINAL_STATUSES = (STATUS_CONFIRMED, STATUS_FAILED)
+
+# Broadcast errors meaning the node already holds this exact transaction,
+# e.g. from an endpoint that accepted it before the pool failed over
+_KNOWN_TX_ERRORS = ('already known', 'known transaction', 'already imported')
+_NONCE_TOO_LOW = 'nonce too low'
+
+GAS_LIMIT_BUFFER = 1.2
+RECEIPT_TIMEOUT_SECONDS = 600
+
+
+@dataclass
+class BatchOperation:
+    op_id: str
+    action: str
+    amount: str
+    pool_id: Optional[int] = None
+    sender: Optional[str] = None
+    gas_limit: Optional[int] = None
+
+
+@dataclass
+class BatchSummary:
+    confirmed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    unconfirmed: int = 0
+    estimated_gas: int = 0
+    elapsed: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def _parse_operation(raw: Dict[str, Any], index: int) -> BatchOperation:
+    action = str(raw.get('action', '')).strip()
+    if action not in SUPPORTED_ACTIONS:
+        raise ValueError(f"Operation {index}: unsupported action '{action}'")
+
+    amount = str(raw.get('amount', '')).strip()
+    if not amount:
+        raise ValueError(f"Operation {index}: amount is required")
+
+    pool_id = raw.get('pool_id')
+    if action.startswith('stake_'):
+        if pool_id in (None, ''):
+            raise ValueError(f"Operation {index}: pool_id is required for {action}")
+        pool_id = int(pool_id)
+    else:
+        pool_id = None
+
+    sender = raw.get('from') or None
+    gas_limit = raw.get('gas_limit')
+
+    return BatchOperation(
+        op_id=str(raw.get('id') or index),
+        action=action,
+        amount=amount,
+        pool_id=pool_id,
+        sender=Web3.toChecksumAddress(sender) if sender else None,
+        gas_limit=int(gas_limit) if gas_limit not in (None, '') else None,
+    )
+
+
+def load_manifest(path: str) -> List[BatchOperation]:
+    """Load batch operations from a CSV or JSON manifest
+
+    CSV manifests need a header row with the columns id, action, pool_id,
+    amount, from and gas_limit (only action and amount are mandatory).
+    JSON manifests hold a list of objects with the same keys, optionally
+    wrapped as {"operations": [...]}.
+    """
+    manifest = Path(path)
+
+    if manifest.suffix.lower() == '.json':
+        data = json.loads(manifest.read_text())
+        if isinstance(data, dict):
+            data = data.get('operations', [])
+        rows = data
+    else:
+        with manifest.open(newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    operations = [_parse_operation(row, index) for index, row in enumerate(rows, start=1)]
+
+    ids = [op.op_id for op in operations]
+    if len(ids) != len(set(ids)):
+        raise ValueError("Manifest contains duplicate operation ids")
+
+    return operations
+
+
+class BatchJournal:
+    """Append-only JSON lines journal of operation state transitions
+
+    The signed transaction is recorded before it is broadcast, so a run that
+    is interrupted at any point can be resumed without double-spending a nonce.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path.exists():
+            with self.path.open() as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash; everything before it is intact
+                        logger.warning(f"Ignoring corrupt journal line in {self.path}")
+                        continue
+                    self.entries.setdefault(record['id'], {}).update(record)
+        return self.entries
+
+    def record(self, op_id: str, status: str, durable: bool = False, **fields):
+        if self._file is None:
+            self._file = self.path.open('a')
+
+        record = {'id': op_id, 'status': status, 'time': time.time(), **fields}
+        self.entries.setdefault(op_id, {}).update(record)
+
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        if durable:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NonceManager:
+    """Hands out sequential nonces per sender without a round trip per transaction"""
+
+    def __init__(self, rpc: AsyncRpcBatcher):
+        self.rpc = rpc
+        self._next: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def prime(self, senders: List[str]):
+        """Fetch the pending nonce of every sender in a single batch request"""
+        results = await self.rpc.batch([
+            ('eth_getTransactionCount', [sender, 'pending']) for sender in senders
+        ])
+        for sender, result in zip(senders, results):
+            if isinstance(result, RpcError):
+                raise result
+            self._next[sender] = int(result, 16)
+
+    def lock(self, sender: str) -> asyncio.Lock:
+        return self._locks.setdefault(sender, asyncio.Lock())
+
+    def peek(self, sender: str) -> int:
+        return self._next[sender]
+
+    def advance(self, sender: str):
+        self._next[sender] += 1
+
+
+class ReceiptTracker:
+    """Polls receipts for every in-flight transaction with one batch request per tick"""
+
+    def __init__(self, rpc: AsyncRpcBatcher, poll_interval: float = 1.0):
+        self.rpc = rpc
+        self.poll_interval = poll_interval
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def wait_for(self, tx_hash: str) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        self._waiting[tx_hash] = future
+        return future
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+
+            # Waiters that timed out are no longer interested
+            self._waiting = {h: f for h, f in self._waiting.items() if not f.done()}
+            if not self._waiting:
+                continue
+
+            hashes = list(self._waiting)
+            try:
+                receipts = await self.rpc.batch([
+                    ('eth_getTransactionReceipt', [tx_hash]) for tx_hash in hashes
+                ])
+            except Exception as e:
+                logger.warning(f"Receipt polling failed, retrying: {e}")
+                continue
+
+            for tx_hash, receipt in zip(hashes, receipts):
+                if receipt is None or isinstance(receipt, RpcError):
+                    continue
+                future = self._waiting.pop(tx_hash)
+                if not future.done():
+                    future.set_result(receipt)
+
+
+class BatchCommands:
+    """Runs manifests of staking and vault operations as pipelined transactions"""
+
+    def __init__(self, web3_client, config):
+        self.web3_client = web3_client
+        self.config = config
+
+    def _contracts(self):
+        w3 = self.web3_client.w3
+        core = w3.eth.contract(address=Web3.toChecksumAddress(self.config.contracts.core), abi=CORE_ABI)
+        vault = w3.eth.contract(address=Web3.toChecksumAddress(self.config.contracts.vault), abi=VAULT_ABI)
+        return core, vault
+
+    def load_signers(self, keys_file: Optional[str] = None) -> Dict[str, Any]:
+        """Load the configured wallet plus any extra keys, one hex key per line"""
+        keys = []
+        if getattr(self.config.wallet, 'private_key', None):
+            keys.append(self.config.wallet.private_key)
+        if keys_file:
+            keys.extend(line.strip() for line in Path(keys_file).read_text().splitlines() if line.strip())
+
+        signers = {}
+        for key in keys:
+            account = Account.from_key(key)
+            signers[account.address] = account
+        return signers
+
+    def build_call(self, op: BatchOperation) -> Dict[str, Any]:
+        """Return the destination and calldata for an operation"""
+        core, vault = self._contracts()
+        amount = Web3.toWei(op.amount, 'ether')
+
+        if op.action == 'stake_deposit':
+            return {'to': core.address, 'data': core.encodeABI(fn_name='deposit', args=[op.pool_id, amount])}
+        if op.action == 'stake_withdraw':
+            return {'to': core.address, 'data': core.encodeABI(fn_name='withdraw', args=[op.pool_id, amount])}
+        return {'to': vault.address, 'data': vault.encodeABI(fn_name='deposit', args=[amount])}
+
+    async def run(
+        self,
+        operations: List[BatchOperation],
+        journal: BatchJournal,
+        signers: Dict[str, Any],
+        window: int = 16,
+        gas_price: Optional[str] = None,
+        dry_run: bool = False,
+        confirm: Optional[Callable[[List[BatchOperation], int], bool]] = None,
+        on_progress: Optional[Callable[[str, str], None]] = None,
+    ) -> BatchSummary:
+        """Execute a manifest, resuming from whatever the journal already records"""
+        started = time.time()
+        summary = BatchSummary()
+        default_sender = Web3.toChecksumAddress(self.config.wallet.address)
+        entries = journal.load()
+
+        def progress(op_id: str, status: str):
+            if on_progress:
+                on_progress(op_id, status)
+
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            chain_id = int(await rpc.call('eth_chainId'), 16)
+            tracker = ReceiptTracker(rpc)
+            tracker.start()
+
+            try:
+                # Resume: transactions signed in an earlier run are re-tracked, not re-signed
+                resumed, retry_later = await self._resume(rpc, tracker, journal, summary, progress)
+
+                pending = []
+                for op in operations:
+                    if op.op_id in resumed or op.op_id in retry_later:
+                        # Reported once its receipt arrives, or already reported as rejected
+                        continue
+                    if entries.get(op.op_id, {}).get('status') in FINAL_STATUSES:
+                        summary.skipped += 1
+                        progress(op.op_id, 'skipped')
+                        continue
+                    op.sender = op.sender or default_sender
+                    if op.sender not in signers:
+                        self._reject(journal, summary, progress, op.op_id, f"no signer loaded for {op.sender}")
+                        continue
+                    pending.append(op)
+
+                calls = {op.op_id: self.build_call(op) for op in pending}
+                pending = await self._estimate_gas(rpc, pending, calls, journal, summary, progress)
+
+                if gas_price:
+                    price = Web3.toWei(gas_price, 'gwei')
+                else:
+                    price = int(await rpc.call('eth_gasPrice'), 16)
+
+                if dry_run or not pending:
+                    await asyncio.gather(*resumed.values())
+                    return summary
+
+                if confirm and not confirm(pending, summary.estimated_gas):
+                    await asyncio.gather(*resumed.values())
+                    return summary
+
+                nonces = NonceManager(rpc)
+                await nonces.prime(sorted({op.sender for op in pending}))
+
+                in_flight = asyncio.Semaphore(window)
+                submissions = [
+                    self._submit(rpc, tracker, nonces, in_flight, journal, summary, progress,
+                                 op, calls[op.op_id], signers[op.sender], price, chain_id)
+                    for op in pending
+                ]
+                await asyncio.gather(*submissions, *resumed.values())
+
+            finally:
+                await tracker.stop()
+                journal.close()
+                summary.elapsed = time.time() - started
+
+        return summary
+
+    async def _resume(self, rpc, tracker, journal, summary, progress) -> Tuple[Dict[str, asyncio.Future], Set[str]]:
+        """Re-track journaled transactions; returns their receipt waits and the ids rejected on rebroadcast"""
+        waiting, rejected = {}, set()
+        submitted = {op_id: entry for op_id, entry in journal.entries.items()
+                     if entry.get('status') == STATUS_SUBMITTED}
+        if not submitted:
+            return waiting, rejected
+
+        # Rebroadcast anything the node no longer knows about; identical raw
+        # transactions are idempotent so this can never double-execute
+        known = await rpc.batch([
+            ('eth_getTransactionByHash', [entry['tx_hash']]) for entry in submitted.values()
+        ])
+        rebroadcast = [op_id for (op_id, entry), tx in zip(submitted.items(), known) if tx is None]
+        if rebroadcast:
+            logger.info(f"Rebroadcasting {len(rebroadcast)} journaled transactions")
+            results = await rpc.batch([
+                ('eth_sendRawTransaction', [submitted[op_id]['raw_tx']]) for op_id in rebroadcast
+            ])
+            for op_id, result in zip(rebroadcast, results):
+                if isinstance(result, RpcError) and not await self._already_broadcast(
+                        rpc, result, submitted[op_id]['tx_hash']):
+                    # The nonce went to another transaction; re-signed on the next run
+                    self._reject(journal, summary, progress, op_id, result.message)
+                    rejected.add(op_id)
+                    del submitted[op_id]
+
+        for op_id, entry in submitted.items():
+            waiting[op_id] = asyncio.ensure_future(
+                self._await_receipt(tracker, journal, summary, progress, op_id, entry['tx_hash'], None)
+            )
+        return waiting, rejected
+
+    async def _estimate_gas(self, rpc, pending, calls, journal, summary, progress) -> List[BatchOperation]:
+        to_estimate = [op for op in pending if op.gas_limit is None]
+        estimates = await rpc.batch([
+            ('eth_estimateGas', [{'from': op.sender, **calls[op.op_id]}]) for op in to_estimate
+        ])
+
+        for op, estimate in zip(to_estimate, estimates):
+            if isinstance(estimate, RpcError):
+                self._reject(journal, summary, progress, op.op_id, f"gas estimation failed: {estimate.message}")
+                continue
+            op.gas_limit = int(int(estimate, 16) * GAS_LIMIT_BUFFER)
+
+        ready = []
+        for op in pending:
+            if op.gas_limit is None:
+                continue
+            journal.record(op.op_id, STATUS_ESTIMATED, gas_limit=op.gas_limit)
+            summary.estimated_gas += op.gas_limit
+            ready.append(op)
+        return ready
+
+    async def _submit(self, rpc, tracker, nonces, in_flight, journal, summary, progress,
+                      op, call, signer, gas_price, chain_id):
+        await in_flight.acquire()
+        released = False
+
+        try:
+            # Nonce assignment and broadcast are serialised per sender so a
+            # rejected transaction never leaves a gap in the nonce sequence
+            async with nonces.lock(op.sender):
+                nonce = nonces.peek(op.sender)
+                signed = signer.sign_transaction({
+                    'to': call['to'],
+                    'data': call['data'],
+                    'value': 0,
+                    'gas': op.gas_limit,
+                    'gasPrice': gas_price,
+                    'nonce': nonce,
+                    'chainId': chain_id,
+                })
+                tx_hash = Web3.toHex(signed.hash)
+                journal.record(op.op_id, STATUS_SUBMITTED, durable=True, tx_hash=tx_hash,
+                               raw_tx=Web3.toHex(signed.rawTransaction), nonce=nonce, sender=op.sender)
+
+                try:
+                    await rpc.call('eth_sendRawTransaction', [Web3.toHex(signed.rawTransaction)])
+                except RpcError as e:
+                    if not await self._already_broadcast(rpc, e, tx_hash):
+                        if _NONCE_TOO_LOW in e.message.lower():
+                            # Another transaction took the nonce; pick up from the chain
+                            await nonces.prime([op.sender])
+                        self._reject(journal, summary, progress, op.op_id, e.message)
+                        return
+                    logger.info(f"{tx_hash} was already broadcast: {e.message}")
+                nonces.advance(op.sender)
+
+            progress(op.op_id, STATUS_SUBMITTED)
+            released = True
+            await self._await_receipt(tracker, journal, summary, progress, op.op_id, tx_hash, in_flight)
+
+        finally:
+            if not released:
+                in_flight.release()
+
+    async def _already_broadcast(self, rpc, error: RpcError, tx_hash: str) -> bool:
+        """Whether a broadcast the node rejected is in fact this transaction already in flight"""
+        message = error.message.lower()
+        if any(marker in message for marker in _KNOWN_TX_ERRORS):
+            return True
+        if _NONCE_TOO_LOW not in message:
+            return False
+
+        # The nonce is used; only a transaction or receipt for our own hash makes it ours
+        results = await rpc.batch([
+            ('eth_getTransactionByHash', [tx_hash]),
+            ('eth_getTransactionReceipt', [tx_hash]),
+        ])
+        return any(result is not None and not isinstance(result, RpcError) for result in results)
+
+    def _reject(self, journal, summary, progress, op_id: str, error: str):
+        """Record an operation that never reached the chain; the next run retries it"""
+        journal.record(op_id, STATUS_REJECTED, error=error)
+        summary.rejected += 1
+        summary.errors[op_id] = error
+        progress(op_id, STATUS_REJECTED)
+
+    async def _await_receipt(self, tracker, journal, summary, progress, op_id, tx_hash, in_flight):
+        try:
+            receipt = await asyncio.wait_for(tracker.wait_for(tx_hash), RECEIPT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Left as submitted in the journal so the next run picks it up again
+            logger.warning(f"No receipt for {tx_hash} after {RECEIPT_TIMEOUT_SECONDS}s")
+            summary.unconfirmed += 1
+            summary.errors[op_id] = 'receipt timeout'
+            progress(op_id, 'unconfirmed')
+            return
+        finally:
+            if in_flight is not None:
+                in_flight.release()
+
+        if int(receipt['status'], 16) == 1:
+            journal.record(op_id, STATUS_CONFIRMED, tx_hash=tx_hash,
+                           block_number=int(receipt['blockNumber'], 16),
+                           gas_used=int(receipt['gasUsed'], 16))
+            summary.confirmed += 1
+            progress(op_id, STATUS_CONFIRMED)
+        else:
+            journal.record(op_id, STATUS_FAILED, tx_hash=tx_hash, error='transaction reverted')
+            summary.failed += 1
+            summary.errors[op_id] = 'transaction reverted'
+            progress(op_id, STATUS_FAILED)
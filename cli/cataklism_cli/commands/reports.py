@@ -0,0 +1,379 @@
+"""
+Streaming analytics report pipeline
+Report sections run concurrently and emit rows as soon as they are
+available; writers persist them incrementally instead of building the
+whole report in memory
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from web3 import Web3
+
+from ..core.abi import CORE_ABI, TOKEN_ABI
+from ..core.events import EventDecoder, LogScanner
+from ..core.history import HistoryStore
+from ..core.multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from ..core.rpc import AsyncRpcBatcher
+from ..core.rpc_pool import endpoint_pool
+from ..utils.writers import RowWriter, open_row_writer
+
+logger = logging.getLogger(__name__)
+
+SECTION_COLUMNS = {
+    'summary': ['metric', 'value'],
+    'pools': ['pool_id', 'token', 'total_liquidity', 'reward_rate', 'acc_reward_per_share', 'is_active'],
+    'pool_history': ['pool_id', 'from_block', 'to_block', 'deposits', 'withdrawals',
+                     'rewards_claimed', 'net_flow', 'events'],
+    'holder_tiers': ['tier', 'min_balance', 'max_balance', 'holders', 'balance', 'share'],
+    'top_holders': ['rank', 'address', 'balance', 'share'],
+    'tvl_history': ['block_time', 'block_number', 'tvl', 'vault_total_assets', 'token_supply'],
+    'apy_history': ['block_time', 'block_number', 'vault_share_value', 'vault_apy'],
+}
+
+# Holder tiers in whole CTKL; the last tier is open-ended
+HOLDER_TIERS = [0, 1, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+ProgressCallback = Callable[[str, int, Optional[int]], None]
+
+_DONE = object()
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+class ReportPipeline:
+    """Produces analytics report rows section by section, concurrently"""
+
+    def __init__(self, protocol_client, config, top_holders: int = 100, bucket_blocks: int = 7200,
+                 store: Optional[HistoryStore] = None):
+        self.protocol_client = protocol_client
+        self.config = config
+        self.top_holders = top_holders
+        self.bucket_blocks = bucket_blocks
+        self.store = store
+
+    async def run(self, from_block: Optional[int] = None, to_block: Optional[int] = None,
+                  on_progress: Optional[ProgressCallback] = None,
+                  offline: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (section, row) pairs as the sections produce them
+
+        Historical sections are answered from the local history store when it
+        has been synced up to to_block; offline runs use only the store.
+        """
+        progress = on_progress or (lambda section, advance, total: None)
+        deploy_block = getattr(self.config.contracts, 'deploy_block', 0) or 0
+        if from_block is None:
+            from_block = deploy_block
+
+        if offline:
+            if self.store is None:
+                raise ValueError("Offline reports need a synced history store")
+            synced = [self.store.checkpoint(stream) for stream in ('core', 'token')]
+            if None in synced:
+                raise ValueError("History store has not been synced; run 'analytics sync' first")
+            to_block = min([to_block] + synced) if to_block is not None else min(synced)
+
+            producers = [
+                self._stored_summary(),
+                self._stored_pools(),
+                self._stored_pool_history(from_block, to_block),
+                self._stored_holders(to_block),
+                self._stored_history(),
+            ]
+            async for item in self._merge(producers):
+                yield item
+            return
+
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            if to_block is None:
+                to_block = int(await rpc.call('eth_blockNumber'), 16)
+
+            store = self.store
+            producers = [self._summary(), self._pools(rpc)]
+
+            if store is not None and store.covers('core', to_block):
+                producers.append(self._stored_pool_history(from_block, to_block))
+            else:
+                producers.append(self._pool_history(rpc, from_block, to_block, progress))
+
+            # Balances need the full transfer history regardless of from_block
+            if store is not None and store.covers('token', to_block):
+                producers.append(self._stored_holders(to_block))
+            else:
+                producers.append(self._holders(rpc, deploy_block, to_block, progress))
+
+            if store is not None:
+                producers.append(self._stored_history())
+
+            async for item in self._merge(producers):
+                yield item
+
+    async def _merge(self, producers) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Run producers concurrently and yield their rows as they arrive"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+
+        async def _drain(producer):
+            try:
+                async for item in producer:
+                    await queue.put(item)
+            finally:
+                await queue.put(_DONE)
+
+        tasks = [asyncio.ensure_future(_drain(p)) for p in producers]
+        remaining = len(tasks)
+
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                yield item
+
+            # Surface the first section failure, if any
+            for task in tasks:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stored_summary(self):
+        sample = self.store.latest_sample()
+        if sample is None:
+            return
+        for metric, value in sample.items():
+            yield 'summary', {'metric': metric, 'value': str(value)}
+
+    async def _stored_pools(self):
+        for row in self.store.latest_pools().to_dict('records'):
+            yield 'pools', {
+                'pool_id': int(row['pool_id']),
+                'token': '',
+                'total_liquidity': row['total_liquidity'],
+                'reward_rate': row['reward_rate'],
+                'acc_reward_per_share': str(row['acc_reward_per_share']),
+                'is_active': bool(row['is_active']),
+            }
+
+    async def _stored_pool_history(self, from_block: int, to_block: int):
+        frame = self.store.pool_history(from_block, to_block, self.bucket_blocks)
+        for row in frame.to_dict('records'):
+            yield 'pool_history', row
+
+    async def _stored_holders(self, to_block: int):
+        balances = self.store.holder_balances(to_block)
+        supply = balances['balance'].sum() or 1.0
+
+        top = balances.head(self.top_holders)
+        for rank, row in enumerate(top.itertuples(index=False), start=1):
+            yield 'top_holders', {
+                'rank': rank,
+                'address': row.address,
+                'balance': row.balance,
+                'share': row.balance / supply,
+            }
+
+        bins = HOLDER_TIERS + [float('inf')]
+        tiers = pd.cut(balances['balance'], bins=bins, right=False)
+        grouped = balances.groupby(tiers, observed=False)['balance'].agg(['count', 'sum'])
+        for (interval, stats), low, high in zip(grouped.iterrows(), HOLDER_TIERS, bins[1:]):
+            yield 'holder_tiers', {
+                'tier': f"{low:,}+" if high == float('inf') else f"{low:,}-{high:,}",
+                'min_balance': float(low),
+                'max_balance': float(high),
+                'holders': int(stats['count']),
+                'balance': float(stats['sum']),
+                'share': float(stats['sum']) / supply,
+            }
+
+    async def _stored_history(self):
+        for row in self.store.tvl_history().to_dict('records'):
+            yield 'tvl_history', row
+        for row in self.store.apy_history().to_dict('records'):
+            yield 'apy_history', row
+
+    async def _summary(self):
+        stats = await self.protocol_client.get_protocol_stats()
+        for metric, value in stats.items():
+            yield 'summary', {'metric': metric, 'value': str(value)}
+
+    async def _pools(self, rpc: AsyncRpcBatcher):
+        multicall = Multicall(rpc, getattr(self.config.contracts, 'multicall', None) or MULTICALL3_ADDRESS)
+        core = self.config.contracts.core
+
+        (count,) = (await multicall.execute([make_call(core, 'poolCount()', [], ['uint256'])]))[0]
+        pools = await multicall.execute([
+            make_call(core, 'pools(uint256)', [pool_id],
+                      ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool'])
+            for pool_id in range(count)
+        ])
+
+        for pool_id, pool in enumerate(pools):
+            if pool is None:
+                continue
+            token, liquidity, reward_rate, _, acc_reward_per_share, is_active = pool
+            yield 'pools', {
+                'pool_id': pool_id,
+                'token': token,
+                'total_liquidity': _from_wei(liquidity),
+                'reward_rate': _from_wei(reward_rate),
+                'acc_reward_per_share': str(acc_reward_per_share),
+                'is_active': bool(is_active),
+            }
+
+    async def _pool_history(self, rpc: AsyncRpcBatcher, from_block: int, to_block: int,
+                            progress: ProgressCallback):
+        """Staking flows per pool, aggregated into fixed block buckets"""
+        decoder = EventDecoder(CORE_ABI)
+        scanner = LogScanner(rpc)
+        topics = [decoder.topics('Deposit', 'Withdraw', 'RewardsClaimed')]
+        progress('pool_history', 0, to_block - from_block + 1)
+
+        buckets: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+        def _bucket_start(block: int) -> int:
+            return from_block + ((block - from_block) // self.bucket_blocks) * self.bucket_blocks
+
+        def _flush(before: int):
+            for key in sorted(k for k in buckets if k[1] + self.bucket_blocks - 1 < before):
+                yield 'pool_history', buckets.pop(key)
+
+        async for start, end, logs in scanner.scan(
+            self.config.contracts.core, topics, from_block, to_block,
+            on_progress=lambda blocks: progress('pool_history', blocks, None),
+        ):
+            for log in logs:
+                event = decoder.decode(log)
+                if event is None:
+                    continue
+                pool_id = event['args']['poolId']
+                bucket = _bucket_start(event['block_number'])
+                row = buckets.setdefault((pool_id, bucket), {
+                    'pool_id': pool_id,
+                    'from_block': bucket,
+                    'to_block': min(bucket + self.bucket_blocks - 1, to_block),
+                    'deposits': 0.0,
+                    'withdrawals': 0.0,
+                    'rewards_claimed': 0.0,
+                    'net_flow': 0.0,
+                    'events': 0,
+                })
+                row['events'] += 1
+                if event['event'] == 'Deposit':
+                    amount = _from_wei(event['args']['amount'])
+                    row['deposits'] += amount
+                    row['net_flow'] += amount
+                elif event['event'] == 'Withdraw':
+                    amount = _from_wei(event['args']['amount'])
+                    row['withdrawals'] += amount
+                    row['net_flow'] -= amount
+                else:
+                    row['rewards_claimed'] += _from_wei(event['args']['reward'])
+
+            # Buckets that end before the next range can no longer change
+            for item in _flush(end + 1):
+                yield item
+
+        for item in _flush(to_block + self.bucket_blocks):
+            yield item
+
+    async def _holders(self, rpc: AsyncRpcBatcher, from_block: int, to_block: int,
+                       progress: ProgressCallback):
+        """CTKL holder distribution rebuilt from Transfer events"""
+        decoder = EventDecoder(TOKEN_ABI)
+        scanner = LogScanner(rpc)
+        topics = [decoder.topics('Transfer')]
+        progress('holders', 0, to_block - from_block + 1)
+
+        balances: Dict[str, int] = {}
+        async for _, _, logs in scanner.scan(
+            self.config.contracts.token, topics, from_block, to_block,
+            on_progress=lambda blocks: progress('holders', blocks, None),
+        ):
+            for log in logs:
+                event = decoder.decode(log)
+                if event is None:
+                    continue
+                sender, recipient, value = event['args']['from'], event['args']['to'], event['args']['value']
+                if sender != ZERO_ADDRESS:
+                    balances[sender] = balances.get(sender, 0) - value
+                if recipient != ZERO_ADDRESS:
+                    balances[recipient] = balances.get(recipient, 0) + value
+
+        holders = sorted(((b, a) for a, b in balances.items() if b > 0), reverse=True)
+        supply = sum(b for b, _ in holders) or 1
+
+        for rank, (balance, address) in enumerate(holders[:self.top_holders], start=1):
+            yield 'top_holders', {
+                'rank': rank,
+                'address': address,
+                'balance': _from_wei(balance),
+                'share': balance / supply,
+            }
+
+        bounds = HOLDER_TIERS + [None]
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            in_tier = [b for b, _ in holders
+                       if _from_wei(b) >= low and (high is None or _from_wei(b) < high)]
+            yield 'holder_tiers', {
+                'tier': f"{low:,}+" if high is None else f"{low:,}-{high:,}",
+                'min_balance': float(low),
+                'max_balance': float(high) if high is not None else float('inf'),
+                'holders': len(in_tier),
+                'balance': _from_wei(sum(in_tier)),
+                'share': sum(in_tier) / supply,
+            }
+
+
+class SectionWriters:
+    """Routes report rows to writers
+
+    json and ndjson, and csv without an output path, produce a single
+    stream tagged with a 'section' field; otherwise csv, parquet and arrow
+    write one file per section next to the output path (report.csv becomes
+    report.pools.csv, report.pool_history.csv, ...).
+    """
+
+    SINGLE_STREAM = ('json', 'ndjson')
+
+    def __init__(self, fmt: str, output: Optional[str]):
+        self.single_stream = fmt in self.SINGLE_STREAM or (fmt == 'csv' and not output)
+        if not self.single_stream and not output:
+            raise ValueError(f"--output is required for {fmt} reports")
+        self.fmt = fmt
+        self.output = output
+        self.paths: List[str] = []
+        self._writers: Dict[str, RowWriter] = {}
+
+    def __enter__(self) -> 'SectionWriters':
+        if self.single_stream:
+            columns = ['section'] + sorted({c for cols in SECTION_COLUMNS.values() for c in cols})
+            self._writers[''] = open_row_writer(self.fmt, self.output, columns).__enter__()
+            if self.output:
+                self.paths.append(self.output)
+        return self
+
+    def __exit__(self, *exc_info):
+        for writer in self._writers.values():
+            writer.__exit__(*exc_info)
+
+    def write(self, section: str, row: Dict[str, Any]):
+        if self.single_stream:
+            self._writers[''].write({'section': section, **row})
+            return
+
+        writer = self._writers.get(section)
+        if writer is None:
+            output = Path(self.output)
+            path = str(output.with_name(f"{output.stem}.{section}{output.suffix or '.' + self.fmt}"))
+            writer = open_row_writer(self.fmt, path, SECTION_COLUMNS[section]).__enter__()
+            self._writers[section] = writer
+            self.paths.append(path)
+        writer.write(row)
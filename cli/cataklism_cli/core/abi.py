@@ -0,0 +1,143 @@
+"""
+Contract ABIs used by the Cataklism CLI
+Kept in sync with the ABIs served by backend/src/services/blockchain.ts
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def _params(params: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    return [{'name': name, 'type': type_} for name, type_ in params]
+
+
+def _function(name: str, inputs: Sequence[Tuple[str, str]] = (),
+              outputs: Sequence[Tuple[str, str]] = (), view: bool = True) -> Dict[str, Any]:
+    return {
+        'type': 'function',
+        'name': name,
+        'inputs': _params(inputs),
+        'outputs': _params(outputs),
+        'stateMutability': 'view' if view else 'nonpayable',
+    }
+
+
+def _event(name: str, inputs: Sequence[Tuple[str, str, bool]]) -> Dict[str, Any]:
+    return {
+        'type': 'event',
+        'name': name,
+        'anonymous': False,
+        'inputs': [
+            {'name': name_, 'type': type_, 'indexed': indexed}
+            for name_, type_, indexed in inputs
+        ],
+    }
+
+
+TOKEN_ABI = [
+    _function('totalSupply', outputs=[('', 'uint256')]),
+    _function('balanceOf', [('account', 'address')], [('', 'uint256')]),
+    _function('allowance', [('owner', 'address'), ('spender', 'address')], [('', 'uint256')]),
+    _function('transfer', [('to', 'address'), ('amount', 'uint256')], [('', 'bool')], view=False),
+    _function('approve', [('spender', 'address'), ('amount', 'uint256')], [('', 'bool')], view=False),
+    _event('Transfer', [('from', 'address', True), ('to', 'address', True), ('value', 'uint256', False)]),
+    _event('Approval', [('owner', 'address', True), ('spender', 'address', True), ('value', 'uint256', False)]),
+]
+
+CORE_ABI = [
+    _function('poolCount', outputs=[('', 'uint256')]),
+    _function('totalValueLocked', outputs=[('', 'uint256')]),
+    _function('pools', [('poolId', 'uint256')], [
+        ('token', 'address'),
+        ('totalLiquidity', 'uint256'),
+        ('rewardRate', 'uint256'),
+        ('lastUpdateTime', 'uint256'),
+        ('accRewardPerShare', 'uint256'),
+        ('isActive', 'bool'),
+    ]),
+    _function('userInfo', [('poolId', 'uint256'), ('user', 'address')], [
+        ('amount', 'uint256'),
+        ('rewardDebt', 'uint256'),
+        ('pendingRewards', 'uint256'),
+        ('lastStakeTime', 'uint256'),
+    ]),
+    _function('pendingReward', [('poolId', 'uint256'), ('user', 'address')], [('', 'uint256')]),
+    _function('deposit', [('poolId', 'uint256'), ('amount', 'uint256')], view=False),
+    _function('withdraw', [('poolId', 'uint256'), ('amount', 'uint256')], view=False),
+    _function('claimRewards', [('poolId', 'uint256')], view=False),
+    _event('Deposit', [('user', 'address', True), ('poolId', 'uint256', True), ('amount', 'uint256', False)]),
+    _event('Withdraw', [('user', 'address', True), ('poolId', 'uint256', True), ('amount', 'uint256', False)]),
+    _event('RewardsClaimed', [('user', 'address', True), ('poolId', 'uint256', True), ('reward', 'uint256', False)]),
+]
+
+VAULT_ABI = [
+    _function('totalAssets', outputs=[('', 'uint256')]),
+    _function('totalShares', outputs=[('', 'uint256')]),
+    _function('shareValue', outputs=[('', 'uint256')]),
+    _function('calculateShares', [('amount', 'uint256')], [('', 'uint256')]),
+    _function('calculateAmount', [('shares', 'uint256')], [('', 'uint256')]),
+    _function('getUserInfo', [('user', 'address')], [
+        ('shares', 'uint256'),
+        ('balance', 'uint256'),
+        ('lastDeposit', 'uint256'),
+    ]),
+    _function('getVaultStats', outputs=[
+        ('totalAssets', 'uint256'),
+        ('totalShares', 'uint256'),
+        ('shareValue', 'uint256'),
+        ('totalReturns', 'uint256'),
+        ('allTimeHigh', 'uint256'),
+        ('maxDrawdown', 'uint256'),
+    ]),
+    _function('deposit', [('amount', 'uint256')], view=False),
+    _function('withdraw', [('shares', 'uint256')], view=False),
+    _event('Deposit', [('user', 'address', True), ('amount', 'uint256', False), ('shares', 'uint256', False)]),
+    _event('Withdraw', [('user', 'address', True), ('amount', 'uint256', False), ('shares', 'uint256', False)]),
+]
+
+# ERC20Votes extension of CTKL; checkpoints are keyed by block number
+VOTES_ABI = [
+    _function('delegates', [('account', 'address')], [('', 'address')]),
+    _function('getVotes', [('account', 'address')], [('', 'uint256')]),
+    _function('getPastVotes', [('account', 'address'), ('blockNumber', 'uint256')], [('', 'uint256')]),
+    _function('getPastTotalSupply', [('blockNumber', 'uint256')], [('', 'uint256')]),
+    _function('delegate', [('delegatee', 'address')], view=False),
+    _event('DelegateChanged', [
+        ('delegator', 'address', True),
+        ('fromDelegate', 'address', True),
+        ('toDelegate', 'address', True),
+    ]),
+    _event('DelegateVotesChanged', [
+        ('delegate', 'address', True),
+        ('previousBalance', 'uint256', False),
+        ('newBalance', 'uint256', False),
+    ]),
+]
+
+GOVERNOR_ABI = [
+    _function('state', [('proposalId', 'uint256')], [('', 'uint8')]),
+    _function('quorum', [('blockNumber', 'uint256')], [('', 'uint256')]),
+    _function('proposalSnapshot', [('proposalId', 'uint256')], [('', 'uint256')]),
+    _function('proposalDeadline', [('proposalId', 'uint256')], [('', 'uint256')]),
+    _function('castVote', [('proposalId', 'uint256'), ('support', 'uint8')], [('', 'uint256')], view=False),
+    _event('ProposalCreated', [
+        ('proposalId', 'uint256', False),
+        ('proposer', 'address', False),
+        ('targets', 'address[]', False),
+        ('values', 'uint256[]', False),
+        ('signatures', 'string[]', False),
+        ('calldatas', 'bytes[]', False),
+        ('voteStart', 'uint256', False),
+        ('voteEnd', 'uint256', False),
+        ('description', 'string', False),
+    ]),
+    _event('VoteCast', [
+        ('voter', 'address', True),
+        ('proposalId', 'uint256', False),
+        ('support', 'uint8', False),
+        ('weight', 'uint256', False),
+        ('reason', 'string', False),
+    ]),
+    _event('ProposalQueued', [('proposalId', 'uint256', False), ('eta', 'uint256', False)]),
+    _event('ProposalExecuted', [('proposalId', 'uint256', False)]),
+    _event('ProposalCanceled', [('proposalId', 'uint256', False)]),
+]
@@ -0,0 +1,192 @@
+"""
+Chunked event log scanning and decoding
+Splits block ranges into eth_getLogs requests, adapts the range size to
+provider limits and yields decoded events in block order
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from eth_abi import decode_abi, decode_single
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+from .rpc import AsyncRpcBatcher, RpcError
+
+logger = logging.getLogger(__name__)
+
+# Error messages providers use when a getLogs range returns too much data;
+# such ranges are bisected
+_RANGE_ERRORS = ('block range', 'too many results', 'response size')
+
+# Rate limiting is retried after a pause instead: a smaller range would not help
+_RATE_LIMIT_CODES = (429, -32029)
+_RATE_LIMIT_ERRORS = ('rate limit', 'too many requests', 'request limit', 'capacity')
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 0.5
+
+# Consecutive successful ranges before the chunk size is doubled again
+GROWTH_STREAK = 8
+
+
+def _normalise(abi_type: str, value: Any) -> Any:
+    """Checksum decoded addresses; eth_abi returns them lower-case, and every consumer keys on them"""
+    if abi_type == 'address':
+        return to_checksum_address(value)
+    if abi_type.startswith('address['):
+        return [to_checksum_address(item) for item in value]
+    return value
+
+
+class EventDecoder:
+    """Decodes raw JSON-RPC logs for the events of one or more ABIs"""
+
+    def __init__(self, *abis: Sequence[Dict[str, Any]]):
+        self._events: Dict[str, Dict[str, Any]] = {}
+        for abi in abis:
+            for entry in abi:
+                if entry.get('type') == 'event':
+                    topic = '0x' + event_abi_to_log_topic(entry).hex()
+                    self._events[topic] = entry
+
+    def topics(self, *names: str) -> List[str]:
+        """Topic0 values for the given event names, for use in a getLogs filter"""
+        return [topic for topic, entry in self._events.items() if entry['name'] in names]
+
+    def decode(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        topics = log.get('topics') or []
+        entry = self._events.get(topics[0]) if topics else None
+        if entry is None:
+            return None
+
+        indexed = [i for i in entry['inputs'] if i['indexed']]
+        plain = [i for i in entry['inputs'] if not i['indexed']]
+
+        args = {}
+        for item, topic in zip(indexed, topics[1:]):
+            args[item['name']] = _normalise(item['type'], decode_single(item['type'], bytes.fromhex(topic[2:])))
+        if plain:
+            values = decode_abi([i['type'] for i in plain], bytes.fromhex(log['data'][2:]))
+            args.update((i['name'], _normalise(i['type'], value)) for i, value in zip(plain, values))
+
+        return {
+            'event': entry['name'],
+            'address': to_checksum_address(log['address']),
+            'block_number': int(log['blockNumber'], 16),
+            'transaction_hash': log['transactionHash'],
+            'log_index': int(log['logIndex'], 16),
+            'args': args,
+        }
+
+
+def _is_rate_limited(error: RpcError) -> bool:
+    message = error.message.lower()
+    return error.code in _RATE_LIMIT_CODES or any(marker in message for marker in _RATE_LIMIT_ERRORS)
+
+
+def _is_range_error(error: RpcError) -> bool:
+    # Some providers also answer rate limiting with -32005, so that is checked first
+    if _is_rate_limited(error):
+        return False
+    message = error.message.lower()
+    return error.code == -32005 or any(marker in message for marker in _RANGE_ERRORS)
+
+
+class LogScanner:
+    """Walks a block range with batched, size-adaptive eth_getLogs requests"""
+
+    def __init__(self, rpc: AsyncRpcBatcher, max_range: int = 5000, min_range: int = 1,
+                 ranges_per_batch: int = 8):
+        self.rpc = rpc
+        self.max_range = max_range
+        self.min_range = min_range
+        self.ranges_per_batch = ranges_per_batch
+        self.chunk_size = max_range
+        self._streak = 0
+
+    async def scan(
+        self,
+        address: Union[str, List[str]],
+        topics: Optional[List[Any]],
+        from_block: int,
+        to_block: int,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> AsyncIterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """Yield (start, end, raw_logs) for consecutive ranges covering [from_block, to_block]
+
+        on_progress receives the number of blocks covered by each yielded range.
+        """
+        start = from_block
+        while start <= to_block:
+            ranges = []
+            cursor = start
+            for _ in range(self.ranges_per_batch):
+                if cursor > to_block:
+                    break
+                end = min(cursor + self.chunk_size - 1, to_block)
+                ranges.append((cursor, end))
+                cursor = end + 1
+
+            responses = await self.rpc.batch([
+                ('eth_getLogs', [self._filter(address, topics, s, e)]) for s, e in ranges
+            ])
+
+            for (s, e), response in zip(ranges, responses):
+                if isinstance(response, RpcError):
+                    logs = await self._refetch(address, topics, s, e, response)
+                else:
+                    logs = response
+                    # Recover towards the configured range after a run of successes
+                    self._streak += 1
+                    if self._streak >= GROWTH_STREAK:
+                        self.chunk_size = min(self.max_range, self.chunk_size * 2)
+                        self._streak = 0
+
+                if on_progress:
+                    on_progress(e - s + 1)
+                yield s, e, logs
+
+            start = cursor
+
+    async def _refetch(self, address, topics, start: int, end: int, error: RpcError) -> List[Dict[str, Any]]:
+        """Recover a range whose request failed: back off when rate limited, bisect when too large"""
+        delay = RATE_LIMIT_BACKOFF
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            if _is_range_error(error):
+                return await self._fetch_split(address, topics, start, end)
+            if not _is_rate_limited(error) or attempt == RATE_LIMIT_RETRIES:
+                break
+
+            logger.debug(f"getLogs {start}-{end} rate limited, retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+            try:
+                return await self.rpc.call('eth_getLogs', [self._filter(address, topics, start, end)])
+            except RpcError as e:
+                error = e
+        raise error
+
+    async def _fetch_split(self, address, topics, start: int, end: int) -> List[Dict[str, Any]]:
+        """Fetch a range that was rejected as too large by bisecting it"""
+        if end - start + 1 <= self.min_range:
+            raise RpcError(-32005, f"getLogs range {start}-{end} still too large at minimum size")
+
+        middle = (start + end) // 2
+        self.chunk_size = max(self.min_range, (end - start + 1) // 2)
+        self._streak = 0
+        logger.debug(f"Splitting getLogs range {start}-{end}, chunk size now {self.chunk_size}")
+
+        logs = []
+        for s, e in ((start, middle), (middle + 1, end)):
+            try:
+                logs.extend(await self.rpc.call('eth_getLogs', [self._filter(address, topics, s, e)]))
+            except RpcError as error:
+                logs.extend(await self._refetch(address, topics, s, e, error))
+        return logs
+
+    @staticmethod
+    def _filter(address, topics, start: int, end: int) -> Dict[str, Any]:
+        log_filter = {'address': address, 'fromBlock': hex(start), 'toBlock': hex(end)}
+        if topics:
+            log_filter['topics'] = topics
+        return log_filter
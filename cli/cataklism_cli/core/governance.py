@@ -0,0 +1,334 @@
+"""
+Governance proposal and voting-power index
+Follows Governor proposal/vote events and CTKL delegation checkpoints into
+the local DuckDB store, so proposal tallies and voting power at any block
+are answered from indexed tables instead of historical contract calls
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+from eth_utils import to_checksum_address
+from web3 import Web3
+
+from .abi import GOVERNOR_ABI, VOTES_ABI
+from .events import EventDecoder, LogScanner
+from .history import HistoryStore, ProgressCallback, fetch_block_times
+from .rpc import AsyncRpcBatcher
+from .rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+GOVERNANCE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposals (
+    proposal_id VARCHAR PRIMARY KEY,
+    proposer VARCHAR,
+    title VARCHAR,
+    description VARCHAR,
+    actions INTEGER,
+    vote_start BIGINT,
+    vote_end BIGINT,
+    block_number BIGINT,
+    block_time TIMESTAMP,
+    tx_hash VARCHAR
+);
+CREATE TABLE IF NOT EXISTS proposal_events (
+    proposal_id VARCHAR,
+    event VARCHAR,
+    eta BIGINT,
+    block_number BIGINT,
+    block_time TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS votes (
+    proposal_id VARCHAR,
+    voter VARCHAR,
+    support TINYINT,
+    weight DOUBLE,
+    reason VARCHAR,
+    block_number BIGINT,
+    log_index INTEGER,
+    tx_hash VARCHAR
+);
+CREATE TABLE IF NOT EXISTS delegations (
+    delegator VARCHAR,
+    from_delegate VARCHAR,
+    to_delegate VARCHAR,
+    block_number BIGINT,
+    log_index INTEGER
+);
+CREATE TABLE IF NOT EXISTS voting_power (
+    delegate VARCHAR,
+    block_number BIGINT,
+    log_index INTEGER,
+    votes DOUBLE
+);
+CREATE INDEX IF NOT EXISTS votes_by_proposal ON votes (proposal_id);
+CREATE INDEX IF NOT EXISTS voting_power_by_delegate ON voting_power (delegate, block_number);
+"""
+
+# GovernorCountingSimple support values
+SUPPORT_LABELS = {0: 'against', 1: 'for', 2: 'abstain'}
+
+_ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+class GovernanceStore(HistoryStore):
+    """History store with the governance tables and their queries"""
+
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        super().__init__(path, read_only)
+        if not read_only:
+            self.conn.execute(GOVERNANCE_SCHEMA)
+
+    def indexed_block(self) -> Optional[int]:
+        """Highest block both governance streams have reached"""
+        blocks = [self.checkpoint(stream) for stream in GovernanceIndexer.STREAMS]
+        blocks = [b for b in blocks if b is not None]
+        return min(blocks) if blocks else None
+
+    def votes_at(self, addresses: Sequence[str], block: int) -> pd.DataFrame:
+        """Voting power of each address at a block, from the latest checkpoint at or before it
+
+        Addresses match case-insensitively, as stores written before events
+        were checksummed on decode hold them in lower case.
+        """
+        wanted = pd.DataFrame({'address': [to_checksum_address(a) for a in addresses]})
+        self.conn.register('wanted', wanted)
+        try:
+            return self.query("""
+                WITH latest AS (
+                    SELECT delegate, votes
+                    FROM voting_power
+                    WHERE block_number <= ? AND lower(delegate) IN (SELECT lower(address) FROM wanted)
+                    QUALIFY ROW_NUMBER() OVER (
+                        PARTITION BY lower(delegate) ORDER BY block_number DESC, log_index DESC
+                    ) = 1
+                )
+                SELECT w.address, COALESCE(l.votes, 0) AS votes
+                FROM wanted w LEFT JOIN latest l ON lower(l.delegate) = lower(w.address)
+                ORDER BY votes DESC
+            """, [block])
+        finally:
+            self.conn.unregister('wanted')
+
+    def top_delegates(self, block: int, limit: int = 25) -> pd.DataFrame:
+        return self.query("""
+            WITH latest AS (
+                SELECT delegate AS address, votes
+                FROM voting_power
+                WHERE block_number <= ?
+                QUALIFY ROW_NUMBER() OVER (
+                    PARTITION BY lower(delegate) ORDER BY block_number DESC, log_index DESC
+                ) = 1
+            )
+            SELECT * FROM latest
+            WHERE votes > 0
+            ORDER BY votes DESC
+            LIMIT ?
+        """, [block, limit])
+
+    def proposals(self, status: Optional[str] = None) -> pd.DataFrame:
+        """Every proposal with its status and vote totals as of the indexed block"""
+        current = self.indexed_block() or 0
+        frame = self.query("""
+            WITH lifecycle AS (
+                SELECT proposal_id,
+                       BOOL_OR(event = 'ProposalCanceled') AS canceled,
+                       BOOL_OR(event = 'ProposalExecuted') AS executed,
+                       BOOL_OR(event = 'ProposalQueued') AS queued,
+                       MAX(eta) AS eta
+                FROM proposal_events
+                GROUP BY proposal_id
+            ),
+            tallies AS (
+                SELECT proposal_id,
+                       SUM(CASE WHEN support = 1 THEN weight ELSE 0 END) AS votes_for,
+                       SUM(CASE WHEN support = 0 THEN weight ELSE 0 END) AS votes_against,
+                       SUM(CASE WHEN support = 2 THEN weight ELSE 0 END) AS votes_abstain,
+                       COUNT(*) AS voters
+                FROM votes
+                GROUP BY proposal_id
+            )
+            SELECT p.proposal_id, p.proposer, p.title, p.actions, p.vote_start, p.vote_end,
+                   p.block_number, p.block_time,
+                   CASE
+                       WHEN l.canceled THEN 'canceled'
+                       WHEN l.executed THEN 'executed'
+                       WHEN l.queued THEN 'queued'
+                       WHEN ? < p.vote_start THEN 'pending'
+                       WHEN ? <= p.vote_end THEN 'active'
+                       ELSE 'ended'
+                   END AS status,
+                   l.eta,
+                   COALESCE(t.votes_for, 0) AS votes_for,
+                   COALESCE(t.votes_against, 0) AS votes_against,
+                   COALESCE(t.votes_abstain, 0) AS votes_abstain,
+                   COALESCE(t.voters, 0) AS voters
+            FROM proposals p
+            LEFT JOIN lifecycle l USING (proposal_id)
+            LEFT JOIN tallies t USING (proposal_id)
+            ORDER BY p.block_number DESC
+        """, [current, current])
+        if status:
+            frame = frame[frame['status'] == status]
+        return frame
+
+    def proposal(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        frame = self.proposals()
+        match = frame[frame['proposal_id'] == str(proposal_id)]
+        if not len(match):
+            return None
+        row = match.iloc[0].to_dict()
+        description = self.query("SELECT description FROM proposals WHERE proposal_id = ?", [str(proposal_id)])
+        row['description'] = description.iloc[0]['description']
+        return row
+
+    def proposal_votes(self, proposal_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Individual votes on a proposal, heaviest first"""
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        return self.query(f"""
+            SELECT voter, support, weight, reason, block_number, tx_hash
+            FROM votes
+            WHERE proposal_id = ?
+            ORDER BY weight DESC
+            {limit_clause}
+        """, [str(proposal_id)])
+
+
+def _proposal_rows(event: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map one decoded Governor event to rows of the governance tables"""
+    args = event['args']
+    proposal_id = str(args['proposalId'])
+    name = event['event']
+
+    if name == 'ProposalCreated':
+        description = args['description']
+        return {'proposals': [{
+            'proposal_id': proposal_id,
+            'proposer': args['proposer'],
+            'title': description.strip().splitlines()[0].lstrip('# ').strip() if description.strip() else '',
+            'description': description,
+            'actions': len(args['targets']),
+            'vote_start': args['voteStart'],
+            'vote_end': args['voteEnd'],
+            'block_number': event['block_number'],
+            'tx_hash': event['transaction_hash'],
+        }]}
+    if name == 'VoteCast':
+        return {'votes': [{
+            'proposal_id': proposal_id,
+            'voter': args['voter'],
+            'support': args['support'],
+            'weight': _from_wei(args['weight']),
+            'reason': args['reason'],
+            'block_number': event['block_number'],
+            'log_index': event['log_index'],
+            'tx_hash': event['transaction_hash'],
+        }]}
+    return {'proposal_events': [{
+        'proposal_id': proposal_id,
+        'event': name,
+        'eta': args.get('eta'),
+        'block_number': event['block_number'],
+    }]}
+
+
+def _delegation_rows(event: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    args = event['args']
+    if event['event'] == 'DelegateChanged':
+        return {'delegations': [{
+            'delegator': args['delegator'],
+            'from_delegate': args['fromDelegate'],
+            'to_delegate': args['toDelegate'],
+            'block_number': event['block_number'],
+            'log_index': event['log_index'],
+        }]}
+    if args['delegate'] == _ZERO_ADDRESS:
+        return {}
+    return {'voting_power': [{
+        'delegate': args['delegate'],
+        'block_number': event['block_number'],
+        'log_index': event['log_index'],
+        'votes': _from_wei(args['newBalance']),
+    }]}
+
+
+class GovernanceIndexer:
+    """Incrementally indexes Governor and delegation events into a GovernanceStore"""
+
+    # stream -> (contracts attribute, ABI, row mapper)
+    STREAMS = {
+        'governor': ('governor', GOVERNOR_ABI, _proposal_rows),
+        'delegation': ('token', VOTES_ABI, _delegation_rows),
+    }
+
+    # Tables whose rows carry a block_time column
+    _TIMED_TABLES = ('proposals', 'proposal_events')
+
+    def __init__(self, config, store: GovernanceStore):
+        self.config = config
+        self.store = store
+
+    def _start_block(self, stream: str) -> int:
+        last = self.store.checkpoint(stream)
+        if last is not None:
+            return last + 1
+        return getattr(self.config.contracts, 'deploy_block', 0) or 0
+
+    async def sync(self, to_block: Optional[int] = None,
+                   on_progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """Bring the index up to to_block (default: latest); returns rows added per stream"""
+        progress = on_progress or (lambda stream, advance, total: None)
+        added: Dict[str, int] = {}
+
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            if to_block is None:
+                to_block = int(await rpc.call('eth_blockNumber'), 16)
+
+            for stream, (attr, abi, mapper) in self.STREAMS.items():
+                address = getattr(self.config.contracts, attr, None)
+                if not address:
+                    logger.warning(f"No '{attr}' contract configured; skipping governance stream '{stream}'")
+                    continue
+                added[stream] = await self._sync_stream(rpc, stream, address, abi, mapper, to_block, progress)
+
+        return added
+
+    async def _sync_stream(self, rpc: AsyncRpcBatcher, stream: str, address: str, abi, mapper,
+                           to_block: int, progress: ProgressCallback) -> int:
+        start = self._start_block(stream)
+        if start > to_block:
+            return 0
+
+        decoder = EventDecoder(abi)
+        topics = [decoder.topics(*(entry['name'] for entry in abi if entry['type'] == 'event'))]
+        scanner = LogScanner(rpc)
+        progress(stream, 0, to_block - start + 1)
+
+        added = 0
+        async for _, end, logs in scanner.scan(
+            address, topics, start, to_block,
+            on_progress=lambda blocks: progress(stream, blocks, None),
+        ):
+            tables: Dict[str, List[Dict[str, Any]]] = {}
+            for event in (decoder.decode(log) for log in logs):
+                if event is None:
+                    continue
+                for table, rows in mapper(event).items():
+                    tables.setdefault(table, []).extend(rows)
+
+            timed = [row for table in self._TIMED_TABLES for row in tables.get(table, [])]
+            if timed:
+                times = await fetch_block_times(rpc, (row['block_number'] for row in timed))
+                for row in timed:
+                    row['block_time'] = times[row['block_number']]
+
+            self.store.append_tables(tables, stream, end)
+            added += sum(len(rows) for rows in tables.values())
+
+        return added
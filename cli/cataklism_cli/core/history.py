@@ -0,0 +1,439 @@
+"""
+Local historical analytics store
+Backfills CataklismCore, CataklismVault and CataklismToken events plus
+periodic state samples into DuckDB, checkpointing after every chunk so
+syncs are incremental and reports can run offline
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import duckdb
+import pandas as pd
+from web3 import Web3
+
+from .abi import CORE_ABI, TOKEN_ABI, VAULT_ABI
+from .events import EventDecoder, LogScanner
+from .multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from .rpc import AsyncRpcBatcher, RpcError
+from .rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = Path.home() / '.cataklism' / 'history.duckdb'
+
+# Roughly one sample per day on Ethereum mainnet
+DEFAULT_SAMPLE_INTERVAL = 7200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    contract VARCHAR,
+    event VARCHAR,
+    block_number BIGINT,
+    block_time TIMESTAMP,
+    log_index INTEGER,
+    tx_hash VARCHAR,
+    pool_id BIGINT,
+    account VARCHAR,
+    counterparty VARCHAR,
+    amount DOUBLE,
+    shares DOUBLE
+);
+CREATE TABLE IF NOT EXISTS state_samples (
+    block_number BIGINT PRIMARY KEY,
+    block_time TIMESTAMP,
+    tvl DOUBLE,
+    vault_total_assets DOUBLE,
+    vault_total_shares DOUBLE,
+    vault_share_value DOUBLE,
+    token_supply DOUBLE
+);
+CREATE TABLE IF NOT EXISTS pool_samples (
+    block_number BIGINT,
+    block_time TIMESTAMP,
+    pool_id BIGINT,
+    total_liquidity DOUBLE,
+    reward_rate DOUBLE,
+    acc_reward_per_share VARCHAR,
+    is_active BOOLEAN,
+    PRIMARY KEY (block_number, pool_id)
+);
+CREATE TABLE IF NOT EXISTS sync_checkpoints (
+    stream VARCHAR PRIMARY KEY,
+    last_block BIGINT,
+    updated_at TIMESTAMP
+);
+"""
+
+ProgressCallback = Callable[[str, int, Optional[int]], None]
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+class HistoryStore:
+    """DuckDB-backed store of protocol events and state samples"""
+
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        self.path = Path(path) if path else DEFAULT_STORE_PATH
+        if not read_only:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = duckdb.connect(str(self.path), read_only=read_only)
+        if not read_only:
+            self.conn.execute(SCHEMA)
+            self._migrate_pool_samples()
+
+    def _migrate_pool_samples(self):
+        """Rebuild pool_samples from stores written before it had a key and kept wei exact"""
+        row = self.conn.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'pool_samples' AND column_name = 'acc_reward_per_share'"
+        ).fetchone()
+        if row is None or row[0] == 'VARCHAR':
+            return
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("ALTER TABLE pool_samples RENAME TO pool_samples_old")
+            self.conn.execute(SCHEMA)
+            # Values already rounded by DOUBLE cannot be recovered; duplicates came from retried chunks
+            self.conn.execute("""
+                INSERT INTO pool_samples
+                SELECT block_number, block_time, pool_id, total_liquidity, reward_rate,
+                       CAST(CAST(acc_reward_per_share AS HUGEINT) AS VARCHAR), is_active
+                FROM pool_samples_old
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY block_number, pool_id ORDER BY block_time) = 1
+            """)
+            self.conn.execute("DROP TABLE pool_samples_old")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        self.conn.close()
+
+    def checkpoint(self, stream: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT last_block FROM sync_checkpoints WHERE stream = ?", [stream]
+        ).fetchone()
+        return row[0] if row else None
+
+    def covers(self, stream: str, block: int) -> bool:
+        last = self.checkpoint(stream)
+        return last is not None and last >= block
+
+    def append(self, table: str, rows: List[Dict[str, Any]], stream: str, last_block: int):
+        """Insert rows and advance the stream checkpoint atomically"""
+        self.append_tables({table: rows}, stream, last_block)
+
+    def append_tables(self, rows_by_table: Dict[str, List[Dict[str, Any]]], stream: str, last_block: int):
+        """Insert rows into several tables and advance the stream checkpoint in one transaction"""
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            for table, rows in rows_by_table.items():
+                if not rows:
+                    continue
+                frame = pd.DataFrame(rows)
+                self.conn.register('incoming', frame)
+                columns = ', '.join(frame.columns)
+                self.conn.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM incoming")
+                self.conn.unregister('incoming')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_checkpoints VALUES (?, ?, ?)",
+                [stream, last_block, datetime.now(timezone.utc).replace(tzinfo=None)]
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def query(self, sql: str, params: Optional[List[Any]] = None) -> pd.DataFrame:
+        return self.conn.execute(sql, params or []).df()
+
+    # Report queries; each is a single vectorised scan over the store
+
+    def tvl_history(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        return self.query("""
+            SELECT block_time, block_number, tvl, vault_total_assets, token_supply
+            FROM state_samples
+            WHERE block_time >= COALESCE(?, TIMESTAMP '1970-01-01')
+            ORDER BY block_number
+        """, [since])
+
+    def apy_history(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Vault APY annualised from consecutive share value samples"""
+        return self.query("""
+            WITH samples AS (
+                SELECT block_time, block_number, vault_share_value,
+                       LAG(vault_share_value) OVER (ORDER BY block_number) AS prev_value,
+                       LAG(block_time) OVER (ORDER BY block_number) AS prev_time
+                FROM state_samples
+            )
+            SELECT block_time, block_number, vault_share_value,
+                   (POWER(vault_share_value / prev_value,
+                          31536000.0 / EPOCH(block_time - prev_time)) - 1) * 100 AS vault_apy
+            FROM samples
+            WHERE prev_value > 0 AND block_time > prev_time
+              AND block_time >= COALESCE(?, TIMESTAMP '1970-01-01')
+            ORDER BY block_number
+        """, [since])
+
+    def staking_flows(self, since: Optional[datetime] = None, interval: str = 'day') -> pd.DataFrame:
+        if interval not in ('hour', 'day', 'week', 'month'):
+            raise ValueError(f"Unsupported interval '{interval}'")
+        return self.query(f"""
+            SELECT DATE_TRUNC('{interval}', block_time) AS period,
+                   pool_id,
+                   SUM(CASE WHEN event = 'Deposit' THEN amount ELSE 0 END) AS deposits,
+                   SUM(CASE WHEN event = 'Withdraw' THEN amount ELSE 0 END) AS withdrawals,
+                   SUM(CASE WHEN event = 'RewardsClaimed' THEN amount ELSE 0 END) AS rewards_claimed,
+                   SUM(CASE WHEN event = 'Deposit' THEN amount
+                            WHEN event = 'Withdraw' THEN -amount ELSE 0 END) AS net_flow,
+                   COUNT(*) AS events
+            FROM events
+            WHERE contract = 'core'
+              AND block_time >= COALESCE(?, TIMESTAMP '1970-01-01')
+            GROUP BY period, pool_id
+            ORDER BY period, pool_id
+        """, [since])
+
+    def pool_history(self, from_block: int, to_block: int, bucket_blocks: int) -> pd.DataFrame:
+        """Staking flows per pool in fixed block buckets starting at from_block"""
+        start, end, size = int(from_block), int(to_block), int(bucket_blocks)
+        return self.query(f"""
+            WITH bucketed AS (
+                SELECT *, {start} + ((block_number - {start}) // {size}) * {size} AS bucket
+                FROM events
+                WHERE contract = 'core' AND block_number BETWEEN {start} AND {end}
+            )
+            SELECT pool_id,
+                   bucket AS from_block,
+                   LEAST(bucket + {size} - 1, {end}) AS to_block,
+                   SUM(CASE WHEN event = 'Deposit' THEN amount ELSE 0 END) AS deposits,
+                   SUM(CASE WHEN event = 'Withdraw' THEN amount ELSE 0 END) AS withdrawals,
+                   SUM(CASE WHEN event = 'RewardsClaimed' THEN amount ELSE 0 END) AS rewards_claimed,
+                   SUM(CASE WHEN event = 'Deposit' THEN amount
+                            WHEN event = 'Withdraw' THEN -amount ELSE 0 END) AS net_flow,
+                   COUNT(*) AS events
+            FROM bucketed
+            GROUP BY pool_id, bucket
+            ORDER BY bucket, pool_id
+        """)
+
+    def latest_pools(self) -> pd.DataFrame:
+        return self.query("""
+            SELECT * FROM pool_samples
+            WHERE block_number = (SELECT MAX(block_number) FROM pool_samples)
+            ORDER BY pool_id
+        """)
+
+    def holder_balances(self, to_block: int) -> pd.DataFrame:
+        """Positive CTKL balances at to_block, largest first"""
+        return self.query("""
+            WITH deltas AS (
+                SELECT account AS address, amount AS delta FROM events
+                WHERE contract = 'token' AND event = 'Transfer' AND block_number <= ?
+                UNION ALL
+                SELECT counterparty AS address, -amount AS delta FROM events
+                WHERE contract = 'token' AND event = 'Transfer' AND block_number <= ?
+            )
+            SELECT address, SUM(delta) AS balance
+            FROM deltas
+            WHERE address <> '0x0000000000000000000000000000000000000000'
+            GROUP BY address
+            HAVING SUM(delta) > 0
+            ORDER BY balance DESC
+        """, [to_block, to_block])
+
+    def latest_sample(self) -> Optional[Dict[str, Any]]:
+        frame = self.query("SELECT * FROM state_samples ORDER BY block_number DESC LIMIT 1")
+        return frame.iloc[0].to_dict() if len(frame) else None
+
+
+def _normalise(stream: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a decoded event into the store's event columns"""
+    args = event['args']
+    row = {
+        'contract': stream,
+        'event': event['event'],
+        'block_number': event['block_number'],
+        'log_index': event['log_index'],
+        'tx_hash': event['transaction_hash'],
+        'pool_id': None,
+        'account': None,
+        'counterparty': None,
+        'amount': None,
+        'shares': None,
+    }
+
+    if stream == 'core':
+        row.update(pool_id=args['poolId'], account=args['user'],
+                   amount=_from_wei(args.get('amount', args.get('reward', 0))))
+    elif stream == 'vault':
+        row.update(account=args['user'], amount=_from_wei(args['amount']), shares=_from_wei(args['shares']))
+    elif event['event'] == 'Transfer':
+        # Token transfers are stored receiver-first so balances are SUM(account) - SUM(counterparty)
+        row.update(account=args['to'], counterparty=args['from'], amount=_from_wei(args['value']))
+    else:
+        row.update(account=args['owner'], counterparty=args['spender'], amount=_from_wei(args['value']))
+    return row
+
+
+async def fetch_block_times(rpc: AsyncRpcBatcher, blocks: Iterable[int]) -> Dict[int, datetime]:
+    """Timestamps for many blocks in one batched round of header requests"""
+    blocks = sorted(set(blocks))
+    headers = await rpc.batch([('eth_getBlockByNumber', [hex(b), False]) for b in blocks])
+    times = {}
+    for block, header in zip(blocks, headers):
+        if header is None or isinstance(header, RpcError):
+            raise Exception(f"Failed to fetch header for block {block}")
+        times[block] = datetime.utcfromtimestamp(int(header['timestamp'], 16))
+    return times
+
+
+class HistorySync:
+    """Incrementally backfills the history store from chain data"""
+
+    STREAMS = {
+        'core': ('core', CORE_ABI),
+        'vault': ('vault', VAULT_ABI),
+        'token': ('token', TOKEN_ABI),
+    }
+
+    def __init__(self, config, store: HistoryStore, sample_interval: int = DEFAULT_SAMPLE_INTERVAL):
+        self.config = config
+        self.store = store
+        self.sample_interval = sample_interval
+
+    def _start_block(self, stream: str) -> int:
+        last = self.store.checkpoint(stream)
+        if last is not None:
+            return last + 1
+        return getattr(self.config.contracts, 'deploy_block', 0) or 0
+
+    async def sync(self, to_block: Optional[int] = None,
+                   on_progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """Bring every stream up to to_block (default: latest); returns rows added per stream"""
+        progress = on_progress or (lambda stream, advance, total: None)
+        added: Dict[str, int] = {}
+
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            if to_block is None:
+                to_block = int(await rpc.call('eth_blockNumber'), 16)
+
+            # DuckDB connections are not shared across concurrent writers, so
+            # streams run sequentially; each one is still fully batched
+            for stream in self.STREAMS:
+                added[stream] = await self._sync_events(rpc, stream, to_block, progress)
+            added['samples'] = await self._sync_samples(rpc, to_block, progress)
+
+        return added
+
+    async def _sync_events(self, rpc: AsyncRpcBatcher, stream: str, to_block: int,
+                           progress: ProgressCallback) -> int:
+        attr, abi = self.STREAMS[stream]
+        start = self._start_block(stream)
+        if start > to_block:
+            return 0
+
+        decoder = EventDecoder(abi)
+        scanner = LogScanner(rpc)
+        progress(stream, 0, to_block - start + 1)
+
+        added = 0
+        async for _, end, logs in scanner.scan(
+            getattr(self.config.contracts, attr), None, start, to_block,
+            on_progress=lambda blocks: progress(stream, blocks, None),
+        ):
+            events = [e for e in (decoder.decode(log) for log in logs) if e is not None]
+            rows = [_normalise(stream, e) for e in events]
+            if rows:
+                times = await fetch_block_times(rpc, (r['block_number'] for r in rows))
+                for row in rows:
+                    row['block_time'] = times[row['block_number']]
+            self.store.append('events', rows, stream, end)
+            added += len(rows)
+
+        return added
+
+    async def _sync_samples(self, rpc: AsyncRpcBatcher, to_block: int, progress: ProgressCallback) -> int:
+        last = self.store.checkpoint('samples')
+        first = self._start_block('samples') if last is None else last + self.sample_interval
+        blocks = list(range(first, to_block + 1, self.sample_interval))
+        if not blocks:
+            return 0
+
+        multicall = Multicall(rpc, getattr(self.config.contracts, 'multicall', None) or MULTICALL3_ADDRESS)
+        progress('samples', 0, len(blocks))
+
+        added = 0
+        batch_size = 32
+        for index in range(0, len(blocks), batch_size):
+            chunk = blocks[index:index + batch_size]
+            samples = await asyncio.gather(*(self._sample(multicall, block) for block in chunk))
+            times = await fetch_block_times(rpc, chunk)
+
+            state_rows, pool_rows = [], []
+            for block, (state, pools) in zip(chunk, samples):
+                if state is None:
+                    continue
+                state_rows.append({'block_number': block, 'block_time': times[block], **state})
+                pool_rows.extend({'block_number': block, 'block_time': times[block], **pool} for pool in pools)
+
+            self.store.append_tables({'pool_samples': pool_rows, 'state_samples': state_rows},
+                                     'samples', chunk[-1])
+            added += len(state_rows)
+            progress('samples', len(chunk), None)
+
+        return added
+
+    async def _sample(self, multicall: Multicall, block: int):
+        contracts = self.config.contracts
+        try:
+            tvl, stats, supply, count = await multicall.execute([
+                make_call(contracts.core, 'totalValueLocked()', [], ['uint256']),
+                make_call(contracts.vault, 'getVaultStats()', [],
+                          ['uint256', 'uint256', 'uint256', 'uint256', 'uint256', 'uint256']),
+                make_call(contracts.token, 'totalSupply()', [], ['uint256']),
+                make_call(contracts.core, 'poolCount()', [], ['uint256']),
+            ], block=block)
+        except RpcError as e:
+            # Blocks before deployment (or pruned state on non-archive nodes)
+            logger.debug(f"Skipping sample at block {block}: {e}")
+            return None, []
+
+        if tvl is None or stats is None:
+            return None, []
+
+        pools = []
+        if count:
+            results = await multicall.execute([
+                make_call(contracts.core, 'pools(uint256)', [pool_id],
+                          ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool'])
+                for pool_id in range(count[0])
+            ], block=block)
+            for pool_id, pool in enumerate(results):
+                if pool is None:
+                    continue
+                pools.append({
+                    'pool_id': pool_id,
+                    'total_liquidity': _from_wei(pool[1]),
+                    'reward_rate': _from_wei(pool[2]),
+                    # A 1e12-scaled integer beyond DOUBLE precision, stored exactly as text
+                    'acc_reward_per_share': str(pool[4]),
+                    'is_active': bool(pool[5]),
+                })
+
+        state = {
+            'tvl': _from_wei(tvl[0]),
+            'vault_total_assets': _from_wei(stats[0]),
+            'vault_total_shares': _from_wei(stats[1]),
+            'vault_share_value': _from_wei(stats[2]),
+            'token_supply': _from_wei(supply[0]) if supply else None,
+        }
+        return state, pools
@@ -0,0 +1,306 @@
+"""
+Incremental CTKL holder balance index
+Applies Transfer events as balance deltas to an array-backed table keyed by
+address. A sorted top-N list is maintained as deltas arrive, and quantile
+and Gini queries share one cached sorted copy of the balances, so neither
+needs a rescan of the chain or of the table.
+"""
+
+import asyncio
+import heapq
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from eth_utils import to_checksum_address
+from web3 import Web3
+
+from .abi import TOKEN_ABI
+from .events import EventDecoder, LogScanner
+from .history import HistoryStore, ProgressCallback
+from .rpc import AsyncRpcBatcher
+from .rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+HOLDER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS holder_balances (
+    address VARCHAR PRIMARY KEY,
+    balance_wei VARCHAR,
+    balance DOUBLE
+);
+"""
+
+HOLDERS_STREAM = 'holders'
+
+HOLDER_COLUMNS = ['rank', 'address', 'balance', 'share_pct']
+
+_ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+class HolderIndex:
+    """Balances by address with an incrementally maintained top list
+
+    Invariant: every holder with more than `_floor` wei is in `_top`.
+    Holders join the list when they rise above the floor and leave it when
+    they fall to or below it; when the list outgrows top_depth the smallest
+    entry is evicted and the floor rises to its balance. Only when the list
+    has shrunk below what a read asks for is it rebuilt from the table.
+    """
+
+    def __init__(self, top_depth: int = 1000):
+        self.top_depth = top_depth
+        self.addresses: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._wei: List[int] = []
+        self._balances = np.zeros(1024)
+        self.total_wei = 0
+        self.holders = 0
+
+        self._top: List[Tuple[int, str]] = []  # (-wei, address), ascending = largest first
+        self._tracked: Set[str] = set()
+        self._floor = 0
+
+        self._version = 0
+        self._sorted: Optional[np.ndarray] = None
+        self._sorted_version = -1
+        self.dirty: Set[str] = set()
+
+    def __len__(self) -> int:
+        return self.holders
+
+    def balance_of(self, address: str) -> int:
+        slot = self._slots.get(address)
+        return self._wei[slot] if slot is not None else 0
+
+    def load(self, rows: Iterable[Tuple[str, int]]):
+        """Bulk-load balances, e.g. from the store, then build the top list once"""
+        for address, wei in rows:
+            self._set(address, int(wei))
+        self.dirty.clear()
+        self._rebuild_top()
+
+    def apply_transfer(self, sender: str, recipient: str, value: int):
+        """Mints come from and burns go to the zero address, which is not tracked"""
+        if value == 0 or sender == recipient:
+            return
+        if sender != _ZERO_ADDRESS:
+            self._adjust(sender, -value)
+        if recipient != _ZERO_ADDRESS:
+            self._adjust(recipient, value)
+
+    def _slot(self, address: str) -> int:
+        slot = self._slots.get(address)
+        if slot is None:
+            slot = len(self.addresses)
+            self._slots[address] = slot
+            self.addresses.append(address)
+            self._wei.append(0)
+            if slot >= len(self._balances):
+                self._balances = np.concatenate([self._balances, np.zeros(len(self._balances))])
+        return slot
+
+    def _set(self, address: str, wei: int):
+        slot = self._slot(address)
+        old = self._wei[slot]
+        self._wei[slot] = wei
+        self._balances[slot] = _from_wei(wei)
+        self.total_wei += wei - old
+        self.holders += (wei > 0) - (old > 0)
+        self._version += 1
+        self.dirty.add(address)
+        return old
+
+    def _adjust(self, address: str, delta: int):
+        old = self._set(address, self.balance_of(address) + delta)
+        new = old + delta
+
+        if address in self._tracked:
+            del self._top[bisect_left(self._top, (-old, address))]
+            if new > self._floor:
+                insort(self._top, (-new, address))
+            else:
+                self._tracked.discard(address)
+        elif new > self._floor:
+            insort(self._top, (-new, address))
+            self._tracked.add(address)
+            if len(self._top) > self.top_depth:
+                evicted, evicted_address = self._top.pop()
+                self._tracked.discard(evicted_address)
+                self._floor = max(self._floor, -evicted)
+
+    def _rebuild_top(self):
+        ranked = heapq.nlargest(
+            self.top_depth + 1,
+            ((wei, address) for address, wei in zip(self.addresses, self._wei) if wei > 0)
+        )
+        self._top = [(-wei, address) for wei, address in ranked[:self.top_depth]]
+        self._top.sort()
+        self._tracked = {address for _, address in self._top}
+        self._floor = ranked[self.top_depth][0] if len(ranked) > self.top_depth else 0
+
+    def top(self, n: int = 100) -> List[Tuple[str, int]]:
+        """Largest n holders as (address, wei)"""
+        if n > self.top_depth:
+            raise ValueError(f"Top list only tracks {self.top_depth} holders")
+        if len(self._top) < min(n, self.holders):
+            self._rebuild_top()
+        return [(address, -negated) for negated, address in self._top[:n]]
+
+    def rank(self, address: str, n: int = 100) -> Optional[int]:
+        """1-based rank of an address when it is among the top n holders"""
+        for position, (address_at, _) in enumerate(self.top(n), 1):
+            if address_at == address:
+                return position
+        return None
+
+    def _sorted_balances(self) -> np.ndarray:
+        if self._sorted_version != self._version:
+            balances = self._balances[:len(self.addresses)]
+            self._sorted = np.sort(balances[balances > 0])
+            self._sorted_version = self._version
+        return self._sorted
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Holder balance quantiles in CTKL, over addresses with a non-zero balance"""
+        balances = self._sorted_balances()
+        if not len(balances):
+            return np.zeros(len(qs))
+        return np.quantile(balances, qs)
+
+    def gini(self) -> float:
+        balances = self._sorted_balances()
+        n = len(balances)
+        if n == 0 or balances.sum() == 0:
+            return 0.0
+        ranks = np.arange(1, n + 1)
+        return float(2 * np.dot(ranks, balances) / (n * balances.sum()) - (n + 1) / n)
+
+    def top_share(self, n: int = 100) -> float:
+        """Percentage of the indexed supply held by the top n holders"""
+        if not self.total_wei:
+            return 0.0
+        return sum(wei for _, wei in self.top(n)) / self.total_wei * 100
+
+    def top_frame(self, n: int = 100) -> pd.DataFrame:
+        return pd.DataFrame([
+            {
+                'rank': rank,
+                'address': address,
+                'balance': _from_wei(wei),
+                'share_pct': wei / self.total_wei * 100 if self.total_wei else 0.0,
+            }
+            for rank, (address, wei) in enumerate(self.top(n), 1)
+        ], columns=HOLDER_COLUMNS)
+
+
+class HolderStore(HistoryStore):
+    """History store with the holder balance table"""
+
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        super().__init__(path, read_only)
+        if not read_only:
+            self.conn.execute(HOLDER_SCHEMA)
+
+    def load_index(self, top_depth: int = 1000) -> HolderIndex:
+        index = HolderIndex(top_depth)
+        rows = self.conn.execute("SELECT address, balance_wei FROM holder_balances").fetchall()
+        # Stores written before events were checksummed on decode hold lower-case addresses
+        index.load((to_checksum_address(address), int(wei)) for address, wei in rows)
+        return index
+
+    def save_index(self, index: HolderIndex, last_block: int):
+        """Write balances changed since the last save and advance the checkpoint in one transaction"""
+        frame = pd.DataFrame([
+            {'address': address, 'balance_wei': str(wei), 'balance': _from_wei(wei)}
+            for address, wei in ((a, index.balance_of(a)) for a in index.dirty)
+        ], columns=['address', 'balance_wei', 'balance'])
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            if len(frame):
+                self.conn.register('incoming', frame)
+                self.conn.execute("INSERT OR REPLACE INTO holder_balances SELECT * FROM incoming")
+                self.conn.unregister('incoming')
+                self.conn.execute("DELETE FROM holder_balances WHERE balance_wei = '0'")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_checkpoints VALUES (?, ?, ?)",
+                [HOLDERS_STREAM, last_block, datetime.now(timezone.utc).replace(tzinfo=None)]
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        index.dirty.clear()
+
+
+# Called with each transfer before it is applied, so ranks reflect the prior state
+TransferCallback = Callable[[Dict[str, Any]], None]
+
+
+class HolderIndexer:
+    """Follows CTKL Transfer events into a HolderIndex, persisting to a HolderStore when given one
+
+    Without a store the index lives in memory only, as in the monitor,
+    and next_block tracks how far it has been applied.
+    """
+
+    def __init__(self, network, token: str, index: HolderIndex, store: Optional[HolderStore] = None,
+                 next_block: int = 0):
+        self.network = network
+        self.token = to_checksum_address(token)
+        self.index = index
+        self.store = store
+        self.next_block = next_block
+        self._decoder = EventDecoder(TOKEN_ABI)
+
+    @classmethod
+    def from_config(cls, config, store: HolderStore, top_depth: int = 1000) -> 'HolderIndexer':
+        last = store.checkpoint(HOLDERS_STREAM)
+        start = last + 1 if last is not None else (getattr(config.contracts, 'deploy_block', 0) or 0)
+        return cls(config.network, config.contracts.token, store.load_index(top_depth), store, start)
+
+    async def sync(self, to_block: Optional[int] = None, on_progress: Optional[ProgressCallback] = None,
+                   on_transfer: Optional[TransferCallback] = None) -> int:
+        """Apply transfers up to to_block (default: latest); returns the number applied"""
+        progress = on_progress or (lambda stream, advance, total: None)
+        applied = 0
+
+        async with AsyncRpcBatcher(endpoint_pool(self.network)) as rpc:
+            if to_block is None:
+                to_block = int(await rpc.call('eth_blockNumber'), 16)
+            if self.next_block > to_block:
+                return 0
+
+            progress(HOLDERS_STREAM, 0, to_block - self.next_block + 1)
+            async for _, end, logs in LogScanner(rpc).scan(
+                self.token, [self._decoder.topics('Transfer')], self.next_block, to_block,
+                on_progress=lambda blocks: progress(HOLDERS_STREAM, blocks, None),
+            ):
+                for event in (self._decoder.decode(log) for log in logs):
+                    if event is None:
+                        continue
+                    transfer = {
+                        'sender': event['args']['from'],
+                        'recipient': event['args']['to'],
+                        'value': event['args']['value'],
+                        'block_number': event['block_number'],
+                        'transaction_hash': event['transaction_hash'],
+                    }
+                    if on_transfer:
+                        on_transfer(transfer)
+                    self.index.apply_transfer(transfer['sender'], transfer['recipient'], transfer['value'])
+                    applied += 1
+
+                if self.store is not None:
+                    await asyncio.to_thread(self.store.save_index, self.index, end)
+                self.next_block = end + 1
+
+        return applied
@@ -0,0 +1,100 @@
+"""
+Multicall3 aggregation for bulk contract reads
+Many view calls are packed into one aggregate3 eth_call, and many of those
+eth_calls are packed into one JSON-RPC batch request
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+from eth_abi import decode_abi, encode_abi
+from eth_abi.exceptions import DecodingError
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from .rpc import AsyncRpcBatcher, RpcError
+
+# Canonical Multicall3 deployment, identical on every major EVM chain
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+_AGGREGATE3_SELECTOR = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+
+
+@dataclass
+class Call:
+    """A single view call: target contract, calldata and the output types to decode"""
+    target: str
+    data: bytes
+    output_types: Sequence[str]
+
+
+def encode_call(signature: str, args: Sequence[Any] = ()) -> bytes:
+    """Encode calldata for a function signature such as 'balanceOf(address)'"""
+    selector = function_signature_to_4byte_selector(signature)
+    arg_types = signature[signature.index('(') + 1:-1]
+    types = [t for t in arg_types.split(',') if t]
+    return selector + (encode_abi(types, list(args)) if types else b'')
+
+
+def make_call(target: str, signature: str, args: Sequence[Any], output_types: Sequence[str]) -> Call:
+    return Call(to_checksum_address(target), encode_call(signature, args), output_types)
+
+
+class Multicall:
+    """Executes large numbers of view calls through Multicall3"""
+
+    def __init__(self, rpc: AsyncRpcBatcher, address: str = MULTICALL3_ADDRESS,
+                 calls_per_aggregate: int = 500, max_concurrency: int = 4):
+        self.rpc = rpc
+        self.address = to_checksum_address(address)
+        self.calls_per_aggregate = calls_per_aggregate
+        self.max_concurrency = max_concurrency
+
+    async def execute(self, calls: Sequence[Call], block: Any = 'latest') -> List[Optional[tuple]]:
+        """Run calls and return decoded outputs in order, None for calls that reverted or did not decode"""
+        if isinstance(block, int):
+            block = hex(block)
+
+        chunks = [calls[i:i + self.calls_per_aggregate] for i in range(0, len(calls), self.calls_per_aggregate)]
+        requests = [('eth_call', [{'to': self.address, 'data': self._encode(chunk)}, block]) for chunk in chunks]
+
+        # Each JSON-RPC batch carries several aggregate calls; a few batches run concurrently
+        per_batch = self.rpc.max_batch_size
+        groups = [requests[i:i + per_batch] for i in range(0, len(requests), per_batch)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run(group):
+            async with semaphore:
+                return await self.rpc.batch(group)
+
+        responses = [r for group in await asyncio.gather(*(_run(g) for g in groups)) for r in group]
+
+        results: List[Optional[tuple]] = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, RpcError):
+                raise response
+            results.extend(self._decode(chunk, response))
+        return results
+
+    def _encode(self, chunk: Sequence[Call]) -> str:
+        encoded = encode_abi(
+            ['(address,bool,bytes)[]'],
+            [[(call.target, True, call.data) for call in chunk]]
+        )
+        return '0x' + (_AGGREGATE3_SELECTOR + encoded).hex()
+
+    @staticmethod
+    def _decode(chunk: Sequence[Call], response: str) -> List[Optional[tuple]]:
+        (returned,) = decode_abi(['(bool,bytes)[]'], bytes.fromhex(response[2:]))
+        decoded = []
+        for call, (success, data) in zip(chunk, returned):
+            if not success or not data:
+                decoded.append(None)
+                continue
+            try:
+                decoded.append(decode_abi(list(call.output_types), data))
+            except (DecodingError, OverflowError, ValueError):
+                # e.g. a token whose symbol() returns bytes32 instead of string; eth_abi
+                # reports the bogus offset as an OverflowError rather than a DecodingError
+                decoded.append(None)
+        return decoded
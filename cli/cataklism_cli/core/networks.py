@@ -0,0 +1,191 @@
+"""
+Concurrent reads across every configured network
+Each network is read over its process-wide endpoint pool with one batched
+Multicall round per step, and all networks are read at once under a
+per-network timeout, so a cross-chain view takes about as long as the
+slowest chain and a slow or unreachable chain only fails its own row.
+
+Networks come from the optional `networks` config section, keyed by name:
+    networks:
+      ethereum: {rpc_url: ..., contracts: {core: ..., vault: ..., token: ..., multicall: ...}}
+      polygon:  {rpc_urls: [...], contracts: {...}}
+Without it, the active network and contracts are the only entry.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from web3 import Web3
+
+from .multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from .rpc import AsyncRpcBatcher, RpcError
+from .rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NETWORK_TIMEOUT = 15.0
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_YEAR = 31536000
+
+_POOL_OUTPUTS = ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool']
+_CONTRACT_KEYS = ('core', 'vault', 'token', 'multicall')
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+def _field(obj: Any, key: str, default: Any = None) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+@dataclass
+class NetworkTarget:
+    name: str
+    network: Any  # network config object or dict with rpc_url or rpc_urls
+    contracts: Dict[str, Optional[str]]
+
+
+@dataclass
+class NetworkResult:
+    network: str
+    value: Any = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+NetworkRead = Callable[[NetworkTarget, AsyncRpcBatcher, Multicall], Awaitable[Any]]
+
+
+def configured_networks(config) -> List[NetworkTarget]:
+    """Every network in config.networks, or the active network when there is no such section"""
+    networks = getattr(config, 'networks', None) or {}
+    items = networks.items() if isinstance(networks, dict) else ((_field(n, 'name'), n) for n in networks)
+
+    targets = [
+        NetworkTarget(name, network, {key: _field(_field(network, 'contracts', {}), key) for key in _CONTRACT_KEYS})
+        for name, network in items
+    ]
+    if not targets:
+        targets.append(NetworkTarget(
+            config.network.name,
+            config.network,
+            {key: getattr(config.contracts, key, None) for key in _CONTRACT_KEYS},
+        ))
+    return targets
+
+
+async def read_networks(targets: List[NetworkTarget], read: NetworkRead,
+                        timeout: float = DEFAULT_NETWORK_TIMEOUT) -> List[NetworkResult]:
+    """Run read against every network at once; results are in target order"""
+
+    async def _one(target: NetworkTarget) -> NetworkResult:
+        started = time.perf_counter()
+        try:
+            async with AsyncRpcBatcher(endpoint_pool(target.network), timeout=timeout) as rpc:
+                multicall = Multicall(rpc, target.contracts.get('multicall') or MULTICALL3_ADDRESS)
+                value = await asyncio.wait_for(read(target, rpc, multicall), timeout)
+            return NetworkResult(target.name, value, seconds=time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            error = f"timed out after {timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        logger.debug(f"Reading {target.name} failed: {error}")
+        return NetworkResult(target.name, error=error, seconds=time.perf_counter() - started)
+
+    return list(await asyncio.gather(*(_one(target) for target in targets)))
+
+
+async def read_pools(target: NetworkTarget, rpc: AsyncRpcBatcher, multicall: Multicall) -> List[Dict[str, Any]]:
+    """Every staking pool with its token symbol, liquidity and reward rate"""
+    core = target.contracts['core']
+    (count,) = (await multicall.execute([make_call(core, 'poolCount()', [], ['uint256'])]))[0]
+    pools = await multicall.execute([
+        make_call(core, 'pools(uint256)', [pool_id], _POOL_OUTPUTS) for pool_id in range(count)
+    ])
+
+    tokens = sorted({pool[0] for pool in pools if pool is not None})
+    symbols = await multicall.execute([make_call(token, 'symbol()', [], ['string']) for token in tokens])
+    symbol_of = {token: symbol[0] if symbol else 'UNKNOWN' for token, symbol in zip(tokens, symbols)}
+
+    return [
+        {
+            'id': pool_id,
+            'token': pool[0],
+            'token_symbol': symbol_of[pool[0]],
+            'total_liquidity': _from_wei(pool[1]),
+            'reward_rate': _from_wei(pool[2]),
+            'is_active': bool(pool[5]),
+        }
+        for pool_id, pool in enumerate(pools)
+        if pool is not None
+    ]
+
+
+async def read_status(target: NetworkTarget, rpc: AsyncRpcBatcher, multicall: Multicall) -> Dict[str, Any]:
+    """Chain head, gas price, vault totals and pools of one network
+
+    Vault fields are None on networks without a vault contract.
+    """
+    vault = target.contracts.get('vault')
+
+    async def _vault_stats():
+        if not vault:
+            return None
+        (stats,) = await multicall.execute([make_call(vault, 'getVaultStats()', [], ['uint256'] * 6)])
+        return stats
+
+    (block, gas_price), stats, pools = await asyncio.gather(
+        rpc.batch([('eth_blockNumber', []), ('eth_gasPrice', [])]),
+        _vault_stats(),
+        read_pools(target, rpc, multicall),
+    )
+    for result in (block, gas_price):
+        if isinstance(result, RpcError):
+            raise result
+
+    return {
+        'block_number': int(block, 16),
+        'gas_price_gwei': float(Web3.fromWei(int(gas_price, 16), 'gwei')),
+        'vault_total_assets': _from_wei(stats[0]) if stats else (0.0 if vault else None),
+        'vault_share_value': _from_wei(stats[2]) if stats else None,
+        'pools': pools,
+    }
+
+
+def balance_reader(address: str) -> NetworkRead:
+    """Read of an address's CTKL and native balances"""
+
+    async def _read(target: NetworkTarget, rpc: AsyncRpcBatcher, multicall: Multicall) -> Dict[str, Any]:
+        (token_balance,), native = await asyncio.gather(
+            multicall.execute([make_call(target.contracts['token'], 'balanceOf(address)', [address], ['uint256'])]),
+            rpc.call('eth_getBalance', [address, 'latest']),
+        )
+        return {
+            'balance': _from_wei(token_balance[0]) if token_balance else 0.0,
+            'native_balance': _from_wei(int(native, 16)),
+        }
+
+    return _read
+
+
+def pool_usd(pool: Dict[str, Any], prices: Dict[str, Optional[float]], reward_price: Optional[float]) -> Dict[str, Any]:
+    """Pool TVL in USD and reward APY, from the staked token and CTKL prices
+
+    Either is None when a price it needs is unavailable.
+    """
+    price = prices.get(pool['token_symbol'])
+    tvl = pool['total_liquidity'] * price if price is not None else None
+    if tvl is None or reward_price is None:
+        apy = None
+    elif tvl and pool['is_active']:
+        apy = pool['reward_rate'] * SECONDS_PER_YEAR * reward_price / tvl * 100
+    else:
+        apy = 0.0
+    return {**pool, 'tvl': tvl, 'apy': apy, 'reward_per_day': pool['reward_rate'] * SECONDS_PER_DAY}
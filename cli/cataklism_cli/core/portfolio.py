@@ -0,0 +1,181 @@
+"""
+Multi-address portfolio scanning
+Reads CTKL balances, staking positions and vault shares for large address
+lists through Multicall3, with one price lookup per token
+"""
+
+import asyncio
+import csv
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List
+
+from eth_utils import is_address, to_checksum_address
+from web3 import Web3
+
+from .multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from .rpc import AsyncRpcBatcher
+from .rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_COLUMNS = [
+    'address',
+    'ctkl_balance',
+    'staked_usd',
+    'pending_rewards',
+    'vault_shares',
+    'vault_balance',
+    'usd_value',
+]
+
+PriceLookup = Callable[[str], Awaitable[float]]
+
+
+@dataclass
+class PoolMeta:
+    pool_id: int
+    token: str
+    symbol: str
+
+
+def read_address_file(path: str) -> List[str]:
+    """Read addresses from a plain list (one per line) or a CSV with an 'address' column"""
+    lines = Path(path).read_text().splitlines()
+    if lines and 'address' in lines[0].lower().split(','):
+        candidates = [row.get('address', '') for row in csv.DictReader(lines)]
+    else:
+        candidates = [line.split(',')[0] for line in lines]
+
+    addresses = []
+    seen = set()
+    for candidate in candidates:
+        candidate = candidate.strip()
+        if not candidate:
+            continue
+        if not is_address(candidate):
+            logger.warning(f"Skipping invalid address: {candidate}")
+            continue
+        address = to_checksum_address(candidate)
+        if address not in seen:
+            seen.add(address)
+            addresses.append(address)
+    return addresses
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+class PortfolioScanner:
+    """Bulk balance, stake and vault reader for many addresses"""
+
+    def __init__(self, config, price_lookup: PriceLookup, chunk_size: int = 1000):
+        self.config = config
+        self.price_lookup = price_lookup
+        self.chunk_size = chunk_size
+
+    async def load_pools(self, multicall: Multicall) -> List[PoolMeta]:
+        core = self.config.contracts.core
+        (count,) = (await multicall.execute([make_call(core, 'poolCount()', [], ['uint256'])]))[0]
+
+        pools = await multicall.execute([
+            make_call(core, 'pools(uint256)', [pool_id],
+                      ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool'])
+            for pool_id in range(count)
+        ])
+        tokens = [pool[0] if pool else None for pool in pools]
+
+        symbols = await multicall.execute([
+            make_call(token, 'symbol()', [], ['string'])
+            for token in tokens if token
+        ])
+        symbol_iter = iter(symbols)
+
+        metas = []
+        for pool_id, token in enumerate(tokens):
+            if token is None:
+                continue
+            symbol = next(symbol_iter)
+            metas.append(PoolMeta(pool_id, token, symbol[0] if symbol else 'UNKNOWN'))
+        return metas
+
+    async def load_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Fetch each distinct token price exactly once"""
+        unique = sorted(set(symbols))
+        results = await asyncio.gather(*(self.price_lookup(s) for s in unique), return_exceptions=True)
+
+        prices = {}
+        for symbol, price in zip(unique, results):
+            if isinstance(price, Exception):
+                logger.warning(f"Price lookup failed for {symbol}: {price}")
+                price = 0.0
+            prices[symbol] = float(price)
+        return prices
+
+    def _calls_for(self, address: str, pools: List[PoolMeta]):
+        contracts = self.config.contracts
+        calls = [make_call(contracts.token, 'balanceOf(address)', [address], ['uint256'])]
+        for pool in pools:
+            calls.append(make_call(contracts.core, 'userInfo(uint256,address)', [pool.pool_id, address],
+                                   ['uint256', 'uint256', 'uint256', 'uint256']))
+            calls.append(make_call(contracts.core, 'pendingReward(uint256,address)', [pool.pool_id, address],
+                                   ['uint256']))
+        calls.append(make_call(contracts.vault, 'getUserInfo(address)', [address],
+                               ['uint256', 'uint256', 'uint256']))
+        return calls
+
+    def _row(self, address: str, results: List[Any], pools: List[PoolMeta],
+             prices: Dict[str, float]) -> Dict[str, Any]:
+        ctkl_price = prices.get('CTKL', 0.0)
+        balance = _from_wei(results[0][0]) if results[0] else 0.0
+
+        staked_usd = 0.0
+        pending = 0.0
+        for index, pool in enumerate(pools):
+            user_info = results[1 + 2 * index]
+            reward = results[2 + 2 * index]
+            if user_info:
+                staked_usd += _from_wei(user_info[0]) * prices.get(pool.symbol, 0.0)
+            if reward:
+                pending += _from_wei(reward[0])
+
+        vault = results[-1]
+        vault_shares = _from_wei(vault[0]) if vault else 0.0
+        vault_balance = _from_wei(vault[1]) if vault else 0.0
+
+        return {
+            'address': address,
+            'ctkl_balance': balance,
+            'staked_usd': staked_usd,
+            'pending_rewards': pending,
+            'vault_shares': vault_shares,
+            'vault_balance': vault_balance,
+            'usd_value': (balance + pending + vault_balance) * ctkl_price + staked_usd,
+        }
+
+    async def scan(self, addresses: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one portfolio row per address, in input order, chunk by chunk"""
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            multicall = Multicall(rpc, getattr(self.config.contracts, 'multicall', None) or MULTICALL3_ADDRESS)
+
+            pools = await self.load_pools(multicall)
+            prices = await self.load_prices(['CTKL'] + [pool.symbol for pool in pools])
+            calls_per_address = 2 + 2 * len(pools)
+
+            chunks = [addresses[i:i + self.chunk_size] for i in range(0, len(addresses), self.chunk_size)]
+
+            def _fetch(chunk):
+                calls = [call for address in chunk for call in self._calls_for(address, pools)]
+                return asyncio.ensure_future(multicall.execute(calls))
+
+            # Keep the next chunk in flight while the current one is being consumed
+            pending = _fetch(chunks[0]) if chunks else None
+            for index, chunk in enumerate(chunks):
+                results = await pending
+                pending = _fetch(chunks[index + 1]) if index + 1 < len(chunks) else None
+
+                for offset, address in enumerate(chunk):
+                    start = offset * calls_per_address
+                    yield self._row(address, results[start:start + calls_per_address], pools, prices)
@@ -0,0 +1,165 @@
+"""
+Cached token prices and token info
+Lookups are served from an in-memory TTL cache. Concurrent misses for the
+same key share one upstream call, values past their TTL are served while a
+single background refresh runs, and bulk lookups fetch all missing symbols
+in one upstream round.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0
+DEFAULT_STALE_TTL = 300.0
+
+# Returns a value, or an exception for a key that failed on its own, per requested key
+LoadMany = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+
+_TOKEN_INFO = 'token_info'
+
+
+def _consume(future: asyncio.Future):
+    # Background refreshes may fail with nobody awaiting them; mark the error as retrieved
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlightCache:
+    """TTL cache with request coalescing and stale-while-revalidate
+
+    Within ttl a value is returned as is. Between ttl and stale_ttl it is
+    returned immediately and refreshed in the background. Past stale_ttl
+    callers wait for the refresh, but still get the old value if it fails.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, stale_ttl: float = DEFAULT_STALE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks = set()
+
+    async def get(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        async def _load_one(keys):
+            return {keys[0]: await load()}
+        return (await self.get_many([key], _load_one))[key]
+
+    async def get_many(self, keys: Iterable[str], load_many: LoadMany) -> Dict[str, Any]:
+        now = self.clock()
+        results: Dict[str, Any] = {}
+        missing: List[str] = []
+        stale: List[str] = []
+
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            age = now - entry[1] if entry else None
+            if entry is not None and age < self.ttl:
+                results[key] = entry[0]
+            elif entry is not None and age < self.stale_ttl:
+                results[key] = entry[0]
+                stale.append(key)
+            else:
+                missing.append(key)
+
+        if stale:
+            self._start(stale, load_many)
+        if missing:
+            for key, future in self._start(missing, load_many).items():
+                try:
+                    # Shielded so one cancelled caller does not cancel the shared load
+                    results[key] = await asyncio.shield(future)
+                except Exception as e:
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        raise
+                    logger.warning(f"Refreshing {key} failed, using value from {self.clock() - entry[1]:.0f}s ago: {e}")
+                    results[key] = entry[0]
+        return results
+
+    def invalidate(self, key: Optional[str] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _start(self, keys: List[str], load_many: LoadMany) -> Dict[str, asyncio.Future]:
+        """Futures for keys; those not already in flight are loaded together in one call"""
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        pending: Dict[str, asyncio.Future] = {}
+        for key in keys:
+            future = self._inflight.get(key)
+            if future is None:
+                future = pending[key] = self._inflight[key] = loop.create_future()
+                future.add_done_callback(_consume)
+            futures[key] = future
+
+        if pending:
+            task = loop.create_task(self._load(pending, load_many))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return futures
+
+    async def _load(self, pending: Dict[str, asyncio.Future], load_many: LoadMany):
+        error: Optional[Exception] = None
+        try:
+            values = await load_many(list(pending))
+        except Exception as e:
+            values, error = {}, e
+            logger.debug(f"Upstream load of {', '.join(pending)} failed: {e}")
+
+        now = self.clock()
+        for key, future in pending.items():
+            del self._inflight[key]
+            if isinstance(values.get(key), Exception):
+                future.set_exception(values[key])
+            elif key in values:
+                self._entries[key] = (values[key], now)
+                future.set_result(values[key])
+            else:
+                future.set_exception(error or KeyError(f"No value returned for {key}"))
+
+
+class PriceService:
+    """Token prices and token info behind one SingleFlightCache each
+
+    fetch_prices, when the upstream offers it, resolves many symbols in one
+    request; otherwise bulk lookups issue the per-symbol fetches concurrently.
+    """
+
+    def __init__(self, fetch_price: Callable[[str], Awaitable[float]],
+                 fetch_token_info: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+                 fetch_prices: Optional[Callable[[List[str]], Awaitable[Dict[str, float]]]] = None,
+                 ttl: float = DEFAULT_TTL, stale_ttl: float = DEFAULT_STALE_TTL):
+        self.fetch_price = fetch_price
+        self.fetch_token_info = fetch_token_info
+        self.fetch_prices = fetch_prices
+        self._prices = SingleFlightCache(ttl, stale_ttl)
+        self._info = SingleFlightCache(ttl, stale_ttl)
+
+    async def _load_prices(self, symbols: List[str]) -> Dict[str, float]:
+        if self.fetch_prices is not None:
+            return {symbol.upper(): float(price) for symbol, price in (await self.fetch_prices(symbols)).items()}
+        prices = await asyncio.gather(*(self.fetch_price(symbol) for symbol in symbols), return_exceptions=True)
+        return {
+            symbol: price if isinstance(price, Exception) else float(price)
+            for symbol, price in zip(symbols, prices)
+        }
+
+    async def price(self, symbol: str) -> float:
+        return (await self.prices([symbol]))[symbol.upper()]
+
+    async def prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Prices keyed by upper-case symbol; all misses go upstream in one round"""
+        return await self._prices.get_many([symbol.upper() for symbol in symbols], self._load_prices)
+
+    async def token_info(self) -> Dict[str, Any]:
+        if self.fetch_token_info is None:
+            raise RuntimeError("No token info source configured")
+        return await self._info.get(_TOKEN_INFO, self.fetch_token_info)
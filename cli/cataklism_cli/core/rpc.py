@@ -0,0 +1,180 @@
+"""
+Asynchronous JSON-RPC client with request batching
+Used by bulk operations that would otherwise pay one round trip per call
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import aiohttp
+
+from .rpc_pool import MIN_LIMIT_WAIT, READ_METHODS, Endpoint, EndpointPool, NoHealthyEndpoint, is_mempool_call
+
+logger = logging.getLogger(__name__)
+
+RpcCall = Tuple[str, Sequence[Any]]
+
+
+class RpcError(Exception):
+    """Error returned by a JSON-RPC endpoint for a single call"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class AsyncRpcBatcher:
+    """Sends JSON-RPC calls over one HTTP session, packing them into batch requests
+
+    Accepts a single URL or an EndpointPool; with a pool every batch is routed
+    to the best endpoint, fails over on transport errors and hedges read-only
+    batches that are slower than usual.
+    """
+
+    def __init__(self, endpoints: Union[str, EndpointPool], max_batch_size: int = 100, timeout: float = 30):
+        self.pool = endpoints if isinstance(endpoints, EndpointPool) else EndpointPool([Endpoint(endpoints)])
+        self.max_batch_size = max_batch_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ids = itertools.count(1)
+
+    async def __aenter__(self) -> 'AsyncRpcBatcher':
+        self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def call(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """Execute a single call, raising RpcError on failure"""
+        result = (await self.batch([(method, params)]))[0]
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def batch(self, calls: Sequence[RpcCall]) -> List[Any]:
+        """Execute calls in as few HTTP requests as possible
+
+        Results are returned in call order. Per-call failures are returned as
+        RpcError instances instead of raising, so one bad call does not
+        discard the rest of the batch.
+        """
+        results: List[Any] = []
+        for start in range(0, len(calls), self.max_batch_size):
+            results.extend(await self._send(calls[start:start + self.max_batch_size]))
+        return results
+
+    async def _send(self, calls: Sequence[RpcCall]) -> List[Any]:
+        if self._session is None:
+            raise RuntimeError("AsyncRpcBatcher used outside of 'async with'")
+
+        payload = [
+            {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)}
+            for method, params in calls
+        ]
+
+        mempool = any(is_mempool_call(method, params) for method, params in calls)
+        read_only = not mempool and all(method in READ_METHODS for method, _ in calls)
+        body = await self._dispatch(payload, read_only, mempool)
+
+        # Some nodes answer a whole batch with a single error object
+        if isinstance(body, dict):
+            error = body.get('error', {})
+            raise RpcError(error.get('code', -1), error.get('message', 'invalid batch response'))
+
+        by_id = {item.get('id'): item for item in body}
+        results = []
+        for request in payload:
+            item = by_id.get(request['id'])
+            if item is None:
+                results.append(RpcError(-1, 'missing response'))
+            elif 'error' in item:
+                error = item['error']
+                results.append(RpcError(error.get('code', -1), error.get('message', ''), error.get('data')))
+            else:
+                results.append(item.get('result'))
+        return results
+
+    async def _post(self, endpoint: Endpoint, payload: List[Dict[str, Any]]) -> Any:
+        started = time.monotonic()
+        try:
+            async with self._session.post(endpoint.url, json=payload) as response:
+                if response.status != 200:
+                    raise Exception(f"RPC endpoint {endpoint.url} returned status {response.status}")
+                body = await response.json(content_type=None)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return body
+
+    async def _acquire(self, exclude: Sequence[Endpoint], mempool: bool = False) -> Endpoint:
+        endpoint, delay = self.pool.pinned(exclude) if mempool else self.pool.acquire(exclude=exclude)
+        # Throttled everywhere: wait until a token is actually taken, as others may be waiting too
+        if delay:
+            await asyncio.sleep(delay)
+            while not endpoint.limiter.try_acquire():
+                await asyncio.sleep(max(endpoint.limiter.wait_time(), MIN_LIMIT_WAIT))
+        return endpoint
+
+    async def _dispatch(self, payload: List[Dict[str, Any]], read_only: bool, mempool: bool = False) -> Any:
+        """Send one HTTP request, failing over between endpoints on transport errors
+
+        Mempool calls go to the pool's pinned endpoint and are never hedged.
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+
+        for _ in range(min(self.pool.max_attempts, len(self.pool.endpoints))):
+            endpoint = await self._acquire(tried, mempool)
+            tried.append(endpoint)
+            try:
+                if read_only:
+                    return await self._hedged(endpoint, payload, tried)
+                return await self._post(endpoint, payload)
+            except Exception as e:
+                last_error = e
+                logger.debug(f"RPC batch failed on {endpoint.url}, failing over: {e}")
+
+        raise last_error or NoHealthyEndpoint("No RPC endpoints available")
+
+    async def _hedged(self, primary: Endpoint, payload: List[Dict[str, Any]], tried: List[Endpoint]) -> Any:
+        delay = self.pool.hedge_delay(primary)
+        if delay is None:
+            return await self._post(primary, payload)
+
+        tasks = [asyncio.ensure_future(self._post(primary, payload))]
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            try:
+                backup, wait_time = self.pool.acquire(exclude=tried)
+            except NoHealthyEndpoint:
+                backup, wait_time = None, None
+            if wait_time == 0:
+                tried.append(backup)
+                tasks.append(asyncio.ensure_future(self._post(backup, payload)))
+
+        # First successful answer wins; the slower request is cancelled
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,362 @@
+"""
+RPC endpoint pool with latency-aware routing and failover
+Tracks rolling latency and error rates per endpoint, routes each request to
+the best healthy endpoint, hedges slow reads and enforces per-endpoint rate
+limits. Shared by the CLI and the monitoring service.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import requests
+from web3.providers.base import JSONBaseProvider
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to send to two endpoints at once
+READ_METHODS = frozenset({
+    'eth_blockNumber', 'eth_call', 'eth_chainId', 'eth_estimateGas', 'eth_feeHistory',
+    'eth_gasPrice', 'eth_getBalance', 'eth_getBlockByHash', 'eth_getBlockByNumber',
+    'eth_getCode', 'eth_getLogs', 'eth_getStorageAt', 'eth_getTransactionByHash',
+    'eth_getTransactionCount', 'eth_getTransactionReceipt', 'eth_maxPriorityFeePerGas',
+    'net_version', 'web3_clientVersion',
+})
+
+_BROADCAST_METHODS = frozenset({'eth_sendRawTransaction', 'eth_sendTransaction'})
+
+
+def is_mempool_call(method: str, params: Sequence[Any]) -> bool:
+    """Whether a call's answer depends on one node's mempool
+
+    Broadcasts and 'pending' nonce reads and gas estimates must reach the same
+    node, or a nonce read elsewhere can miss transactions just broadcast and
+    hand the same nonce out twice.
+    """
+    if method in _BROADCAST_METHODS:
+        return True
+    if method == 'eth_getTransactionCount':
+        return len(params) > 1 and params[1] == 'pending'
+    if method == 'eth_estimateGas':
+        # Without a block tag nodes may estimate against the pending state
+        return len(params) < 2 or params[1] == 'pending'
+    return False
+
+EndpointSpec = Union[str, Dict[str, Any]]
+
+# Shortest sleep between attempts to take a rate limit token
+MIN_LIMIT_WAIT = 0.001
+
+
+class NoHealthyEndpoint(Exception):
+    """Raised when every endpoint in the pool is cooling down"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate is in requests per second"""
+
+    def __init__(self, rate: Optional[float], burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or (rate or 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        if self.rate is None:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def wait_time(self) -> float:
+        """Seconds until the next token becomes available"""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+    def acquire(self):
+        """Block until a token is taken; other callers may take the one a sleep waited for"""
+        while not self.try_acquire():
+            time.sleep(max(self.wait_time(), MIN_LIMIT_WAIT))
+
+
+@dataclass
+class EndpointHealth:
+    url: str
+    latency_ms: float
+    error_rate: float
+    healthy: bool
+    requests: int
+
+
+class Endpoint:
+    """One RPC URL with its rolling health statistics"""
+
+    # Weight of the newest sample in the latency moving average
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, url: str, rate_limit: Optional[float] = None, burst: Optional[int] = None,
+                 window: int = 100, cooldown: float = 30.0):
+        self.url = url
+        self.limiter = TokenBucket(rate_limit, burst)
+        self.cooldown = cooldown
+        self.latency: Optional[float] = None
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooling_until = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooling_until
+
+    def score(self) -> float:
+        """Lower is better; unknown endpoints get a neutral score so they are tried"""
+        latency = self.latency if self.latency is not None else 0.25
+        return latency * (1 + 10 * self.error_rate)
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency += self.EWMA_ALPHA * (elapsed - self.latency)
+
+    def record_failure(self):
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            # Back off exponentially, capped at 8x the base cooldown
+            if self.consecutive_failures >= 3:
+                factor = min(8, 2 ** (self.consecutive_failures - 3))
+                self.cooling_until = time.monotonic() + self.cooldown * factor
+                logger.warning(f"RPC endpoint {self.url} cooling down for {self.cooldown * factor:.0f}s")
+
+    def health(self) -> EndpointHealth:
+        return EndpointHealth(
+            url=self.url,
+            latency_ms=(self.latency or 0.0) * 1000,
+            error_rate=self.error_rate,
+            healthy=self.healthy,
+            requests=self.requests,
+        )
+
+
+class EndpointPool:
+    """Routes requests across endpoints by health, latency and rate limit headroom"""
+
+    def __init__(self, endpoints: Sequence[Endpoint], hedge_after: Optional[float] = None,
+                 max_attempts: int = 3):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.hedge_after = hedge_after
+        self.max_attempts = max_attempts
+        self._pinned: Optional[Endpoint] = None
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[EndpointSpec], **kwargs) -> 'EndpointPool':
+        """Build a pool from URLs or {'url', 'rate_limit', 'burst'} dicts"""
+        endpoints = []
+        for spec in specs:
+            if isinstance(spec, str):
+                endpoints.append(Endpoint(spec))
+            else:
+                endpoints.append(Endpoint(spec['url'], spec.get('rate_limit'), spec.get('burst')))
+        return cls(endpoints, **kwargs)
+
+    def ranked(self, exclude: Iterable[Endpoint] = ()) -> List[Endpoint]:
+        excluded = set(id(e) for e in exclude)
+        candidates = [e for e in self.endpoints if id(e) not in excluded]
+        healthy = [e for e in candidates if e.healthy]
+        # If everything is cooling down, fall back to the least bad endpoint
+        return sorted(healthy or candidates, key=lambda e: e.score())
+
+    def acquire(self, exclude: Iterable[Endpoint] = ()) -> Tuple[Endpoint, float]:
+        """Pick the best endpoint with rate limit headroom
+
+        Returns the endpoint and how long the caller must wait before using it
+        (zero unless every candidate is currently throttled).
+        """
+        ranked = self.ranked(exclude)
+        if not ranked:
+            raise NoHealthyEndpoint("No RPC endpoints available")
+        for endpoint in ranked:
+            if endpoint.limiter.try_acquire():
+                return endpoint, 0.0
+        soonest = min(ranked, key=lambda e: e.limiter.wait_time())
+        return soonest, soonest.limiter.wait_time()
+
+    def pinned(self, exclude: Iterable[Endpoint] = ()) -> Tuple[Endpoint, float]:
+        """Endpoint for mempool calls; kept while it stays healthy so they all see one mempool"""
+        endpoint = self._pinned
+        if endpoint is None or not endpoint.healthy or any(endpoint is e for e in exclude):
+            endpoint, delay = self.acquire(exclude)
+            self._pinned = endpoint
+            return endpoint, delay
+        if endpoint.limiter.try_acquire():
+            return endpoint, 0.0
+        return endpoint, endpoint.limiter.wait_time()
+
+    def hedge_delay(self, primary: Endpoint) -> Optional[float]:
+        """How long to wait on a read before racing a second endpoint"""
+        if len(self.endpoints) < 2:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if primary.latency is None:
+            return None
+        return max(0.05, primary.latency * 3)
+
+    def health(self) -> List[EndpointHealth]:
+        return [e.health() for e in self.endpoints]
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """web3.py provider that sends each request through an EndpointPool"""
+
+    def __init__(self, pool: EndpointPool, request_timeout: float = 10.0):
+        super().__init__()
+        self.pool = pool
+        self.request_timeout = request_timeout
+        self._session = requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='rpc-hedge')
+
+    def __str__(self):
+        return f"PooledHTTPProvider({len(self.pool.endpoints)} endpoints)"
+
+    def isConnected(self) -> bool:
+        try:
+            response = self.make_request('web3_clientVersion', [])
+        except Exception:
+            return False
+        return 'result' in response
+
+    def close(self):
+        """Release pooled connections and hedging threads"""
+        self._session.close()
+        self._executor.shutdown(wait=False)
+
+    def _post(self, endpoint: Endpoint, payload: bytes) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            response = self._session.post(
+                endpoint.url,
+                data=payload,
+                headers={'Content-Type': 'application/json'},
+                timeout=self.request_timeout,
+            )
+            # Rate limiting and server errors count against the endpoint
+            if response.status_code == 429 or response.status_code >= 500:
+                raise requests.HTTPError(f"{endpoint.url} returned status {response.status_code}")
+            response.raise_for_status()
+            decoded = self.decode_rpc_response(response.content)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return decoded
+
+    def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        payload = self.encode_rpc_request(method, params)
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+
+        mempool = is_mempool_call(method, params or ())
+
+        for _ in range(min(self.pool.max_attempts, len(self.pool.endpoints))):
+            endpoint, delay = self.pool.pinned(tried) if mempool else self.pool.acquire(exclude=tried)
+            if delay:
+                endpoint.limiter.acquire()
+            tried.append(endpoint)
+
+            try:
+                if method in READ_METHODS and not mempool:
+                    return self._hedged(endpoint, payload, tried)
+                return self._post(endpoint, payload)
+            except Exception as e:
+                last_error = e
+                logger.debug(f"RPC {method} failed on {endpoint.url}, failing over: {e}")
+
+        raise last_error or NoHealthyEndpoint("No RPC endpoints available")
+
+    def _hedged(self, primary: Endpoint, payload: bytes, tried: List[Endpoint]) -> Dict[str, Any]:
+        delay = self.pool.hedge_delay(primary)
+        if delay is None:
+            return self._post(primary, payload)
+
+        futures = [self._executor.submit(self._post, primary, payload)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            try:
+                backup, wait_time = self.pool.acquire(exclude=tried)
+            except NoHealthyEndpoint:
+                backup, wait_time = None, None
+            if wait_time == 0:
+                tried.append(backup)
+                futures.append(self._executor.submit(self._post, backup, payload))
+
+        # First successful answer wins; the loser finishes in the background
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+def endpoint_specs(network) -> List[EndpointSpec]:
+    """Endpoint list for a network config object or dict
+
+    Uses 'rpc_urls' when present and falls back to the single 'rpc_url'.
+    """
+    if isinstance(network, dict):
+        return list(network.get('rpc_urls') or [network['rpc_url']])
+    return list(getattr(network, 'rpc_urls', None) or [network.rpc_url])
+
+
+_pools: Dict[Tuple[str, ...], EndpointPool] = {}
+
+
+def endpoint_pool(network, **kwargs) -> EndpointPool:
+    """Process-wide pool for a network, so every client shares the same health data
+
+    Settings passed in kwargs (hedge_after, max_attempts) are applied to an
+    already cached pool too, so a reloaded config takes effect.
+    """
+    specs = endpoint_specs(network)
+    key = tuple(s if isinstance(s, str) else s['url'] for s in specs)
+    if key not in _pools:
+        _pools[key] = EndpointPool.from_specs(specs, **kwargs)
+    pool = _pools[key]
+    for name, value in kwargs.items():
+        setattr(pool, name, value)
+    return pool
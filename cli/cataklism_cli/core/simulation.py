@@ -0,0 +1,261 @@
+"""
+Offline vault share and staking reward math
+Loads CataklismVault and CataklismCore state once and reproduces the
+contracts' integer arithmetic locally, vectorised over many amounts, users
+and time horizons, so what-if planning needs no further RPC round trips
+"""
+
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from web3 import Web3
+
+from .multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from .rpc import AsyncRpcBatcher
+from .rpc_pool import endpoint_pool
+
+# Scale factor CataklismCore applies to accRewardPerShare
+ACC_REWARD_PRECISION = 10 ** 12
+
+_HORIZON_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+SIMULATION_COLUMNS = {
+    'vault': ['amount', 'shares', 'share_of_vault', 'redeem_value'],
+    'rewards': ['pool_id', 'subject', 'staked', 'horizon', 'seconds', 'rewards'],
+}
+
+
+def parse_horizon(value: str) -> int:
+    """Parse '3600', '90m', '1h', '7d' or '2w' into seconds"""
+    match = re.fullmatch(r'\s*(\d+)\s*([smhdw]?)\s*', value.lower())
+    if not match:
+        raise ValueError(f"Invalid time horizon '{value}'")
+    return int(match.group(1)) * _HORIZON_UNITS[match.group(2) or 's']
+
+
+def to_wei(amount: Any) -> int:
+    return int(Web3.toWei(Decimal(str(amount)), 'ether'))
+
+
+def from_wei(value: int) -> float:
+    return float(Web3.fromWei(int(value), 'ether'))
+
+
+def _int_array(values: Sequence[int]) -> np.ndarray:
+    # Object arrays keep Python's arbitrary precision; uint256 products overflow int64
+    return np.array([int(v) for v in values], dtype=object)
+
+
+@dataclass
+class VaultState:
+    total_assets: int
+    total_shares: int
+
+    def shares_for(self, amounts: Sequence[int]) -> np.ndarray:
+        """Mirror of CataklismVault.calculateShares for each amount (wei)"""
+        amounts = _int_array(amounts)
+        if self.total_shares == 0 or self.total_assets == 0:
+            return amounts
+        return amounts * self.total_shares // self.total_assets
+
+    def assets_for(self, shares: Sequence[int]) -> np.ndarray:
+        """Mirror of CataklismVault.calculateAmount for each share amount"""
+        shares = _int_array(shares)
+        if self.total_shares == 0:
+            return shares
+        return shares * self.total_assets // self.total_shares
+
+
+@dataclass
+class PoolState:
+    pool_id: int
+    token: str
+    total_liquidity: int
+    reward_rate: int
+    last_update_time: int
+    acc_reward_per_share: int
+    is_active: bool
+
+    def acc_at(self, timestamps: Sequence[int]) -> np.ndarray:
+        """accRewardPerShare as updatePool would leave it at each timestamp"""
+        elapsed = np.maximum(_int_array(timestamps) - self.last_update_time, 0)
+        if not self.is_active or self.total_liquidity == 0:
+            return elapsed * 0 + self.acc_reward_per_share
+        return elapsed * self.reward_rate * ACC_REWARD_PRECISION // self.total_liquidity + self.acc_reward_per_share
+
+
+@dataclass
+class UserPosition:
+    amount: int
+    reward_debt: int
+    pending_rewards: int
+
+
+@dataclass
+class ProtocolSnapshot:
+    """Vault and core state pinned to a single block"""
+    block_number: int
+    timestamp: int
+    vault: VaultState
+    pools: Dict[int, PoolState]
+    users: Dict[str, Dict[int, UserPosition]] = field(default_factory=dict)
+
+
+class SimulationEngine:
+    """Exact replica of the vault share and staking reward math"""
+
+    def __init__(self, snapshot: ProtocolSnapshot):
+        self.snapshot = snapshot
+
+    def pool(self, pool_id: int) -> PoolState:
+        if pool_id not in self.snapshot.pools:
+            raise ValueError(f"Pool {pool_id} does not exist")
+        return self.snapshot.pools[pool_id]
+
+    def deposit_shares(self, amounts: Sequence[int]) -> np.ndarray:
+        return self.snapshot.vault.shares_for(amounts)
+
+    def redeem_value(self, shares: Sequence[int]) -> np.ndarray:
+        return self.snapshot.vault.assets_for(shares)
+
+    def plan_deposits(self, amounts: Sequence[int]) -> List[Dict[str, Any]]:
+        """Shares, post-deposit ownership and immediate redeem value for each amount"""
+        vault = self.snapshot.vault
+        amounts = _int_array(amounts)
+        shares = vault.shares_for(amounts)
+        total_shares = shares + vault.total_shares
+        total_assets = amounts + vault.total_assets
+        # Redeeming straight after the deposit exposes the rounding loss
+        redeem = np.where(total_shares > 0, shares * total_assets // np.maximum(total_shares, 1), 0)
+
+        return [
+            {
+                'amount': from_wei(amount),
+                'shares': from_wei(share),
+                'share_of_vault': float(share) / float(total) if total else 0.0,
+                'redeem_value': from_wei(value),
+            }
+            for amount, share, total, value in zip(amounts, shares, total_shares, redeem)
+        ]
+
+    def pending_rewards(self, pool_id: int, users: Sequence[str], horizons: Sequence[int]) -> np.ndarray:
+        """Mirror of CataklismCore.pendingReward; returns a users x horizons matrix"""
+        pool = self.pool(pool_id)
+        timestamps = [self.snapshot.timestamp + h for h in horizons]
+        acc = pool.acc_at(timestamps)
+
+        positions = [self.snapshot.users.get(u, {}).get(pool_id) or UserPosition(0, 0, 0) for u in users]
+        amounts = _int_array([p.amount for p in positions])[:, None]
+        debts = _int_array([p.reward_debt for p in positions])[:, None]
+        carried = _int_array([p.pending_rewards for p in positions])[:, None]
+        return amounts * acc[None, :] // ACC_REWARD_PRECISION - debts + carried
+
+    def stake_rewards(self, pool_id: int, amounts: Sequence[int], horizons: Sequence[int]) -> np.ndarray:
+        """Rewards a new deposit of each amount would earn over each horizon; amounts x horizons"""
+        pool = self.pool(pool_id)
+        amounts = _int_array(amounts)
+        now = self.snapshot.timestamp
+
+        # deposit() runs updatePool first and books rewardDebt at the current accumulator
+        acc_now = pool.acc_at([now])[0]
+        debt = amounts * acc_now // ACC_REWARD_PRECISION
+
+        # Accrual after the deposit is diluted by the deposit itself
+        accrued_rate = pool.reward_rate * ACC_REWARD_PRECISION if pool.is_active else 0
+        liquidity = np.maximum(amounts + pool.total_liquidity, 1)
+        elapsed = _int_array(horizons)
+        acc = acc_now + elapsed[None, :] * accrued_rate // liquidity[:, None]
+        return amounts[:, None] * acc // ACC_REWARD_PRECISION - debt[:, None]
+
+
+class SnapshotLoader:
+    """Reads everything the engine needs through Multicall, pinned to one block"""
+
+    def __init__(self, config):
+        self.config = config
+
+    async def load(self, users: Sequence[str] = (), block: Optional[int] = None) -> ProtocolSnapshot:
+        contracts = self.config.contracts
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            multicall = Multicall(rpc, getattr(contracts, 'multicall', None) or MULTICALL3_ADDRESS)
+            if block is None:
+                block = int(await rpc.call('eth_blockNumber'), 16)
+            header = await rpc.call('eth_getBlockByNumber', [hex(block), False])
+
+            (count,) = (await multicall.execute([make_call(contracts.core, 'poolCount()', [], ['uint256'])], block))[0]
+
+            calls = [
+                make_call(contracts.vault, 'totalAssets()', [], ['uint256']),
+                make_call(contracts.vault, 'totalShares()', [], ['uint256']),
+            ]
+            calls += [
+                make_call(contracts.core, 'pools(uint256)', [pool_id],
+                          ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool'])
+                for pool_id in range(count)
+            ]
+            calls += [
+                make_call(contracts.core, 'userInfo(uint256,address)', [pool_id, user],
+                          ['uint256', 'uint256', 'uint256', 'uint256'])
+                for user in users for pool_id in range(count)
+            ]
+            results = await multicall.execute(calls, block)
+
+        assets, shares = results[0], results[1]
+        vault = VaultState(assets[0] if assets else 0, shares[0] if shares else 0)
+
+        pools = {}
+        for pool_id, pool in enumerate(results[2:2 + count]):
+            if pool:
+                pools[pool_id] = PoolState(pool_id, *pool)
+
+        positions: Dict[str, Dict[int, UserPosition]] = {}
+        user_results = iter(results[2 + count:])
+        for user in users:
+            positions[user] = {}
+            for pool_id in range(count):
+                info = next(user_results)
+                if info:
+                    positions[user][pool_id] = UserPosition(info[0], info[1], info[2])
+
+        return ProtocolSnapshot(block, int(header['timestamp'], 16), vault, pools, positions)
+
+    async def verify(self, engine: SimulationEngine, amounts: Sequence[int],
+                     users: Sequence[str] = ()) -> List[Dict[str, Any]]:
+        """Compare engine results with calculateShares and pendingReward at the snapshot block
+
+        Returns one row per mismatch; an empty list means the engine agrees
+        with the contracts exactly.
+        """
+        snapshot = engine.snapshot
+        contracts = self.config.contracts
+        pool_ids = sorted(snapshot.pools)
+
+        calls = [make_call(contracts.vault, 'calculateShares(uint256)', [a], ['uint256']) for a in amounts]
+        calls += [
+            make_call(contracts.core, 'pendingReward(uint256,address)', [pool_id, user], ['uint256'])
+            for user in users for pool_id in pool_ids
+        ]
+        async with AsyncRpcBatcher(endpoint_pool(self.config.network)) as rpc:
+            multicall = Multicall(rpc, getattr(contracts, 'multicall', None) or MULTICALL3_ADDRESS)
+            results = await multicall.execute(calls, snapshot.block_number)
+
+        mismatches = []
+        expected_shares = engine.deposit_shares(amounts)
+        for amount, expected, actual in zip(amounts, expected_shares, results):
+            if actual is None or actual[0] != expected:
+                mismatches.append({'check': 'calculateShares', 'input': amount,
+                                   'expected': int(expected), 'actual': actual[0] if actual else None})
+
+        reward_results = iter(results[len(amounts):])
+        for user in users:
+            for pool_id in pool_ids:
+                # The snapshot block's own timestamp is what the eth_call evaluates against
+                expected = engine.pending_rewards(pool_id, [user], [0])[0, 0]
+                actual = next(reward_results)
+                if actual is None or actual[0] != expected:
+                    mismatches.append({'check': f'pendingReward[{pool_id}]', 'input': user,
+                                       'expected': int(expected), 'actual': actual[0] if actual else None})
+        return mismatches
@@ -0,0 +1,256 @@
+"""
+Realised vault and pool yields from on-chain history
+Samples CataklismVault share value and each pool's reward accumulator at
+fixed block intervals with batched historical Multicall reads and caches
+the samples in the history store. Yields over trailing windows are then
+annualised from the cached samples in one vectorised pass, and a refresh
+only reads the blocks past the last cached sample.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .history import HistoryStore, ProgressCallback, fetch_block_times
+from .multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from .rpc import AsyncRpcBatcher, RpcError
+from .rpc_pool import endpoint_pool
+from .simulation import ACC_REWARD_PRECISION, PoolState, from_wei
+
+logger = logging.getLogger(__name__)
+
+YIELD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS yield_samples (
+    block_number BIGINT PRIMARY KEY,
+    block_time TIMESTAMP,
+    vault_share_value DOUBLE
+);
+CREATE TABLE IF NOT EXISTS yield_pool_samples (
+    block_number BIGINT,
+    block_time TIMESTAMP,
+    pool_id BIGINT,
+    reward_per_token DOUBLE
+);
+"""
+
+YIELDS_STREAM = 'yields'
+
+YIELD_COLUMNS = ['subject', 'pool_id', 'window', 'apy', 'from_block', 'to_block']
+
+# Trailing windows reported by default, in seconds
+DEFAULT_WINDOWS = {'1d': 86400, '7d': 7 * 86400, '30d': 30 * 86400}
+
+# About one sample per hour on Ethereum mainnet
+DEFAULT_YIELD_INTERVAL = 300
+
+SECONDS_PER_YEAR = 31536000.0
+
+_POOL_OUTPUTS = ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool']
+
+
+def realised_yields(times: np.ndarray, values: np.ndarray, windows: Sequence[float],
+                    compound: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Annualised yield in percent over each trailing window ending at the last sample
+
+    values is (samples,) or (samples, series). Each window starts at the last
+    sample at or before its nominal start, so it spans at least the window;
+    windows reaching past the first sample, or series missing at the start,
+    give NaN. Compounded yields suit share values, simple ones accumulators.
+    Returns the yields, (windows,) or (windows, series), and the start indices.
+    """
+    windows = np.asarray(windows, dtype=float)
+    end = times[-1]
+    start = np.searchsorted(times, end - windows, side='right') - 1
+    covered = start >= 0
+    start = np.where(covered, start, 0)
+    elapsed = end - times[start]
+    if values.ndim == 2:
+        elapsed, covered = elapsed[:, None], covered[:, None]
+
+    first, last = values[start], values[-1]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if compound:
+            result = (np.power(last / first, SECONDS_PER_YEAR / elapsed) - 1) * 100
+        else:
+            result = (last - first) * SECONDS_PER_YEAR / elapsed * 100
+    return np.where(covered & (elapsed > 0), result, np.nan), start
+
+
+class YieldStore(HistoryStore):
+    """History store with the yield sample tables"""
+
+    def __init__(self, path: Optional[str] = None, read_only: bool = False):
+        super().__init__(path, read_only)
+        if not read_only:
+            self.conn.execute(YIELD_SCHEMA)
+
+    def prune(self, before_block: int, interval: int, head: int):
+        """Drop samples older than the longest window needs, and earlier head samples off the interval grid"""
+        for table in ('yield_samples', 'yield_pool_samples'):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE block_number < ? OR (block_number % ? <> 0 AND block_number < ?)",
+                [before_block, interval, head]
+            )
+
+    def _samples(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, pd.DataFrame]:
+        vault = self.query("""
+            SELECT block_number, EPOCH(block_time) AS ts, vault_share_value
+            FROM yield_samples ORDER BY block_number
+        """)
+        pools = self.query("SELECT block_number, pool_id, reward_per_token FROM yield_pool_samples")
+        # One column per pool, aligned to the vault sample blocks; pools not yet deployed are NaN
+        if len(pools):
+            matrix = pools.pivot_table(index='block_number', columns='pool_id', values='reward_per_token') \
+                .reindex(vault['block_number'])
+        else:
+            matrix = pd.DataFrame(index=vault['block_number'])
+        return (vault['block_number'].to_numpy(), vault['ts'].to_numpy(dtype=float),
+                vault['vault_share_value'].to_numpy(dtype=float), matrix)
+
+    def yields(self, windows: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Realised vault APY (compounded share value growth) and pool reward APR
+
+        Pool yields are simple, as rewards are not restaked, and are in CTKL
+        per staked token: a percentage yield for pools staking CTKL itself.
+        """
+        windows = windows or DEFAULT_WINDOWS
+        blocks, times, share_values, pools = self._samples()
+        if len(blocks) < 2:
+            return pd.DataFrame(columns=YIELD_COLUMNS)
+
+        names, seconds = list(windows), list(windows.values())
+        vault_apy, vault_start = realised_yields(times, share_values, seconds, compound=True)
+        rows = [
+            {'subject': 'vault', 'pool_id': None, 'window': name, 'apy': float(apy),
+             'from_block': int(blocks[start]), 'to_block': int(blocks[-1])}
+            for name, apy, start in zip(names, vault_apy, vault_start)
+        ]
+
+        if pools.shape[1]:
+            pool_apr, pool_start = realised_yields(times, pools.to_numpy(dtype=float), seconds, compound=False)
+            for column, pool_id in enumerate(pools.columns):
+                rows.extend(
+                    {'subject': f"pool {pool_id}", 'pool_id': int(pool_id), 'window': name,
+                     'apy': float(pool_apr[row, column]),
+                     'from_block': int(blocks[pool_start[row]]), 'to_block': int(blocks[-1])}
+                    for row, name in enumerate(names)
+                )
+        return pd.DataFrame(rows, columns=YIELD_COLUMNS)
+
+
+class YieldSampler:
+    """Keeps a YieldStore sampled up to the chain head for the trailing lookback
+
+    Sample blocks are aligned to multiples of interval so refreshes extend
+    the same grid; the chain head is sampled too, so yields end at it.
+    """
+
+    def __init__(self, network, contracts: Dict[str, Any], store: YieldStore,
+                 interval: int = DEFAULT_YIELD_INTERVAL, lookback_seconds: float = max(DEFAULT_WINDOWS.values()),
+                 deploy_block: int = 0):
+        self.network = network
+        self.contracts = contracts
+        self.store = store
+        self.interval = interval
+        self.lookback_seconds = lookback_seconds
+        self.deploy_block = deploy_block
+
+    @classmethod
+    def from_config(cls, config, store: YieldStore, interval: int = DEFAULT_YIELD_INTERVAL,
+                    lookback_seconds: float = max(DEFAULT_WINDOWS.values())) -> 'YieldSampler':
+        contracts = {
+            'core': config.contracts.core,
+            'vault': config.contracts.vault,
+            'multicall': getattr(config.contracts, 'multicall', None),
+        }
+        return cls(config.network, contracts, store, interval, lookback_seconds,
+                   getattr(config.contracts, 'deploy_block', 0) or 0)
+
+    async def sync(self, to_block: Optional[int] = None, on_progress: Optional[ProgressCallback] = None) -> int:
+        """Sample new blocks up to to_block (default: latest); returns the samples added"""
+        progress = on_progress or (lambda stream, advance, total: None)
+
+        async with AsyncRpcBatcher(endpoint_pool(self.network)) as rpc:
+            if to_block is None:
+                to_block = int(await rpc.call('eth_blockNumber'), 16)
+            # DuckDB calls are blocking, so they run off the event loop
+            last = await asyncio.to_thread(self.store.checkpoint, YIELDS_STREAM)
+            if last is not None and last >= to_block:
+                return 0
+
+            start = await self._lookback_start(rpc, to_block)
+            first = start if last is None or last < start else last + 1
+            blocks = list(range(-(-first // self.interval) * self.interval, to_block + 1, self.interval))
+            if not blocks or blocks[-1] != to_block:
+                blocks.append(to_block)
+
+            multicall = Multicall(rpc, self.contracts.get('multicall') or MULTICALL3_ADDRESS)
+            count = (await multicall.execute([make_call(self.contracts['core'], 'poolCount()', [], ['uint256'])],
+                                             to_block))[0]
+            pool_count = count[0] if count else 0
+            progress(YIELDS_STREAM, 0, len(blocks))
+
+            added = 0
+            batch_size = 32
+            for index in range(0, len(blocks), batch_size):
+                chunk = blocks[index:index + batch_size]
+                samples = await asyncio.gather(*(self._sample(multicall, block, pool_count) for block in chunk))
+                times = await fetch_block_times(rpc, chunk)
+
+                vault_rows, pool_rows = [], []
+                for block, (share_value, pools) in zip(chunk, samples):
+                    if share_value is None:
+                        continue
+                    block_time = times[block]
+                    vault_rows.append({'block_number': block, 'block_time': block_time,
+                                       'vault_share_value': share_value})
+                    timestamp = int((block_time - datetime(1970, 1, 1)).total_seconds())
+                    pool_rows.extend(
+                        {'block_number': block, 'block_time': block_time, 'pool_id': pool.pool_id,
+                         'reward_per_token': float(pool.acc_at([timestamp])[0]) / ACC_REWARD_PRECISION}
+                        for pool in pools
+                    )
+
+                await asyncio.to_thread(self.store.append_tables,
+                                        {'yield_samples': vault_rows, 'yield_pool_samples': pool_rows},
+                                        YIELDS_STREAM, chunk[-1])
+                added += len(vault_rows)
+                progress(YIELDS_STREAM, len(chunk), None)
+
+            await asyncio.to_thread(self.store.prune, start, self.interval, to_block)
+        return added
+
+    async def _lookback_start(self, rpc: AsyncRpcBatcher, to_block: int) -> int:
+        """First block the longest window can need, from the recent average block time"""
+        probe = max(to_block - 10000, self.deploy_block, 0)
+        if probe >= to_block:
+            return self.deploy_block
+        times = await fetch_block_times(rpc, [probe, to_block])
+        block_time = max((times[to_block] - times[probe]).total_seconds() / (to_block - probe), 0.1)
+        # One extra interval so every window has a sample at or before its start
+        blocks_back = int(self.lookback_seconds * 1.05 / block_time) + self.interval
+        return max(to_block - blocks_back, self.deploy_block)
+
+    async def _sample(self, multicall: Multicall, block: int, pool_count: int) -> Tuple[Optional[float], List[PoolState]]:
+        calls = [make_call(self.contracts['vault'], 'getVaultStats()', [], ['uint256'] * 6)]
+        calls += [make_call(self.contracts['core'], 'pools(uint256)', [pool_id], _POOL_OUTPUTS)
+                  for pool_id in range(pool_count)]
+        try:
+            stats, *pools = await multicall.execute(calls, block)
+        except RpcError as e:
+            # Blocks before deployment (or pruned state on non-archive nodes)
+            logger.debug(f"Skipping yield sample at block {block}: {e}")
+            return None, []
+        if stats is None:
+            return None, []
+
+        states = [
+            PoolState(pool_id, pool[0], pool[1], pool[2], pool[3], pool[4], bool(pool[5]))
+            for pool_id, pool in enumerate(pools)
+            if pool is not None
+        ]
+        return from_wei(stats[2]), states
@@ -6,31 +6,48 @@ Advanced command-line interface for interacting with Cataklism Protocol
 
 import argparse
 import asyncio
-import json
 import logging
+import math
 import sys
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import click
+import pandas as pd
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
 from rich.panel import Panel
 from rich.text import Text
+from web3 import Web3
 
 from .core.config import Config, load_config
 from .core.web3_client import Web3Client
 from .core.protocol_client import ProtocolClient
+from .core.rpc_pool import PooledHTTPProvider, endpoint_pool, endpoint_specs
+from .core.prices import PriceService
+from .core.portfolio import PORTFOLIO_COLUMNS, PortfolioScanner, read_address_file
+from .core.history import DEFAULT_SAMPLE_INTERVAL, DEFAULT_STORE_PATH, HistoryStore, HistorySync
+from .core.governance import SUPPORT_LABELS, GovernanceIndexer, GovernanceStore
+from .core.holders import HOLDERS_STREAM, HolderIndexer, HolderStore
+from .core.networks import (DEFAULT_NETWORK_TIMEOUT, NetworkRead, NetworkResult, balance_reader, configured_networks,
+                            pool_usd, read_networks, read_pools, read_status)
+from .core.simulation import SIMULATION_COLUMNS, SimulationEngine, SnapshotLoader, from_wei, parse_horizon, to_wei
+from .core.yields import DEFAULT_WINDOWS, DEFAULT_YIELD_INTERVAL, YIELDS_STREAM, YieldSampler, YieldStore
 from .commands.wallet import WalletCommands
 from .commands.staking import StakingCommands
 from .commands.vault import VaultCommands
 from .commands.governance import GovernanceCommands
 from .commands.analytics import AnalyticsCommands
+from .commands.batch import BatchCommands, BatchJournal, load_manifest
+from .commands.reports import SECTION_COLUMNS, ReportPipeline, SectionWriters
 from .utils.formatters import format_token_amount, format_percentage, format_usd
 from .utils.validators import validate_address, validate_amount
 from .utils.logger import setup_logger
+from .utils.writers import ROW_FORMATS, open_row_writer
 
 console = Console()
+err_console = Console(stderr=True)
 logger = logging.getLogger(__name__)
 
 class CataklismCLI:
@@ -41,21 +58,37 @@ class CataklismCLI:
         self.web3_client = Web3Client(self.config)
         self.protocol_client = ProtocolClient(self.web3_client, self.config)
 
+        # Every price and token-info read goes through one cache, so concurrent callers share upstream calls
+        self.prices = PriceService(
+            self.protocol_client.get_token_price,
+            self.protocol_client.get_token_info,
+            getattr(self.protocol_client, 'get_token_prices', None),
+        )
+
         # Initialize command modules
         self.wallet = WalletCommands(self.protocol_client)
         self.staking = StakingCommands(self.protocol_client)
         self.vault = VaultCommands(self.protocol_client)
         self.governance = GovernanceCommands(self.protocol_client)
         self.analytics = AnalyticsCommands(self.protocol_client)
+        self.batch = BatchCommands(self.web3_client, self.config)
+        self.portfolio = PortfolioScanner(self.config, self.prices.price)
+        self.reports = ReportPipeline(self.protocol_client, self.config)
 
     async def initialize(self):
         """Initialize the CLI application"""
         try:
             await self.web3_client.connect()
+
+            # Route every Web3 request through the endpoint pool when failover endpoints are configured
+            if len(endpoint_specs(self.config.network)) > 1:
+                self.web3_client.w3.provider = PooledHTTPProvider(endpoint_pool(self.config.network))
+
             await self.protocol_client.initialize()
-            console.print("✅ [green]Connected to Cataklism Protocol[/green]")
+            # Status goes to stderr so piped json/csv output stays clean
+            err_console.print("✅ [green]Connected to Cataklism Protocol[/green]")
         except Exception as e:
-            console.print(f"❌ [red]Failed to initialize: {e}[/red]")
+            err_console.print(f"❌ [red]Failed to initialize: {e}[/red]")
             raise
 
 @click.group()
@@ -77,9 +110,14 @@ def cli(ctx, config, network, verbose):
     ctx.obj['verbose'] = verbose
 
 @cli.command()
+@click.option('--all-networks', is_flag=True, help='Query every configured network concurrently')
+@click.option('--timeout', type=float, default=DEFAULT_NETWORK_TIMEOUT, help='Per-network timeout in seconds with --all-networks')
 @click.pass_context
-def status(ctx):
+def status(ctx, all_networks, timeout):
     """Show protocol status and health information"""
+    if all_networks:
+        return asyncio.run(_status_all_networks(ctx.obj['cli'], timeout))
+
     async def _status():
         cli_app = ctx.obj['cli']
         await cli_app.initialize()
@@ -95,7 +133,7 @@ def status(ctx):
                 # Get protocol statistics
                 stats = await cli_app.protocol_client.get_protocol_stats()
                 vault_stats = await cli_app.protocol_client.get_vault_stats()
-                token_info = await cli_app.protocol_client.get_token_info()
+                token_info = await cli_app.prices.token_info()
 
                 progress.stop()
 
@@ -155,6 +193,13 @@ def status(ctx):
                     format_percentage(vault_stats['apy']),
                     "Vault annual percentage yield"
                 )
+                realised_apy = _realised_vault_apy()
+                if realised_apy is not None:
+                    table.add_row(
+                        "Realised Vault APY (7d)",
+                        format_percentage(realised_apy),
+                        "From on-chain share value history"
+                    )
 
                 console.print(table)
 
@@ -176,6 +221,138 @@ def status(ctx):
 
     return asyncio.run(_status())
 
+def _realised_vault_apy(window: str = '7d') -> Optional[float]:
+    """Vault APY from cached yield samples, when 'analytics yields' has sampled them"""
+    if not DEFAULT_STORE_PATH.exists():
+        return None
+    try:
+        store = YieldStore(str(DEFAULT_STORE_PATH), read_only=True)
+    except Exception:
+        return None
+    try:
+        frame = store.yields({window: DEFAULT_WINDOWS[window]})
+    except Exception as e:
+        # Stores created before the yield tables existed
+        logger.debug(f"No cached yields: {e}")
+        return None
+    finally:
+        store.close()
+
+    vault = frame[frame['subject'] == 'vault']
+    if vault.empty or math.isnan(vault['apy'].iloc[0]):
+        return None
+    return float(vault['apy'].iloc[0])
+
+async def _read_all_networks(cli_app, read: NetworkRead, timeout: float,
+                             description: str) -> Tuple[List[NetworkResult], bool]:
+    """Read every configured network at once, connecting for prices alongside
+
+    Returns the results and whether the protocol client connected; without
+    it there are no prices and USD values are shown as n/a.
+    """
+    targets = configured_networks(cli_app.config)
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=err_console,
+    ) as progress:
+        progress.add_task(f"{description} on {len(targets)} networks...", total=None)
+        connected, results = await asyncio.gather(cli_app.initialize(), read_networks(targets, read, timeout),
+                                                  return_exceptions=True)
+    if isinstance(results, Exception):
+        raise results
+    if isinstance(connected, Exception):
+        err_console.print(f"⚠️  [yellow]Prices unavailable ({connected}); USD values shown as n/a[/yellow]")
+        return results, False
+    return results, True
+
+async def _network_prices(cli_app, symbols, connected: bool) -> Dict[str, Optional[float]]:
+    """USD price per symbol, None where the lookup failed or there is no connection"""
+    if not connected:
+        return {symbol: None for symbol in symbols}
+    # load_prices reports a failed lookup as 0.0
+    prices = await cli_app.portfolio.load_prices(symbols)
+    return {symbol: price or None for symbol, price in prices.items()}
+
+def _usd(value: Optional[float]) -> str:
+    return format_usd(value) if value is not None else "n/a"
+
+def _usd_total(values: List[Optional[float]]) -> Optional[float]:
+    """Sum of USD values, or None when any of them is unknown"""
+    return None if any(value is None for value in values) else sum(values)
+
+def _print_network_failures(results: List[NetworkResult]):
+    for result in results:
+        if result.error is not None:
+            console.print(f"⚠️  [yellow]{result.network}: {result.error}[/yellow]")
+
+def _print_network_timing(results: List[NetworkResult]):
+    slowest = max(results, key=lambda result: result.seconds)
+    ok = sum(result.error is None for result in results)
+    err_console.print(f"Read {ok} of {len(results)} networks; slowest {slowest.network} in {slowest.seconds:.2f}s")
+
+async def _status_all_networks(cli_app, timeout: float):
+    try:
+        results, connected = await _read_all_networks(cli_app, read_status, timeout, "Fetching protocol status")
+        symbols = {pool['token_symbol'] for result in results if result.error is None for pool in result.value['pools']}
+        prices = await _network_prices(cli_app, symbols | {'CTKL'}, connected)
+    except Exception as e:
+        console.print(f"❌ [red]Error fetching status: {e}[/red]")
+        return 1
+
+    table = Table(title="Cataklism Protocol Status - All Networks", show_header=True, show_footer=True)
+    table.add_column("Network", "All networks", style="cyan", no_wrap=True)
+    table.add_column("Block", justify="right")
+    table.add_column("Gas (gwei)", justify="right")
+    table.add_column("Pools", justify="center")
+    table.add_column("Staked TVL", justify="right", style="green")
+    table.add_column("Vault TVL", justify="right", style="green")
+    table.add_column("TVL", justify="right", style="magenta")
+    table.add_column("Status", justify="center")
+
+    staked_values, vault_values = [], []
+    for result in results:
+        if result.error is not None:
+            table.add_row(result.network, "-", "-", "-", "-", "-", "-", "🔴 Unavailable")
+            continue
+        status = result.value
+        pools = [pool_usd(pool, prices, prices['CTKL']) for pool in status['pools']]
+        staked = _usd_total([pool['tvl'] for pool in pools])
+        # The vault holds CTKL; a network without a vault adds nothing
+        assets = status['vault_total_assets']
+        if assets is None:
+            vault = 0.0
+        else:
+            vault = assets * prices['CTKL'] if prices['CTKL'] is not None else None
+        staked_values.append(staked)
+        vault_values.append(vault)
+        table.add_row(
+            result.network,
+            f"{status['block_number']:,}",
+            f"{status['gas_price_gwei']:.1f}",
+            f"{sum(pool['is_active'] for pool in pools)}/{len(pools)}",
+            _usd(staked),
+            _usd(vault) if assets is not None else "-",
+            _usd(_usd_total([staked, vault])),
+            f"🟢 {result.seconds:.2f}s"
+        )
+
+    staked_total, vault_total = _usd_total(staked_values), _usd_total(vault_values)
+    total = _usd_total([staked_total, vault_total])
+    table.columns[4].footer = _usd(staked_total)
+    table.columns[5].footer = _usd(vault_total)
+    table.columns[6].footer = _usd(total)
+    console.print(table)
+    console.print(Panel(
+        f"💰 Aggregate TVL: {_usd(total)}\n"
+        f"🪙 CTKL Price: {_usd(prices['CTKL'])}",
+        title="All Networks",
+        border_style="green"
+    ))
+    _print_network_failures(results)
+    _print_network_timing(results)
+    return 1 if all(result.error is not None for result in results) else 0
+
 @cli.group()
 def wallet():
     """Wallet management commands"""
@@ -184,9 +361,14 @@ def wallet():
 @wallet.command('balance')
 @click.argument('address', required=False)
 @click.option('--token', '-t', default='CTKL', help='Token symbol to check')
+@click.option('--all-networks', is_flag=True, help='Query every configured network concurrently (CTKL only)')
+@click.option('--timeout', type=float, default=DEFAULT_NETWORK_TIMEOUT, help='Per-network timeout in seconds with --all-networks')
 @click.pass_context
-def wallet_balance(ctx, address, token):
+def wallet_balance(ctx, address, token, all_networks, timeout):
     """Check wallet balance"""
+    if all_networks:
+        return asyncio.run(_balance_all_networks(ctx.obj['cli'], address, token, timeout))
+
     async def _balance():
         cli_app = ctx.obj['cli']
         await cli_app.initialize()
@@ -200,7 +382,7 @@ def wallet_balance(ctx, address, token):
 
         try:
             balance = await cli_app.wallet.get_balance(address, token)
-            price = await cli_app.protocol_client.get_token_price(token)
+            price = await cli_app.prices.price(token)
 
             console.print(Panel(
                 f"💰 Address: {address}\n"
@@ -216,6 +398,92 @@ def wallet_balance(ctx, address, token):
 
     return asyncio.run(_balance())
 
+async def _balance_all_networks(cli_app, address: Optional[str], token: str, timeout: float):
+    address = address or cli_app.config.wallet.address
+    if not validate_address(address):
+        console.print("❌ [red]Invalid address format[/red]")
+        return 1
+    if token.upper() != 'CTKL':
+        console.print("❌ [red]--all-networks reads CTKL balances only[/red]")
+        return 1
+
+    try:
+        results, connected = await _read_all_networks(cli_app, balance_reader(Web3.toChecksumAddress(address)),
+                                                      timeout, "Fetching balances")
+        price = (await _network_prices(cli_app, {'CTKL'}, connected))['CTKL']
+    except Exception as e:
+        console.print(f"❌ [red]Error: {e}[/red]")
+        return 1
+
+    table = Table(title=f"CTKL Balance - {address}", show_header=True, show_footer=True)
+    table.add_column("Network", "All networks", style="cyan", no_wrap=True)
+    table.add_column("CTKL Balance", justify="right", style="magenta")
+    table.add_column("Native Balance", justify="right")
+    table.add_column("USD Value", justify="right", style="green")
+
+    total = 0.0
+    for result in results:
+        if result.error is not None:
+            table.add_row(result.network, "-", "-", "🔴 Unavailable")
+            continue
+        total += result.value['balance']
+        table.add_row(
+            result.network,
+            format_token_amount(result.value['balance']),
+            format_token_amount(result.value['native_balance']),
+            _usd(result.value['balance'] * price if price is not None else None)
+        )
+
+    table.columns[1].footer = format_token_amount(total)
+    table.columns[3].footer = _usd(total * price if price is not None else None)
+    console.print(table)
+    _print_network_failures(results)
+    _print_network_timing(results)
+    return 1 if all(result.error is not None for result in results) else 0
+
+@wallet.command('scan')
+@click.argument('address_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', '-f', type=click.Choice(ROW_FORMATS), default='csv')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.option('--chunk-size', type=int, default=1000, help='Addresses per Multicall round')
+@click.pass_context
+def wallet_scan(ctx, address_file, format, output, chunk_size):
+    """Scan balances, stakes and vault shares for a list of addresses"""
+    async def _scan():
+        cli_app = ctx.obj['cli']
+        await cli_app.initialize()
+
+        addresses = read_address_file(address_file)
+        if not addresses:
+            err_console.print("❌ [red]No valid addresses found[/red]")
+            return 1
+
+        cli_app.portfolio.chunk_size = chunk_size
+
+        try:
+            # Progress goes to stderr so results can be piped from stdout
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=err_console,
+            ) as progress, open_row_writer(format, output, PORTFOLIO_COLUMNS) as writer:
+                task = progress.add_task("Scanning addresses...", total=len(addresses))
+
+                async for row in cli_app.portfolio.scan(addresses):
+                    writer.write(row)
+                    progress.advance(task)
+
+            if output:
+                err_console.print(f"✅ [green]Scanned {writer.rows_written:,} addresses to {output}[/green]")
+
+        except Exception as e:
+            err_console.print(f"❌ [red]Scan failed: {e}[/red]")
+            return 1
+
+    return asyncio.run(_scan())
+
 @cli.group()
 def stake():
     """Staking management commands"""
@@ -356,9 +624,14 @@ def stake_withdraw(ctx, pool_id, amount, gas_limit, gas_price):
 
 @stake.command('pools')
 @click.option('--active-only', is_flag=True, help='Show only active pools')
+@click.option('--all-networks', is_flag=True, help='Query every configured network concurrently')
+@click.option('--timeout', type=float, default=DEFAULT_NETWORK_TIMEOUT, help='Per-network timeout in seconds with --all-networks')
 @click.pass_context
-def stake_pools(ctx, active_only):
+def stake_pools(ctx, active_only, all_networks, timeout):
     """List all staking pools"""
+    if all_networks:
+        return asyncio.run(_pools_all_networks(ctx.obj['cli'], active_only, timeout))
+
     async def _pools():
         cli_app = ctx.obj['cli']
         await cli_app.initialize()
@@ -399,6 +672,52 @@ def stake_pools(ctx, active_only):
 
     return asyncio.run(_pools())
 
+async def _pools_all_networks(cli_app, active_only: bool, timeout: float):
+    try:
+        results, connected = await _read_all_networks(cli_app, read_pools, timeout, "Fetching pools")
+        symbols = {pool['token_symbol'] for result in results if result.error is None for pool in result.value}
+        prices = await _network_prices(cli_app, symbols | {'CTKL'}, connected)
+    except Exception as e:
+        console.print(f"❌ [red]Error fetching pools: {e}[/red]")
+        return 1
+
+    table = Table(title="Staking Pools - All Networks", show_header=True, show_footer=True)
+    table.add_column("Network", "All networks", style="cyan", no_wrap=True)
+    table.add_column("ID", justify="center", style="cyan")
+    table.add_column("Token", style="magenta")
+    table.add_column("TVL", justify="right", style="green")
+    table.add_column("APY", justify="right", style="yellow")
+    table.add_column("Reward Rate", justify="right", style="blue")
+    table.add_column("Status", justify="center")
+
+    tvls = []
+    for result in results:
+        if result.error is not None:
+            continue
+        for pool in result.value:
+            if active_only and not pool['is_active']:
+                continue
+            pool = pool_usd(pool, prices, prices['CTKL'])
+            tvls.append(pool['tvl'])
+            table.add_row(
+                result.network,
+                str(pool['id']),
+                pool['token_symbol'],
+                _usd(pool['tvl']),
+                format_percentage(pool['apy']) if pool['apy'] is not None else "n/a",
+                f"{format_token_amount(pool['reward_per_day'])}/day",
+                "🟢 Active" if pool['is_active'] else "🔴 Inactive"
+            )
+
+    table.columns[3].footer = _usd(_usd_total(tvls))
+    if table.row_count:
+        console.print(table)
+    else:
+        console.print("ℹ️  No pools found")
+    _print_network_failures(results)
+    _print_network_timing(results)
+    return 1 if all(result.error is not None for result in results) else 0
+
 @cli.group()
 def vault():
     """Vault management commands"""
@@ -461,46 +780,798 @@ def vault_deposit(ctx, amount, gas_limit, gas_price):
 
     return asyncio.run(_deposit())
 
-@cli.command()
-@click.option('--format', '-f', type=click.Choice(['table', 'json', 'csv']), default='table')
-@click.option('--output', '-o', help='Output file path')
+@cli.group()
+def simulate():
+    """Offline what-if simulation of vault shares and staking rewards"""
+    pass
+
+def _read_amounts(amounts, amounts_file):
+    values = list(amounts)
+    if amounts_file:
+        values += [line.split(',')[0].strip() for line in Path(amounts_file).read_text().splitlines()]
+    values = [v for v in values if v and validate_amount(v)]
+    return [to_wei(v) for v in values]
+
+def _print_mismatches(mismatches):
+    if not mismatches:
+        err_console.print("✅ [green]Simulation matches the contracts exactly[/green]")
+        return 0
+
+    table = Table(title="Simulation Mismatches", show_header=True)
+    table.add_column("Check", style="cyan")
+    table.add_column("Input", style="magenta")
+    table.add_column("Expected", justify="right", style="green")
+    table.add_column("Actual", justify="right", style="red")
+    for mismatch in mismatches:
+        table.add_row(mismatch['check'], str(mismatch['input']), str(mismatch['expected']), str(mismatch['actual']))
+    err_console.print(table)
+    return 1
+
+@simulate.command('vault')
+@click.argument('amounts', nargs=-1)
+@click.option('--amounts-file', type=click.Path(exists=True, dir_okay=False), help='Deposit amounts, one per line')
+@click.option('--block', type=int, help='Simulate against the state at this block (defaults to latest)')
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.option('--verify', is_flag=True, help='Check every result against calculateShares on the live contract')
+@click.pass_context
+def simulate_vault(ctx, amounts, amounts_file, block, format, output, verify):
+    """Plan vault deposits: shares received and immediate redeem value"""
+    async def _simulate():
+        cli_app = ctx.obj['cli']
+        await cli_app.initialize()
+
+        wei_amounts = _read_amounts(amounts, amounts_file)
+        if not wei_amounts:
+            err_console.print("❌ [red]No valid amounts given[/red]")
+            return 1
+
+        try:
+            loader = SnapshotLoader(cli_app.config)
+            engine = SimulationEngine(await loader.load(block=block))
+            rows = engine.plan_deposits(wei_amounts)
+
+            if format == 'table':
+                table = Table(title=f"Vault Deposit Simulation (block {engine.snapshot.block_number:,})", show_header=True)
+                table.add_column("Amount", justify="right", style="cyan")
+                table.add_column("Shares", justify="right", style="green")
+                table.add_column("Vault Share", justify="right", style="yellow")
+                table.add_column("Redeem Value", justify="right", style="magenta")
+                for row in rows:
+                    table.add_row(
+                        format_token_amount(row['amount']),
+                        format_token_amount(row['shares']),
+                        format_percentage(row['share_of_vault'] * 100),
+                        format_token_amount(row['redeem_value'])
+                    )
+                console.print(table)
+            else:
+                with open_row_writer(format, output, SIMULATION_COLUMNS['vault']) as writer:
+                    writer.write_many(rows)
+
+            if verify:
+                return _print_mismatches(await loader.verify(engine, wei_amounts))
+
+        except Exception as e:
+            err_console.print(f"❌ [red]Simulation failed: {e}[/red]")
+            return 1
+
+    return asyncio.run(_simulate())
+
+@simulate.command('rewards')
+@click.argument('pool_id', type=int)
+@click.option('--user', '-u', 'users', multiple=True, help='Project pending rewards for this address (repeatable)')
+@click.option('--stake', '-s', 'stakes', multiple=True, help='Project rewards for a new stake of this amount (repeatable)')
+@click.option('--horizon', '-t', 'horizons', multiple=True, help='Time horizon such as 1h, 1d or 30d (repeatable)')
+@click.option('--block', type=int, help='Simulate against the state at this block (defaults to latest)')
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.option('--verify', is_flag=True, help='Check current pending rewards against pendingReward on the live contract')
+@click.pass_context
+def simulate_rewards(ctx, pool_id, users, stakes, horizons, block, format, output, verify):
+    """Project staking rewards for existing positions and hypothetical stakes"""
+    async def _simulate():
+        cli_app = ctx.obj['cli']
+        await cli_app.initialize()
+
+        for user in users:
+            if not validate_address(user):
+                err_console.print(f"❌ [red]Invalid address: {user}[/red]")
+                return 1
+
+        try:
+            labels = list(horizons or ('1d', '7d', '30d'))
+            seconds = [parse_horizon(h) for h in labels]
+            addresses = [Web3.toChecksumAddress(u) for u in (users or [cli_app.config.wallet.address])]
+            stake_amounts = _read_amounts(stakes, None)
+
+            loader = SnapshotLoader(cli_app.config)
+            engine = SimulationEngine(await loader.load(users=addresses, block=block))
+
+            rows = []
+            pending = engine.pending_rewards(pool_id, addresses, seconds)
+            for index, address in enumerate(addresses):
+                position = engine.snapshot.users[address].get(pool_id)
+                for col, (label, horizon) in enumerate(zip(labels, seconds)):
+                    rows.append({
+                        'pool_id': pool_id,
+                        'subject': address,
+                        'staked': from_wei(position.amount if position else 0),
+                        'horizon': label,
+                        'seconds': horizon,
+                        'rewards': from_wei(pending[index, col]),
+                    })
+            if stake_amounts:
+                projected = engine.stake_rewards(pool_id, stake_amounts, seconds)
+                for index, amount in enumerate(stake_amounts):
+                    for col, (label, horizon) in enumerate(zip(labels, seconds)):
+                        rows.append({
+                            'pool_id': pool_id,
+                            'subject': 'new stake',
+                            'staked': from_wei(amount),
+                            'horizon': label,
+                            'seconds': horizon,
+                            'rewards': from_wei(projected[index, col]),
+                        })
+
+            if format == 'table':
+                table = Table(title=f"Pool {pool_id} Reward Projection (block {engine.snapshot.block_number:,})", show_header=True)
+                table.add_column("Position", style="cyan")
+                table.add_column("Staked", justify="right", style="magenta")
+                table.add_column("Horizon", justify="center")
+                table.add_column("Rewards", justify="right", style="green")
+                for row in rows:
+                    table.add_row(
+                        row['subject'],
+                        format_token_amount(row['staked']),
+                        row['horizon'],
+                        f"{format_token_amount(row['rewards'])} CTKL"
+                    )
+                console.print(table)
+            else:
+                with open_row_writer(format, output, SIMULATION_COLUMNS['rewards']) as writer:
+                    writer.write_many(rows)
+
+            if verify:
+                return _print_mismatches(await loader.verify(engine, [], addresses))
+
+        except Exception as e:
+            err_console.print(f"❌ [red]Simulation failed: {e}[/red]")
+            return 1
+
+    return asyncio.run(_simulate())
+
+@cli.group()
+def batch():
+    """Batch transaction commands"""
+    pass
+
+@batch.command('run')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--journal', '-j', help='Results journal path (defaults to <manifest>.journal.jsonl)')
+@click.option('--window', '-w', type=int, default=16, help='Maximum transactions in flight')
+@click.option('--keys-file', type=click.Path(exists=True, dir_okay=False), help='Extra signer private keys, one per line')
+@click.option('--gas-price', type=str, help='Custom gas price in gwei')
+@click.option('--dry-run', is_flag=True, help='Estimate gas without submitting transactions')
+@click.option('--yes', '-y', is_flag=True, help='Skip the confirmation prompt')
+@click.pass_context
+def batch_run(ctx, manifest, journal, window, keys_file, gas_price, dry_run, yes):
+    """Execute staking and vault operations from a CSV or JSON manifest"""
+    async def _run():
+        cli_app = ctx.obj['cli']
+        await cli_app.initialize()
+
+        try:
+            operations = load_manifest(manifest)
+        except (ValueError, KeyError) as e:
+            console.print(f"❌ [red]Invalid manifest: {e}[/red]")
+            return 1
+
+        journal_path = journal or f"{manifest}.journal.jsonl"
+        signers = cli_app.batch.load_signers(keys_file)
+
+        def _confirm(pending, estimated_gas):
+            by_action = {}
+            for op in pending:
+                by_action[op.action] = by_action.get(op.action, 0) + 1
+
+            console.print(Panel(
+                "\n".join(f"📦 {action}: {count:,}" for action, count in sorted(by_action.items())) +
+                f"\n👛 Signers: {len({op.sender for op in pending}):,}\n"
+                f"⛽ Estimated Gas: {estimated_gas:,}\n"
+                f"🚦 Window: {window} transactions in flight",
+                title="Batch Confirmation",
+                border_style="yellow"
+            ))
+            return yes or click.confirm("Do you want to submit these transactions?")
+
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=console,
+            ) as progress:
+                task = progress.add_task("Executing batch...", total=len(operations))
+
+                def _on_progress(op_id, status):
+                    if status != 'submitted':
+                        progress.advance(task)
+
+                summary = await cli_app.batch.run(
+                    operations,
+                    BatchJournal(journal_path),
+                    signers,
+                    window=window,
+                    gas_price=gas_price,
+                    dry_run=dry_run,
+                    confirm=_confirm,
+                    on_progress=_on_progress,
+                )
+
+            console.print(Panel(
+                f"✅ Confirmed: {summary.confirmed:,}\n"
+                f"❌ Failed: {summary.failed:,}\n"
+                f"🚫 Rejected (retried on resume): {summary.rejected:,}\n"
+                f"⏳ Unconfirmed: {summary.unconfirmed:,}\n"
+                f"⏭️  Skipped (already journaled): {summary.skipped:,}\n"
+                f"⛽ Estimated Gas: {summary.estimated_gas:,}\n"
+                f"⏱️  Elapsed: {summary.elapsed:.1f}s\n"
+                f"📒 Journal: {journal_path}",
+                title="Batch Results",
+                border_style="green" if not (summary.failed or summary.rejected) else "red"
+            ))
+
+            for op_id, error in list(summary.errors.items())[:10]:
+                console.print(f"  [red]{op_id}[/red]: {error}")
+
+            return 1 if summary.failed or summary.rejected else 0
+
+        except Exception as e:
+            console.print(f"❌ [red]Batch execution failed: {e}[/red]")
+            return 1
+
+    return asyncio.run(_run())
+
+@cli.group(invoke_without_command=True)
+@click.option('--format', '-f', type=click.Choice(['table', 'json', 'ndjson', 'csv', 'parquet', 'arrow']), default='table')
+@click.option('--output', '-o', help='Output file path (csv, parquet and arrow write one file per section; csv defaults to stdout)')
+@click.option('--from-block', type=int, help='First block of the historical sections')
+@click.option('--to-block', type=int, help='Last block of the historical sections (defaults to latest)')
+@click.option('--store', 'store_path', help='History store path (defaults to ~/.cataklism/history.duckdb)')
+@click.option('--offline', is_flag=True, help='Build the report from the local history store only')
 @click.pass_context
-def analytics(ctx, format, output):
+def analytics(ctx, format, output, from_block, to_block, store_path, offline):
     """Generate protocol analytics report"""
+    if ctx.invoked_subcommand is not None:
+        ctx.obj['store_path'] = store_path
+        return
+
     async def _analytics():
         cli_app = ctx.obj['cli']
+
+        if not offline:
+            await cli_app.initialize()
+
+        if format == 'table' and not offline:
+            return await _analytics_table(cli_app, output)
+
+        # Use the local history store whenever one has been synced
+        path = Path(store_path) if store_path else DEFAULT_STORE_PATH
+        if path.exists():
+            cli_app.reports.store = HistoryStore(str(path), read_only=True)
+        elif offline:
+            err_console.print("❌ [red]No history store found; run 'cataklism analytics sync' first[/red]")
+            return 1
+
+        if format == 'table':
+            return await _stored_analytics_table(cli_app, from_block, to_block, output)
+
+        try:
+            # Progress goes to stderr so streamed rows can be piped from stdout
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=err_console,
+            ) as progress, SectionWriters(format, output) as writers:
+                tasks = {}
+
+                def _on_progress(section, advance, total):
+                    if section not in tasks:
+                        tasks[section] = progress.add_task(f"Scanning {section.replace('_', ' ')}...", total=total)
+                    progress.advance(tasks[section], advance)
+
+                rows = progress.add_task("Rows written", total=None)
+                async for section, row in cli_app.reports.run(from_block, to_block, _on_progress, offline=offline):
+                    writers.write(section, row)
+                    progress.advance(rows)
+
+            for path in writers.paths:
+                err_console.print(f"✅ [green]Report saved to {path}[/green]")
+
+        except Exception as e:
+            err_console.print(f"❌ [red]Analytics generation failed: {e}[/red]")
+            return 1
+
+    return asyncio.run(_analytics())
+
+async def _analytics_table(cli_app, output):
+    """Render the in-memory report as a table in the terminal"""
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Generating analytics report...", total=None)
+
+            report = await cli_app.analytics.generate_report()
+
+            progress.stop()
+
+            result = cli_app.analytics.to_table(report)
+
+            if output:
+                Path(output).write_text(result)
+                console.print(f"✅ [green]Report saved to {output}[/green]")
+            else:
+                console.print(result)
+
+    except Exception as e:
+        console.print(f"❌ [red]Analytics generation failed: {e}[/red]")
+        return 1
+
+async def _stored_analytics_table(cli_app, from_block, to_block, output):
+    """Render the report from the local history store, one table per section"""
+    try:
+        sections = {}
+        async for section, row in cli_app.reports.run(from_block, to_block, offline=True):
+            sections.setdefault(section, []).append(row)
+
+        with open(output, 'w') if output else nullcontext() as f:
+            target = Console(file=f, width=120) if output else console
+            for section, columns in SECTION_COLUMNS.items():
+                if section not in sections:
+                    continue
+                labels = [
+                    (column, column.replace('_', ' ').title(),
+                     'left' if column in ('metric', 'value', 'tier', 'address', 'token') else 'right')
+                    for column in columns
+                ]
+                _write_frame(pd.DataFrame(sections[section], columns=columns), 'table', None,
+                             section.replace('_', ' ').title(), labels, target=target)
+
+        if output:
+            console.print(f"✅ [green]Report saved to {output}[/green]")
+
+    except Exception as e:
+        err_console.print(f"❌ [red]Analytics generation failed: {e}[/red]")
+        return 1
+
+@analytics.command('sync')
+@click.option('--to-block', type=int, help='Sync up to this block (defaults to latest)')
+@click.option('--sample-interval', type=int, default=DEFAULT_SAMPLE_INTERVAL, help='Blocks between state samples')
+@click.pass_context
+def analytics_sync(ctx, to_block, sample_interval):
+    """Backfill protocol events and state samples into the local history store"""
+    async def _sync():
+        cli_app = ctx.obj['cli']
         await cli_app.initialize()
 
+        store = HistoryStore(ctx.obj.get('store_path'))
+        syncer = HistorySync(cli_app.config, store, sample_interval=sample_interval)
+
         try:
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
                 console=console,
             ) as progress:
-                task = progress.add_task("Generating analytics report...", total=None)
+                tasks = {}
+
+                def _on_progress(stream, advance, total):
+                    if stream not in tasks:
+                        tasks[stream] = progress.add_task(f"Syncing {stream}...", total=total)
+                    progress.advance(tasks[stream], advance)
+
+                added = await syncer.sync(to_block, _on_progress)
+
+            table = Table(title="History Sync", show_header=True)
+            table.add_column("Stream", style="cyan")
+            table.add_column("Rows Added", justify="right", style="green")
+            table.add_column("Synced To Block", justify="right", style="magenta")
+            for stream, rows in added.items():
+                checkpoint = store.checkpoint(stream)
+                table.add_row(stream, f"{rows:,}", f"{checkpoint:,}" if checkpoint is not None else "-")
+            console.print(table)
+            console.print(f"📁 Store: {store.path}")
+
+        except Exception as e:
+            console.print(f"❌ [red]History sync failed: {e}[/red]")
+            console.print("ℹ️  Progress up to the last completed chunk has been kept")
+            return 1
+        finally:
+            store.close()
+
+    return asyncio.run(_sync())
+
+@analytics.command('holders')
+@click.option('--top', type=int, default=25, help='Number of largest holders to list')
+@click.option('--quantile', '-q', 'quantiles', type=float, multiple=True, help='Balance quantile to report (repeatable)')
+@click.option('--exclude', multiple=True, help='Non-circulating address, e.g. treasury or vesting (repeatable)')
+@click.option('--offline', is_flag=True, help='Answer from the local index without applying new transfers first')
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path for the holder list (defaults to stdout)')
+@click.pass_context
+def analytics_holders(ctx, top, quantiles, exclude, offline, format, output):
+    """CTKL holder concentration from the incremental Transfer index"""
+    async def _holders():
+        cli_app = ctx.obj['cli']
+        for address in exclude:
+            if not validate_address(address):
+                err_console.print(f"❌ [red]Invalid address: {address}[/red]")
+                return 1
 
-                report = await cli_app.analytics.generate_report()
+        store = HolderStore(ctx.obj.get('store_path'))
+        try:
+            if offline:
+                index = store.load_index()
+            else:
+                await cli_app.initialize()
+                indexer = HolderIndexer.from_config(cli_app.config, store)
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    MofNCompleteColumn(),
+                    console=err_console,
+                    transient=True,
+                ) as progress:
+                    task = progress.add_task("Indexing CTKL transfers...", total=None)
+
+                    def _on_progress(stream, advance, total):
+                        if total is not None:
+                            progress.update(task, total=total)
+                        progress.advance(task, advance)
+
+                    await indexer.sync(on_progress=_on_progress)
+                index = indexer.index
+
+            if format != 'table':
+                _write_frame(index.top_frame(top), format, output, "", [])
+                return
+
+            qs = list(quantiles) or [0.5, 0.9, 0.99]
+            excluded = {Web3.toChecksumAddress(a): index.balance_of(Web3.toChecksumAddress(a)) for a in exclude}
+            for address, balance in excluded.items():
+                if not balance:
+                    err_console.print(f"⚠️  [yellow]Excluded address {address} holds no CTKL in the index[/yellow]")
+            non_circulating = sum(excluded.values())
+
+            summary = Table(title="CTKL Holders", show_header=False)
+            summary.add_column("Metric", style="cyan")
+            summary.add_column("Value", justify="right", style="green")
+            summary.add_row("Indexed to block", f"{store.checkpoint(HOLDERS_STREAM) or 0:,}")
+            summary.add_row("Holders", f"{len(index):,}")
+            summary.add_row("Supply", format_token_amount(float(Web3.fromWei(index.total_wei, 'ether'))))
+            if exclude:
+                circulating = float(Web3.fromWei(index.total_wei - non_circulating, 'ether'))
+                summary.add_row("Circulating supply", format_token_amount(circulating))
+            summary.add_row("Gini coefficient", f"{index.gini():.4f}")
+            summary.add_row(f"Top {top} share", format_percentage(index.top_share(top)))
+            for q, value in zip(qs, index.quantiles(qs)):
+                summary.add_row(f"p{q * 100:g} balance", format_token_amount(float(value)))
+            console.print(summary)
+
+            _write_frame(index.top_frame(top), format, None, f"Top {top} Holders", [
+                ('rank', '#', 'right'),
+                ('address', 'Address', 'left'),
+                ('balance', 'Balance', 'right'),
+                ('share_pct', 'Share %', 'right'),
+            ])
 
-                progress.stop()
+        except Exception as e:
+            err_console.print(f"❌ [red]Holder index failed: {e}[/red]")
+            return 1
+        finally:
+            store.close()
 
-                if format == 'json':
-                    result = json.dumps(report, indent=2)
-                elif format == 'csv':
-                    result = cli_app.analytics.to_csv(report)
-                else:
-                    result = cli_app.analytics.to_table(report)
+    return asyncio.run(_holders())
+
+@analytics.command('yields')
+@click.option('--window', '-w', 'windows', multiple=True, help='Trailing window such as 1d, 7d or 30d (repeatable)')
+@click.option('--interval', type=int, default=DEFAULT_YIELD_INTERVAL, help='Blocks between samples')
+@click.option('--offline', is_flag=True, help='Answer from cached samples without sampling new blocks first')
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.pass_context
+def analytics_yields(ctx, windows, interval, offline, format, output):
+    """Realised vault APY and pool reward APR from on-chain share-price history"""
+    async def _yields():
+        cli_app = ctx.obj['cli']
+        try:
+            spans = {window: parse_horizon(window) for window in windows} or DEFAULT_WINDOWS
+        except ValueError as e:
+            err_console.print(f"❌ [red]{e}[/red]")
+            return 1
 
-                if output:
-                    Path(output).write_text(result)
-                    console.print(f"✅ [green]Report saved to {output}[/green]")
-                else:
-                    console.print(result)
+        store = YieldStore(ctx.obj.get('store_path'))
+        try:
+            if not offline:
+                await cli_app.initialize()
+                sampler = YieldSampler.from_config(cli_app.config, store, interval, max(spans.values()))
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    MofNCompleteColumn(),
+                    console=err_console,
+                    transient=True,
+                ) as progress:
+                    task = progress.add_task("Sampling share price and reward history...", total=None)
+
+                    def _on_progress(stream, advance, total):
+                        if total is not None:
+                            progress.update(task, total=total)
+                        progress.advance(task, advance)
+
+                    await sampler.sync(on_progress=_on_progress)
+
+            frame = store.yields(spans)
+            if format != 'table':
+                _write_frame(frame, format, output, "", [])
+                return
+
+            if frame.empty:
+                err_console.print("ℹ️  Not enough samples yet; run without --offline to sample the chain")
+                return
+
+            table = Table(title=f"Realised Yields to Block {store.checkpoint(YIELDS_STREAM) or 0:,}", show_header=True)
+            table.add_column("Subject", style="cyan")
+            for window in spans:
+                table.add_column(f"{window} APY", justify="right", style="green")
+            for subject, rows in frame.groupby('subject', sort=False):
+                table.add_row(subject, *(
+                    "n/a" if math.isnan(apy) else format_percentage(apy) for apy in rows['apy']
+                ))
+            console.print(table)
+            console.print("Pool yields are simple reward APR in CTKL per staked token")
 
         except Exception as e:
-            console.print(f"❌ [red]Analytics generation failed: {e}[/red]")
+            err_console.print(f"❌ [red]Yield calculation failed: {e}[/red]")
             return 1
+        finally:
+            store.close()
 
-    return asyncio.run(_analytics())
+    return asyncio.run(_yields())
+
+@cli.group()
+@click.option('--store', 'store_path', help='History store path (defaults to ~/.cataklism/history.duckdb)')
+@click.option('--offline', is_flag=True, help='Answer from the local index without syncing new events first')
+@click.pass_context
+def governance(ctx, store_path, offline):
+    """Governance proposals, votes and voting power"""
+    ctx.obj['store_path'] = store_path
+    ctx.obj['offline'] = offline
+
+async def _governance_store(ctx) -> GovernanceStore:
+    """Open the governance index, first catching it up with the chain unless --offline"""
+    cli_app = ctx.obj['cli']
+    store = GovernanceStore(ctx.obj.get('store_path'))
+    if ctx.obj.get('offline'):
+        return store
+
+    try:
+        await cli_app.initialize()
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            console=err_console,
+            transient=True,
+        ) as progress:
+            tasks = {}
+
+            def _on_progress(stream, advance, total):
+                if stream not in tasks:
+                    tasks[stream] = progress.add_task(f"Indexing {stream} events...", total=total)
+                progress.advance(tasks[stream], advance)
+
+            await GovernanceIndexer(cli_app.config, store).sync(on_progress=_on_progress)
+    except Exception:
+        store.close()
+        raise
+    return store
+
+def _write_frame(frame, format, output, title, columns, target=None):
+    """Print a DataFrame as a table, or stream it through a row writer"""
+    if format != 'table':
+        with open_row_writer(format, output, list(frame.columns)) as writer:
+            writer.write_many(frame.to_dict('records'))
+        return
+
+    table = Table(title=title, show_header=True)
+    for column, label, justify in columns:
+        table.add_column(label, justify=justify)
+    for record in frame.to_dict('records'):
+        table.add_row(*(str(record[column]) if not isinstance(record[column], float)
+                        else format_token_amount(record[column]) for column, _, _ in columns))
+    (target or console).print(table)
+
+@governance.command('sync')
+@click.option('--to-block', type=int, help='Index up to this block (defaults to latest)')
+@click.pass_context
+def governance_sync(ctx, to_block):
+    """Index proposal, vote and delegation events into the local store"""
+    async def _sync():
+        cli_app = ctx.obj['cli']
+        await cli_app.initialize()
+
+        store = GovernanceStore(ctx.obj.get('store_path'))
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=console,
+            ) as progress:
+                tasks = {}
+
+                def _on_progress(stream, advance, total):
+                    if stream not in tasks:
+                        tasks[stream] = progress.add_task(f"Indexing {stream} events...", total=total)
+                    progress.advance(tasks[stream], advance)
+
+                added = await GovernanceIndexer(cli_app.config, store).sync(to_block, _on_progress)
+
+            table = Table(title="Governance Index", show_header=True)
+            table.add_column("Stream", style="cyan")
+            table.add_column("Rows Added", justify="right", style="green")
+            table.add_column("Indexed To Block", justify="right", style="magenta")
+            for stream, rows in added.items():
+                checkpoint = store.checkpoint(stream)
+                table.add_row(stream, f"{rows:,}", f"{checkpoint:,}" if checkpoint is not None else "-")
+            console.print(table)
+
+        except Exception as e:
+            console.print(f"❌ [red]Governance sync failed: {e}[/red]")
+            console.print("ℹ️  Progress up to the last completed chunk has been kept")
+            return 1
+        finally:
+            store.close()
+
+    return asyncio.run(_sync())
+
+@governance.command('proposals')
+@click.option('--status', type=click.Choice(['pending', 'active', 'ended', 'queued', 'executed', 'canceled']))
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.pass_context
+def governance_proposals(ctx, status, format, output):
+    """List proposals with their status and vote totals"""
+    async def _proposals():
+        try:
+            store = await _governance_store(ctx)
+        except Exception as e:
+            err_console.print(f"❌ [red]Governance sync failed: {e}[/red]")
+            return 1
+
+        try:
+            proposals = store.proposals(status)
+            if format == 'table' and not len(proposals):
+                console.print("ℹ️  No proposals found")
+                return 0
+
+            _write_frame(proposals, format, output, "Governance Proposals", [
+                ('proposal_id', 'ID', 'left'),
+                ('title', 'Title', 'left'),
+                ('status', 'Status', 'center'),
+                ('votes_for', 'For', 'right'),
+                ('votes_against', 'Against', 'right'),
+                ('votes_abstain', 'Abstain', 'right'),
+                ('voters', 'Voters', 'right'),
+            ])
+        finally:
+            store.close()
+
+    return asyncio.run(_proposals())
+
+@governance.command('proposal')
+@click.argument('proposal_id')
+@click.option('--top', type=int, default=20, help='Number of largest votes to list')
+@click.pass_context
+def governance_proposal(ctx, proposal_id, top):
+    """Show a proposal with its tally and largest votes"""
+    async def _proposal():
+        try:
+            store = await _governance_store(ctx)
+        except Exception as e:
+            err_console.print(f"❌ [red]Governance sync failed: {e}[/red]")
+            return 1
+
+        try:
+            proposal = store.proposal(proposal_id)
+            if proposal is None:
+                console.print(f"❌ [red]Proposal {proposal_id} not found in the index[/red]")
+                return 1
+
+            total = proposal['votes_for'] + proposal['votes_against'] + proposal['votes_abstain']
+
+            def _share(votes):
+                return format_percentage(votes / total * 100 if total else 0)
+
+            console.print(Panel(
+                f"📜 {proposal['title']}\n"
+                f"👤 Proposer: {proposal['proposer']}\n"
+                f"📌 Status: {proposal['status']}\n"
+                f"🗳️  Voting: blocks {proposal['vote_start']:,} – {proposal['vote_end']:,}\n"
+                f"✅ For: {format_token_amount(proposal['votes_for'])} ({_share(proposal['votes_for'])})\n"
+                f"❌ Against: {format_token_amount(proposal['votes_against'])} ({_share(proposal['votes_against'])})\n"
+                f"➖ Abstain: {format_token_amount(proposal['votes_abstain'])} ({_share(proposal['votes_abstain'])})\n"
+                f"👥 Voters: {proposal['voters']:,}",
+                title=f"Proposal {proposal_id}",
+                border_style="blue"
+            ))
+
+            votes = store.proposal_votes(proposal_id, top)
+            if len(votes):
+                votes['support'] = votes['support'].map(SUPPORT_LABELS)
+                _write_frame(votes, 'table', None, f"Top {len(votes)} Votes", [
+                    ('voter', 'Voter', 'left'),
+                    ('support', 'Support', 'center'),
+                    ('weight', 'Weight', 'right'),
+                    ('reason', 'Reason', 'left'),
+                ])
+        finally:
+            store.close()
+
+    return asyncio.run(_proposal())
+
+@governance.command('votes')
+@click.argument('addresses', nargs=-1)
+@click.option('--address-file', type=click.Path(exists=True, dir_okay=False), help='Addresses to look up, one per line')
+@click.option('--block', type=int, help='Voting power at this block (defaults to the indexed head)')
+@click.option('--top', type=int, default=25, help='Number of delegates to list when no addresses are given')
+@click.option('--format', '-f', type=click.Choice(('table',) + ROW_FORMATS), default='table')
+@click.option('--output', '-o', help='Output file path (defaults to stdout)')
+@click.pass_context
+def governance_votes(ctx, addresses, address_file, block, top, format, output):
+    """Voting power at a block, for given addresses or the largest delegates"""
+    async def _votes():
+        wanted = list(addresses) + (read_address_file(address_file) if address_file else [])
+        for address in wanted:
+            if not validate_address(address):
+                err_console.print(f"❌ [red]Invalid address: {address}[/red]")
+                return 1
+
+        try:
+            store = await _governance_store(ctx)
+        except Exception as e:
+            err_console.print(f"❌ [red]Governance sync failed: {e}[/red]")
+            return 1
+
+        try:
+            at_block = block if block is not None else store.indexed_block()
+            if at_block is None:
+                err_console.print("❌ [red]Governance index is empty; run 'cataklism governance sync' first[/red]")
+                return 1
+
+            frame = store.votes_at(wanted, at_block) if wanted else store.top_delegates(at_block, top)
+            _write_frame(frame, format, output, f"Voting Power at Block {at_block:,}", [
+                ('address', 'Address', 'left'),
+                ('votes', 'Votes', 'right'),
+            ])
+        finally:
+            store.close()
+
+    return asyncio.run(_votes())
 
 def main():
     """Main entry point"""
@@ -0,0 +1,152 @@
+"""
+Incremental row writers for CLI output
+Rows are written as they are produced so large results never sit in memory
+"""
+
+import csv
+import json
+import sys
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+
+ROW_FORMATS = ('csv', 'json', 'ndjson')
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+
+class RowWriter:
+    """Base class for streaming writers; use as a context manager"""
+
+    def __init__(self, path: Optional[str], columns: Sequence[str]):
+        self.path = path
+        self.columns = list(columns)
+        self.rows_written = 0
+        self._stream: Optional[TextIO] = None
+
+    def __enter__(self) -> 'RowWriter':
+        self._stream = open(self.path, 'w', newline='') if self.path else sys.stdout
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self.path and self._stream is not None:
+            self._stream.close()
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, row: Dict[str, Any]):
+        raise NotImplementedError
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+
+class CsvRowWriter(RowWriter):
+    def open(self):
+        self._writer = csv.DictWriter(self._stream, fieldnames=self.columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self._writer.writerow(row)
+        self.rows_written += 1
+
+
+class NdjsonRowWriter(RowWriter):
+    def write(self, row: Dict[str, Any]):
+        self._stream.write(json.dumps(row, default=str) + '\n')
+        self.rows_written += 1
+
+
+class JsonArrayRowWriter(RowWriter):
+    """Writes a single JSON array, one element per line, without buffering the rows"""
+
+    def open(self):
+        self._stream.write('[')
+
+    def write(self, row: Dict[str, Any]):
+        prefix = ',\n' if self.rows_written else '\n'
+        self._stream.write(prefix + json.dumps(row, default=str))
+        self.rows_written += 1
+
+    def close(self):
+        self._stream.write('\n]\n')
+
+
+class ColumnarRowWriter(RowWriter):
+    """Buffers rows into Arrow record batches and flushes them as they fill
+
+    Requires pyarrow, which is an optional dependency of the CLI.
+    """
+
+    def __init__(self, path: Optional[str], columns: Sequence[str], batch_size: int = 10000):
+        if not path:
+            raise ValueError("Columnar formats require an output file")
+        super().__init__(path, columns)
+        self.batch_size = batch_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._sink = None
+        self._schema = None
+
+    def __enter__(self) -> 'ColumnarRowWriter':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("pyarrow is required for parquet/arrow output: pip install pyarrow")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._flush()
+        if self._sink is not None:
+            self._sink.close()
+
+    def write(self, row: Dict[str, Any]):
+        self._buffer.append(row)
+        self.rows_written += 1
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        import pyarrow as pa
+
+        table = pa.Table.from_pylist([{c: row.get(c) for c in self.columns} for row in self._buffer])
+        if self._sink is None:
+            # The first batch fixes the schema for the whole file
+            self._schema = table.schema
+            self._sink = self._open_sink(self._schema)
+        self._sink.write_table(table.cast(self._schema))
+        self._buffer = []
+
+    def _open_sink(self, schema):
+        raise NotImplementedError
+
+
+class ParquetRowWriter(ColumnarRowWriter):
+    def _open_sink(self, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, schema)
+
+
+class ArrowRowWriter(ColumnarRowWriter):
+    def _open_sink(self, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(self.path, schema)
+
+
+def open_row_writer(fmt: str, path: Optional[str], columns: Sequence[str]) -> RowWriter:
+    """Create a writer for one of ROW_FORMATS or COLUMNAR_FORMATS; path None writes to stdout"""
+    writers = {
+        'csv': CsvRowWriter,
+        'json': JsonArrayRowWriter,
+        'ndjson': NdjsonRowWriter,
+        'parquet': ParquetRowWriter,
+        'arrow': ArrowRowWriter,
+    }
+    if fmt not in writers:
+        raise ValueError(f"Unsupported output format '{fmt}'")
+    return writers[fmt](path, columns)
@@ -0,0 +1,28 @@
+from setuptools import find_namespace_packages, setup
+
+setup(
+    name='cataklism-cli',
+    version='1.0.0',
+    description='Command-line interface for the Cataklism Protocol',
+    packages=find_namespace_packages(include=['cataklism_cli', 'cataklism_cli.*']),
+    # eth-abi 2.x (web3 5) depends on parsimonious 0.8, which does not import on Python 3.11+
+    python_requires='>=3.9,<3.11',
+    install_requires=[
+        'aiohttp>=3.8',
+        'click>=8.0',
+        'duckdb>=0.9',
+        'eth-account>=0.5,<0.6',
+        'numpy>=1.24',
+        'pandas>=1.5',
+        'requests>=2.28',
+        'rich>=13.0',
+        'web3>=5.31,<6',
+    ],
+    extras_require={
+        'parquet': ['pyarrow>=12'],
+        'test': ['pytest>=7'],
+    },
+    entry_points={
+        'console_scripts': ['cataklism=cataklism_cli.main:cli'],
+    },
+)
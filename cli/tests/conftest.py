@@ -0,0 +1,29 @@
+"""Shared helpers for the CLI tests"""
+
+from typing import Any, Dict, Sequence
+
+from eth_abi import encode_abi
+from eth_utils import event_abi_to_log_topic
+
+
+def topic_for(address: str) -> str:
+    """An indexed address topic as nodes return it: lower-case and left-padded"""
+    return '0x' + '0' * 24 + address[2:].lower()
+
+
+def raw_log(event_abi: Dict[str, Any], indexed_topics: Sequence[str], data_types: Sequence[str],
+            data_values: Sequence[Any], block: int = 1, log_index: int = 0,
+            address: str = '0x' + '11' * 20) -> Dict[str, Any]:
+    """A JSON-RPC log for one event, with hex fields like eth_getLogs returns"""
+    return {
+        'address': address,
+        'topics': ['0x' + event_abi_to_log_topic(event_abi).hex(), *indexed_topics],
+        'data': '0x' + encode_abi(list(data_types), list(data_values)).hex(),
+        'blockNumber': hex(block),
+        'transactionHash': '0x' + f"{block:064x}",
+        'logIndex': hex(log_index),
+    }
+
+
+def event_abi(abi: Sequence[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    return next(entry for entry in abi if entry.get('type') == 'event' and entry['name'] == name)
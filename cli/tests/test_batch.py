@@ -0,0 +1,227 @@
+import asyncio
+import functools
+import json
+from types import SimpleNamespace
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+
+from cataklism_cli.commands import batch
+from cataklism_cli.commands.batch import (
+    STATUS_CONFIRMED, STATUS_FAILED, STATUS_REJECTED, STATUS_SUBMITTED,
+    BatchCommands, BatchJournal, BatchOperation,
+)
+from cataklism_cli.core.rpc import RpcError
+
+SIGNER = Account.from_key('0x' + '42' * 32)
+
+
+class FakeRpc:
+    """Answers the calls a batch run makes; broadcasts are mined on the next receipt poll"""
+
+    def __init__(self, nonce=7, send_errors=None, estimate_error=None, accept=True, revert=False):
+        self.nonce = nonce
+        self.send_errors = list(send_errors or [])
+        self.estimate_error = estimate_error
+        self.accept = accept
+        self.revert = revert
+        self.known = {}
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def know(self, raw_tx):
+        tx_hash = Web3.toHex(Web3.keccak(hexstr=raw_tx))
+        self.known[tx_hash] = raw_tx
+        return tx_hash
+
+    def _answer(self, method, params):
+        if method == 'eth_chainId':
+            return '0x1'
+        if method == 'eth_gasPrice':
+            return hex(10 ** 9)
+        if method == 'eth_getTransactionCount':
+            return hex(self.nonce)
+        if method == 'eth_estimateGas':
+            return self.estimate_error or hex(100000)
+        if method == 'eth_sendRawTransaction':
+            self.sent.append(params[0])
+            if self.accept:
+                self.know(params[0])
+            if self.send_errors:
+                return self.send_errors.pop(0)
+            return Web3.toHex(Web3.keccak(hexstr=params[0]))
+        if method == 'eth_getTransactionByHash':
+            return {'hash': params[0]} if params[0] in self.known else None
+        if method == 'eth_getTransactionReceipt':
+            if params[0] not in self.known:
+                return None
+            return {'status': '0x0' if self.revert else '0x1',
+                    'blockNumber': '0x10', 'gasUsed': hex(50000)}
+        raise AssertionError(f"unexpected call {method}")
+
+    async def call(self, method, params=None):
+        result = self._answer(method, params or [])
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def batch(self, calls):
+        return [self._answer(method, params) for method, params in calls]
+
+
+@pytest.fixture
+def commands():
+    config = SimpleNamespace(
+        network=SimpleNamespace(name='test', rpc_url='http://node'),
+        wallet=SimpleNamespace(address=SIGNER.address, private_key=None),
+        contracts=SimpleNamespace(core='0x' + '01' * 20, vault='0x' + '02' * 20),
+    )
+    return BatchCommands(SimpleNamespace(w3=Web3()), config)
+
+
+@pytest.fixture
+def use_rpc(monkeypatch):
+    def _use(rpc):
+        monkeypatch.setattr(batch, 'AsyncRpcBatcher', lambda pool: rpc)
+        monkeypatch.setattr(batch, 'endpoint_pool', lambda network: None)
+        monkeypatch.setattr(batch, 'ReceiptTracker', functools.partial(batch.ReceiptTracker, poll_interval=0.01))
+        return rpc
+    return _use
+
+
+def _ops(*ids):
+    return [BatchOperation(op_id, 'vault_deposit', '1') for op_id in ids]
+
+
+def _run(commands, operations, journal_path, signers=None, events=None):
+    def _progress(op_id, status):
+        if events is not None:
+            events.append((op_id, status))
+
+    return asyncio.run(commands.run(
+        operations, BatchJournal(str(journal_path)),
+        {SIGNER.address: SIGNER} if signers is None else signers,
+        on_progress=_progress,
+    ))
+
+
+def _journal_status(path):
+    return {op_id: entry['status'] for op_id, entry in BatchJournal(str(path)).load().items()}
+
+
+def test_run_confirms_operations_with_sequential_nonces(commands, use_rpc, tmp_path):
+    use_rpc(FakeRpc(nonce=7))
+    journal = tmp_path / 'batch.jsonl'
+
+    summary = _run(commands, _ops('a', 'b', 'c'), journal)
+
+    assert (summary.confirmed, summary.failed, summary.rejected) == (3, 0, 0)
+    entries = BatchJournal(str(journal)).load()
+    assert sorted(entry['nonce'] for entry in entries.values()) == [7, 8, 9]
+    assert {entry['status'] for entry in entries.values()} == {STATUS_CONFIRMED}
+
+
+def test_resume_skips_final_operations_and_tracks_submitted_ones_once(commands, use_rpc, tmp_path):
+    rpc = use_rpc(FakeRpc())
+    journal = tmp_path / 'batch.jsonl'
+    raw_tx = '0x' + 'cd' * 40
+    tx_hash = rpc.know(raw_tx)
+    journal.write_text(
+        json.dumps({'id': 'a', 'status': STATUS_CONFIRMED}) + '\n'
+        + json.dumps({'id': 'b', 'status': STATUS_SUBMITTED, 'tx_hash': tx_hash, 'raw_tx': raw_tx}) + '\n'
+        + '{"id": "c", "sta'  # torn line from a crash
+    )
+    events = []
+
+    summary = _run(commands, _ops('a', 'b', 'c'), journal, events=events)
+
+    assert (summary.skipped, summary.confirmed) == (1, 2)
+    # One completion per operation, so progress never overshoots the manifest
+    completed = [op_id for op_id, status in events if status != STATUS_SUBMITTED]
+    assert sorted(completed) == ['a', 'b', 'c']
+    assert len(rpc.sent) == 1  # only c was broadcast; the node still had b
+
+
+def test_missing_signer_is_rejected_and_retried_on_resume(commands, use_rpc, tmp_path):
+    use_rpc(FakeRpc())
+    journal = tmp_path / 'batch.jsonl'
+
+    summary = _run(commands, _ops('a'), journal, signers={})
+    assert (summary.rejected, summary.failed) == (1, 0)
+    assert _journal_status(journal) == {'a': STATUS_REJECTED}
+
+    summary = _run(commands, _ops('a'), journal)
+    assert (summary.confirmed, summary.skipped) == (1, 0)
+    assert _journal_status(journal) == {'a': STATUS_CONFIRMED}
+
+
+def test_gas_estimation_failure_is_rejected(commands, use_rpc, tmp_path):
+    rpc = use_rpc(FakeRpc(estimate_error=RpcError(3, 'execution reverted')))
+    journal = tmp_path / 'batch.jsonl'
+
+    summary = _run(commands, _ops('a'), journal)
+
+    assert (summary.rejected, summary.failed) == (1, 0)
+    assert _journal_status(journal) == {'a': STATUS_REJECTED}
+    assert not rpc.sent
+
+
+def test_already_known_broadcast_counts_as_submitted(commands, use_rpc, tmp_path):
+    use_rpc(FakeRpc(nonce=3, send_errors=[RpcError(-32000, 'already known')]))
+    journal = tmp_path / 'batch.jsonl'
+
+    summary = _run(commands, _ops('a', 'b'), journal)
+
+    assert (summary.confirmed, summary.rejected) == (2, 0)
+    entries = BatchJournal(str(journal)).load()
+    assert sorted(entry['nonce'] for entry in entries.values()) == [3, 4]
+
+
+def test_nonce_too_low_is_ours_only_when_the_node_has_our_hash(commands, use_rpc, tmp_path):
+    use_rpc(FakeRpc(send_errors=[RpcError(-32000, 'nonce too low')]))
+    summary = _run(commands, _ops('a'), tmp_path / 'ours.jsonl')
+    assert summary.confirmed == 1
+
+    # The node never saw our transaction, so something else used the nonce
+    use_rpc(FakeRpc(send_errors=[RpcError(-32000, 'nonce too low')], accept=False))
+    summary = _run(commands, _ops('a'), tmp_path / 'theirs.jsonl')
+    assert (summary.confirmed, summary.rejected) == (0, 1)
+
+
+def test_reverted_transaction_is_final(commands, use_rpc, tmp_path):
+    use_rpc(FakeRpc(revert=True))
+    journal = tmp_path / 'batch.jsonl'
+
+    summary = _run(commands, _ops('a'), journal)
+    assert summary.failed == 1
+    assert _journal_status(journal) == {'a': STATUS_FAILED}
+
+    summary = _run(commands, _ops('a'), journal)
+    assert (summary.skipped, summary.failed) == (1, 0)
+
+
+@pytest.mark.parametrize('error', ['nonce too low', 'replacement transaction underpriced'])
+def test_resumed_transaction_that_lost_its_nonce_is_rejected_then_retried(commands, use_rpc, tmp_path, error):
+    rpc = use_rpc(FakeRpc(send_errors=[RpcError(-32000, error)], accept=False))
+    journal = tmp_path / 'batch.jsonl'
+    raw_tx = '0x' + 'cd' * 40
+    journal.write_text(json.dumps({'id': 'a', 'status': STATUS_SUBMITTED,
+                                   'tx_hash': Web3.toHex(Web3.keccak(hexstr=raw_tx)), 'raw_tx': raw_tx}) + '\n')
+
+    summary = _run(commands, _ops('a'), journal)
+
+    # Not left waiting for a receipt that can never come, nor re-signed in the same run
+    assert (summary.rejected, summary.unconfirmed, summary.confirmed) == (1, 0, 0)
+    assert rpc.sent == [raw_tx]
+    assert _journal_status(journal) == {'a': STATUS_REJECTED}
+
+    use_rpc(FakeRpc())
+    summary = _run(commands, _ops('a'), journal)
+    assert (summary.confirmed, summary.rejected) == (1, 0)
+    assert _journal_status(journal) == {'a': STATUS_CONFIRMED}
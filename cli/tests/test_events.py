@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from cataklism_cli.core import events
+from cataklism_cli.core.events import GROWTH_STREAK, LogScanner
+from cataklism_cli.core.rpc import RpcError
+
+
+class LogsRpc:
+    """eth_getLogs over one log per block, refusing ranges wider than max_blocks"""
+
+    def __init__(self, max_blocks=None, rate_limited=0, rate_error=RpcError(429, 'Too Many Requests')):
+        self.max_blocks = max_blocks
+        self.rate_limited = rate_limited
+        self.rate_error = rate_error
+        self.requests = []
+
+    def _logs(self, log_filter):
+        start, end = int(log_filter['fromBlock'], 16), int(log_filter['toBlock'], 16)
+        self.requests.append((start, end))
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return self.rate_error
+        if self.max_blocks and end - start + 1 > self.max_blocks:
+            return RpcError(-32005, 'query returned more than 10000 results')
+        return [{'blockNumber': hex(block)} for block in range(start, end + 1)]
+
+    async def call(self, method, params=None):
+        result = self._logs(params[0])
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def batch(self, calls):
+        return [self._logs(params[0]) for _, params in calls]
+
+
+def _scan(scanner, from_block, to_block):
+    async def _collect():
+        return [(start, end, logs) async for start, end, logs in scanner.scan('0x' + '11' * 20, None, from_block, to_block)]
+    return asyncio.run(_collect())
+
+
+def _blocks(ranges):
+    return [int(log['blockNumber'], 16) for _, _, logs in ranges for log in logs]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(events, 'RATE_LIMIT_BACKOFF', 0)
+
+
+def test_scan_covers_the_range_in_order():
+    ranges = _scan(LogScanner(LogsRpc(), max_range=10, ranges_per_batch=3), 5, 42)
+
+    assert [(start, end) for start, end, _ in ranges][:2] == [(5, 14), (15, 24)]
+    assert ranges[-1][1] == 42
+    assert _blocks(ranges) == list(range(5, 43))
+
+
+def test_oversized_ranges_are_bisected_and_the_chunk_shrinks():
+    rpc = LogsRpc(max_blocks=3)
+    scanner = LogScanner(rpc, max_range=16, ranges_per_batch=2)
+
+    ranges = _scan(scanner, 0, 63)
+
+    assert _blocks(ranges) == list(range(64))
+    assert scanner.chunk_size < 16
+    assert all(end - start + 1 <= 16 for start, end in rpc.requests)
+
+
+def test_chunk_grows_back_only_after_a_run_of_successes():
+    scanner = LogScanner(LogsRpc(), max_range=64, ranges_per_batch=1)
+    scanner.chunk_size = 2
+
+    _scan(scanner, 0, 2 * (GROWTH_STREAK - 1) - 1)
+    assert scanner.chunk_size == 2
+
+    _scan(scanner, 0, 1)
+    assert scanner.chunk_size == 4
+
+
+def test_rate_limits_are_retried_without_bisecting():
+    rpc = LogsRpc(rate_limited=2)
+    scanner = LogScanner(rpc, max_range=10, ranges_per_batch=1)
+
+    ranges = _scan(scanner, 0, 9)
+
+    assert _blocks(ranges) == list(range(10))
+    assert rpc.requests == [(0, 9)] * 3
+    assert scanner.chunk_size == 10
+
+
+def test_rate_limit_reported_with_32005_is_not_bisected():
+    rpc = LogsRpc(rate_limited=1, rate_error=RpcError(-32005, 'daily request count exceeded, request rate limited'))
+    ranges = _scan(LogScanner(rpc, max_range=10), 0, 9)
+
+    assert _blocks(ranges) == list(range(10))
+    assert rpc.requests == [(0, 9)] * 2
+
+
+def test_persistent_rate_limit_gives_up():
+    rpc = LogsRpc(rate_limited=100)
+    with pytest.raises(RpcError):
+        _scan(LogScanner(rpc, max_range=10), 0, 9)
+    assert len(rpc.requests) == events.RATE_LIMIT_RETRIES + 1
+
+
+def test_other_errors_are_raised():
+    rpc = LogsRpc(rate_limited=1, rate_error=RpcError(-32602, 'invalid params'))
+    with pytest.raises(RpcError, match='invalid params'):
+        _scan(LogScanner(rpc, max_range=10), 0, 9)
@@ -0,0 +1,60 @@
+from eth_utils import to_checksum_address
+
+from cataklism_cli.core.abi import VOTES_ABI
+from cataklism_cli.core.events import EventDecoder
+from cataklism_cli.core.governance import GovernanceStore, _delegation_rows
+
+from conftest import event_abi, raw_log, topic_for
+
+DELEGATE = '0x' + 'ab' * 20
+WEI = 10 ** 18
+
+
+def _votes_changed(delegate: str, new_balance: int, block: int, log_index: int = 0):
+    return raw_log(event_abi(VOTES_ABI, 'DelegateVotesChanged'), [topic_for(delegate)],
+                   ['uint256', 'uint256'], [0, new_balance], block, log_index)
+
+
+def _store_with(tmp_path, logs) -> GovernanceStore:
+    store = GovernanceStore(str(tmp_path / 'history.duckdb'))
+    decoder = EventDecoder(VOTES_ABI)
+    tables = {}
+    for log in logs:
+        for table, rows in _delegation_rows(decoder.decode(log)).items():
+            tables.setdefault(table, []).extend(rows)
+    store.append_tables(tables, 'delegation', max(int(log['blockNumber'], 16) for log in logs))
+    return store
+
+
+def test_decoded_addresses_are_checksummed():
+    event = EventDecoder(VOTES_ABI).decode(_votes_changed(DELEGATE, 5 * WEI, 10))
+    assert event['args']['delegate'] == to_checksum_address(DELEGATE)
+
+
+def test_votes_at_matches_any_address_case(tmp_path):
+    store = _store_with(tmp_path, [_votes_changed(DELEGATE, 5 * WEI, 10)])
+
+    for address in (DELEGATE, to_checksum_address(DELEGATE)):
+        votes = store.votes_at([address], 10)
+        assert votes['votes'].tolist() == [5.0]
+    assert store.top_delegates(10)['votes'].tolist() == [5.0]
+
+
+def test_votes_at_uses_latest_checkpoint_at_block(tmp_path):
+    store = _store_with(tmp_path, [
+        _votes_changed(DELEGATE, 5 * WEI, 10),
+        _votes_changed(DELEGATE, 7 * WEI, 20),
+        _votes_changed(DELEGATE, 2 * WEI, 20, log_index=1),
+    ])
+
+    assert store.votes_at([DELEGATE], 9)['votes'].tolist() == [0.0]
+    assert store.votes_at([DELEGATE], 15)['votes'].tolist() == [5.0]
+    assert store.votes_at([DELEGATE], 20)['votes'].tolist() == [2.0]
+
+
+def test_votes_at_reads_lower_case_rows_from_older_stores(tmp_path):
+    store = GovernanceStore(str(tmp_path / 'history.duckdb'))
+    store.append('voting_power', [{'delegate': DELEGATE, 'block_number': 10, 'log_index': 0, 'votes': 5.0}],
+                 'delegation', 10)
+
+    assert store.votes_at([to_checksum_address(DELEGATE)], 10)['votes'].tolist() == [5.0]
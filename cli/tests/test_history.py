@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import duckdb
+import pytest
+
+from cataklism_cli.core import history
+from cataklism_cli.core.history import HistoryStore, HistorySync
+
+ACC = 123456789012345678901234567890  # well past the 53 bits a DOUBLE keeps
+
+
+def _pool(pool_id):
+    return {'pool_id': pool_id, 'total_liquidity': 1.0, 'reward_rate': 0.1,
+            'acc_reward_per_share': str(ACC + pool_id), 'is_active': True}
+
+
+@pytest.fixture
+def sync(monkeypatch, tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.duckdb'))
+    config = SimpleNamespace(contracts=SimpleNamespace(deploy_block=100, multicall=None))
+    sync = HistorySync(config, store, sample_interval=10)
+
+    async def _sample(multicall, block):
+        return {'tvl': 1.0, 'vault_total_assets': 1.0, 'vault_total_shares': 1.0,
+                'vault_share_value': 1.0, 'token_supply': 1.0}, [_pool(0), _pool(1)]
+
+    async def _times(rpc, blocks):
+        return {block: datetime(2024, 1, 1) for block in blocks}
+
+    monkeypatch.setattr(sync, '_sample', _sample)
+    monkeypatch.setattr(history, 'fetch_block_times', _times)
+    yield sync
+    store.close()
+
+
+def test_samples_keep_exact_accumulators_and_share_one_checkpoint(sync):
+    added = asyncio.run(sync._sync_samples(None, 125, lambda *args: None))
+
+    assert added == 3
+    assert sync.store.checkpoint('samples') == 120
+    assert sync.store.checkpoint('pool_samples') is None
+    pools = sync.store.latest_pools()
+    assert list(pools['block_number']) == [120, 120]
+    assert [int(value) for value in pools['acc_reward_per_share']] == [ACC, ACC + 1]
+
+
+def test_failed_chunk_leaves_neither_table_behind(sync):
+    sync.store.conn.execute("DROP TABLE state_samples")
+    with pytest.raises(duckdb.Error):
+        asyncio.run(sync._sync_samples(None, 125, lambda *args: None))
+
+    assert sync.store.query("SELECT COUNT(*) AS n FROM pool_samples")['n'][0] == 0
+    assert sync.store.checkpoint('samples') is None
+
+
+def test_pool_samples_reject_duplicate_keys(sync):
+    asyncio.run(sync._sync_samples(None, 105, lambda *args: None))
+    with pytest.raises(duckdb.Error):
+        sync.store.append('pool_samples', [{'block_number': 100, 'pool_id': 0}], 'samples', 100)
+
+
+def test_old_pool_samples_are_migrated(tmp_path):
+    path = str(tmp_path / 'old.duckdb')
+    conn = duckdb.connect(path)
+    conn.execute("""
+        CREATE TABLE pool_samples (block_number BIGINT, block_time TIMESTAMP, pool_id BIGINT,
+                                   total_liquidity DOUBLE, reward_rate DOUBLE,
+                                   acc_reward_per_share DOUBLE, is_active BOOLEAN)
+    """)
+    conn.execute("INSERT INTO pool_samples VALUES (1, NULL, 0, 1, 1, 5e20, true), (1, NULL, 0, 1, 1, 5e20, true)")
+    conn.close()
+
+    store = HistoryStore(path)
+    rows = store.conn.execute("SELECT block_number, pool_id, acc_reward_per_share FROM pool_samples").fetchall()
+    assert rows == [(1, 0, str(5 * 10 ** 20))]
+    store.close()
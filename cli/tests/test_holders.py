@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+import pytest
+from eth_utils import to_checksum_address
+
+from cataklism_cli.core.abi import TOKEN_ABI
+from cataklism_cli.core.events import EventDecoder
+from cataklism_cli.core.holders import HolderIndex, HolderStore
+
+from conftest import event_abi, raw_log, topic_for
+
+ZERO = '0x' + '00' * 20
+WEI = 10 ** 18
+
+
+def _address(n: int) -> str:
+    return to_checksum_address(f"0x{n:040x}")
+
+
+def _transfer_log(sender: str, recipient: str, value: int, block: int = 1):
+    return raw_log(event_abi(TOKEN_ABI, 'Transfer'), [topic_for(sender), topic_for(recipient)],
+                   ['uint256'], [value], block)
+
+
+def test_decoded_transfers_are_found_by_checksum_address():
+    holder = '0x' + 'ab' * 20
+    event = EventDecoder(TOKEN_ABI).decode(_transfer_log(ZERO, holder, 5 * WEI))
+
+    index = HolderIndex()
+    index.apply_transfer(event['args']['from'], event['args']['to'], event['args']['value'])
+
+    assert index.balance_of(to_checksum_address(holder)) == 5 * WEI
+    assert len(index) == 1
+
+
+def test_top_list_matches_a_full_sort_under_random_transfers():
+    rng = random.Random(7)
+    index = HolderIndex(top_depth=20)
+    balances = {}
+    for _ in range(3000):
+        sender = rng.choice([ZERO] + list(balances))
+        recipient = _address(rng.randrange(1, 200))
+        value = rng.randrange(1, 1000) * WEI if sender == ZERO else rng.randrange(0, balances[sender] + 1)
+        index.apply_transfer(sender, recipient, value)
+        if sender != ZERO:
+            balances[sender] -= value
+        balances[recipient] = balances.get(recipient, 0) + value
+
+    expected = sorted(((wei, a) for a, wei in balances.items() if wei > 0), reverse=True)[:10]
+    assert [wei for _, wei in index.top(10)] == [wei for wei, _ in expected]
+    assert len(index) == sum(wei > 0 for wei in balances.values())
+    assert index.total_wei == sum(balances.values())
+
+
+def test_gini_and_quantiles():
+    index = HolderIndex()
+    index.load([(_address(1), 1 * WEI), (_address(2), 1 * WEI), (_address(3), 1 * WEI)])
+    assert index.gini() == pytest.approx(0.0)
+
+    index.load([(_address(4), 0), (_address(5), 97 * WEI)])
+    values = np.array([1.0, 1.0, 1.0, 97.0])
+    assert index.quantiles([0.5])[0] == pytest.approx(np.quantile(values, 0.5))
+    assert index.top_share(1) == pytest.approx(97.0)
+    assert index.rank(_address(5), 3) == 1
+    with pytest.raises(ValueError):
+        index.top(index.top_depth + 1)
+
+
+def test_store_round_trip_drops_emptied_balances(tmp_path):
+    store = HolderStore(str(tmp_path / 'history.duckdb'))
+    index = HolderIndex()
+    index.apply_transfer(ZERO, _address(1), 10 * WEI)
+    index.apply_transfer(ZERO, _address(2), 3 * WEI)
+    store.save_index(index, 100)
+
+    index.apply_transfer(_address(2), _address(1), 3 * WEI)
+    store.save_index(index, 200)
+
+    loaded = store.load_index()
+    assert store.checkpoint('holders') == 200
+    assert loaded.balance_of(_address(1)) == 13 * WEI
+    assert len(loaded) == 1
+
+
+def test_store_checksums_lower_case_rows_from_older_stores(tmp_path):
+    store = HolderStore(str(tmp_path / 'history.duckdb'))
+    store.conn.execute("INSERT INTO holder_balances VALUES (?, ?, ?)", [_address(9).lower(), str(4 * WEI), 4.0])
+
+    assert store.load_index().balance_of(_address(9)) == 4 * WEI
@@ -0,0 +1,26 @@
+from eth_abi import encode_abi
+
+from cataklism_cli.core.multicall import Multicall, make_call
+
+TOKEN = '0x' + '11' * 20
+
+
+def _response(*results):
+    return '0x' + encode_abi(['(bool,bytes)[]'], [list(results)]).hex()
+
+
+def test_undecodable_results_become_none():
+    calls = [
+        make_call(TOKEN, 'symbol()', [], ['string']),
+        make_call(TOKEN, 'symbol()', [], ['string']),
+        make_call(TOKEN, 'decimals()', [], ['uint8']),
+        make_call(TOKEN, 'totalSupply()', [], ['uint256']),
+    ]
+    response = _response(
+        (True, encode_abi(['string'], ['CTKL'])),
+        (True, encode_abi(['bytes32'], [b'MKR'.ljust(32, b'\0')])),  # bytes32 symbol()
+        (True, b'\x01'),  # truncated
+        (False, b''),  # reverted
+    )
+
+    assert Multicall._decode(calls, response) == [('CTKL',), None, None, None]
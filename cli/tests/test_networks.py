@@ -0,0 +1,62 @@
+import asyncio
+
+from cataklism_cli.core.multicall import encode_call
+from cataklism_cli.core.networks import NetworkTarget, pool_usd, read_status
+
+CORE, TOKEN, VAULT = '0x' + '01' * 20, '0x' + '02' * 20, '0x' + '03' * 20
+WEI = 10 ** 18
+
+
+class FakeRpc:
+    async def batch(self, calls):
+        answers = {'eth_blockNumber': hex(100), 'eth_gasPrice': hex(2 * 10 ** 9)}
+        return [answers[method] for method, _ in calls]
+
+
+ANSWERS = {
+    encode_call('poolCount()'): (1,),
+    encode_call('pools(uint256)', [0]): (TOKEN, 10 * WEI, WEI, 0, 0, True),
+    encode_call('symbol()'): ('CTKL',),
+    encode_call('getVaultStats()'): (5 * WEI, 5 * WEI, WEI, 0, 0, 0),
+}
+
+
+class FakeMulticall:
+    """Answers by calldata; records which contracts were called"""
+
+    def __init__(self):
+        self.targets = []
+
+    async def execute(self, calls, block='latest'):
+        self.targets.extend(call.target for call in calls)
+        return [ANSWERS[call.data] for call in calls]
+
+
+def _status(contracts):
+    multicall = FakeMulticall()
+    status = asyncio.run(read_status(NetworkTarget('test', None, contracts), FakeRpc(), multicall))
+    return status, multicall
+
+
+def test_status_reads_the_vault_when_configured():
+    status, _ = _status({'core': CORE, 'vault': VAULT})
+    assert status['vault_total_assets'] == 5.0
+    assert status['pools'][0]['token_symbol'] == 'CTKL'
+
+
+def test_status_without_a_vault_skips_it():
+    status, multicall = _status({'core': CORE, 'vault': None})
+    assert status['vault_total_assets'] is None
+    assert status['block_number'] == 100
+    assert VAULT not in multicall.targets
+
+
+def test_pool_usd_without_prices_is_unknown_not_zero():
+    pool = {'token_symbol': 'CTKL', 'total_liquidity': 10.0, 'reward_rate': 1.0, 'is_active': True}
+
+    priced = pool_usd(pool, {'CTKL': 2.0}, 2.0)
+    assert priced['tvl'] == 20.0 and priced['apy'] > 0
+
+    unpriced = pool_usd(pool, {'CTKL': None}, None)
+    assert unpriced['tvl'] is None and unpriced['apy'] is None
+    assert pool_usd(pool, {}, 2.0)['tvl'] is None
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from cataklism_cli.core.prices import SingleFlightCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Upstream:
+    """load_many that records each call and answers from a price table once released"""
+
+    def __init__(self, prices, gate=None):
+        self.prices = prices
+        self.gate = gate
+        self.calls = []
+
+    async def __call__(self, keys):
+        self.calls.append(sorted(keys))
+        if self.gate is not None:
+            await self.gate.wait()
+        if isinstance(self.prices, Exception):
+            raise self.prices
+        return {key: self.prices[key] for key in keys if key in self.prices}
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    return SingleFlightCache(ttl=30, stale_ttl=300, clock=clock)
+
+
+def test_concurrent_misses_share_one_upstream_call(cache):
+    async def _run():
+        upstream = Upstream({'ETH': 2000.0, 'CTKL': 1.25}, gate=asyncio.Event())
+        lookups = [
+            asyncio.ensure_future(cache.get_many(['ETH', 'CTKL'], upstream)),
+            asyncio.ensure_future(cache.get_many(['CTKL'], upstream)),
+            asyncio.ensure_future(cache.get('ETH', lambda: upstream(['ETH']))),
+        ]
+        await asyncio.sleep(0)
+        upstream.gate.set()
+        return upstream, await asyncio.gather(*lookups)
+
+    upstream, (both, ctkl, eth) = asyncio.run(_run())
+
+    assert upstream.calls == [['CTKL', 'ETH']]
+    assert both == {'ETH': 2000.0, 'CTKL': 1.25}
+    assert (ctkl, eth) == ({'CTKL': 1.25}, 2000.0)
+
+
+def test_fresh_values_are_served_without_a_call(cache, clock):
+    upstream = Upstream({'ETH': 2000.0})
+
+    async def _run():
+        await cache.get_many(['ETH'], upstream)
+        clock.now = 29
+        return await cache.get_many(['ETH'], upstream)
+
+    assert asyncio.run(_run()) == {'ETH': 2000.0}
+    assert len(upstream.calls) == 1
+
+
+def test_stale_values_are_served_while_one_refresh_runs(cache, clock):
+    upstream = Upstream({'ETH': 2000.0})
+
+    async def _run():
+        await cache.get_many(['ETH'], upstream)
+        upstream.prices = {'ETH': 2100.0}
+        clock.now = 60
+        first = await cache.get_many(['ETH'], upstream)
+        second = await cache.get_many(['ETH'], upstream)  # refresh still in flight
+        await asyncio.sleep(0)
+        return first, second, await cache.get_many(['ETH'], upstream)
+
+    first, second, refreshed = asyncio.run(_run())
+
+    assert first == second == {'ETH': 2000.0}
+    assert refreshed == {'ETH': 2100.0}
+    assert len(upstream.calls) == 2
+
+
+def test_expired_values_wait_for_the_refresh(cache, clock):
+    upstream = Upstream({'ETH': 2000.0})
+
+    async def _run():
+        await cache.get_many(['ETH'], upstream)
+        upstream.prices = {'ETH': 2100.0}
+        clock.now = 301
+        return await cache.get_many(['ETH'], upstream)
+
+    assert asyncio.run(_run()) == {'ETH': 2100.0}
+
+
+def test_failed_refresh_falls_back_to_the_old_value(cache, clock):
+    upstream = Upstream({'ETH': 2000.0})
+
+    async def _run():
+        await cache.get_many(['ETH'], upstream)
+        upstream.prices = ConnectionError("upstream down")
+        clock.now = 1000
+        return await cache.get_many(['ETH'], upstream)
+
+    assert asyncio.run(_run()) == {'ETH': 2000.0}
+
+
+def test_failure_without_an_old_value_raises(cache):
+    upstream = Upstream(ConnectionError("upstream down"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(cache.get_many(['ETH'], upstream))
+
+    # Nothing was cached, so the next lookup tries again
+    upstream.prices = {'ETH': 2000.0}
+    assert asyncio.run(cache.get_many(['ETH'], upstream)) == {'ETH': 2000.0}
+
+
+def test_per_key_exceptions_fail_only_their_key(cache):
+    upstream = Upstream({'ETH': 2000.0, 'BAD': LookupError("unknown symbol")})
+
+    with pytest.raises(LookupError):
+        asyncio.run(cache.get_many(['ETH', 'BAD'], upstream))
+
+    # ETH from the same round was cached; BAD was not and is asked for again
+    assert asyncio.run(cache.get_many(['ETH'], upstream)) == {'ETH': 2000.0}
+    assert len(upstream.calls) == 1
+    with pytest.raises(LookupError):
+        asyncio.run(cache.get_many(['BAD'], upstream))
+    assert upstream.calls[-1] == ['BAD']
+
+
+def test_missing_keys_raise_key_error_and_invalidate_forgets(cache, clock):
+    upstream = Upstream({'ETH': 2000.0})
+    with pytest.raises(KeyError):
+        asyncio.run(cache.get_many(['ETH', 'NOPE'], upstream))
+
+    cache.invalidate('ETH')
+    asyncio.run(cache.get_many(['ETH'], upstream))
+    assert len(upstream.calls) == 2
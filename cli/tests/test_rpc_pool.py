@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cataklism_cli.core.rpc import AsyncRpcBatcher
+from cataklism_cli.core.rpc_pool import (
+    Endpoint, EndpointPool, NoHealthyEndpoint, PooledHTTPProvider, TokenBucket, endpoint_pool, endpoint_specs,
+    is_mempool_call,
+)
+
+
+def test_pool_prefers_the_fastest_healthy_endpoint():
+    slow, fast = Endpoint('http://slow'), Endpoint('http://fast')
+    slow.record_success(0.5)
+    fast.record_success(0.05)
+    pool = EndpointPool([slow, fast])
+
+    assert pool.acquire() == (fast, 0.0)
+    assert pool.acquire(exclude=[fast]) == (slow, 0.0)
+
+
+def test_failing_endpoint_cools_down_and_is_routed_around():
+    flaky, steady = Endpoint('http://flaky'), Endpoint('http://steady')
+    flaky.record_success(0.01)
+    steady.record_success(0.2)
+    for _ in range(3):
+        flaky.record_failure()
+
+    assert not flaky.healthy
+    assert EndpointPool([flaky, steady]).ranked() == [steady]
+    # With nothing healthy left the least bad endpoint is still tried
+    assert EndpointPool([flaky]).ranked() == [flaky]
+
+
+def test_exhausted_pool_raises():
+    endpoint = Endpoint('http://only')
+    with pytest.raises(NoHealthyEndpoint):
+        EndpointPool([endpoint]).acquire(exclude=[endpoint])
+
+
+def test_throttled_pool_reports_the_wait():
+    endpoint = Endpoint('http://limited', rate_limit=10, burst=1)
+    pool = EndpointPool([endpoint])
+
+    assert pool.acquire() == (endpoint, 0.0)
+    chosen, delay = pool.acquire()
+    assert chosen is endpoint
+    assert 0 < delay <= 0.1
+
+
+def test_token_bucket_acquire_enforces_the_rate_across_threads():
+    bucket = TokenBucket(rate=50, burst=1)
+    bucket.try_acquire()
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Ten more tokens at 50/s cannot be had in much under 0.2s
+    assert time.monotonic() - started >= 0.18
+
+
+def test_async_acquire_takes_a_token_for_every_request():
+    endpoint = Endpoint('http://limited', rate_limit=50, burst=1)
+    batcher = AsyncRpcBatcher(EndpointPool([endpoint]))
+
+    async def _run():
+        started = time.monotonic()
+        await asyncio.gather(*(batcher._acquire([]) for _ in range(11)))
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) >= 0.18
+
+
+def test_endpoint_specs_accept_dicts_and_objects():
+    class Network:
+        rpc_url = 'http://one'
+        rpc_urls = None
+
+    assert endpoint_specs({'rpc_url': 'http://one'}) == ['http://one']
+    assert endpoint_specs({'rpc_url': 'x', 'rpc_urls': ['http://a', {'url': 'http://b'}]}) == \
+        ['http://a', {'url': 'http://b'}]
+    assert endpoint_specs(Network()) == ['http://one']
+
+
+def test_cached_pool_takes_new_settings_and_keeps_its_health():
+    network = {'rpc_url': 'x', 'rpc_urls': ['http://cached-a', 'http://cached-b']}
+    pool = endpoint_pool(network, hedge_after=0.5)
+    pool.endpoints[0].record_success(0.1)
+
+    assert endpoint_pool(network, hedge_after=2.0) is pool
+    assert pool.hedge_after == 2.0
+    assert endpoint_pool(network).hedge_after == 2.0  # callers without settings change nothing
+    assert pool.endpoints[0].latency is not None
+
+
+def test_closed_provider_releases_its_hedging_threads():
+    provider = PooledHTTPProvider(EndpointPool([Endpoint('http://only')]))
+    provider.close()
+    with pytest.raises(RuntimeError):
+        provider._executor.submit(time.sleep, 0)
+
+
+def test_mempool_calls():
+    sender = '0x' + '11' * 20
+    assert is_mempool_call('eth_sendRawTransaction', ['0x00'])
+    assert is_mempool_call('eth_getTransactionCount', [sender, 'pending'])
+    assert not is_mempool_call('eth_getTransactionCount', [sender, 'latest'])
+    assert is_mempool_call('eth_estimateGas', [{'from': sender}])
+    assert not is_mempool_call('eth_estimateGas', [{'from': sender}, 'latest'])
+    assert not is_mempool_call('eth_call', [{'to': sender}, 'pending'])
+
+
+def test_pinned_endpoint_is_kept_until_it_fails():
+    first, second = Endpoint('http://first'), Endpoint('http://second')
+    first.record_success(0.2)
+    second.record_success(0.1)
+    pool = EndpointPool([first, second])
+
+    assert pool.pinned() == (second, 0.0)
+    # A faster endpoint does not move mempool traffic
+    first.record_success(0.001)
+    first.record_success(0.001)
+    assert pool.pinned() == (second, 0.0)
+
+    # Failing over re-pins, and the new endpoint sticks
+    assert pool.pinned(exclude=[second]) == (first, 0.0)
+    assert pool.pinned() == (first, 0.0)
+
+
+def test_batcher_sends_nonce_reads_and_broadcasts_to_one_endpoint_unhedged():
+    slow, fast = Endpoint('http://slow'), Endpoint('http://fast')
+    slow.record_success(0.01)
+    fast.record_success(0.5)
+    pool = EndpointPool([slow, fast], hedge_after=0)
+    batcher = AsyncRpcBatcher(pool)
+    posts = []
+
+    async def _post(endpoint, payload):
+        posts.append((endpoint, payload[0]['method']))
+        # Make the other endpoint look faster after every request
+        (fast if endpoint is slow else slow).record_success(0.0001)
+        return [{'id': request['id'], 'result': '0x1'} for request in payload]
+
+    batcher._post = _post
+    batcher._session = object()
+    sender = '0x' + '11' * 20
+
+    async def _run():
+        await batcher.call('eth_getTransactionCount', [sender, 'pending'])
+        await batcher.call('eth_sendRawTransaction', ['0x00'])
+        await batcher.call('eth_getTransactionCount', [sender, 'pending'])
+
+    asyncio.run(_run())
+    assert [endpoint for endpoint, _ in posts] == [slow, slow, slow]
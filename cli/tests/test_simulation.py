@@ -0,0 +1,207 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from eth_abi import decode_abi
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from cataklism_cli.core import simulation
+from cataklism_cli.core.simulation import ACC_REWARD_PRECISION, SimulationEngine, SnapshotLoader, parse_horizon
+
+CORE, VAULT, TOKEN = '0x' + '01' * 20, '0x' + '02' * 20, '0x' + '03' * 20
+ALICE, BOB = to_checksum_address('0x' + 'a1' * 20), to_checksum_address('0x' + 'b2' * 20)
+BLOCK, TIMESTAMP = 1000, 1_700_000_000
+
+
+class FakeContracts:
+    """CataklismVault and CataklismCore written out the way the contracts compute, one value at a time"""
+
+    def __init__(self):
+        self.timestamp = TIMESTAMP
+        # Well past int64, so any float or fixed-width shortcut in the engine shows up
+        self.total_assets = 12_345_678_901_234_567_890_123
+        self.total_shares = 9_876_543_210_987_654_321_098
+        self.pools = [
+            {'token': TOKEN, 'liquidity': 7 * 10 ** 24 + 3, 'rate': 3_170_979_198_376_458,
+             'last_update': TIMESTAMP - 4_000, 'acc': 123_456_789_123, 'active': True},
+            {'token': TOKEN, 'liquidity': 0, 'rate': 10 ** 18,
+             'last_update': TIMESTAMP - 50, 'acc': 42, 'active': True},
+            {'token': TOKEN, 'liquidity': 10 ** 21, 'rate': 10 ** 18,
+             'last_update': TIMESTAMP - 50, 'acc': 99, 'active': False},
+        ]
+        self.users = {
+            (0, ALICE): {'amount': 5 * 10 ** 23 + 1, 'debt': 61_728_394_561, 'pending': 17},
+            (2, ALICE): {'amount': 10 ** 20, 'debt': 0, 'pending': 5},
+            (0, BOB): {'amount': 3, 'debt': 0, 'pending': 0},
+        }
+
+    # CataklismVault
+
+    def calculateShares(self, amount):
+        if self.total_shares == 0 or self.total_assets == 0:
+            return amount
+        return amount * self.total_shares // self.total_assets
+
+    # CataklismCore
+
+    def _acc(self, pool):
+        acc = pool['acc']
+        if self.timestamp > pool['last_update'] and pool['active'] and pool['liquidity'] != 0:
+            elapsed = self.timestamp - pool['last_update']
+            acc += elapsed * pool['rate'] * ACC_REWARD_PRECISION // pool['liquidity']
+        return acc
+
+    def _user(self, pool_id, user):
+        return self.users.setdefault((pool_id, to_checksum_address(user)), {'amount': 0, 'debt': 0, 'pending': 0})
+
+    def pendingReward(self, pool_id, user):
+        info = self._user(pool_id, user)
+        return info['amount'] * self._acc(self.pools[pool_id]) // ACC_REWARD_PRECISION - info['debt'] + info['pending']
+
+    def deposit(self, pool_id, user, amount):
+        pool, info = self.pools[pool_id], self._user(pool_id, user)
+        pool['acc'], pool['last_update'] = self._acc(pool), self.timestamp
+        info['pending'] += info['amount'] * pool['acc'] // ACC_REWARD_PRECISION - info['debt']
+        info['amount'] += amount
+        info['debt'] = info['amount'] * pool['acc'] // ACC_REWARD_PRECISION
+        pool['liquidity'] += amount
+
+    def view(self, signature, args):
+        if signature == 'poolCount()':
+            return (len(self.pools),)
+        if signature == 'totalAssets()':
+            return (self.total_assets,)
+        if signature == 'totalShares()':
+            return (self.total_shares,)
+        if signature == 'pools(uint256)':
+            pool = self.pools[args[0]]
+            return (pool['token'], pool['liquidity'], pool['rate'], pool['last_update'], pool['acc'], pool['active'])
+        if signature == 'userInfo(uint256,address)':
+            info = self._user(*args)
+            return (info['amount'], info['debt'], info['pending'], 0)
+        if signature == 'calculateShares(uint256)':
+            return (self.calculateShares(*args),)
+        if signature == 'pendingReward(uint256,address)':
+            return (self.pendingReward(*args),)
+        raise AssertionError(f"unexpected call {signature}")
+
+
+SIGNATURES = {
+    function_signature_to_4byte_selector(signature): signature
+    for signature in ('poolCount()', 'totalAssets()', 'totalShares()', 'pools(uint256)',
+                      'userInfo(uint256,address)', 'calculateShares(uint256)', 'pendingReward(uint256,address)')
+}
+
+
+class FakeMulticall:
+    def __init__(self, contracts):
+        self.contracts = contracts
+
+    async def execute(self, calls, block='latest'):
+        results = []
+        for call in calls:
+            signature = SIGNATURES[call.data[:4]]
+            types = [t for t in signature[signature.index('(') + 1:-1].split(',') if t]
+            results.append(self.contracts.view(signature, decode_abi(types, call.data[4:]) if types else ()))
+        return results
+
+
+class FakeRpc:
+    def __init__(self, contracts):
+        self.contracts = contracts
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def call(self, method, params=None):
+        if method == 'eth_blockNumber':
+            return hex(BLOCK)
+        if method == 'eth_getBlockByNumber':
+            return {'number': params[0], 'timestamp': hex(self.contracts.timestamp)}
+        raise AssertionError(f"unexpected call {method}")
+
+
+@pytest.fixture
+def contracts(monkeypatch):
+    contracts = FakeContracts()
+    monkeypatch.setattr(simulation, 'AsyncRpcBatcher', lambda pool: FakeRpc(contracts))
+    monkeypatch.setattr(simulation, 'endpoint_pool', lambda network: None)
+    monkeypatch.setattr(simulation, 'Multicall', lambda rpc, address: FakeMulticall(contracts))
+    return contracts
+
+
+@pytest.fixture
+def loader():
+    return SnapshotLoader(SimpleNamespace(network=None, contracts=SimpleNamespace(core=CORE, vault=VAULT)))
+
+
+AMOUNTS = [0, 1, 10 ** 18, 3 * 10 ** 25 + 7, 2 ** 200]
+
+
+def _engine(loader, users=(ALICE, BOB)):
+    return SimulationEngine(asyncio.run(loader.load(users)))
+
+
+def test_engine_agrees_with_the_contracts_under_verify(contracts, loader):
+    engine = _engine(loader)
+
+    assert engine.snapshot.block_number == BLOCK
+    assert asyncio.run(loader.verify(engine, AMOUNTS, [ALICE, BOB])) == []
+
+
+def test_verify_reports_each_disagreement(contracts, loader):
+    engine = _engine(loader)
+    contracts.total_assets += 1
+    contracts.users[(0, BOB)]['pending'] += 1
+
+    mismatches = asyncio.run(loader.verify(engine, [2 ** 200], [ALICE, BOB]))
+
+    assert [(row['check'], row['input']) for row in mismatches] == [
+        ('calculateShares', 2 ** 200), ('pendingReward[0]', BOB),
+    ]
+    assert mismatches[1]['actual'] == mismatches[1]['expected'] + 1
+
+
+def test_pending_rewards_over_horizons_match_the_contract_later(contracts, loader):
+    engine = _engine(loader)
+    horizons = [0, 1, 3600, 7 * 86400]
+
+    expected = engine.pending_rewards(0, [ALICE, BOB], horizons)
+
+    for column, horizon in enumerate(horizons):
+        contracts.timestamp = TIMESTAMP + horizon
+        assert [expected[0, column], expected[1, column]] == [
+            contracts.pendingReward(0, ALICE), contracts.pendingReward(0, BOB),
+        ]
+
+
+@pytest.mark.parametrize('pool_id', [0, 1, 2])
+def test_stake_rewards_match_depositing_and_waiting(contracts, loader, pool_id):
+    engine = _engine(loader, users=())
+    amounts, horizons = [1, 10 ** 18, 5 * 10 ** 24], [0, 60, 30 * 86400]
+
+    expected = engine.stake_rewards(pool_id, amounts, horizons)
+
+    for row, amount in enumerate(amounts):
+        for column, horizon in enumerate(horizons):
+            chain = FakeContracts()
+            newcomer = to_checksum_address('0x' + 'c3' * 20)
+            chain.deposit(pool_id, newcomer, amount)
+            chain.timestamp += horizon
+            assert expected[row, column] == chain.pendingReward(pool_id, newcomer)
+
+
+def test_deposit_plan_redeems_no_more_than_was_deposited(contracts, loader):
+    plans = _engine(loader).plan_deposits([10 ** 18, 10 ** 24])
+    assert all(plan['redeem_value'] <= plan['amount'] for plan in plans)
+
+
+def test_horizons_and_unknown_pools():
+    assert [parse_horizon(value) for value in ('3600', '90m', '1h', '7d', '2w')] == [3600, 5400, 3600, 604800, 1209600]
+    with pytest.raises(ValueError):
+        parse_horizon('soon')
+    with pytest.raises(ValueError):
+        SimulationEngine(simulation.ProtocolSnapshot(0, 0, simulation.VaultState(0, 0), {})).pool(1)
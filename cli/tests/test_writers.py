@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+import pytest
+
+from cataklism_cli.commands.reports import SectionWriters
+from cataklism_cli.utils.writers import open_row_writer
+
+
+def _write(fmt, path, rows, columns=('a', 'b')):
+    with open_row_writer(fmt, path, columns) as writer:
+        writer.write_many(rows)
+    return writer
+
+
+def test_json_writer_produces_one_array(tmp_path):
+    path = tmp_path / 'rows.json'
+    writer = _write('json', str(path), [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}])
+
+    assert writer.rows_written == 2
+    assert json.loads(path.read_text()) == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}]
+
+
+def test_empty_json_writer_is_still_valid(tmp_path):
+    path = tmp_path / 'rows.json'
+    _write('json', str(path), [])
+    assert json.loads(path.read_text()) == []
+
+
+def test_ndjson_and_csv_writers(tmp_path):
+    ndjson, table = tmp_path / 'rows.ndjson', tmp_path / 'rows.csv'
+    rows = [{'a': 1, 'b': 'x', 'ignored': True}]
+    _write('ndjson', str(ndjson), rows)
+    _write('csv', str(table), rows)
+
+    assert [json.loads(line) for line in ndjson.read_text().splitlines()] == rows
+    assert list(csv.DictReader(table.open())) == [{'a': '1', 'b': 'x'}]
+
+
+def test_columnar_formats_need_a_file():
+    with pytest.raises(ValueError):
+        open_row_writer('parquet', None, ['a'])
+    with pytest.raises(ValueError):
+        open_row_writer('xml', 'out.xml', ['a'])
+
+
+def test_section_csv_writes_one_file_per_section(tmp_path):
+    output = tmp_path / 'report.csv'
+    with SectionWriters('csv', str(output)) as writers:
+        writers.write('summary', {'metric': 'tvl', 'value': '10'})
+        writers.write('top_holders', {'rank': 1, 'address': '0xabc', 'balance': 5.0, 'share': 0.5})
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['report.summary.csv', 'report.top_holders.csv']
+    assert list(csv.DictReader((tmp_path / 'report.summary.csv').open())) == [{'metric': 'tvl', 'value': '10'}]
+
+
+def test_section_csv_without_output_streams_to_stdout(monkeypatch):
+    stdout = io.StringIO()
+    monkeypatch.setattr('sys.stdout', stdout)
+
+    with SectionWriters('csv', None) as writers:
+        writers.write('summary', {'metric': 'tvl', 'value': '10'})
+        writers.write('pools', {'pool_id': 0, 'is_active': True})
+
+    rows = list(csv.DictReader(io.StringIO(stdout.getvalue())))
+    assert [(row['section'], row['metric'], row['pool_id']) for row in rows] == [('summary', 'tvl', ''), ('pools', '', '0')]
+    assert writers.paths == []
+
+
+def test_section_parquet_needs_an_output():
+    with pytest.raises(ValueError):
+        SectionWriters('parquet', None)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from cataklism_cli.core.yields import SECONDS_PER_YEAR, YIELDS_STREAM, YieldStore, realised_yields
+
+TIMES = np.array([0.0, 100.0, 200.0, 300.0, 400.0])
+DAY = 86400
+
+
+def test_window_starts_at_the_last_sample_at_or_before_its_nominal_start():
+    values = np.linspace(1.0, 1.4, len(TIMES))
+
+    _, start = realised_yields(TIMES, values, [50, 150, 200, 400], compound=False)
+
+    # 350 falls between samples, so the window reaches back to 300 and spans at least its length
+    assert list(start) == [3, 2, 2, 0]
+
+
+def test_windows_past_the_first_sample_or_of_zero_length_are_nan():
+    apy, start = realised_yields(TIMES, np.linspace(1.0, 1.4, len(TIMES)), [401, 10 ** 9, 0], compound=True)
+
+    assert np.isnan(apy).all()
+    assert list(start) == [0, 0, 4]
+
+
+def test_compound_and_simple_yields():
+    times = np.array([0.0, SECONDS_PER_YEAR / 2])
+    values = np.array([1.0, 1.05])
+
+    compound, _ = realised_yields(times, values, [SECONDS_PER_YEAR / 2], compound=True)
+    simple, _ = realised_yields(times, values, [SECONDS_PER_YEAR / 2], compound=False)
+
+    assert compound[0] == pytest.approx(10.25)
+    assert simple[0] == pytest.approx(10.0)
+    # Over exactly a year the two agree
+    times, values = np.array([0.0, SECONDS_PER_YEAR]), np.array([1.0, 1.1])
+    for compound in (True, False):
+        assert realised_yields(times, values, [SECONDS_PER_YEAR], compound)[0][0] == pytest.approx(10.0)
+
+
+def test_series_missing_at_the_window_start_are_nan_per_column():
+    values = np.array([
+        [0.0, np.nan],
+        [1.0, np.nan],
+        [2.0, 5.0],
+        [3.0, 6.0],
+        [4.0, 7.0],
+    ])
+
+    apy, start = realised_yields(TIMES, values, [100, 300], compound=False)
+
+    assert apy.shape == (2, 2)
+    assert apy[0] == pytest.approx([SECONDS_PER_YEAR, SECONDS_PER_YEAR])
+    assert apy[1, 0] == pytest.approx(SECONDS_PER_YEAR)
+    assert np.isnan(apy[1, 1])
+    assert list(start) == [3, 1]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = YieldStore(str(tmp_path / 'yields.duckdb'))
+    yield store
+    store.close()
+
+
+def _append(store, samples):
+    start = datetime(2024, 1, 1)
+    vault_rows, pool_rows = [], []
+    for block, (day, share_value, pools) in samples.items():
+        block_time = start + timedelta(days=day)
+        vault_rows.append({'block_number': block, 'block_time': block_time, 'vault_share_value': share_value})
+        pool_rows.extend({'block_number': block, 'block_time': block_time, 'pool_id': pool_id,
+                          'reward_per_token': value} for pool_id, value in pools.items())
+    store.append_tables({'yield_samples': vault_rows, 'yield_pool_samples': pool_rows}, YIELDS_STREAM, max(samples))
+
+
+def test_store_reports_vault_and_pool_yields_per_window(store):
+    _append(store, {
+        100: (0, 1.00, {0: 0.0}),
+        200: (6, 1.01, {0: 0.6}),
+        300: (7, 1.02, {0: 0.7, 1: 0.0}),
+        400: (8, 1.03, {0: 0.8, 1: 0.1}),
+    })
+
+    frame = store.yields({'1d': DAY, '7d': 7 * DAY}).set_index(['subject', 'window'])
+
+    assert frame.loc[('vault', '1d'), 'from_block'] == 300
+    assert frame.loc[('vault', '7d'), 'from_block'] == 100
+    assert frame.loc[('vault', '1d'), 'apy'] == pytest.approx(((1.03 / 1.02) ** 365 - 1) * 100)
+    assert frame.loc[('pool 0', '7d'), 'apy'] == pytest.approx(0.8 / 8 * 365 * 100)
+    assert frame.loc[('pool 1', '1d'), 'apy'] == pytest.approx(0.1 * 365 * 100)
+    # Pool 1 did not exist at the start of the 7 day window
+    assert np.isnan(frame.loc[('pool 1', '7d'), 'apy'])
+    assert set(frame['to_block']) == {400}
+
+
+def test_store_needs_two_samples(store):
+    assert store.yields().empty
+    _append(store, {100: (0, 1.0, {})})
+    assert store.yields().empty
@@ -0,0 +1,15 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+/**
+ * @title MockERC20
+ * @dev Plain ERC20 used as a staking token in tests and benchmark fixtures.
+ * The whole supply is minted to the deployer.
+ */
+contract MockERC20 is ERC20 {
+    constructor(string memory name, string memory symbol, uint256 supply) ERC20(name, symbol) {
+        _mint(msg.sender, supply);
+    }
+}
@@ -0,0 +1,36 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.19;
+
+/**
+ * @title Multicall3
+ * @dev The aggregate3 entry point of the canonical Multicall3, for local chains
+ * where it is not predeployed. The benchmark fixture copies its runtime code to
+ * 0xcA11bde05977b3631167028862bE2a173976CA11 so clients need no extra config.
+ */
+contract Multicall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate3(Call3[] calldata calls) public payable returns (Result[] memory returnData) {
+        uint256 length = calls.length;
+        returnData = new Result[](length);
+        for (uint256 i = 0; i < length; i++) {
+            Call3 calldata call = calls[i];
+            Result memory result = returnData[i];
+            (result.success, result.returnData) = call.target.call(call.callData);
+            require(call.allowFailure || result.success, "Multicall3: call failed");
+        }
+    }
+
+    function getBlockNumber() public view returns (uint256) {
+        return block.number;
+    }
+}
@@ -0,0 +1,234 @@
+"""
+Seasonal anomaly detection for monitor metrics
+Keeps an hour-of-week baseline (median and MAD) per metric and network,
+scores each new sample with a robust z-score, nudges the baseline
+incrementally and periodically refits it from history in a worker process
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# ProtocolMetrics fields that are scored
+METRIC_FIELDS = (
+    'total_value_locked',
+    'total_stakers',
+    'average_apy',
+    'token_price',
+    'market_cap',
+    'vault_tvl',
+    'vault_apy',
+    'gas_price',
+)
+
+SeriesKey = Tuple[str, str]
+
+
+@dataclass
+class Anomaly:
+    network: str
+    metric: str
+    timestamp: datetime
+    value: float
+    expected: float
+    score: float
+
+
+def week_slot(timestamp: datetime) -> int:
+    """Hour-of-week bucket, 0 = Monday 00:00"""
+    return timestamp.weekday() * 24 + timestamp.hour
+
+
+def _robust(values: np.ndarray) -> Tuple[float, float]:
+    median = float(np.median(values))
+    return median, float(np.median(np.abs(values - median)))
+
+
+def fit_baseline(slots: np.ndarray, values: np.ndarray, min_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Median and MAD for each hour-of-week slot
+
+    Slots with fewer than min_samples observations fall back to the
+    hour-of-day statistics, then to the whole series.
+    """
+    median = np.full(HOURS_PER_WEEK, np.nan)
+    mad = np.full(HOURS_PER_WEEK, np.nan)
+    global_median, global_mad = _robust(values)
+
+    order = np.argsort(slots, kind='stable')
+    sorted_slots, sorted_values = slots[order], values[order]
+    bounds = np.searchsorted(sorted_slots, np.arange(HOURS_PER_WEEK + 1))
+    for slot in range(HOURS_PER_WEEK):
+        segment = sorted_values[bounds[slot]:bounds[slot + 1]]
+        if len(segment) >= min_samples:
+            median[slot], mad[slot] = _robust(segment)
+
+    missing = np.isnan(median)
+    if missing.any():
+        hours = slots % 24
+        for hour in range(24):
+            targets = missing & (np.arange(HOURS_PER_WEEK) % 24 == hour)
+            if not targets.any():
+                continue
+            segment = values[hours == hour]
+            if len(segment) >= min_samples:
+                median[targets], mad[targets] = _robust(segment)
+
+    missing = np.isnan(median)
+    median[missing] = global_median
+    mad[missing] = global_mad
+    return median, mad
+
+
+def fit_baselines(series: Dict[SeriesKey, Tuple[np.ndarray, np.ndarray]],
+                  min_samples: int) -> Dict[SeriesKey, Tuple[np.ndarray, np.ndarray]]:
+    """Fit every series; module-level so it can run in a ProcessPoolExecutor"""
+    return {
+        key: fit_baseline(slots, values, min_samples)
+        for key, (slots, values) in series.items()
+        if len(values)
+    }
+
+
+class SeasonalBaseline:
+    """Per-slot median/MAD with a cheap incremental update between refits"""
+
+    def __init__(self, value: float):
+        self.median = np.full(HOURS_PER_WEEK, float(value))
+        self.mad = np.zeros(HOURS_PER_WEEK)
+        self.count = 0
+        # Until the first fit there is no seasonality, so updates move every slot
+        self.fitted = False
+
+    def _scale(self, slot: int) -> float:
+        # Floor the scale so flat series do not turn every tiny change into an anomaly
+        return max(MAD_SCALE * self.mad[slot], 1e-6 * abs(self.median[slot]), 1e-12)
+
+    def score(self, slot: int, value: float) -> Tuple[float, float]:
+        expected = float(self.median[slot])
+        return expected, (value - expected) / self._scale(slot)
+
+    def update(self, slot: int, value: float, rate: float):
+        """Stochastic median/MAD step towards the new sample"""
+        target = slot if self.fitted else slice(None)
+        residual = value - self.median[target]
+        self.median[target] += rate * self._scale(slot) * np.sign(residual)
+        self.mad[target] += rate * (np.abs(residual) - self.mad[target])
+        self.count += 1
+
+    def load(self, median: np.ndarray, mad: np.ndarray, samples: int):
+        self.median = median
+        self.mad = mad
+        self.count = max(self.count, samples)
+        self.fitted = True
+
+
+class AnomalyDetector:
+    """Scores metric samples against seasonal baselines, keyed by (network, metric)
+
+    A series that has been reported stays anomalous until its score falls
+    below clear_z, and is reported again only after cooldown_seconds or when
+    it escalates to critical, so a sustained excursion is one alert rather
+    than one per sample.
+    """
+
+    def __init__(self, z_threshold: float = 6.0, critical_z: float = 10.0, min_samples: int = 30,
+                 slot_min_samples: int = 4, learning_rate: float = 0.05, history_size: int = 20000,
+                 cooldown_seconds: float = 3600.0, clear_z: Optional[float] = None):
+        self.z_threshold = z_threshold
+        self.critical_z = critical_z
+        self.cooldown_seconds = cooldown_seconds
+        self.clear_z = clear_z if clear_z is not None else z_threshold / 2
+        self.min_samples = min_samples
+        self.slot_min_samples = slot_min_samples
+        self.learning_rate = learning_rate
+        self.history_size = history_size
+        self.baselines: Dict[SeriesKey, SeasonalBaseline] = {}
+        self.history: Dict[SeriesKey, Deque[Tuple[int, float]]] = {}
+        self.scores: Dict[SeriesKey, float] = {}
+        # Series currently reported as anomalous: (last reported at, whether that was critical)
+        self.alerted: Dict[SeriesKey, Tuple[datetime, bool]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AnomalyDetector':
+        keys = ('z_threshold', 'critical_z', 'min_samples', 'slot_min_samples', 'learning_rate', 'history_size',
+                'cooldown_seconds', 'clear_z')
+        return cls(**{k: config[k] for k in keys if k in config})
+
+    def _history(self, key: SeriesKey) -> Deque[Tuple[int, float]]:
+        if key not in self.history:
+            self.history[key] = deque(maxlen=self.history_size)
+        return self.history[key]
+
+    def seed(self, network: str, metric: str, timestamps: Sequence[datetime], values: Sequence[float]):
+        """Load stored history for a series ahead of the first refit"""
+        history = self._history((network, metric))
+        history.extend((week_slot(t), float(v)) for t, v in zip(timestamps, values) if v is not None)
+
+    def observe(self, network: str, metric: str, timestamp: datetime, value: float) -> Optional[Anomaly]:
+        """Score a sample, then fold it into the baseline; returns an Anomaly when it is out of band"""
+        key = (network, metric)
+        value = float(value)
+        slot = week_slot(timestamp)
+
+        baseline = self.baselines.get(key)
+        anomaly = None
+        if baseline is None:
+            baseline = self.baselines[key] = SeasonalBaseline(value)
+        elif baseline.count >= self.min_samples:
+            expected, score = baseline.score(slot, value)
+            self.scores[key] = score
+            if abs(score) >= self.z_threshold:
+                if self._due(key, timestamp, abs(score) >= self.critical_z):
+                    anomaly = Anomaly(network, metric, timestamp, value, expected, score)
+            elif abs(score) < self.clear_z:
+                self.alerted.pop(key, None)
+
+        baseline.update(slot, value, self.learning_rate)
+        self._history(key).append((slot, value))
+        return anomaly
+
+    def _due(self, key: SeriesKey, timestamp: datetime, critical: bool) -> bool:
+        """Whether an out-of-band sample should be reported, recording it when it is"""
+        last = self.alerted.get(key)
+        if last is not None:
+            reported_at, was_critical = last
+            escalated = critical and not was_critical
+            if not escalated and (timestamp - reported_at).total_seconds() < self.cooldown_seconds:
+                return False
+        self.alerted[key] = (timestamp, critical)
+        return True
+
+    def observe_metrics(self, network: str, metrics) -> List[Anomaly]:
+        anomalies = []
+        for field in METRIC_FIELDS:
+            anomaly = self.observe(network, field, metrics.timestamp, getattr(metrics, field))
+            if anomaly is not None:
+                anomalies.append(anomaly)
+        return anomalies
+
+    def refit_payload(self) -> Dict[SeriesKey, Tuple[np.ndarray, np.ndarray]]:
+        """Copy of the history as arrays, safe to ship to a worker process"""
+        payload = {}
+        for key, history in self.history.items():
+            if history:
+                slots, values = zip(*history)
+                payload[key] = (np.array(slots, dtype=np.int16), np.array(values, dtype=np.float64))
+        return payload
+
+    def apply_fit(self, fitted: Dict[SeriesKey, Tuple[np.ndarray, np.ndarray]]):
+        for key, (median, mad) in fitted.items():
+            if key not in self.baselines:
+                self.baselines[key] = SeasonalBaseline(float(np.median(median)))
+            self.baselines[key].load(median, mad, len(self.history.get(key, ())))
+        logger.info(f"Refitted seasonal baselines for {len(fitted)} metric series")
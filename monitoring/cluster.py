@@ -0,0 +1,221 @@
+"""
+High-availability coordination between monitor replicas
+Replicas register under short leases in Redis (or an in-process stand-in),
+split probe targets between the live members by rendezvous hashing and
+elect one leader that stores alerts and sends notifications. A replica
+that dies stops renewing its leases, so its targets and, if it led, alert
+dispatch move to the survivors within one lease TTL.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'cataklism:monitor'
+
+# Renew the lease only if we still hold it, so an expired leader cannot extend a successor's lease
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaseStore:
+    """Membership, leader lease and alert queue kept in Redis"""
+
+    def __init__(self, client, prefix: str = KEY_PREFIX):
+        self.client = client
+        self.members_key = f"{prefix}:replicas"
+        self.leader_key = f"{prefix}:leader"
+        self.alerts_key = f"{prefix}:alerts"
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    def heartbeat(self, replica_id: str, ttl: float) -> List[str]:
+        """Refresh our membership and return the live members"""
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(self.members_key, {replica_id: now + ttl})
+        pipe.zremrangebyscore(self.members_key, '-inf', now)
+        pipe.zrange(self.members_key, 0, -1)
+        return sorted(pipe.execute()[-1])
+
+    def acquire_leader(self, replica_id: str, ttl: float) -> bool:
+        ttl_ms = int(ttl * 1000)
+        if self.client.set(self.leader_key, replica_id, nx=True, px=ttl_ms):
+            return True
+        return bool(self._renew(keys=[self.leader_key], args=[replica_id, ttl_ms]))
+
+    def leave(self, replica_id: str):
+        self.client.zrem(self.members_key, replica_id)
+        self._release(keys=[self.leader_key], args=[replica_id])
+
+    def publish_alert(self, payload: Dict[str, Any]):
+        self.client.rpush(self.alerts_key, json.dumps(payload, default=str))
+
+    def take_alerts(self, limit: int) -> List[Dict[str, Any]]:
+        pipe = self.client.pipeline()
+        pipe.lrange(self.alerts_key, 0, limit - 1)
+        pipe.ltrim(self.alerts_key, limit, -1)
+        return [json.loads(item) for item in pipe.execute()[0]]
+
+
+class MemoryLeaseStore:
+    """In-process stand-in for RedisLeaseStore, for replicas sharing one process or no Redis"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._members: Dict[str, float] = {}
+        self._leader: Optional[Tuple[str, float]] = None
+        self._alerts: List[Dict[str, Any]] = []
+
+    def heartbeat(self, replica_id: str, ttl: float) -> List[str]:
+        now = time.time()
+        with self._lock:
+            self._members[replica_id] = now + ttl
+            self._members = {m: expiry for m, expiry in self._members.items() if expiry > now}
+            return sorted(self._members)
+
+    def acquire_leader(self, replica_id: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._leader is None or self._leader[1] <= now or self._leader[0] == replica_id:
+                self._leader = (replica_id, now + ttl)
+                return True
+            return False
+
+    def leave(self, replica_id: str):
+        with self._lock:
+            self._members.pop(replica_id, None)
+            if self._leader is not None and self._leader[0] == replica_id:
+                self._leader = None
+
+    def publish_alert(self, payload: Dict[str, Any]):
+        with self._lock:
+            self._alerts.append(payload)
+
+    def take_alerts(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            taken, self._alerts = self._alerts[:limit], self._alerts[limit:]
+            return taken
+
+
+# Shared by every Cluster in the process, so in-process replicas see each other
+_memory_store = MemoryLeaseStore()
+
+
+def _weight(member: str, target: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{member}|{target}".encode(), digest_size=8).digest(), 'big')
+
+
+def rendezvous_owner(members: Iterable[str], target: str) -> Optional[str]:
+    """Highest-random-weight owner; only the dead member's targets move when membership changes"""
+    return max(members, key=lambda member: _weight(member, target), default=None)
+
+
+class Cluster:
+    """This replica's view of the monitor cluster
+
+    Until the first heartbeat succeeds, and whenever the store has been
+    unreachable for longer than a lease, the replica acts standalone: it
+    owns every target and dispatches its own alerts. Duplicate alerts are
+    preferred over a silent monitor.
+    """
+
+    def __init__(self, store, replica_id: Optional[str] = None, lease_ttl: float = 15,
+                 heartbeat_interval: float = 5):
+        self.store = store
+        self.replica_id = replica_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.members: Tuple[str, ...] = ()
+        self.is_leader = False
+        self._last_contact: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], redis_client=None) -> 'Cluster':
+        backend = config.get('backend', 'redis')
+        if backend == 'redis':
+            store = RedisLeaseStore(redis_client, config.get('key_prefix', KEY_PREFIX))
+        elif backend == 'memory':
+            store = _memory_store
+        else:
+            raise ValueError(f"Unknown cluster backend '{backend}'")
+        return cls(
+            store,
+            replica_id=config.get('replica_id'),
+            lease_ttl=config.get('lease_ttl_seconds', 15),
+            heartbeat_interval=config.get('heartbeat_seconds', 5),
+        )
+
+    @property
+    def standalone(self) -> bool:
+        return self._last_contact is None or time.monotonic() - self._last_contact > self.lease_ttl
+
+    @property
+    def dispatches_alerts(self) -> bool:
+        return self.is_leader or self.standalone
+
+    def owns(self, target: str) -> bool:
+        if self.standalone:
+            return True
+        return rendezvous_owner(self.members, target) == self.replica_id
+
+    async def join(self):
+        """First heartbeat, so ownership is known before the probe loops start"""
+        await self._tick()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await self._tick()
+
+    async def _tick(self):
+        try:
+            members = await asyncio.to_thread(self.store.heartbeat, self.replica_id, self.lease_ttl)
+            leader = await asyncio.to_thread(self.store.acquire_leader, self.replica_id, self.lease_ttl)
+        except Exception as e:
+            logger.error(f"Cluster heartbeat failed: {e}")
+            self.is_leader = False
+            if self.standalone and self.members:
+                logger.warning("Lost contact with the cluster store; running standalone")
+                self.members = ()
+            return
+
+        self._last_contact = time.monotonic()
+        if tuple(members) != self.members:
+            logger.info(f"Cluster members: {', '.join(members)}")
+            self.members = tuple(members)
+        if leader != self.is_leader:
+            logger.info(f"Replica {self.replica_id} {'is now' if leader else 'is no longer'} the alert leader")
+            self.is_leader = leader
+
+    async def leave(self):
+        try:
+            await asyncio.to_thread(self.store.leave, self.replica_id)
+        except Exception as e:
+            logger.error(f"Error leaving cluster: {e}")
+        self.is_leader = False
+
+    async def publish_alert(self, payload: Dict[str, Any]):
+        await asyncio.to_thread(self.store.publish_alert, payload)
+
+    async def take_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.take_alerts, limit)
@@ -0,0 +1,177 @@
+"""
+Push-based protocol stats ingestion
+Subscribes to the backend's stats stream (Server-Sent Events or WebSocket),
+resumes from the last event id after reconnects and falls back to
+conditional polling (ETag / If-None-Match) while the stream is unavailable
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ('sse', 'websocket', 'poll')
+
+
+class StreamUnavailable(Exception):
+    """The push stream could not be opened or dropped"""
+
+
+class StatsFeed:
+    """Yields protocol stats payloads as soon as the backend publishes them
+
+    Configured from config['api']['stream']:
+        transport       'sse', 'websocket' or 'poll'
+        url             stream URL (defaults to <base_url>/protocol/stats/stream)
+        poll_interval   seconds between conditional polls while falling back
+        retry_after     seconds of polling before the stream is tried again
+        idle_timeout    seconds without any event or heartbeat before reconnecting
+    """
+
+    def __init__(self, base_url: str, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.base_url = base_url.rstrip('/')
+        self.transport = config.get('transport', 'sse')
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown stats stream transport '{self.transport}'")
+
+        default_path = '/protocol/stats/ws' if self.transport == 'websocket' else '/protocol/stats/stream'
+        self.stream_url = config.get('url') or f"{self.base_url}{default_path}"
+        self.poll_url = f"{self.base_url}/protocol/stats"
+        self.poll_interval = config.get('poll_interval', 60)
+        self.retry_after = config.get('retry_after', 30)
+        self.idle_timeout = config.get('idle_timeout', 90)
+
+        self.resume_token: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.source: Optional[str] = None
+        self.last_update: Optional[float] = None
+        self.last_block: Optional[int] = None
+        self._failures = 0
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last payload, from either source"""
+        return time.time() - self.last_update if self.last_update else None
+
+    async def updates(self) -> AsyncIterator[Dict[str, Any]]:
+        """Stats payloads, switching between stream and polling as availability changes"""
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=self.idle_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while True:
+                if self.transport != 'poll':
+                    try:
+                        stream = self._sse(session) if self.transport == 'sse' else self._websocket(session)
+                        async for payload in stream:
+                            self._failures = 0
+                            if not self._is_stale(payload):
+                                yield self._delivered(payload, 'stream')
+                    except (StreamUnavailable, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        self._failures += 1
+                        logger.warning(f"Stats stream unavailable ({e}); falling back to polling")
+
+                # Poll until it is time to try the stream again
+                deadline = time.monotonic() + self._backoff()
+                while self.transport == 'poll' or time.monotonic() < deadline:
+                    try:
+                        payload = await self._poll(session)
+                        if payload is not None and not self._is_stale(payload):
+                            yield self._delivered(payload, 'poll')
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        logger.error(f"Stats poll failed: {e}")
+                    await asyncio.sleep(self.poll_interval)
+
+    def _backoff(self) -> float:
+        # Exponential with jitter so a fleet of monitors does not reconnect in lockstep
+        delay = min(self.retry_after * 2 ** max(self._failures - 1, 0), 600)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _is_stale(self, payload: Dict[str, Any]) -> bool:
+        """Whether a payload is no newer than one already delivered
+
+        Polling does not move the resume token, so a stream reconnecting after
+        a fallback replays events older than the last polled snapshot.
+        """
+        block = payload.get('block_number')
+        return block is not None and self.last_block is not None and int(block) <= self.last_block
+
+    def _delivered(self, payload: Dict[str, Any], source: str) -> Dict[str, Any]:
+        if source != self.source:
+            logger.info(f"Protocol stats now arriving via {source}")
+        self.source = source
+        self.last_update = time.time()
+        if payload.get('block_number') is not None:
+            self.last_block = int(payload['block_number'])
+        return payload
+
+    async def _sse(self, session: aiohttp.ClientSession) -> AsyncIterator[Dict[str, Any]]:
+        headers = {'Accept': 'text/event-stream', 'Cache-Control': 'no-cache'}
+        if self.resume_token:
+            headers['Last-Event-ID'] = self.resume_token
+
+        async with session.get(self.stream_url, headers=headers) as response:
+            if response.status != 200:
+                raise StreamUnavailable(f"stream returned status {response.status}")
+
+            event_id, event_type, data = None, 'message', []
+            async for raw in response.content:
+                line = raw.decode('utf-8').rstrip('\r\n')
+                if not line:
+                    # Blank line dispatches the buffered event
+                    if data and event_type in ('message', 'stats'):
+                        if event_id is not None:
+                            self.resume_token = event_id
+                        yield json.loads('\n'.join(data))
+                    event_id, event_type, data = None, 'message', []
+                    continue
+                if line.startswith(':'):
+                    continue  # heartbeat comment
+                name, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if name == 'id':
+                    event_id = value
+                elif name == 'event':
+                    event_type = value
+                elif name == 'data':
+                    data.append(value)
+                elif name == 'retry' and value.isdigit():
+                    self.retry_after = int(value) / 1000
+
+        raise StreamUnavailable("stream closed by server")
+
+    async def _websocket(self, session: aiohttp.ClientSession) -> AsyncIterator[Dict[str, Any]]:
+        async with session.ws_connect(self.stream_url, heartbeat=30) as ws:
+            await ws.send_json({'type': 'subscribe', 'channel': 'protocol_stats', 'resume': self.resume_token})
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    if message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                        break
+                    continue
+                envelope = json.loads(message.data)
+                if envelope.get('type') not in (None, 'stats'):
+                    continue
+                if envelope.get('id') is not None:
+                    self.resume_token = str(envelope['id'])
+                yield envelope.get('data', envelope)
+
+        raise StreamUnavailable("websocket closed")
+
+    async def _poll(self, session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
+        """Conditional GET; returns None when the stats have not changed"""
+        headers = {'If-None-Match': self.etag} if self.etag else {}
+        async with session.get(self.poll_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status == 304:
+                return None
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message=f"stats poll returned status {response.status}"
+                )
+            self.etag = response.headers.get('ETag')
+            return await response.json()
@@ -0,0 +1,210 @@
+"""
+Non-blocking structured logging for the monitor
+Log calls only filter and enqueue the record; a QueueListener thread does
+the formatting and the file and console I/O, so slow disks or a blocked
+stdout never stall the event loop. Files rotate by size and by age,
+levels are set per subsystem (logger name) and identical messages are
+rate limited with a count of what was suppressed.
+
+Configured from config['logging']:
+    level                   root level (default INFO)
+    levels                  {logger name: level}, e.g. {"ingest": "WARNING"}
+    file                    log file path, or null to log to the console only
+    max_bytes               rotate once the file reaches this size
+    rotate_interval_seconds rotate once the file is this old
+    backup_count            rotated files to keep
+    console                 'text', 'json' or null
+    queue_size              records buffered before new ones are dropped
+    rate_limit              {"burst": 5, "period_seconds": 60}
+
+A config reload applies level and levels; the other keys need a restart.
+"""
+
+import copy
+import json
+import logging
+import queue
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The monitor's original line format, noting suppressed repeats"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        if getattr(record, 'suppressed', None):
+            line += f" (suppressed {record.suppressed} similar messages)"
+        return line
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through `burst` identical messages per `period` seconds
+
+    The first message after a quiet period carries the number suppressed
+    in the previous one as record.suppressed.
+    """
+
+    def __init__(self, burst: int = 5, period: float = 60, max_keys: int = 10000):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[str, int, str], List] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        key = (record.name, record.levelno, record.getMessage())
+        window = self._windows.get(key)
+
+        if window is None or now - window[0] >= self.period:
+            # window: [opened at, emitted, suppressed]
+            if window is not None and window[2]:
+                record.suppressed = window[2]
+            self._windows[key] = [now, 1, 0]
+            if len(self._windows) > self.max_keys:
+                self._prune(now)
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+    def _prune(self, now: float):
+        self._windows = {k: w for k, w in self._windows.items() if now - w[0] < self.period}
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueues without ever blocking; records are dropped (and counted) when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, but leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            record.dropped_before = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            # Only a record that made it in reports the drops, so none go uncounted while the queue stays full
+            self.dropped = 0
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """Rotates when the file reaches max_bytes or has been written for interval seconds"""
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0, interval: float = 0):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+
+def _level(name: Any) -> int:
+    return name if isinstance(name, int) else logging.getLevelName(str(name).upper())
+
+
+def apply_levels(config: Optional[Dict[str, Any]] = None, previous: Optional[Dict[str, Any]] = None):
+    """Set the root and per-subsystem levels; subsystems dropped since `previous` inherit again"""
+    config = config or {}
+    levels = config.get('levels', {})
+    for name in (previous or {}).get('levels', {}):
+        if name not in levels:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    logging.getLogger().setLevel(_level(config.get('level', 'INFO')))
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(_level(level))
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> QueueListener:
+    """Route all logging through a queue and start the listener; stop it on shutdown"""
+    config = config or {}
+
+    handlers = []
+    if config.get('file', 'monitor.log'):
+        file_handler = SizeAndTimeRotatingFileHandler(
+            config.get('file', 'monitor.log'),
+            max_bytes=config.get('max_bytes', 50 * 1024 * 1024),
+            backup_count=config.get('backup_count', 10),
+            interval=config.get('rotate_interval_seconds', 86400),
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    console = config.get('console', 'text')
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(JsonFormatter() if console == 'json' else TextFormatter())
+        handlers.append(console_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=config.get('queue_size', 10000))
+    queue_handler = DroppingQueueHandler(log_queue)
+    rate_limit = config.get('rate_limit', {})
+    if rate_limit is not None:
+        queue_handler.addFilter(RateLimitFilter(
+            burst=rate_limit.get('burst', 5),
+            period=rate_limit.get('period_seconds', 60),
+        ))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    apply_levels(config)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
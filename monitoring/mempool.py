@@ -0,0 +1,290 @@
+"""
+Pending-transaction watcher for the protocol contracts
+Follows the node's pending transactions, by a full-transaction WebSocket
+subscription or by polling txpool_content on a local node, and reports
+large withdrawals and admin calls to the protocol contracts before they
+are mined. Unrelated traffic is rejected by slicing the `to` field out of
+the raw message and looking it up in a precomputed address set, which is
+an order of magnitude cheaper than parsing the JSON; only transactions to
+a watched contract are parsed and matched on the 4-byte selector, and
+only matches are ABI-decoded.
+
+Configured from config['mempool']:
+    networks        networks to watch (default: every network with a ws_url)
+    source          'subscribe' (default; needs ws_url) or 'txpool'
+    poll_interval   seconds between txpool polls
+    watch           extra calls, e.g. [{"contract": "vault", "signature": "setStrategy(address)",
+                    "level": "critical"}]; "amount_arg" makes it a value-thresholded call
+"""
+
+import asyncio
+import json
+import logging
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import aiohttp
+from eth_abi import decode_abi
+from eth_utils import function_signature_to_4byte_selector
+from prometheus_client.core import CounterMetricFamily
+
+from cataklism_cli.core.rpc import AsyncRpcBatcher, RpcError
+from cataklism_cli.core.rpc_pool import endpoint_pool
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ('subscribe', 'txpool')
+
+ADMIN_SIGNATURES = (
+    'pause()',
+    'unpause()',
+    'transferOwnership(address)',
+    'renounceOwnership()',
+    'grantRole(bytes32,address)',
+    'revokeRole(bytes32,address)',
+    'renounceRole(bytes32,address)',
+    'upgradeTo(address)',
+    'upgradeToAndCall(address,bytes)',
+)
+
+# (contract, signature, level, index of the amount argument for value-thresholded calls)
+DEFAULT_WATCH: List[Tuple[str, str, str, Optional[int]]] = [
+    ('core', 'withdraw(uint256,uint256)', 'warning', 1),
+    ('core', 'emergencyWithdraw(uint256)', 'critical', None),
+    ('vault', 'withdraw(uint256)', 'warning', 0),
+    ('vault', 'emergencyWithdraw()', 'critical', None),
+] + [
+    (contract, signature, 'critical', None)
+    for contract in ('core', 'vault', 'token')
+    for signature in ADMIN_SIGNATURES
+]
+
+
+class MempoolUnavailable(Exception):
+    """The node cannot stream full pending transactions or dropped the subscription"""
+
+
+@dataclass(frozen=True)
+class WatchedCall:
+    contract: str
+    address: str  # lower-case
+    signature: str
+    level: str
+    amount_arg: Optional[int] = None
+
+    @property
+    def function(self) -> str:
+        return self.signature[:self.signature.index('(')]
+
+    @property
+    def selector(self) -> str:
+        return '0x' + function_signature_to_4byte_selector(self.signature).hex()
+
+    @property
+    def arg_types(self) -> List[str]:
+        return [t for t in self.signature[self.signature.index('(') + 1:-1].split(',') if t]
+
+
+@dataclass
+class PendingCall:
+    network: str
+    watched: WatchedCall
+    tx_hash: str
+    sender: str
+    args: tuple
+    amount_wei: Optional[int] = None
+
+    def describe(self) -> str:
+        args = ', '.join('0x' + arg.hex() if isinstance(arg, bytes) else str(arg) for arg in self.args)
+        return f"{self.watched.contract}.{self.watched.function}({args})"
+
+
+class Watchlist:
+    """Watched calls keyed by (to, selector), plus the set of watched addresses"""
+
+    def __init__(self, calls: Iterable[WatchedCall]):
+        self.calls: Dict[Tuple[str, str], WatchedCall] = {(call.address, call.selector): call for call in calls}
+        self.addresses = frozenset(address for address, _ in self.calls)
+
+    @classmethod
+    def from_config(cls, contracts: Dict[str, str], extra: Sequence[Dict[str, Any]] = ()) -> 'Watchlist':
+        entries = list(DEFAULT_WATCH) + [
+            (item['contract'], item['signature'], item.get('level', 'warning'), item.get('amount_arg'))
+            for item in extra
+        ]
+        return cls(
+            WatchedCall(contract, contracts[contract].lower(), signature, level, amount_arg)
+            for contract, signature, level, amount_arg in entries
+            if contracts.get(contract)
+        )
+
+    def addressed(self, raw: str) -> bool:
+        """Whether raw transaction JSON is sent to a watched address, without parsing it"""
+        start = raw.find('"to"')
+        if start < 0:
+            return False
+        # Nodes and proxies space the colon differently ("to":"0x..", "to": "0x..", "to" : "0x..");
+        # contract creations have "to":null and never match
+        start = raw.find('0x', start + 4, start + 16)
+        return start >= 0 and raw[start:start + 42].lower() in self.addresses
+
+    def match(self, tx: Dict[str, Any]) -> Optional[WatchedCall]:
+        to = tx.get('to')
+        if not to:
+            return None
+        data = tx.get('input') or tx.get('data') or ''
+        return self.calls.get((to.lower(), data[:10].lower()))
+
+
+class MempoolWatcher:
+    """Yields pending calls to watched contract functions on one network
+
+    Value-thresholded calls below min_amount_wei are counted as matched
+    but not yielded. Each transaction hash is reported at most once.
+    """
+
+    def __init__(self, network: str, network_config: Dict[str, Any], watchlist: Watchlist,
+                 source: str = 'subscribe', poll_interval: float = 2, min_amount_wei: int = 0,
+                 max_reported: int = 10000):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown mempool source '{source}'")
+        if source == 'subscribe' and not network_config.get('ws_url'):
+            raise ValueError(f"Network {network} has no ws_url to subscribe to pending transactions")
+        self.network = network
+        self.network_config = network_config
+        self.watchlist = watchlist
+        self.source = source
+        self.poll_interval = poll_interval
+        self.min_amount_wei = min_amount_wei
+        self.max_reported = max_reported
+
+        # Plain counters on the hot path; MempoolCollector reads them on scrape
+        self.seen = 0
+        self.parsed = 0
+        self.matched = 0
+        self.reported = 0
+        self._reported: 'OrderedDict[str, None]' = OrderedDict()
+        self._failures = 0
+
+    async def matches(self) -> AsyncIterator[PendingCall]:
+        """Pending calls as they arrive, reconnecting with backoff when the source fails"""
+        while True:
+            try:
+                source = self._subscribe() if self.source == 'subscribe' else self._poll_txpool()
+                async for call in source:
+                    yield call
+            except (MempoolUnavailable, RpcError, ValueError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._failures += 1
+                logger.warning(f"Pending transactions on {self.network} unavailable: {e}")
+            await asyncio.sleep(self._backoff())
+
+    def _backoff(self) -> float:
+        delay = min(2 * 2 ** max(self._failures - 1, 0), 300)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _subscribe(self) -> AsyncIterator[PendingCall]:
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self.network_config['ws_url'], heartbeat=30, max_msg_size=0) as ws:
+                await ws.send_json({
+                    'jsonrpc': '2.0', 'id': 1, 'method': 'eth_subscribe',
+                    'params': ['newPendingTransactions', True],
+                })
+                reply = await ws.receive_json(timeout=30)
+                if reply.get('error'):
+                    raise MempoolUnavailable(f"subscription refused: {reply['error'].get('message')}; "
+                                             f"use source 'txpool' with a local node")
+                logger.info(f"Watching pending transactions on {self.network}")
+                self._failures = 0
+
+                verified = False
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        if message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                            break
+                        continue
+
+                    raw = message.data
+                    self.seen += 1
+                    if verified and not self.watchlist.addressed(raw):
+                        continue
+
+                    self.parsed += 1
+                    tx = json.loads(raw).get('params', {}).get('result')
+                    if not verified:
+                        # Nodes without full-transaction support silently stream hashes instead
+                        if not isinstance(tx, dict):
+                            raise MempoolUnavailable("node streams pending hashes only; use source 'txpool'")
+                        verified = True
+
+                    call = self._check(tx)
+                    if call is not None:
+                        yield call
+
+        raise MempoolUnavailable("subscription closed")
+
+    async def _poll_txpool(self) -> AsyncIterator[PendingCall]:
+        async with AsyncRpcBatcher(endpoint_pool(self.network_config)) as rpc:
+            known: set = set()
+            while True:
+                content = await rpc.call('txpool_content')
+                self._failures = 0
+                current = set()
+                for bucket in ('pending', 'queued'):
+                    for by_nonce in (content.get(bucket) or {}).values():
+                        for tx in by_nonce.values():
+                            current.add(tx['hash'])
+                            if tx['hash'] in known:
+                                continue
+                            self.seen += 1
+                            self.parsed += 1
+                            call = self._check(tx)
+                            if call is not None:
+                                yield call
+                # Only what is still in the pool is remembered, so memory follows the pool size
+                known = current
+                await asyncio.sleep(self.poll_interval)
+
+    def _check(self, tx: Dict[str, Any]) -> Optional[PendingCall]:
+        watched = self.watchlist.match(tx)
+        if watched is None or tx['hash'] in self._reported:
+            return None
+        self.matched += 1
+
+        data = tx.get('input') or tx.get('data') or '0x'
+        try:
+            args = decode_abi(watched.arg_types, bytes.fromhex(data[10:])) if watched.arg_types else ()
+        except Exception as e:
+            logger.debug(f"Undecodable {watched.signature} call in {tx['hash']}: {e}")
+            return None
+
+        amount = args[watched.amount_arg] if watched.amount_arg is not None else None
+        if amount is not None and amount < self.min_amount_wei:
+            return None
+
+        self._reported[tx['hash']] = None
+        if len(self._reported) > self.max_reported:
+            self._reported.popitem(last=False)
+        self.reported += 1
+        return PendingCall(self.network, watched, tx['hash'], tx.get('from', ''), tuple(args), amount)
+
+
+class MempoolCollector:
+    """Renders the watchers' counters on scrape, keeping metric updates off the per-transaction path"""
+
+    def __init__(self, watchers: Dict[str, MempoolWatcher]):
+        self.watchers = watchers
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        transactions = CounterMetricFamily(
+            'cataklism_mempool_transactions', 'Pending transactions by how far they got through the filter',
+            labels=['network', 'stage']
+        )
+        for network, watcher in sorted(self.watchers.items()):
+            for stage in ('seen', 'parsed', 'matched', 'reported'):
+                transactions.add_metric([network, stage], getattr(watcher, stage))
+        yield transactions
@@ -4,12 +4,16 @@ Cataklism Protocol Monitoring System
 Real-time monitoring and alerting for protocol health and performance
 """
 
+import argparse
 import asyncio
+import functools
 import json
 import logging
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional
 import aiohttp
 import asyncpg
 from web3 import Web3
@@ -25,18 +29,43 @@ from telegram import Bot
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from prometheus_client import start_http_server, Gauge, Counter, Histogram
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('monitor.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+from prometheus_client import start_http_server, Gauge, Counter, Histogram, REGISTRY
+from cataklism_cli.core.rpc_pool import PooledHTTPProvider, endpoint_pool, endpoint_specs
+
+from anomaly import Anomaly, AnomalyDetector, fit_baselines
+from cluster import Cluster
+from rules import RuleEngine, Sample
+from state import StateFormatError, decode_state, encode_state, state_store_from_config
+from ingest import StatsFeed
+from logs import apply_levels, configure_logging
+from mempool import MempoolCollector, MempoolWatcher, Watchlist
+from pool_metrics import PoolMetricsCollector, read_network
+from reload import RESTART_SECTIONS, ConfigReloader, Rollback, diff_config
+
+# Handlers are installed by configure_logging() once the config is loaded;
+# a fixed name keeps per-subsystem levels working when run as a script
+logger = logging.getLogger('monitor')
+
+# Alert thresholds; config['thresholds'] overrides any of them
+DEFAULT_THRESHOLDS = {
+    'tvl_drop_percentage': 20,  # Alert if TVL drops by 20%
+    'gas_price_gwei': 100,      # Alert if gas > 100 gwei
+    'apy_drop_percentage': 50,   # Alert if APY drops by 50%
+    'token_price_drop_percentage': 30,  # Alert if price drops by 30%
+    'vault_utilization': 95,    # Alert if vault is 95% utilized
+    'response_time_seconds': 5,  # Alert if API response > 5s
+    'failed_transactions_percentage': 10,  # Alert if >10% tx fail
+    'whale_transfer_tokens': 1_000_000,  # Alert if a top holder moves this much CTKL
+    'pending_withdrawal_tokens': 100_000,  # Alert on pending withdrawals of this many tokens
+    'apy_divergence_points': 5  # Alert if reported vault APY is this far from the realised 7d APY
+}
+
+# Seconds between protocol metrics polls when config['api'] sets no poll_interval
+DEFAULT_METRICS_INTERVAL = 60
+
+# pct_change windows span this many metric intervals, so one slow poll still
+# leaves two samples in the window
+PCT_CHANGE_WINDOW_INTERVALS = 2.5
 
 class AlertLevel(Enum):
     INFO = "info"
@@ -73,13 +102,22 @@ class ProtocolMetrics:
 class CataklismMonitor:
     """Main monitoring class for Cataklism Protocol"""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], config_path: Optional[str] = None):
         self.config = config
+        self.config_path = config_path
         self.web3_clients = {}
         self.redis_client = None
         self.db_pool = None
+        self.cluster: Optional[Cluster] = None
+        self.state_store = None
+        self.last_blocks: Dict[str, int] = {}
+        self.latest_metrics: Optional[ProtocolMetrics] = None
         self.alerts = []
 
+        # Set by replay runs: fired alerts are collected here instead of stored and sent
+        self.replay_alerts: Optional[List[Alert]] = None
+        self.replay_time: Optional[datetime] = None
+
         # Prometheus metrics
         self.tvl_gauge = Gauge('cataklism_tvl_total', 'Total Value Locked in USD')
         self.stakers_gauge = Gauge('cataklism_stakers_total', 'Total number of stakers')
@@ -88,17 +126,111 @@ class CataklismMonitor:
         self.gas_price_gauge = Gauge('cataklism_gas_price_gwei', 'Current gas price in gwei')
         self.alerts_counter = Counter('cataklism_alerts_total', 'Total alerts triggered', ['level'])
         self.response_time_histogram = Histogram('cataklism_api_response_seconds', 'API response time')
+        self.rpc_latency_gauge = Gauge('cataklism_rpc_endpoint_latency_seconds', 'Smoothed RPC endpoint latency', ['network', 'endpoint'])
+        self.rpc_error_rate_gauge = Gauge('cataklism_rpc_endpoint_error_rate', 'Recent RPC endpoint error rate', ['network', 'endpoint'])
+
+        # Alert thresholds; replaced as a whole on reload, never updated in place
+        self.thresholds = {**DEFAULT_THRESHOLDS, **self.config.get('thresholds', {})}
+
+        # Push-based stats ingestion, when the backend stream is configured
+        stream_config = self.config['api'].get('stream')
+        self.stats_feed = StatsFeed(self.config['api']['base_url'], stream_config) if stream_config else None
+
+        # Declarative alert rules; the built-in thresholds apply when none are configured
+        self.rule_engine = RuleEngine.from_config(self.config.get('alert_rules') or self._default_alert_rules())
+
+        # Seasonal anomaly detection runs alongside the fixed thresholds
+        anomaly_config = self.config.get('anomaly', {})
+        self.anomaly_detector = AnomalyDetector.from_config(anomaly_config)
+        self.anomaly_refit_interval = anomaly_config.get('refit_interval_seconds', 3600)
+        self.anomaly_history_days = anomaly_config.get('history_days', 28)
+        self.anomaly_executor = None
+        self.anomaly_score_gauge = Gauge('cataklism_anomaly_score', 'Robust z-score against the seasonal baseline', ['network', 'metric'])
+
+        # CTKL holder concentration, from the incremental Transfer index
+        self.holders_gauge = Gauge('cataklism_token_holders', 'Addresses holding CTKL')
+        self.holder_gini_gauge = Gauge('cataklism_token_holder_gini', 'Gini coefficient of CTKL balances')
+        self.top_holder_share_gauge = Gauge('cataklism_token_top_holder_share_pct', 'Share of CTKL supply held by the top holders')
+
+        # Yields realised on chain, to check the reported APYs against
+        self.realised_apy_gauge = Gauge('cataklism_realised_apy', 'Realised APY over a trailing window', ['network', 'subject', 'window'])
+
+        # Per-pool metrics are rendered from a snapshot on scrape rather than held in labelled gauges
+        pool_metrics_config = self.config.get('pool_metrics', {})
+        self.pool_metrics_interval = pool_metrics_config.get('interval_seconds', 60)
+        self.pool_collector = PoolMetricsCollector(
+            max_pools_per_network=pool_metrics_config.get('max_pools_per_network', 200),
+            max_series=pool_metrics_config.get('max_series', 5000)
+        )
 
-        # Alert thresholds
-        self.thresholds = {
-            'tvl_drop_percentage': 20,  # Alert if TVL drops by 20%
-            'gas_price_gwei': 100,      # Alert if gas > 100 gwei
-            'apy_drop_percentage': 50,   # Alert if APY drops by 50%
-            'token_price_drop_percentage': 30,  # Alert if price drops by 30%
-            'vault_utilization': 95,    # Alert if vault is 95% utilized
-            'response_time_seconds': 5,  # Alert if API response > 5s
-            'failed_transactions_percentage': 10  # Alert if >10% tx fail
-        }
+        # Pending-transaction watchers, keyed by network while this replica runs them
+        self.mempool_watchers: Dict[str, MempoolWatcher] = {}
+        self.mempool_collector = MempoolCollector(self.mempool_watchers)
+
+        # Running monitoring tasks by name, so a config reload can restart single ones
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.config_reloader: Optional[ConfigReloader] = None
+
+    def _default_alert_rules(self, thresholds: Optional[Dict[str, Any]] = None,
+                             config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Rules equivalent to the built-in thresholds, used when config has no 'alert_rules'"""
+        thresholds = thresholds or self.thresholds
+        window = PCT_CHANGE_WINDOW_INTERVALS * self._metrics_interval(config or self.config)
+        return [
+            {
+                'name': 'tvl_drop', 'metric': 'total_value_locked', 'aggregation': 'pct_change', 'window': window,
+                'comparator': '<', 'threshold': -thresholds['tvl_drop_percentage'], 'level': 'critical',
+                'title': 'Significant TVL Drop', 'message': 'TVL changed by {value:.1f}% in the last {window:.0f}s',
+            },
+            {
+                'name': 'apy_drop', 'metric': 'average_apy', 'aggregation': 'pct_change', 'window': window,
+                'comparator': '<', 'threshold': -thresholds['apy_drop_percentage'], 'level': 'warning',
+                'title': 'Significant APY Drop', 'message': 'Average APY changed by {value:.1f}% in the last {window:.0f}s',
+            },
+            {
+                'name': 'token_price_drop', 'metric': 'token_price', 'aggregation': 'pct_change', 'window': window,
+                'comparator': '<', 'threshold': -thresholds['token_price_drop_percentage'], 'level': 'warning',
+                'title': 'Token Price Drop', 'message': 'CTKL price changed by {value:.1f}% in the last {window:.0f}s',
+            },
+            {
+                'name': 'gas_price', 'metric': 'network_gas_price_gwei', 'comparator': '>',
+                'threshold': thresholds['gas_price_gwei'], 'level': 'warning',
+                'title': 'High Gas Prices on {network}', 'message': 'Gas price is {value:.1f} gwei',
+            },
+            {
+                'name': 'api_status', 'metric': 'api_status_ok', 'comparator': '<', 'threshold': 1, 'level': 'warning',
+                'title': 'API Endpoint Error', 'message': '{endpoint} returned status {status}',
+            },
+            {
+                'name': 'api_unreachable', 'metric': 'api_reachable', 'comparator': '<', 'threshold': 1,
+                'level': 'critical', 'title': 'API Unreachable', 'message': '{endpoint} is unreachable: {error}',
+            },
+            {
+                'name': 'response_time', 'metric': 'api_response_seconds', 'comparator': '>',
+                'threshold': thresholds['response_time_seconds'], 'level': 'warning',
+                'title': 'Slow API Response', 'message': '{endpoint} took {value:.2f}s to respond',
+            },
+            {
+                'name': 'vault_apy_divergence', 'metric': 'vault_apy_divergence_points', 'comparator': '>',
+                'threshold': thresholds['apy_divergence_points'], 'level': 'warning',
+                'title': 'Reported Vault APY Diverges on {network}',
+                'message': 'Reported vault APY is {value:.2f} points away from the realised 7d APY',
+            },
+            {
+                'name': 'stats_feed_stale', 'metric': 'stats_feed_age_seconds', 'comparator': '>', 'threshold': 300,
+                'level': 'warning', 'title': 'Protocol Stats Feed Stale',
+                'message': 'No protocol stats received for {value:.0f}s',
+            },
+        ]
+
+    @staticmethod
+    def _metrics_interval(config: Dict[str, Any]) -> float:
+        """Seconds between protocol metrics samples: the stream store interval or the poll interval"""
+        api_config = config.get('api', {})
+        stream_config = api_config.get('stream')
+        if stream_config:
+            return stream_config.get('store_interval', DEFAULT_METRICS_INTERVAL)
+        return api_config.get('poll_interval', DEFAULT_METRICS_INTERVAL)
 
     async def initialize(self):
         """Initialize all monitoring components"""
@@ -116,14 +248,28 @@ class CataklismMonitor:
                 decode_responses=True
             )
 
+            # Join the replica cluster before the probe loops decide what they own
+            cluster_config = self.config.get('cluster', {})
+            if cluster_config.get('enabled', False):
+                self.cluster = Cluster.from_config(cluster_config, self.redis_client)
+                await self.cluster.join()
+                logger.info(f"Joined monitor cluster as {self.cluster.replica_id}")
+
+            # Restore alerts and rule windows from the last snapshot so no warm-up is needed
+            state_config = self.config.get('state', {})
+            self.state_store = state_store_from_config(state_config, self.redis_client)
+            if self.state_store is not None:
+                await self._restore_state(state_config.get('max_age_seconds', 86400))
+
             # Initialize database
-            self.db_pool = await asyncpg.create_pool(
-                self.config['database']['url'],
-                min_size=5,
-                max_size=20
-            )
+            self.db_pool = await self._create_db_pool(self.config['database'])
+
+            # Fit anomaly baselines from stored history before the first sample arrives
+            await self._load_anomaly_history()
 
             # Start Prometheus metrics server
+            REGISTRY.register(self.pool_collector)
+            REGISTRY.register(self.mempool_collector)
             start_http_server(self.config['prometheus']['port'])
 
             logger.info("Monitor initialized successfully")
@@ -135,78 +281,326 @@ class CataklismMonitor:
     async def _initialize_web3_clients(self):
         """Initialize Web3 clients for each network"""
         for network, config in self.config['networks'].items():
-            try:
+            w3 = self._connect_network(network, config)
+            if w3 is not None:
+                self.web3_clients[network] = w3
+
+    @classmethod
+    def _connect_network(cls, network: str, config: Dict[str, Any]) -> Optional[Web3]:
+        """A connected Web3 client for one network, or None if it cannot connect"""
+        w3 = None
+        try:
+            # Networks with several endpoints get latency-aware routing and failover
+            if len(endpoint_specs(config)) > 1:
+                pool = endpoint_pool(config, hedge_after=config.get('hedge_after_seconds'))
+                w3 = Web3(PooledHTTPProvider(pool))
+            else:
                 w3 = Web3(Web3.HTTPProvider(config['rpc_url']))
 
-                # Add PoA middleware for some networks
-                if config.get('poa', False):
-                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+            # Add PoA middleware for some networks
+            if config.get('poa', False):
+                w3.middleware_onion.inject(geth_poa_middleware, layer=0)
 
-                # Verify connection
-                if w3.isConnected():
-                    self.web3_clients[network] = w3
-                    logger.info(f"Connected to {network} network")
-                else:
-                    logger.warning(f"Failed to connect to {network} network")
+            # Verify connection
+            if w3.isConnected():
+                logger.info(f"Connected to {network} network")
+                return w3
+            logger.warning(f"Failed to connect to {network} network")
 
-            except Exception as e:
-                logger.error(f"Error connecting to {network}: {e}")
+        except Exception as e:
+            logger.error(f"Error connecting to {network}: {e}")
+        if w3 is not None:
+            cls._close_clients([w3])
+        return None
+
+    @staticmethod
+    def _close_clients(clients: Iterable[Web3]):
+        """Release the connections of clients that never went into service"""
+        for w3 in clients:
+            close = getattr(w3.provider, 'close', None)
+            if close is not None:
+                close()
+
+    @staticmethod
+    async def _create_db_pool(database_config: Dict[str, Any]):
+        return await asyncpg.create_pool(
+            database_config['url'],
+            min_size=database_config.get('min_size', 5),
+            max_size=database_config.get('max_size', 20)
+        )
+
+    def _task_factories(self) -> Dict[str, Callable[[], Coroutine]]:
+        """The monitoring tasks the current config calls for, by name"""
+        factories = {
+            'protocol_metrics': self._monitor_protocol_metrics,
+            'network_health': self._monitor_network_health,
+            'gas_prices': self._monitor_gas_prices,
+            'api_health': self._monitor_api_health,
+            'smart_contracts': self._monitor_smart_contracts,
+            'pool_metrics': self._monitor_pool_metrics,
+            'alerts': self._process_alerts,
+            'reports': self._generate_reports,
+            'anomaly_refit': self._refit_anomaly_baselines,
+        }
+        if self.config.get('holders'):
+            factories['holders'] = self._monitor_holders
+        if self.config.get('mempool'):
+            factories['mempool'] = self._monitor_mempool
+        if self.config.get('yields'):
+            factories['yields'] = self._monitor_yields
+        if self.cluster is not None:
+            factories['cluster'] = self.cluster.run
+            factories['cluster_alerts'] = self._dispatch_cluster_alerts
+        if self.state_store is not None:
+            factories['state'] = self._persist_state
+        if self.config_reloader is not None:
+            factories['config_reload'] = self.config_reloader.run
+        return factories
+
+    def _sync_tasks(self, restart: Iterable[str] = ()):
+        """Start the tasks the config calls for, stop the ones it no longer does and restart `restart`"""
+        factories = self._task_factories()
+        for name in list(self._tasks):
+            if name not in factories or name in restart:
+                self._tasks.pop(name).cancel()
+        for name, factory in factories.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(factory(), name=f"monitor:{name}")
 
     async def start_monitoring(self):
         """Start the main monitoring loop"""
         logger.info("Starting monitoring loop...")
 
-        tasks = [
-            self._monitor_protocol_metrics(),
-            self._monitor_network_health(),
-            self._monitor_gas_prices(),
-            self._monitor_api_health(),
-            self._monitor_smart_contracts(),
-            self._process_alerts(),
-            self._generate_reports(),
-        ]
+        if self.config_path is not None:
+            self.config_reloader = ConfigReloader(
+                self.config_path, self.reload_config,
+                watch_interval=self.config.get('reload', {}).get('watch_interval_seconds', 5)
+            )
+        self._sync_tasks()
 
-        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            # Runs until every task has ended; a reload may replace tasks in the meantime
+            while self._tasks:
+                await asyncio.wait(list(self._tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+                for name, task in list(self._tasks.items()):
+                    if not task.done():
+                        continue
+                    del self._tasks[name]
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error(f"Monitoring task {name} stopped: {task.exception()}")
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            if self.state_store is not None:
+                await self._save_state()
+            # Hand targets and leadership over now instead of after the lease expires
+            if self.cluster is not None:
+                await self.cluster.leave()
+
+    async def reload_config(self, config: Dict[str, Any]):
+        """Apply a changed config in place, touching only what changed
+
+        Clients, rules and pools for the new config are built before anything
+        is swapped, so a config that fails to apply leaves the running one in
+        place. Unchanged networks keep their clients, rule windows carry over
+        and only tasks whose setup depends on a changed section restart.
+        """
+        diff = diff_config(self.config, config)
+        if not diff.changed:
+            logger.info("Configuration unchanged")
+            return
+        started = time.perf_counter()
+        old = self.config
+        config = dict(config)
+
+        # Sections held by long-lived objects keep their running values until a restart
+        pinned = diff.changed & RESTART_SECTIONS
+        for section in pinned:
+            if section in old:
+                config[section] = old[section]
+            else:
+                config.pop(section, None)
+        if pinned:
+            logger.warning(f"Changes to {', '.join(sorted(pinned))} take effect after a restart")
+        applied = diff.changed - pinned
+        if not applied:
+            return
+        old_logging, new_logging = old.get('logging') or {}, config.get('logging') or {}
+        if any(old_logging.get(key) != new_logging.get(key)
+               for key in set(old_logging) | set(new_logging) if key not in ('level', 'levels')):
+            logger.warning("Logging changes other than level and levels take effect after a restart")
+
+        thresholds = {**DEFAULT_THRESHOLDS, **config.get('thresholds', {})}
+        rule_engine = self.rule_engine
+        if diff.changed & {'thresholds', 'alert_rules', 'api'}:
+            rule_engine = RuleEngine.from_config(config.get('alert_rules') or self._default_alert_rules(thresholds, config))
+            rule_engine.import_windows(self.rule_engine.export_windows())
+
+        stats_feed = self.stats_feed
+        if 'api' in diff.changed:
+            stream_config = config['api'].get('stream')
+            stats_feed = StatsFeed(config['api']['base_url'], stream_config) if stream_config else None
+
+        state_store = self.state_store
+        if 'state' in diff.changed:
+            state_store = state_store_from_config(config.get('state', {}), self.redis_client)
+
+        # Resources that hold connections come last and are released if anything before the swap fails
+        async with Rollback() as rollback:
+            # A new dict rather than in-place changes, so loops iterating the clients are undisturbed
+            web3_clients = self.web3_clients
+            if diff.networks:
+                web3_clients = {
+                    network: w3 for network, w3 in self.web3_clients.items()
+                    if network in config['networks'] and network not in diff.networks.changed
+                }
+                for network in sorted(diff.networks.added | diff.networks.changed):
+                    w3 = await asyncio.to_thread(self._connect_network, network, config['networks'][network])
+                    if w3 is not None:
+                        web3_clients[network] = w3
+                        rollback.on_failure(functools.partial(self._close_clients, [w3]))
+
+            db_pool = self.db_pool
+            if 'database' in diff.changed:
+                db_pool = await self._create_db_pool(config['database'])
+                rollback.on_failure(db_pool.close)
+
+            # Tasks that set up from the sections that changed
+            touched = diff.networks_touched
+            restart = set()
+            if 'api' in diff.changed:
+                restart.add('protocol_metrics')
+            if 'state' in diff.changed:
+                restart.add('state')
+            for section in ('holders', 'yields'):
+                network = (config.get(section) or {}).get('network') or next(iter(web3_clients), None)
+                if section in diff.changed or network in touched:
+                    restart.add(section)
+            if ('mempool' in diff.changed
+                    or touched & set(self._mempool_networks(old) + self._mempool_networks(config))
+                    or thresholds['pending_withdrawal_tokens'] != self.thresholds['pending_withdrawal_tokens']):
+                restart.add('mempool')
+
+        # Swap; nothing below awaits, so every task sees either the old or the new config
+        old_pool = self.db_pool
+        replaced = [w3 for network, w3 in self.web3_clients.items() if web3_clients.get(network) is not w3]
+        self.config = config
+        self.thresholds = thresholds
+        self.rule_engine = rule_engine
+        self.web3_clients = web3_clients
+        self.stats_feed = stats_feed
+        self.db_pool = db_pool
+        self.state_store = state_store
+        for network in diff.networks.removed:
+            self.last_blocks.pop(network, None)
+
+        pool_metrics_config = config.get('pool_metrics', {})
+        self.pool_metrics_interval = pool_metrics_config.get('interval_seconds', 60)
+        self.pool_collector.max_pools_per_network = pool_metrics_config.get('max_pools_per_network', 200)
+        self.pool_collector.max_series = pool_metrics_config.get('max_series', 5000)
+        if self.config_reloader is not None:
+            self.config_reloader.watch_interval = config.get('reload', {}).get('watch_interval_seconds', 5)
+        if 'logging' in diff.changed:
+            apply_levels(new_logging, old_logging)
+
+        self._sync_tasks(restart)
+
+        # Connections checked out of the old pool are released before it closes
+        if db_pool is not old_pool and old_pool is not None:
+            asyncio.create_task(old_pool.close())
+        # Clients of changed and removed networks; a loop still holding one fails once and moves on
+        self._close_clients(replaced)
+
+        logger.info(f"Applied changes to {', '.join(sorted(applied))} in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                    + (f"; restarted {', '.join(sorted(restart))}" if restart else ""))
+
+    def _owns(self, target: str) -> bool:
+        """Whether this replica probes a target; always true without a cluster"""
+        return self.cluster is None or self.cluster.owns(target)
 
     async def _monitor_protocol_metrics(self):
         """Monitor core protocol metrics"""
+        if self.stats_feed is not None:
+            await self._consume_stats_feed()
+            return
+
         while True:
             try:
-                logger.info("Collecting protocol metrics...")
+                if not self._owns('protocol_metrics'):
+                    await asyncio.sleep(60)
+                    continue
+
+                logger.debug("Collecting protocol metrics...")
 
                 # Get metrics from API
                 metrics = await self._fetch_protocol_metrics()
+                await self._handle_protocol_metrics(metrics)
 
-                # Update Prometheus metrics
-                self.tvl_gauge.set(metrics.total_value_locked)
-                self.stakers_gauge.set(metrics.total_stakers)
-                self.apy_gauge.set(metrics.average_apy)
-                self.token_price_gauge.set(metrics.token_price)
-                self.gas_price_gauge.set(metrics.gas_price)
-
-                # Store in database
-                await self._store_metrics(metrics)
+            except Exception as e:
+                await self._metrics_collection_failed(e)
 
-                # Check for alerts
-                await self._check_metric_alerts(metrics)
+            await asyncio.sleep(self._metrics_interval(self.config))
 
-                # Cache metrics
-                await self._cache_metrics(metrics)
+    async def _consume_stats_feed(self):
+        """Process stats as the backend pushes them, storing at most one row per store_interval"""
+        store_interval = self.config['api']['stream'].get('store_interval', DEFAULT_METRICS_INTERVAL)
+        last_stored = 0.0
 
-                logger.info(f"Protocol metrics updated - TVL: ${metrics.total_value_locked:,.2f}")
+        while True:
+            try:
+                async for data in self.stats_feed.updates():
+                    # Every replica stays subscribed so a takeover does not wait for a reconnect
+                    if not self._owns('protocol_metrics'):
+                        continue
+                    metrics = self._metrics_from_payload(data)
+                    # Replayed stream events can be older than a snapshot already polled
+                    if self.latest_metrics is not None and metrics.block_number <= self.latest_metrics.block_number:
+                        logger.debug(f"Dropping stale protocol stats for block {metrics.block_number}")
+                        continue
+                    store = time.monotonic() - last_stored >= store_interval
+                    await self._handle_protocol_metrics(metrics, store=store)
+                    if store:
+                        last_stored = time.monotonic()
 
             except Exception as e:
-                logger.error(f"Error monitoring protocol metrics: {e}")
-                await self._create_alert(
-                    AlertLevel.WARNING,
-                    "Metrics Collection Failed",
-                    f"Failed to collect protocol metrics: {e}",
-                    "metrics_collection",
-                    0,
-                    1
-                )
-
-            await asyncio.sleep(60)  # Check every minute
+                await self._metrics_collection_failed(e)
+                await asyncio.sleep(5)
+
+    async def _handle_protocol_metrics(self, metrics: ProtocolMetrics, store: bool = True):
+        """Export, persist and evaluate one protocol metrics sample"""
+        self.latest_metrics = metrics
+
+        # Update Prometheus metrics
+        self.tvl_gauge.set(metrics.total_value_locked)
+        self.stakers_gauge.set(metrics.total_stakers)
+        self.apy_gauge.set(metrics.average_apy)
+        self.token_price_gauge.set(metrics.token_price)
+        self.gas_price_gauge.set(metrics.gas_price)
+
+        # Store in database
+        if store:
+            await self._store_metrics(metrics)
+
+        # Check for alerts
+        await self._evaluate_metrics(metrics)
+
+        # Cache metrics
+        await self._cache_metrics(metrics)
+
+        logger.debug(f"Protocol metrics updated - TVL: ${metrics.total_value_locked:,.2f}")
+
+    async def _metrics_collection_failed(self, error: Exception):
+        logger.error(f"Error monitoring protocol metrics: {error}")
+        await self._create_alert(
+            AlertLevel.WARNING,
+            "Metrics Collection Failed",
+            f"Failed to collect protocol metrics: {error}",
+            "metrics_collection",
+            0,
+            1
+        )
 
     async def _fetch_protocol_metrics(self) -> ProtocolMetrics:
         """Fetch metrics from protocol API"""
@@ -216,29 +610,44 @@ class CataklismMonitor:
                     if response.status != 200:
                         raise Exception(f"API returned status {response.status}")
 
-                    data = await response.json()
-
-                    return ProtocolMetrics(
-                        timestamp=datetime.now(),
-                        total_value_locked=float(data['tvl']),
-                        total_stakers=int(data['total_stakers']),
-                        active_pools=int(data['active_pools']),
-                        average_apy=float(data['avg_apy']),
-                        token_price=float(data['token_price']),
-                        market_cap=float(data['market_cap']),
-                        vault_tvl=float(data['vault_tvl']),
-                        vault_apy=float(data['vault_apy']),
-                        gas_price=float(data['gas_price']),
-                        block_number=int(data['block_number']),
-                        network_health=bool(data['network_health'])
-                    )
+                    return self._metrics_from_payload(await response.json())
+
+    @staticmethod
+    def _payload_time(data: Dict[str, Any]) -> datetime:
+        """When the backend produced a payload, as local time; now for payloads without a timestamp"""
+        value = data.get('timestamp')
+        if value is None:
+            return datetime.now()
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value)
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+    @classmethod
+    def _metrics_from_payload(cls, data: Dict[str, Any]) -> ProtocolMetrics:
+        return ProtocolMetrics(
+            timestamp=cls._payload_time(data),
+            total_value_locked=float(data['tvl']),
+            total_stakers=int(data['total_stakers']),
+            active_pools=int(data['active_pools']),
+            average_apy=float(data['avg_apy']),
+            token_price=float(data['token_price']),
+            market_cap=float(data['market_cap']),
+            vault_tvl=float(data['vault_tvl']),
+            vault_apy=float(data['vault_apy']),
+            gas_price=float(data['gas_price']),
+            block_number=int(data['block_number']),
+            network_health=bool(data['network_health'])
+        )
 
     async def _monitor_network_health(self):
         """Monitor blockchain network health"""
         while True:
             try:
                 for network, w3 in self.web3_clients.items():
-                    logger.info(f"Checking {network} network health...")
+                    if not self._owns(f"network:{network}"):
+                        continue
+                    logger.debug(f"Checking {network} network health...")
 
                     # Check if connected
                     if not w3.isConnected():
@@ -257,6 +666,11 @@ class CataklismMonitor:
                         latest_block = w3.eth.get_block('latest')
                         block_age = datetime.now().timestamp() - latest_block.timestamp
 
+                        last_seen = self.last_blocks.get(network, 0)
+                        if latest_block.number < last_seen:
+                            logger.warning(f"{network} endpoint is at block {latest_block.number}, behind last seen {last_seen}")
+                        self.last_blocks[network] = max(last_seen, latest_block.number)
+
                         if block_age > 300:  # 5 minutes
                             await self._create_alert(
                                 AlertLevel.WARNING,
@@ -270,6 +684,12 @@ class CataklismMonitor:
                     except Exception as e:
                         logger.error(f"Error checking {network} blocks: {e}")
 
+                    # Export per-endpoint health for pooled providers
+                    if isinstance(w3.provider, PooledHTTPProvider):
+                        for health in w3.provider.pool.health():
+                            self.rpc_latency_gauge.labels(network=network, endpoint=health.url).set(health.latency_ms / 1000)
+                            self.rpc_error_rate_gauge.labels(network=network, endpoint=health.url).set(health.error_rate)
+
             except Exception as e:
                 logger.error(f"Error monitoring network health: {e}")
 
@@ -279,7 +699,10 @@ class CataklismMonitor:
         """Monitor gas prices across networks"""
         while True:
             try:
+                samples = []
                 for network, w3 in self.web3_clients.items():
+                    if not self._owns(f"network:{network}"):
+                        continue
                     try:
                         gas_price = w3.eth.gas_price
                         gas_price_gwei = w3.fromWei(gas_price, 'gwei')
@@ -287,22 +710,22 @@ class CataklismMonitor:
                         # Update metrics
                         self.gas_price_gauge.set(gas_price_gwei)
 
-                        # Check threshold
-                        if gas_price_gwei > self.thresholds['gas_price_gwei']:
-                            await self._create_alert(
-                                AlertLevel.WARNING,
-                                f"High Gas Prices on {network}",
-                                f"Gas price is {gas_price_gwei:.1f} gwei",
-                                f"gas_price_{network}",
-                                gas_price_gwei,
-                                self.thresholds['gas_price_gwei']
-                            )
+                        anomaly = self.anomaly_detector.observe(network, 'gas_price', datetime.now(), float(gas_price_gwei))
+                        if anomaly is not None:
+                            await self._create_anomaly_alert(anomaly)
 
-                        logger.info(f"{network} gas price: {gas_price_gwei:.1f} gwei")
+                        samples.append(
+                            Sample('network_gas_price_gwei', float(gas_price_gwei), {'network': network}, time.time())
+                        )
+
+                        logger.debug(f"{network} gas price: {gas_price_gwei:.1f} gwei")
 
                     except Exception as e:
                         logger.error(f"Error checking gas price for {network}: {e}")
 
+                # One rule pass for every network's reading
+                await self._evaluate_rules(samples)
+
             except Exception as e:
                 logger.error(f"Error monitoring gas prices: {e}")
 
@@ -319,54 +742,41 @@ class CataklismMonitor:
 
         while True:
             try:
+                samples = []
+                # The stats feed already proves the stats endpoint is alive; track its freshness instead
+                if self.stats_feed is not None and self.stats_feed.age is not None:
+                    samples.append(Sample('stats_feed_age_seconds', self.stats_feed.age, {}, time.time()))
+
                 for endpoint in endpoints:
+                    if not self._owns(f"api:{endpoint}"):
+                        continue
+                    if self.stats_feed is not None and endpoint == '/api/protocol/stats':
+                        continue
+
                     url = f"{self.config['api']['base_url']}{endpoint}"
+                    labels = {'endpoint': endpoint}
 
                     start_time = time.time()
                     async with aiohttp.ClientSession() as session:
                         try:
                             async with session.get(url, timeout=10) as response:
                                 response_time = time.time() - start_time
+                                ok = response.status == 200
 
-                                if response.status != 200:
-                                    await self._create_alert(
-                                        AlertLevel.WARNING,
-                                        f"API Endpoint Error",
-                                        f"{endpoint} returned status {response.status}",
-                                        f"api_{endpoint.replace('/', '_')}",
-                                        response.status,
-                                        200
-                                    )
-
-                                elif response_time > self.thresholds['response_time_seconds']:
-                                    await self._create_alert(
-                                        AlertLevel.WARNING,
-                                        f"Slow API Response",
-                                        f"{endpoint} took {response_time:.2f}s to respond",
-                                        f"response_time_{endpoint.replace('/', '_')}",
-                                        response_time,
-                                        self.thresholds['response_time_seconds']
-                                    )
+                                samples += [
+                                    Sample('api_reachable', 1.0, labels, start_time),
+                                    Sample('api_status_ok', float(ok), labels, start_time, {'status': response.status}),
+                                    Sample('api_response_seconds', response_time, labels, start_time),
+                                ]
 
                         except asyncio.TimeoutError:
-                            await self._create_alert(
-                                AlertLevel.CRITICAL,
-                                f"API Timeout",
-                                f"{endpoint} timed out after 10 seconds",
-                                f"timeout_{endpoint.replace('/', '_')}",
-                                10,
-                                5
-                            )
+                            samples.append(Sample('api_reachable', 0.0, labels, start_time,
+                                                  {'error': 'timed out after 10 seconds'}))
 
                         except Exception as e:
-                            await self._create_alert(
-                                AlertLevel.CRITICAL,
-                                f"API Connection Error",
-                                f"Failed to connect to {endpoint}: {e}",
-                                f"connection_{endpoint.replace('/', '_')}",
-                                0,
-                                1
-                            )
+                            samples.append(Sample('api_reachable', 0.0, labels, start_time, {'error': str(e)}))
+
+                await self._evaluate_rules(samples)
 
             except Exception as e:
                 logger.error(f"Error monitoring API health: {e}")
@@ -378,6 +788,8 @@ class CataklismMonitor:
         while True:
             try:
                 for network, w3 in self.web3_clients.items():
+                    if not self._owns(f"network:{network}"):
+                        continue
                     contract_addresses = self.config['contracts'][network]
 
                     for contract_name, address in contract_addresses.items():
@@ -406,57 +818,364 @@ class CataklismMonitor:
 
             await asyncio.sleep(600)  # Check every 10 minutes
 
-    async def _check_metric_alerts(self, metrics: ProtocolMetrics):
-        """Check if metrics trigger any alerts"""
-        # Get previous metrics for comparison
-        previous = await self._get_cached_metrics()
-        if not previous:
-            return
+    async def _monitor_pool_metrics(self):
+        """Refresh the per-pool snapshot for every network with a core contract"""
+        while True:
+            networks = [
+                network for network in self.web3_clients
+                if self.config['contracts'].get(network, {}).get('core') and self._owns(f"network:{network}")
+            ]
+            # Networks now probed by another replica are dropped from this replica's scrape
+            self.pool_collector.retain(networks)
+
+            results = await asyncio.gather(*(
+                read_network(network, self.config['networks'][network], self.config['contracts'][network])
+                for network in networks
+            ), return_exceptions=True)
+
+            for network, result in zip(networks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error reading pool metrics on {network}: {result}")
+                    continue
+                self.pool_collector.update(result)
+                logger.debug(f"Read {len(result.pools)} pools on {network} in {result.read_seconds:.2f}s")
+
+            if self.pool_collector.dropped_series:
+                logger.warning(f"{self.pool_collector.dropped_series} pools folded into pool=\"other\" by the series limit")
+
+            await asyncio.sleep(self.pool_metrics_interval)
+
+    def _load_holder_indexer(self, network: str, holders_config: Dict[str, Any]):
+        """Seed the holder index from the CLI's store when one exists, else index from deploy_block"""
+        # Imported here so duckdb is only needed when holder tracking is enabled
+        from cataklism_cli.core.holders import HOLDERS_STREAM, HolderIndex, HolderIndexer, HolderStore
+
+        index, next_block = HolderIndex(), holders_config.get('deploy_block', 0)
+        path = os.path.expanduser(holders_config.get('store', '~/.cataklism/history.duckdb'))
+        if os.path.exists(path):
+            store = HolderStore(path, read_only=True)
+            try:
+                last = store.checkpoint(HOLDERS_STREAM)
+                if last is not None:
+                    index, next_block = store.load_index(), last + 1
+            finally:
+                store.close()
+
+        logger.info(f"Holder index seeded with {len(index):,} holders; following transfers from block {next_block:,}")
+        return HolderIndexer(self.config['networks'][network], self.config['contracts'][network]['token'],
+                             index, next_block=next_block)
+
+    async def _monitor_holders(self):
+        """Follow CTKL transfers and alert when one of the largest holders moves a large amount"""
+        holders_config = self.config['holders']
+        network = holders_config.get('network') or next(iter(self.web3_clients))
+        top_n = holders_config.get('top_n', 100)
+        indexer = None
 
-        # TVL drop check
-        if previous.total_value_locked > 0:
-            tvl_change = ((metrics.total_value_locked - previous.total_value_locked) /
-                         previous.total_value_locked) * 100
+        while True:
+            try:
+                if not self._owns('holders'):
+                    # Re-seeded from the store if this replica takes the target over again
+                    indexer = None
+                else:
+                    if indexer is None:
+                        indexer = await asyncio.to_thread(self._load_holder_indexer, network, holders_config)
 
-            if tvl_change < -self.thresholds['tvl_drop_percentage']:
-                await self._create_alert(
-                    AlertLevel.CRITICAL,
-                    "Significant TVL Drop",
-                    f"TVL dropped by {abs(tvl_change):.1f}% to ${metrics.total_value_locked:,.2f}",
-                    "tvl_drop",
-                    abs(tvl_change),
-                    self.thresholds['tvl_drop_percentage']
-                )
+                    threshold = Web3.toWei(self.thresholds['whale_transfer_tokens'], 'ether')
+                    moves = []
 
-        # APY drop check
-        if previous.average_apy > 0:
-            apy_change = ((metrics.average_apy - previous.average_apy) /
-                         previous.average_apy) * 100
+                    def _on_transfer(transfer):
+                        if transfer['value'] < threshold:
+                            return
+                        for side in ('sender', 'recipient'):
+                            rank = indexer.index.rank(transfer[side], top_n)
+                            if rank is not None:
+                                moves.append((rank, side, transfer))
 
-            if apy_change < -self.thresholds['apy_drop_percentage']:
-                await self._create_alert(
-                    AlertLevel.WARNING,
-                    "Significant APY Drop",
-                    f"Average APY dropped by {abs(apy_change):.1f}% to {metrics.average_apy:.2f}%",
-                    "apy_drop",
-                    abs(apy_change),
-                    self.thresholds['apy_drop_percentage']
+                    await indexer.sync(on_transfer=_on_transfer)
+
+                    for rank, side, transfer in moves:
+                        amount = float(Web3.fromWei(transfer['value'], 'ether'))
+                        await self._create_alert(
+                            AlertLevel.WARNING,
+                            "Top Holder Movement",
+                            f"Holder #{rank} {transfer[side]} {'sent' if side == 'sender' else 'received'} "
+                            f"{amount:,.0f} CTKL (tx {transfer['transaction_hash']})",
+                            f"whale_transfer_{transfer[side]}",
+                            amount,
+                            self.thresholds['whale_transfer_tokens']
+                        )
+
+                    self.holders_gauge.set(len(indexer.index))
+                    self.holder_gini_gauge.set(indexer.index.gini())
+                    self.top_holder_share_gauge.set(indexer.index.top_share(top_n))
+
+            except Exception as e:
+                logger.error(f"Error following CTKL holders: {e}")
+
+            await asyncio.sleep(holders_config.get('interval_seconds', 60))
+
+    def _load_yield_sampler(self, network: str, yields_config: Dict[str, Any]):
+        # Imported here so duckdb is only needed when yield tracking is enabled
+        from cataklism_cli.core.yields import DEFAULT_YIELD_INTERVAL, YieldSampler, YieldStore
+
+        contracts = self.config['contracts'][network]
+        store = YieldStore(os.path.expanduser(yields_config.get('store', 'monitor_yields.duckdb')))
+        return YieldSampler(self.config['networks'][network], contracts, store,
+                            interval=yields_config.get('interval_blocks', DEFAULT_YIELD_INTERVAL),
+                            deploy_block=yields_config.get('deploy_block', 0))
+
+    async def _monitor_yields(self):
+        """Sample share value and reward history and export realised 1d/7d/30d yields"""
+        yields_config = self.config['yields']
+        network = yields_config.get('network') or next(iter(self.web3_clients))
+        sampler = None
+
+        while True:
+            try:
+                if self._owns('yields'):
+                    if sampler is None:
+                        sampler = await asyncio.to_thread(self._load_yield_sampler, network, yields_config)
+                    added = await sampler.sync()
+                    frame = await asyncio.to_thread(sampler.store.yields)
+                    logger.debug(f"Sampled {added} blocks for realised yields on {network}")
+
+                    samples = []
+                    for row in frame.to_dict('records'):
+                        if row['apy'] != row['apy']:  # NaN: not enough history for the window yet
+                            continue
+                        self.realised_apy_gauge.labels(network=network, subject=row['subject'], window=row['window']).set(row['apy'])
+                        samples.append(Sample('realised_apy', row['apy'],
+                                              {'network': network, 'subject': row['subject'], 'window': row['window']},
+                                              time.time()))
+                        if row['subject'] == 'vault' and row['window'] == '7d' and self.latest_metrics is not None:
+                            samples.append(Sample('vault_apy_divergence_points',
+                                                  abs(self.latest_metrics.vault_apy - row['apy']),
+                                                  {'network': network}, time.time()))
+                    await self._evaluate_rules(samples)
+
+            except Exception as e:
+                logger.error(f"Error sampling realised yields: {e}")
+
+            await asyncio.sleep(yields_config.get('interval_seconds', 600))
+
+    async def _monitor_mempool(self):
+        """Watch pending transactions on every configured network"""
+        mempool_config = self.config['mempool']
+        networks = self._mempool_networks(self.config)
+        await asyncio.gather(*(self._watch_mempool(network, mempool_config) for network in networks),
+                             return_exceptions=True)
+
+    @staticmethod
+    def _mempool_networks(config: Dict[str, Any]) -> List[str]:
+        return (config.get('mempool') or {}).get('networks') or [
+            network for network, network_config in config['networks'].items() if network_config.get('ws_url')
+        ]
+
+    async def _watch_mempool(self, network: str, mempool_config: Dict[str, Any]):
+        """Run the network's watcher only while this replica owns it"""
+        target = f"mempool:{network}"
+        while True:
+            if not self._owns(target):
+                await asyncio.sleep(10)
+                continue
+
+            try:
+                watcher = MempoolWatcher(
+                    network,
+                    self.config['networks'][network],
+                    Watchlist.from_config(self.config['contracts'].get(network, {}), mempool_config.get('watch', [])),
+                    source=mempool_config.get('source', 'subscribe'),
+                    poll_interval=mempool_config.get('poll_interval', 2),
+                    min_amount_wei=Web3.toWei(self.thresholds['pending_withdrawal_tokens'], 'ether'),
                 )
+            except Exception as e:
+                logger.error(f"Cannot watch pending transactions on {network}: {e}")
+                return
 
-        # Token price drop check
-        if previous.token_price > 0:
-            price_change = ((metrics.token_price - previous.token_price) /
-                           previous.token_price) * 100
+            self.mempool_watchers[network] = watcher
+            consumer = asyncio.create_task(self._raise_mempool_alerts(watcher))
+            try:
+                while self._owns(target) and not consumer.done():
+                    await asyncio.sleep(10)
+            finally:
+                # Also when a config reload cancels the watchers
+                consumer.cancel()
+                await asyncio.gather(consumer, return_exceptions=True)
+                del self.mempool_watchers[network]
+
+    async def _raise_mempool_alerts(self, watcher: MempoolWatcher):
+        async for call in watcher.matches():
+            try:
+                if call.amount_wei is not None:
+                    amount = float(Web3.fromWei(call.amount_wei, 'ether'))
+                    title, value, threshold = "Pending Large Withdrawal", amount, self.thresholds['pending_withdrawal_tokens']
+                else:
+                    title, value, threshold = "Pending Admin Call", 1, 0
 
-            if price_change < -self.thresholds['token_price_drop_percentage']:
                 await self._create_alert(
-                    AlertLevel.WARNING,
-                    "Token Price Drop",
-                    f"CTKL price dropped by {abs(price_change):.1f}% to ${metrics.token_price:.4f}",
-                    "token_price_drop",
-                    abs(price_change),
-                    self.thresholds['token_price_drop_percentage']
+                    AlertLevel(call.watched.level),
+                    title,
+                    f"{call.sender} submitted {call.describe()} on {call.network}; not yet mined (tx {call.tx_hash})",
+                    f"mempool_{call.watched.contract}_{call.watched.function}_{call.network}",
+                    value,
+                    threshold
                 )
+            except Exception as e:
+                logger.error(f"Error raising pending transaction alert: {e}")
+
+    async def _evaluate_metrics(self, metrics: ProtocolMetrics):
+        """Full alert path for one metrics sample: rules, then anomaly detection"""
+        await self._check_metric_alerts(metrics)
+        for anomaly in self.anomaly_detector.observe_metrics('protocol', metrics):
+            await self._create_anomaly_alert(anomaly)
+        self._export_anomaly_scores()
+
+    async def _check_metric_alerts(self, metrics: ProtocolMetrics):
+        """Evaluate alert rules against a protocol metrics sample"""
+        timestamp = metrics.timestamp.timestamp()
+        await self._evaluate_rules([
+            Sample(name, value, {'network': 'protocol'}, timestamp)
+            for name, value in asdict(metrics).items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ])
+
+    async def _evaluate_rules(self, samples: List[Sample]):
+        """Run a batch of samples through the rule engine and raise an alert per match"""
+        for match in self.rule_engine.evaluate(samples):
+            await self._create_alert(
+                AlertLevel(match.rule.level),
+                match.title,
+                match.message,
+                match.key,
+                match.value,
+                match.rule.threshold
+            )
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        return {
+            'saved_at': time.time(),
+            'alerts': [self._alert_payload(alert) for alert in self.alerts],
+            'rule_windows': self.rule_engine.export_windows(),
+            'last_blocks': self.last_blocks,
+        }
+
+    async def _save_state(self):
+        """Write a snapshot of in-memory state; encoding and I/O run off the event loop"""
+        try:
+            state = self._snapshot_state()
+            await asyncio.to_thread(lambda: self.state_store.save(encode_state(state)))
+        except Exception as e:
+            logger.error(f"Error saving monitor state: {e}")
+
+    async def _restore_state(self, max_age: float):
+        try:
+            data = await asyncio.to_thread(self.state_store.load)
+            if data is None:
+                return
+            state = decode_state(data)
+        except (StateFormatError, OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable monitor state snapshot: {e}")
+            return
+
+        age = time.time() - state['saved_at']
+        if age > max_age:
+            logger.info(f"Ignoring monitor state snapshot from {age / 3600:.1f} hours ago")
+            return
+
+        cutoff_time = datetime.now() - timedelta(hours=24)
+        self.alerts = [
+            alert for alert in map(self._alert_from_payload, state['alerts'])
+            if alert.timestamp > cutoff_time
+        ]
+        self.rule_engine.import_windows(state['rule_windows'])
+        self.last_blocks.update(state['last_blocks'])
+        logger.info(f"Restored monitor state from {age:.0f}s ago: {len(self.alerts)} alerts, "
+                    f"{len(state['rule_windows'])} rule windows")
+
+    async def _persist_state(self):
+        """Periodic snapshots, so a crash loses at most one interval of context"""
+        interval = self.config.get('state', {}).get('interval_seconds', 60)
+        while True:
+            await asyncio.sleep(interval)
+            await self._save_state()
+
+    async def _load_anomaly_history(self):
+        """Seed anomaly baselines from stored protocol metrics and fit them once"""
+        columns = {
+            'total_value_locked': 'tvl',
+            'total_stakers': 'total_stakers',
+            'average_apy': 'avg_apy',
+            'token_price': 'token_price',
+            'market_cap': 'market_cap',
+            'vault_tvl': 'vault_tvl',
+            'vault_apy': 'vault_apy',
+            'gas_price': 'gas_price',
+        }
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch(f"""
+                    SELECT timestamp, {', '.join(columns.values())}
+                    FROM protocol_metrics
+                    WHERE timestamp >= NOW() - make_interval(days => $1)
+                    ORDER BY timestamp
+                """, self.anomaly_history_days)
+
+            timestamps = [row['timestamp'] for row in rows]
+            for field, column in columns.items():
+                self.anomaly_detector.seed('protocol', field, timestamps, [row[column] for row in rows])
+
+            await self._fit_anomaly_baselines()
+            logger.info(f"Loaded {len(rows)} historical samples for anomaly detection")
+
+        except Exception as e:
+            logger.error(f"Failed to load anomaly history: {e}")
+
+    async def _fit_anomaly_baselines(self):
+        """Refit every seasonal baseline in a worker process"""
+        payload = self.anomaly_detector.refit_payload()
+        if not payload:
+            return
+
+        if self.anomaly_executor is None:
+            self.anomaly_executor = ProcessPoolExecutor(max_workers=1)
+
+        loop = asyncio.get_running_loop()
+        fitted = await loop.run_in_executor(
+            self.anomaly_executor, fit_baselines, payload, self.anomaly_detector.slot_min_samples
+        )
+        self.anomaly_detector.apply_fit(fitted)
+
+    async def _refit_anomaly_baselines(self):
+        """Periodically refit anomaly baselines from the accumulated history"""
+        while True:
+            await asyncio.sleep(self.anomaly_refit_interval)
+            try:
+                await self._fit_anomaly_baselines()
+            except Exception as e:
+                logger.error(f"Error refitting anomaly baselines: {e}")
+
+    def _export_anomaly_scores(self):
+        for (network, metric), score in self.anomaly_detector.scores.items():
+            self.anomaly_score_gauge.labels(network=network, metric=metric).set(score)
+
+    async def _create_anomaly_alert(self, anomaly: Anomaly):
+        """Raise an alert for a sample far outside its seasonal baseline"""
+        level = AlertLevel.CRITICAL if abs(anomaly.score) >= self.anomaly_detector.critical_z else AlertLevel.WARNING
+        label = anomaly.metric.replace('_', ' ').title()
+        scope = '' if anomaly.network == 'protocol' else f" on {anomaly.network}"
+        direction = 'above' if anomaly.score > 0 else 'below'
+
+        await self._create_alert(
+            level,
+            f"Anomalous {label}{scope}",
+            f"{label} is {anomaly.value:,.4f}, {abs(anomaly.score):.1f} robust deviations {direction} "
+            f"the expected {anomaly.expected:,.4f} for this hour of the week",
+            f"anomaly_{anomaly.metric}_{anomaly.network}",
+            abs(anomaly.score),
+            self.anomaly_detector.z_threshold
+        )
 
     async def _create_alert(self, level: AlertLevel, title: str, message: str,
                           metric: str, value: float, threshold: float):
@@ -465,25 +1184,63 @@ class CataklismMonitor:
             level=level,
             title=title,
             message=message,
-            timestamp=datetime.now(),
+            timestamp=self.replay_time or datetime.now(),
             metric=metric,
             value=value,
             threshold=threshold,
             source="monitor"
         )
 
+        if self.replay_alerts is not None:
+            self.replay_alerts.append(alert)
+            return
+
         self.alerts.append(alert)
         self.alerts_counter.labels(level=level.value).inc()
 
         logger.warning(f"ALERT [{level.value.upper()}]: {title} - {message}")
 
-        # Store alert in database
+        # In a cluster the leader stores and notifies, so each alert is sent once
+        if self.cluster is not None and not self.cluster.standalone:
+            try:
+                await self.cluster.publish_alert(self._alert_payload(alert))
+                return
+            except Exception as e:
+                logger.error(f"Error publishing alert to the cluster, dispatching locally: {e}")
+
+        await self._dispatch_alert(alert)
+
+    async def _dispatch_alert(self, alert: Alert):
+        """Store an alert and send notifications based on its level"""
         await self._store_alert(alert)
 
-        # Send notifications based on level
-        if level in [AlertLevel.CRITICAL, AlertLevel.EMERGENCY]:
+        if alert.level in [AlertLevel.CRITICAL, AlertLevel.EMERGENCY]:
             await self._send_notifications(alert)
 
+    @staticmethod
+    def _alert_payload(alert: Alert) -> Dict[str, Any]:
+        return {**asdict(alert), 'level': alert.level.value, 'timestamp': alert.timestamp.isoformat()}
+
+    @staticmethod
+    def _alert_from_payload(payload: Dict[str, Any]) -> Alert:
+        return Alert(**{
+            **payload,
+            'level': AlertLevel(payload['level']),
+            'timestamp': datetime.fromisoformat(payload['timestamp'])
+        })
+
+    async def _dispatch_cluster_alerts(self):
+        """Leader only: store and notify alerts published by every replica"""
+        while True:
+            try:
+                if self.cluster.is_leader:
+                    for payload in await self.cluster.take_alerts():
+                        await self._dispatch_alert(self._alert_from_payload(payload))
+            except Exception as e:
+                logger.error(f"Error dispatching cluster alerts: {e}")
+
+            await asyncio.sleep(1)
+
     async def _process_alerts(self):
         """Process and manage alerts"""
         while True:
@@ -513,6 +1270,11 @@ class CataklismMonitor:
         """Generate periodic reports"""
         while True:
             try:
+                # Reports are sent once per cluster, by the alert leader
+                if self.cluster is not None and not self.cluster.dispatches_alerts:
+                    await asyncio.sleep(60)
+                    continue
+
                 # Generate daily report at midnight
                 now = datetime.now()
                 if now.hour == 0 and now.minute == 0:
@@ -548,14 +1310,6 @@ class CataklismMonitor:
             json.dumps(asdict(metrics), default=str)
         )
 
-    async def _get_cached_metrics(self) -> Optional[ProtocolMetrics]:
-        """Get cached metrics from Redis"""
-        cached = self.redis_client.get("latest_metrics")
-        if cached:
-            data = json.loads(cached)
-            return ProtocolMetrics(**data)
-        return None
-
     async def _store_alert(self, alert: Alert):
         """Store alert in database"""
         async with self.db_pool.acquire() as conn:
@@ -658,14 +1412,52 @@ class CataklismMonitor:
 
         logger.info("Daily report generated")
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cataklism Protocol monitor")
+    parser.add_argument('--config', default='config.json', help='Configuration file')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('run', help='Run the live monitor (default)')
+
+    replay_parser = commands.add_parser('replay', help='Replay stored metrics through the alert rules')
+    replay_parser.add_argument('--since', type=datetime.fromisoformat, required=True, help='Start time (ISO 8601)')
+    replay_parser.add_argument('--until', type=datetime.fromisoformat, default=None, help='End time (defaults to now)')
+    replay_parser.add_argument('--events', help='CLI history store (DuckDB) whose events are replayed as well')
+    replay_parser.add_argument('--rules', help='JSON file with alert rules to evaluate instead of the configured ones')
+    replay_parser.add_argument('--threshold', action='append', default=[], metavar='NAME=VALUE',
+                               help='Override a built-in threshold, e.g. gas_price_gwei=150 (repeatable)')
+    replay_parser.add_argument('--batch-size', type=int, default=5000, help='Rows fetched per database round trip')
+    replay_parser.add_argument('--show', type=int, default=50, help='Number of fired alerts to list')
+    return parser.parse_args(argv)
+
 async def main():
     """Main entry point"""
+    args = parse_args()
+
     # Load configuration
-    with open('config.json', 'r') as f:
+    with open(args.config, 'r') as f:
         config = json.load(f)
 
+    log_listener = configure_logging(config.get('logging'))
+    try:
+        await run(args, config)
+    finally:
+        # Flush whatever is still queued before the process exits
+        log_listener.stop()
+
+async def run(args: argparse.Namespace, config: Dict[str, Any]):
+    """Dispatch to the live monitor or a replay"""
+    if args.command == 'replay':
+        from replay import parse_threshold_overrides, replay
+
+        config['thresholds'] = {**config.get('thresholds', {}), **parse_threshold_overrides(args.threshold)}
+        if args.rules:
+            with open(args.rules, 'r') as f:
+                config['alert_rules'] = json.load(f)
+        await replay(config, args.since, args.until or datetime.now(), args.events, args.batch_size, args.show)
+        return
+
     # Initialize monitor
-    monitor = CataklismMonitor(config)
+    monitor = CataklismMonitor(config, config_path=args.config)
     await monitor.initialize()
 
     # Start monitoring
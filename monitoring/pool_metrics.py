@@ -0,0 +1,169 @@
+"""
+Per-pool and per-network labelled metrics
+Pool state is read in batched Multicall rounds per network and published
+as an immutable snapshot; a custom Prometheus collector renders that
+snapshot on scrape, so scrape cost does not depend on how many gauge
+objects a label set would otherwise need. Cardinality is capped by
+folding the smallest pools of a network into pool="other".
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client.core import GaugeMetricFamily
+from web3 import Web3
+
+from cataklism_cli.core.multicall import MULTICALL3_ADDRESS, Multicall, make_call
+from cataklism_cli.core.rpc import AsyncRpcBatcher
+from cataklism_cli.core.rpc_pool import endpoint_pool
+
+OTHER_POOL = 'other'
+
+
+@dataclass
+class PoolSample:
+    pool_id: str
+    token: str
+    total_liquidity: float
+    reward_rate: float
+    active: bool
+
+
+@dataclass
+class NetworkSample:
+    network: str
+    pools: List[PoolSample]
+    vault_total_assets: Optional[float]
+    vault_share_value: Optional[float]
+    block_number: int
+    read_seconds: float
+
+
+def _from_wei(value: int) -> float:
+    return float(Web3.fromWei(value, 'ether'))
+
+
+async def read_network(network: str, network_config: Dict[str, Any], contracts: Dict[str, str]) -> NetworkSample:
+    """Read every pool plus vault totals for one network in three Multicall rounds"""
+    started = time.perf_counter()
+    core = contracts['core']
+    async with AsyncRpcBatcher(endpoint_pool(network_config)) as rpc:
+        multicall = Multicall(rpc, contracts.get('multicall') or MULTICALL3_ADDRESS)
+        block = int(await rpc.call('eth_blockNumber'), 16)
+
+        calls = [make_call(core, 'poolCount()', [], ['uint256'])]
+        if contracts.get('vault'):
+            calls.append(make_call(contracts['vault'], 'getVaultStats()', [], ['uint256'] * 6))
+        count, stats = (await multicall.execute(calls, block) + [None])[:2]
+
+        pools = await multicall.execute([
+            make_call(core, 'pools(uint256)', [pool_id],
+                      ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'bool'])
+            for pool_id in range(count[0] if count else 0)
+        ], block)
+
+        tokens = sorted({pool[0] for pool in pools if pool})
+        symbols = await multicall.execute([make_call(token, 'symbol()', [], ['string']) for token in tokens], block)
+        symbol_of = {token: (symbol[0] if symbol else token[:10]) for token, symbol in zip(tokens, symbols)}
+
+    samples = [
+        PoolSample(str(pool_id), symbol_of[pool[0]], _from_wei(pool[1]), _from_wei(pool[2]), bool(pool[5]))
+        for pool_id, pool in enumerate(pools) if pool
+    ]
+    return NetworkSample(
+        network=network,
+        pools=samples,
+        vault_total_assets=_from_wei(stats[0]) if stats else None,
+        vault_share_value=_from_wei(stats[2]) if stats else None,
+        block_number=block,
+        read_seconds=time.perf_counter() - started,
+    )
+
+
+class PoolMetricsCollector:
+    """Prometheus collector that renders the latest precomputed pool snapshot
+
+    max_pools_per_network bounds the pool label per network; the remainder
+    is summed into pool="other". max_series bounds the total across
+    networks by shrinking the per-network limit as networks are added.
+    """
+
+    def __init__(self, max_pools_per_network: int = 200, max_series: int = 5000):
+        self.max_pools_per_network = max_pools_per_network
+        self.max_series = max_series
+        self._networks: Dict[str, NetworkSample] = {}
+        self._families: Tuple[GaugeMetricFamily, ...] = ()
+        self._lock = threading.Lock()
+        self.dropped_series = 0
+
+    def describe(self):
+        # Describing nothing keeps registration from calling collect() before data exists
+        return []
+
+    def collect(self):
+        # The tuple is replaced wholesale on update, so a scrape never sees a half-built snapshot
+        return iter(self._families)
+
+    def update(self, sample: NetworkSample):
+        with self._lock:
+            self._networks[sample.network] = sample
+            self._families = self._render()
+
+    def retain(self, networks):
+        """Drop networks that are no longer read by this process"""
+        with self._lock:
+            stale = set(self._networks) - set(networks)
+            if stale:
+                for network in stale:
+                    del self._networks[network]
+                self._families = self._render()
+
+    def _limit(self) -> int:
+        per_network = self.max_series // max(1, len(self._networks))
+        return max(1, min(self.max_pools_per_network, per_network))
+
+    def _fold(self, pools: Sequence[PoolSample], limit: int) -> List[PoolSample]:
+        if len(pools) <= limit:
+            return list(pools)
+        ranked = sorted(pools, key=lambda p: p.total_liquidity, reverse=True)
+        kept, rest = ranked[:limit - 1], ranked[limit - 1:]
+        self.dropped_series += len(rest)
+        kept.append(PoolSample(
+            OTHER_POOL, OTHER_POOL,
+            sum(p.total_liquidity for p in rest),
+            sum(p.reward_rate for p in rest),
+            any(p.active for p in rest),
+        ))
+        return kept
+
+    def _render(self) -> Tuple[GaugeMetricFamily, ...]:
+        labels = ['network', 'pool', 'token']
+        liquidity = GaugeMetricFamily('cataklism_pool_liquidity', 'Tokens staked in the pool', labels=labels)
+        reward_rate = GaugeMetricFamily('cataklism_pool_reward_rate', 'Pool reward rate in CTKL per second', labels=labels)
+        active = GaugeMetricFamily('cataklism_pool_active', 'Whether the pool is active', labels=labels)
+        pool_count = GaugeMetricFamily('cataklism_network_pools', 'Pools deployed on the network', labels=['network'])
+        vault_assets = GaugeMetricFamily('cataklism_vault_total_assets', 'Vault total assets in CTKL', labels=['network'])
+        share_value = GaugeMetricFamily('cataklism_vault_share_value', 'Vault share value in CTKL', labels=['network'])
+        block = GaugeMetricFamily('cataklism_pool_snapshot_block', 'Block the pool snapshot was read at', labels=['network'])
+        read_time = GaugeMetricFamily('cataklism_pool_snapshot_read_seconds', 'Time taken to read the pool snapshot', labels=['network'])
+
+        self.dropped_series = 0
+        limit = self._limit()
+        for network, sample in sorted(self._networks.items()):
+            for pool in self._fold(sample.pools, limit):
+                values = [network, pool.pool_id, pool.token]
+                liquidity.add_metric(values, pool.total_liquidity)
+                reward_rate.add_metric(values, pool.reward_rate)
+                active.add_metric(values, 1.0 if pool.active else 0.0)
+            pool_count.add_metric([network], len(sample.pools))
+            if sample.vault_total_assets is not None:
+                vault_assets.add_metric([network], sample.vault_total_assets)
+                share_value.add_metric([network], sample.vault_share_value)
+            block.add_metric([network], sample.block_number)
+            read_time.add_metric([network], sample.read_seconds)
+
+        dropped = GaugeMetricFamily('cataklism_pool_series_folded', 'Pools folded into pool="other" by the cardinality limit')
+        dropped.add_metric([], self.dropped_series)
+        return (liquidity, reward_rate, active, pool_count, vault_assets, share_value, block, read_time, dropped)
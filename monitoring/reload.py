@@ -0,0 +1,164 @@
+"""
+Hot configuration reload for the running monitor
+The config file is re-read on SIGHUP and, unless disabled, whenever its
+modification time or size changes. The new config is diffed against the
+live one section by section, so the monitor can apply only what changed
+and keep connections and in-memory state of everything else.
+
+Configured from config['reload']:
+    watch_interval_seconds  seconds between checks of the file (0 disables watching; SIGHUP always works)
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import signal
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sections held by objects that cannot be swapped under the running monitor
+RESTART_SECTIONS = frozenset({'redis', 'prometheus', 'cluster', 'anomaly'})
+
+
+@dataclass
+class MappingDiff:
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    changed: Set[str] = field(default_factory=set)
+
+    @property
+    def touched(self) -> Set[str]:
+        return self.added | self.removed | self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.touched)
+
+
+def diff_mapping(old: Dict[str, Any], new: Dict[str, Any]) -> MappingDiff:
+    return MappingDiff(
+        added=set(new) - set(old),
+        removed=set(old) - set(new),
+        changed={key for key in set(old) & set(new) if old[key] != new[key]},
+    )
+
+
+@dataclass
+class ConfigDiff:
+    sections: MappingDiff
+    networks: MappingDiff
+    contracts: MappingDiff
+
+    @property
+    def changed(self) -> Set[str]:
+        """Top-level sections that were added, removed or changed"""
+        return self.sections.touched
+
+    @property
+    def networks_touched(self) -> Set[str]:
+        """Networks whose connection settings or contract addresses changed"""
+        return self.networks.touched | self.contracts.touched
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> ConfigDiff:
+    return ConfigDiff(
+        sections=diff_mapping(old, new),
+        networks=diff_mapping(old.get('networks', {}), new.get('networks', {})),
+        contracts=diff_mapping(old.get('contracts', {}), new.get('contracts', {})),
+    )
+
+
+class Rollback:
+    """Releases what was built for a new config if applying it fails
+
+    Used as 'async with Rollback() as rollback' around everything that runs
+    before the swap; each resource registers its release as it is created.
+    Releases run newest first and only when the block raises.
+    """
+
+    def __init__(self):
+        self._releases: List[Callable[[], Any]] = []
+
+    def on_failure(self, release: Callable[[], Any]):
+        self._releases.append(release)
+
+    async def __aenter__(self) -> 'Rollback':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            return False
+        for release in reversed(self._releases):
+            try:
+                result = release()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Releasing a resource of the failed config raised: {e}")
+        return False
+
+
+class ConfigReloader:
+    """Hands the re-read config to apply() on SIGHUP or when the file changes
+
+    A file that fails to parse, e.g. while an editor is still writing it,
+    is logged and skipped; the next change triggers another attempt.
+    """
+
+    def __init__(self, path: str, apply: Callable[[Dict[str, Any]], Awaitable[None]],
+                 watch_interval: float = 5):
+        self.path = path
+        self.apply = apply
+        self.watch_interval = watch_interval
+        self._requested = asyncio.Event()
+        self._fingerprint: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Dict[str, Any]:
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self._requested.set)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            logger.warning("SIGHUP reload is not available here; relying on file watching")
+
+        self._fingerprint = self._stat()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._requested.wait(), timeout=self.watch_interval or None)
+                    logger.info(f"SIGHUP received, reloading {self.path}")
+                except asyncio.TimeoutError:
+                    if self._stat() == self._fingerprint:
+                        continue
+                    logger.info(f"{self.path} changed, reloading")
+
+                self._requested.clear()
+                self._fingerprint = self._stat()
+                try:
+                    config = await asyncio.to_thread(self._load)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Not reloading {self.path}: {e}")
+                    continue
+
+                try:
+                    await self.apply(config)
+                except Exception as e:
+                    logger.error(f"Reloading {self.path} failed, keeping the running configuration: {e}")
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGHUP)
+            except (NotImplementedError, AttributeError, RuntimeError):
+                pass
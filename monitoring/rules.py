@@ -0,0 +1,288 @@
+"""
+Declarative alert rules for the monitor
+Rules are loaded from config and compiled once into threshold ladders
+grouped by metric, label matcher, aggregation window and comparator.
+A sample updates each distinct window once and finds the triggered rule
+of each ladder by binary search, so per-sample cost tracks the number of
+distinct windows rather than the number of rules.
+"""
+
+import bisect
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AGGREGATIONS = ('last', 'avg', 'sum', 'count', 'min', 'max', 'delta', 'pct_change')
+COMPARATORS = ('>', '>=', '<', '<=')
+LEVELS = ('info', 'warning', 'critical', 'emergency')
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Optional[Dict[str, Any]]) -> LabelSet:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    metric: str
+    comparator: str
+    threshold: float
+    level: str = 'warning'
+    aggregation: str = 'last'
+    window: float = 0.0
+    labels: LabelSet = ()
+    title: Optional[str] = None
+    message: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'AlertRule':
+        """Validate one entry of config['alert_rules']"""
+        name = spec.get('name') or f"{spec.get('metric')}_{spec.get('aggregation', 'last')}"
+        try:
+            rule = cls(
+                name=name,
+                metric=spec['metric'],
+                comparator=spec['comparator'],
+                threshold=float(spec['threshold']),
+                level=spec.get('level', 'warning').lower(),
+                aggregation=spec.get('aggregation', 'last'),
+                window=float(spec.get('window', 0)),
+                labels=_label_set(spec.get('labels')),
+                title=spec.get('title'),
+                message=spec.get('message'),
+            )
+        except KeyError as e:
+            raise ValueError(f"Alert rule '{name}' is missing {e}")
+
+        if rule.comparator not in COMPARATORS:
+            raise ValueError(f"Alert rule '{name}' has unknown comparator '{rule.comparator}'")
+        if rule.aggregation not in AGGREGATIONS:
+            raise ValueError(f"Alert rule '{name}' has unknown aggregation '{rule.aggregation}'")
+        if rule.level not in LEVELS:
+            raise ValueError(f"Alert rule '{name}' has unknown level '{rule.level}'")
+        if rule.aggregation not in ('last',) and rule.window <= 0:
+            raise ValueError(f"Alert rule '{name}' needs a window for '{rule.aggregation}'")
+        return rule
+
+
+@dataclass
+class Sample:
+    metric: str
+    value: float
+    labels: Dict[str, Any]
+    timestamp: float
+    # Extra fields for alert titles and messages; unlike labels they do not split series
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RuleMatch:
+    rule: AlertRule
+    labels: Dict[str, Any]
+    value: float
+    timestamp: float
+    context: Dict[str, Any] = field(default_factory=dict)
+
+    def _context(self) -> Dict[str, Any]:
+        return {
+            **self.context,
+            **self.labels,
+            'metric': self.rule.metric,
+            'value': self.value,
+            'threshold': self.rule.threshold,
+            'aggregation': self.rule.aggregation,
+            'window': self.rule.window,
+        }
+
+    @property
+    def title(self) -> str:
+        return (self.rule.title or self.rule.name).format_map(_Missing(self._context()))
+
+    @property
+    def message(self) -> str:
+        template = self.rule.message or "{metric} {aggregation} is {value:.4f} (threshold {threshold})"
+        return template.format_map(_Missing(self._context()))
+
+    @property
+    def key(self) -> str:
+        """Stable alert metric id: rule name plus label values"""
+        return '_'.join([self.rule.name] + [str(v) for _, v in sorted(self.labels.items())])
+
+
+class _Missing(dict):
+    def __missing__(self, key):
+        return f"{{{key}}}"
+
+
+class _Window:
+    """Time-based sliding window with O(1) amortised sum, min and max"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.samples: Deque[Tuple[float, float]] = deque()
+        self.total = 0.0
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+
+    def push(self, timestamp: float, value: float):
+        self.samples.append((timestamp, value))
+        self.total += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+        cutoff = timestamp - self.seconds
+        while len(self.samples) > 1 and self.samples[0][0] < cutoff:
+            _, old = self.samples.popleft()
+            self.total -= old
+        first = self.samples[0][0]
+        while self._min[0][0] < first:
+            self._min.popleft()
+        while self._max[0][0] < first:
+            self._max.popleft()
+
+    def aggregate(self, name: str) -> Optional[float]:
+        first, last = self.samples[0][1], self.samples[-1][1]
+        if name == 'last':
+            return last
+        if name == 'avg':
+            return self.total / len(self.samples)
+        if name == 'sum':
+            return self.total
+        if name == 'count':
+            return float(len(self.samples))
+        if name == 'min':
+            return self._min[0][1]
+        if name == 'max':
+            return self._max[0][1]
+        if len(self.samples) < 2:
+            return None
+        if name == 'delta':
+            return last - first
+        # pct_change
+        return (last - first) / first * 100 if first else None
+
+
+class _Ladder:
+    """Rules sharing metric, matcher, aggregation, window and comparator, sorted by threshold"""
+
+    def __init__(self, rules: List[AlertRule]):
+        self.rules = sorted(rules, key=lambda r: r.threshold)
+        self.thresholds = [r.threshold for r in self.rules]
+        head = self.rules[0]
+        self.aggregation = head.aggregation
+        self.window = head.window
+        self.comparator = head.comparator
+        self.labels = head.labels
+
+    def matches(self, labels: LabelSet) -> bool:
+        return set(self.labels) <= set(labels)
+
+    def strictest(self, value: float) -> Optional[AlertRule]:
+        """The triggered rule furthest past the boundary, if any"""
+        if self.comparator == '>':
+            index = bisect.bisect_left(self.thresholds, value)
+            return self.rules[index - 1] if index else None
+        if self.comparator == '>=':
+            index = bisect.bisect_right(self.thresholds, value)
+            return self.rules[index - 1] if index else None
+        if self.comparator == '<':
+            index = bisect.bisect_right(self.thresholds, value)
+            return self.rules[index] if index < len(self.rules) else None
+        index = bisect.bisect_left(self.thresholds, value)
+        return self.rules[index] if index < len(self.rules) else None
+
+
+@dataclass
+class _Series:
+    windows: Dict[float, _Window] = field(default_factory=dict)
+    ladders: List[_Ladder] = field(default_factory=list)
+
+
+class RuleEngine:
+    """Evaluates compiled alert rules against metric samples"""
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        self.rules = list(rules)
+        grouped: Dict[Tuple, List[AlertRule]] = {}
+        for rule in self.rules:
+            key = (rule.metric, rule.labels, rule.aggregation, rule.window, rule.comparator)
+            grouped.setdefault(key, []).append(rule)
+
+        self._ladders: Dict[str, List[_Ladder]] = {}
+        for (metric, *_), rules in grouped.items():
+            self._ladders.setdefault(metric, []).append(_Ladder(rules))
+        self._series: Dict[Tuple[str, LabelSet], _Series] = {}
+
+    @classmethod
+    def from_config(cls, specs: Iterable[Dict[str, Any]]) -> 'RuleEngine':
+        rules = [AlertRule.from_dict(spec) for spec in specs]
+        logger.info(f"Compiled {len(rules)} alert rules")
+        return cls(rules)
+
+    def _series_for(self, metric: str, labels: LabelSet) -> _Series:
+        key = (metric, labels)
+        series = self._series.get(key)
+        if series is None:
+            # Matching labels against rules happens once per series, not per sample
+            series = _Series()
+            for ladder in self._ladders.get(metric, []):
+                if ladder.matches(labels):
+                    series.ladders.append(ladder)
+                    series.windows.setdefault(ladder.window, _Window(ladder.window))
+            self._series[key] = series
+        return series
+
+    def observe(self, sample: Sample) -> List[RuleMatch]:
+        if sample.metric not in self._ladders or sample.value is None:
+            return []
+
+        series = self._series_for(sample.metric, _label_set(sample.labels))
+        value = float(sample.value)
+        for window in series.windows.values():
+            window.push(sample.timestamp, value)
+
+        matches = []
+        for ladder in series.ladders:
+            aggregate = series.windows[ladder.window].aggregate(ladder.aggregation)
+            if aggregate is None:
+                continue
+            rule = ladder.strictest(aggregate)
+            if rule is not None:
+                matches.append(RuleMatch(rule, dict(sample.labels), aggregate, sample.timestamp, sample.context))
+        return matches
+
+    def export_windows(self) -> List[Dict[str, Any]]:
+        """Samples held per series, for warm restarts; the widest window holds all of them"""
+        exported = []
+        for (metric, labels), series in self._series.items():
+            if not series.windows:
+                continue
+            widest = series.windows[max(series.windows)]
+            exported.append({'metric': metric, 'labels': dict(labels), 'samples': list(widest.samples)})
+        return exported
+
+    def import_windows(self, exported: Iterable[Dict[str, Any]]):
+        """Refill windows from export_windows() output without evaluating any rule"""
+        for entry in exported:
+            if entry['metric'] not in self._ladders:
+                continue
+            series = self._series_for(entry['metric'], _label_set(entry['labels']))
+            for timestamp, value in entry['samples']:
+                for window in series.windows.values():
+                    window.push(timestamp, value)
+
+    def evaluate(self, samples: Iterable[Sample]) -> List[RuleMatch]:
+        """Evaluate a batch of samples, possibly spanning metrics and networks, in one pass"""
+        matches = []
+        for sample in samples:
+            matches.extend(self.observe(sample))
+        return matches
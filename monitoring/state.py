@@ -0,0 +1,98 @@
+"""
+Warm-restart snapshots of the monitor's in-memory state
+The state is a JSON document compressed with zlib behind a short header,
+written atomically to a file or stored under a Redis key. Snapshots are
+taken periodically and on shutdown and restored in initialize(), so alert
+windows and active alerts survive a deploy.
+
+Configured from config['state']:
+    backend             'file' (default), 'redis' or null to disable
+    path                snapshot file for the file backend
+    key                 Redis key for the redis backend; give each replica its own
+    interval_seconds    seconds between periodic snapshots
+    max_age_seconds     older snapshots are ignored on restore
+"""
+
+import base64
+import json
+import os
+import tempfile
+import zlib
+from typing import Any, Dict, Optional
+
+MAGIC = b'CTKLMON'
+STATE_VERSION = 1
+
+
+class StateFormatError(Exception):
+    """Snapshot bytes are not a monitor state snapshot of a supported version"""
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    payload = zlib.compress(json.dumps(state, separators=(',', ':'), default=str).encode(), 6)
+    return MAGIC + bytes([STATE_VERSION]) + payload
+
+
+def decode_state(data: bytes) -> Dict[str, Any]:
+    if len(data) <= len(MAGIC) or not data.startswith(MAGIC):
+        raise StateFormatError("not a monitor state snapshot")
+    version = data[len(MAGIC)]
+    if version != STATE_VERSION:
+        raise StateFormatError(f"unsupported snapshot version {version}")
+    try:
+        return json.loads(zlib.decompress(data[len(MAGIC) + 1:]))
+    except (zlib.error, ValueError) as e:
+        raise StateFormatError(f"corrupt snapshot: {e}") from e
+
+
+class FileStateStore:
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, data: bytes):
+        # Write beside the target and rename, so a crash mid-write never leaves a torn snapshot
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.monitor-state-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self) -> Optional[bytes]:
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class RedisStateStore:
+    """Snapshot under one Redis key; base64 because the monitor's client decodes responses"""
+
+    def __init__(self, client, key: str):
+        self.client = client
+        self.key = key
+
+    def save(self, data: bytes):
+        self.client.set(self.key, base64.b64encode(data).decode())
+
+    def load(self) -> Optional[bytes]:
+        value = self.client.get(self.key)
+        return base64.b64decode(value) if value else None
+
+
+def state_store_from_config(config: Dict[str, Any], redis_client=None):
+    """Store for config['state'], or None when snapshots are disabled"""
+    backend = config.get('backend', 'file')
+    if backend is None:
+        return None
+    if backend == 'file':
+        return FileStateStore(config.get('path', 'monitor_state.bin'))
+    if backend == 'redis':
+        return RedisStateStore(redis_client, config.get('key', 'cataklism:monitor:state'))
+    raise ValueError(f"Unknown state backend '{backend}'")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the backend stats endpoints
+Serves /protocol/stats (with ETags), /protocol/stats/stream (SSE with
+Last-Event-ID resume) and /protocol/stats/ws (WebSocket) from a random
+walk, so the monitor's push ingestion can be exercised without the backend.
+
+    python stats_standin.py --port 8081 --interval 1
+    # then set config['api']['base_url'] to http://localhost:8081
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from aiohttp import web
+
+
+class StatsSource:
+    """Random-walk protocol stats with a replay buffer for resumed subscribers"""
+
+    def __init__(self, interval: float, buffer_size: int = 1000):
+        self.interval = interval
+        self.sequence = 0
+        self.history: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=buffer_size)
+        self.subscribers: List[asyncio.Queue] = []
+        self.stats = {
+            'tvl': 25_000_000.0,
+            'total_stakers': 4200,
+            'active_pools': 6,
+            'avg_apy': 18.5,
+            'token_price': 1.25,
+            'market_cap': 125_000_000.0,
+            'vault_tvl': 9_000_000.0,
+            'vault_apy': 12.0,
+            'gas_price': 25.0,
+            'block_number': 19_000_000,
+            'network_health': True,
+            'timestamp': time.time(),
+        }
+
+    def _step(self):
+        stats = self.stats
+        for key in ('tvl', 'market_cap', 'vault_tvl'):
+            stats[key] *= random.uniform(0.998, 1.002)
+        for key in ('avg_apy', 'vault_apy', 'token_price'):
+            stats[key] *= random.uniform(0.995, 1.005)
+        stats['gas_price'] = max(1.0, stats['gas_price'] * random.uniform(0.9, 1.1))
+        stats['total_stakers'] += random.choice((-1, 0, 0, 1, 2))
+        stats['block_number'] += max(1, round(self.interval / 12))
+        stats['timestamp'] = time.time()
+
+    def publish(self):
+        """Advance the walk and hand the new stats to every subscriber"""
+        self._step()
+        self.sequence += 1
+        event = (self.sequence, dict(self.stats))
+        self.history.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    async def run(self):
+        while True:
+            self.publish()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def etag(self) -> str:
+        return '"' + hashlib.sha1(json.dumps(self.stats, sort_keys=True).encode()).hexdigest()[:16] + '"'
+
+    def since(self, token) -> List[Tuple[int, Dict[str, Any]]]:
+        """Buffered events after a resume token"""
+        try:
+            last = int(token)
+        except (TypeError, ValueError):
+            return []
+        return [event for event in self.history if event[0] > last]
+
+
+async def stats(request: web.Request) -> web.Response:
+    source: StatsSource = request.app['source']
+    etag = source.etag
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers={'ETag': etag})
+    return web.json_response(source.stats, headers={'ETag': etag})
+
+
+async def stream(request: web.Request) -> web.StreamResponse:
+    source: StatsSource = request.app['source']
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+    await response.prepare(request)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    source.subscribers.append(queue)
+    try:
+        await response.write(b'retry: 5000\n\n')
+        for sequence, payload in source.since(request.headers.get('Last-Event-ID')):
+            await response.write(f"id: {sequence}\nevent: stats\ndata: {json.dumps(payload)}\n\n".encode())
+        while True:
+            try:
+                sequence, payload = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                await response.write(b': heartbeat\n\n')
+                continue
+            await response.write(f"id: {sequence}\nevent: stats\ndata: {json.dumps(payload)}\n\n".encode())
+    finally:
+        source.subscribers.remove(queue)
+
+
+async def websocket(request: web.Request) -> web.WebSocketResponse:
+    source: StatsSource = request.app['source']
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+
+    subscribe = await ws.receive_json()
+    queue: asyncio.Queue = asyncio.Queue()
+    source.subscribers.append(queue)
+    try:
+        for sequence, payload in source.since(subscribe.get('resume')):
+            await ws.send_json({'type': 'stats', 'id': sequence, 'data': payload})
+        while not ws.closed:
+            sequence, payload = await queue.get()
+            await ws.send_json({'type': 'stats', 'id': sequence, 'data': payload})
+    finally:
+        source.subscribers.remove(queue)
+    return ws
+
+
+def create_app(interval: float) -> web.Application:
+    app = web.Application()
+    app['source'] = StatsSource(interval)
+
+    async def _start(app):
+        app['runner_task'] = asyncio.create_task(app['source'].run())
+
+    async def _stop(app):
+        app['runner_task'].cancel()
+
+    app.on_startup.append(_start)
+    app.on_cleanup.append(_stop)
+    app.router.add_get('/protocol/stats', stats)
+    app.router.add_get('/protocol/stats/stream', stream)
+    app.router.add_get('/protocol/stats/ws', websocket)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between stats updates')
+    args = parser.parse_args()
+    web.run_app(create_app(args.interval), port=args.port)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from anomaly import HOURS_PER_WEEK, AnomalyDetector, fit_baseline, fit_baselines, week_slot
+
+MONDAY = datetime(2024, 1, 1)
+
+
+def test_week_slot():
+    assert week_slot(MONDAY) == 0
+    assert week_slot(MONDAY + timedelta(days=6, hours=23)) == HOURS_PER_WEEK - 1
+
+
+def test_baseline_follows_the_hour_of_week():
+    slots = np.repeat(np.arange(HOURS_PER_WEEK), 5)
+    values = np.where(slots % 24 < 12, 100.0, 200.0) + np.tile([-1.0, 0.0, 0.0, 0.0, 1.0], HOURS_PER_WEEK)
+
+    median, mad = fit_baseline(slots, values, min_samples=4)
+
+    assert median[3] == 100.0 and median[15] == 200.0
+    assert np.all(mad == 0.0)
+
+
+def test_sparse_slots_fall_back_to_hour_of_day_then_everything():
+    # Only Mondays are observed; other days borrow the same hour, and unseen hours the whole series
+    slots = np.repeat(np.arange(12), 4)
+    values = slots.astype(float) * 10
+
+    median, _ = fit_baseline(slots, values, min_samples=4)
+
+    assert median[5] == 50.0
+    assert median[24 + 5] == 50.0
+    assert median[20] == float(np.median(values))
+
+
+def test_fit_baselines_skips_empty_series():
+    fitted = fit_baselines({('protocol', 'tvl'): (np.array([0] * 4), np.ones(4)),
+                            ('protocol', 'empty'): (np.array([], dtype=int), np.array([]))}, 4)
+    assert list(fitted) == [('protocol', 'tvl')]
+
+
+def _warm(detector, samples=40, value=100.0):
+    """Build a baseline, then freeze it so later samples score predictably"""
+    for i in range(samples):
+        detector.observe('ethereum', 'gas_price', MONDAY + timedelta(minutes=i), value + (i % 3 - 1))
+    detector.learning_rate = 0.0
+    return MONDAY + timedelta(minutes=samples)
+
+
+def test_no_scores_before_enough_samples():
+    detector = AnomalyDetector(min_samples=30)
+    for i in range(29):
+        assert detector.observe('ethereum', 'gas_price', MONDAY + timedelta(minutes=i), 100.0 * (i + 1)) is None
+    assert detector.scores == {}
+
+
+def test_outlier_is_reported_once_per_excursion():
+    detector = AnomalyDetector(z_threshold=6, critical_z=1e9, cooldown_seconds=3600)
+    now = _warm(detector)
+
+    first = detector.observe('ethereum', 'gas_price', now, 500.0)
+    assert first is not None and first.score > 6
+    # Still far out a minute later: same excursion, inside the cooldown
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=1), 500.0) is None
+
+
+def test_excursion_is_reported_again_after_the_cooldown():
+    detector = AnomalyDetector(z_threshold=6, critical_z=1e9, cooldown_seconds=600)
+    now = _warm(detector)
+
+    assert detector.observe('ethereum', 'gas_price', now, 500.0) is not None
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=5), 500.0) is None
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=11), 500.0) is not None
+
+
+def test_recovery_clears_the_excursion():
+    detector = AnomalyDetector(z_threshold=6, critical_z=1e9, cooldown_seconds=3600)
+    now = _warm(detector)
+
+    assert detector.observe('ethereum', 'gas_price', now, 500.0) is not None
+    expected = detector.baselines[('ethereum', 'gas_price')].median[week_slot(now)]
+    detector.observe('ethereum', 'gas_price', now + timedelta(minutes=1), expected)
+    assert ('ethereum', 'gas_price') not in detector.alerted
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=2), 500.0) is not None
+
+
+def test_escalation_to_critical_is_reported_inside_the_cooldown():
+    detector = AnomalyDetector(z_threshold=6, cooldown_seconds=3600)
+    now = _warm(detector)
+    baseline = detector.baselines[('ethereum', 'gas_price')]
+    expected, scale = baseline.median[week_slot(now)], baseline._scale(week_slot(now))
+    warning_value, critical_value = expected + 8 * scale, expected + 40 * scale
+
+    assert detector.observe('ethereum', 'gas_price', now, warning_value) is not None
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=1), critical_value) is not None
+    assert detector.observe('ethereum', 'gas_price', now + timedelta(minutes=2), critical_value) is None
+
+
+def test_from_config_reads_cooldown_settings():
+    detector = AnomalyDetector.from_config({'z_threshold': 4, 'cooldown_seconds': 60, 'unrelated': 1})
+    assert (detector.z_threshold, detector.cooldown_seconds, detector.clear_z) == (4, 60, 2)
+    assert AnomalyDetector.from_config({'clear_z': 3}).clear_z == 3
+
+
+def test_refit_applies_seasonal_baselines():
+    detector = AnomalyDetector(min_samples=1, slot_min_samples=2)
+    detector.seed('protocol', 'tvl', [MONDAY, MONDAY, MONDAY + timedelta(hours=1)], [10.0, 12.0, None])
+
+    detector.apply_fit(fit_baselines(detector.refit_payload(), detector.slot_min_samples))
+
+    baseline = detector.baselines[('protocol', 'tvl')]
+    assert baseline.fitted and baseline.median[0] == pytest.approx(11.0)
@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cluster
+from cluster import Cluster, MemoryLeaseStore, rendezvous_owner
+
+TARGETS = [f"network:{i}" for i in range(500)]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cluster module's view of time; the event loop keeps the real clock
+    monkeypatch.setattr(cluster, 'time', SimpleNamespace(time=clock, monotonic=clock))
+    return clock
+
+
+class FlakyStore(MemoryLeaseStore):
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+    def heartbeat(self, replica_id, ttl):
+        if self.down:
+            raise ConnectionError("redis unreachable")
+        return super().heartbeat(replica_id, ttl)
+
+
+def test_leader_lease_is_renewed_only_by_its_holder(clock):
+    store = MemoryLeaseStore()
+
+    assert store.acquire_leader('a', ttl=15)
+    assert not store.acquire_leader('b', ttl=15)
+    clock.now += 10
+    assert store.acquire_leader('a', ttl=15)  # renewed to 1025
+    clock.now += 10
+    assert not store.acquire_leader('b', ttl=15)
+
+    # Once it lapses a successor takes over, and the old leader cannot extend it
+    clock.now += 6
+    assert store.acquire_leader('b', ttl=15)
+    assert not store.acquire_leader('a', ttl=15)
+
+
+def test_leaving_releases_only_our_own_lease(clock):
+    store = MemoryLeaseStore()
+    store.acquire_leader('a', ttl=15)
+
+    store.leave('b')
+    assert not store.acquire_leader('b', ttl=15)
+
+    store.leave('a')
+    assert store.acquire_leader('b', ttl=15)
+
+
+def test_members_drop_out_when_they_stop_heartbeating(clock):
+    store = MemoryLeaseStore()
+    store.heartbeat('a', ttl=15)
+    clock.now += 10
+    assert store.heartbeat('b', ttl=15) == ['a', 'b']
+    clock.now += 6
+    assert store.heartbeat('b', ttl=15) == ['b']
+
+
+def test_alert_queue_hands_out_each_alert_once():
+    store = MemoryLeaseStore()
+    for i in range(5):
+        store.publish_alert({'n': i})
+    assert [alert['n'] for alert in store.take_alerts(3)] == [0, 1, 2]
+    assert [alert['n'] for alert in store.take_alerts(3)] == [3, 4]
+    assert store.take_alerts(3) == []
+
+
+def test_rendezvous_moves_only_the_targets_of_a_member_that_leaves():
+    members = ['a', 'b', 'c', 'd']
+    before = {target: rendezvous_owner(members, target) for target in TARGETS}
+    after = {target: rendezvous_owner(['a', 'b', 'd'], target) for target in TARGETS}
+
+    moved = {target for target in TARGETS if before[target] != after[target]}
+    assert moved == {target for target in TARGETS if before[target] == 'c'}
+    # Every member gets a fair share
+    assert all(len(TARGETS) / 8 < list(before.values()).count(member) < len(TARGETS) / 2 for member in members)
+
+
+def test_rendezvous_moves_targets_only_to_a_member_that_joins():
+    before = {target: rendezvous_owner(['a', 'b', 'c'], target) for target in TARGETS}
+    after = {target: rendezvous_owner(['c', 'new', 'a', 'b'], target) for target in TARGETS}
+
+    assert {after[target] for target in TARGETS if before[target] != after[target]} == {'new'}
+    assert rendezvous_owner([], 'network:0') is None
+
+
+def test_replicas_split_targets_and_elect_one_leader(clock):
+    store = MemoryLeaseStore()
+    replicas = [Cluster(store, replica_id=name) for name in ('a', 'b', 'c')]
+
+    async def _join():
+        for replica in replicas:
+            await replica.join()
+        # A second round so every replica has seen the full membership
+        for replica in replicas:
+            await replica.join()
+
+    asyncio.run(_join())
+
+    assert all(replica.members == ('a', 'b', 'c') for replica in replicas)
+    assert all(sum(replica.owns(target) for replica in replicas) == 1 for target in TARGETS)
+    assert [replica.dispatches_alerts for replica in replicas] == [True, False, False]
+
+
+def test_replica_is_standalone_until_it_joins_and_after_losing_the_store(clock):
+    store = FlakyStore()
+    replica, peer = Cluster(store, replica_id='a', lease_ttl=15), Cluster(store, replica_id='b', lease_ttl=15)
+
+    assert replica.standalone
+    assert all(replica.owns(target) for target in TARGETS)
+
+    asyncio.run(peer.join())
+    asyncio.run(replica.join())
+    assert not replica.standalone
+    assert not all(replica.owns(target) for target in TARGETS)
+    assert not replica.dispatches_alerts  # b took the lease first
+
+    # A failed heartbeat alone keeps the last membership until a lease has passed
+    store.down = True
+    clock.now += 5
+    asyncio.run(replica._tick())
+    assert replica.members == ('a', 'b')
+    assert not all(replica.owns(target) for target in TARGETS)
+
+    clock.now += 11
+    asyncio.run(replica._tick())
+    assert replica.standalone and replica.members == ()
+    assert all(replica.owns(target) for target in TARGETS)
+    assert replica.dispatches_alerts
+
+    # Back in contact, ownership is split again
+    store.down = False
+    asyncio.run(peer.join())
+    asyncio.run(replica.join())
+    assert replica.members == ('a', 'b')
+    assert not all(replica.owns(target) for target in TARGETS)
+
+
+def test_from_config_backends():
+    assert Cluster.from_config({'backend': 'memory', 'replica_id': 'x'}).replica_id == 'x'
+    with pytest.raises(ValueError):
+        Cluster.from_config({'backend': 'etcd'})
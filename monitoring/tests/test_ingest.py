@@ -0,0 +1,186 @@
+import asyncio
+import contextlib
+
+import pytest
+from aiohttp import web
+
+import ingest
+from ingest import StatsFeed
+from stats_standin import create_app
+
+
+@contextlib.asynccontextmanager
+async def standin():
+    """The stats stand-in on a free local port; the source only advances when published to"""
+    app = create_app(interval=3600)
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        yield app['source'], f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+async def _take(updates, count):
+    return [await asyncio.wait_for(updates.__anext__(), timeout=5) for _ in range(count)]
+
+
+async def _publish_to_subscriber(source, times):
+    """Publish once the feed is subscribed; the stream only carries events from then on"""
+    while not source.subscribers:
+        await asyncio.sleep(0.01)
+    for _ in range(times):
+        source.publish()
+
+
+async def _take_published(source, updates, count):
+    received = asyncio.ensure_future(_take(updates, count))
+    await _publish_to_subscriber(source, count)
+    return await received
+
+
+def _run(scenario):
+    asyncio.run(asyncio.wait_for(scenario(), timeout=20))
+
+
+@pytest.mark.parametrize('transport', ['sse', 'websocket'])
+def test_stream_delivers_published_stats_in_order(transport):
+    async def scenario():
+        async with standin() as (source, url):
+            feed = StatsFeed(url, {'transport': transport})
+            updates = feed.updates()
+            try:
+                received = await _take_published(source, updates, 3)
+            finally:
+                await updates.aclose()
+
+            # The event published at start-up went out before the feed subscribed
+            assert received == [payload for sequence, payload in source.history if sequence > 1]
+            assert feed.source == 'stream'
+            assert feed.resume_token == '4'
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize('transport', ['sse', 'websocket'])
+def test_reconnect_resumes_after_the_last_event(transport):
+    async def scenario():
+        async with standin() as (source, url):
+            feed = StatsFeed(url, {'transport': transport})
+            updates = feed.updates()
+            await _take_published(source, updates, 1)
+            await updates.aclose()
+
+            # Published while disconnected; replayed from the buffer, without the one already seen
+            source.publish()
+            source.publish()
+            updates = feed.updates()
+            try:
+                missed = await _take(updates, 2)
+            finally:
+                await updates.aclose()
+
+            assert missed == [payload for sequence, payload in source.history if sequence > 2]
+            assert feed.resume_token == '4'
+
+    _run(scenario)
+
+
+def test_polling_uses_etags_and_skips_unchanged_stats(monkeypatch):
+    async def scenario():
+        async with standin() as (source, url):
+            feed = StatsFeed(url, {'transport': 'poll', 'poll_interval': 0})
+            polls = []
+            poll = feed._poll
+
+            async def _counted(session):
+                polls.append(session)
+                if len(polls) == 3:
+                    source.publish()
+                return await poll(session)
+
+            monkeypatch.setattr(feed, '_poll', _counted)
+            updates = feed.updates()
+            try:
+                first, second = await _take(updates, 2)
+            finally:
+                await updates.aclose()
+
+            # The second poll was answered 304 and yielded nothing
+            assert len(polls) == 3
+            assert second == source.stats != first
+            assert feed.etag == source.etag
+            assert feed.source == 'poll'
+
+    _run(scenario)
+
+
+def test_unavailable_stream_falls_back_to_polling(monkeypatch):
+    monkeypatch.setattr(ingest.random, 'uniform', lambda low, high: 1.0)
+
+    async def scenario():
+        async with standin() as (source, url):
+            feed = StatsFeed(url, {'url': f"{url}/missing", 'poll_interval': 0, 'retry_after': 60})
+            updates = feed.updates()
+            try:
+                payload, = await _take(updates, 1)
+            finally:
+                await updates.aclose()
+
+            assert payload == source.stats
+            assert feed.source == 'poll'
+            assert feed._backoff() == 60
+
+    _run(scenario)
+
+
+def test_unknown_transport_is_rejected():
+    with pytest.raises(ValueError):
+        StatsFeed('http://localhost', {'transport': 'carrier-pigeon'})
+
+
+def test_replay_after_a_polling_fallback_skips_what_polling_already_delivered(monkeypatch):
+    monkeypatch.setattr(ingest.random, 'uniform', lambda low, high: 1.0)
+
+    async def scenario():
+        async with standin() as (source, url):
+            feed = StatsFeed(url, {'poll_interval': 0.01})
+            updates = feed.updates()
+            await _take_published(source, updates, 1)
+            await updates.aclose()
+            feed.retry_after = 0.05  # the stand-in's retry field asked for 5s
+
+            # The stream drops once; polling picks up the latest snapshot meanwhile
+            source.publish()
+            source.publish()
+            sse, attempts = feed._sse, []
+
+            def _flaky(session):
+                attempts.append(session)
+                if len(attempts) == 1:
+                    raise ingest.StreamUnavailable('dropped')
+                return sse(session)
+
+            monkeypatch.setattr(feed, '_sse', _flaky)
+            updates = feed.updates()
+            try:
+                polled, = await _take(updates, 1)
+                # Back on the stream, resuming from before the poll: 3 and 4 are replayed but dropped
+                fresh = asyncio.ensure_future(_take(updates, 1))
+                while feed.resume_token != '4':
+                    await asyncio.sleep(0.01)
+                source.publish()
+                fresh, = await fresh
+            finally:
+                await updates.aclose()
+
+            blocks = {sequence: payload['block_number'] for sequence, payload in source.history}
+            assert polled['block_number'] == blocks[4]
+            assert fresh['block_number'] == blocks[5]
+            assert feed.source == 'stream'
+            assert feed.resume_token == '5'
+
+    _run(scenario)
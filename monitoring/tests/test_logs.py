@@ -0,0 +1,130 @@
+import logging
+import queue
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import logs
+from logs import DroppingQueueHandler, JsonFormatter, RateLimitFilter, SizeAndTimeRotatingFileHandler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(logs, 'time', SimpleNamespace(time=clock, monotonic=clock))
+    return clock
+
+
+def _record(msg='stream dropped', *args, name='ingest', level=logging.WARNING, **extra):
+    return logging.makeLogRecord({'name': name, 'levelno': level, 'levelname': logging.getLevelName(level),
+                                  'msg': msg, 'args': args, **extra})
+
+
+def test_rate_limit_lets_a_burst_through_then_reports_what_it_suppressed(clock):
+    limit = RateLimitFilter(burst=3, period=60)
+
+    assert [limit.filter(_record()) for _ in range(5)] == [True, True, True, False, False]
+    clock.now += 59
+    assert not limit.filter(_record())
+
+    clock.now += 1
+    record = _record()
+    assert limit.filter(record)
+    assert record.suppressed == 3
+    # A quiet window reports nothing on the next one
+    clock.now += 60
+    record = _record()
+    assert limit.filter(record) and not hasattr(record, 'suppressed')
+
+
+def test_rate_limit_keys_on_logger_level_and_formatted_message(clock):
+    limit = RateLimitFilter(burst=1, period=60)
+
+    assert limit.filter(_record('block %d', 1))
+    assert not limit.filter(_record('block %d', 1))
+    assert limit.filter(_record('block %d', 2))
+    assert limit.filter(_record('block %d', 1, level=logging.ERROR))
+    assert limit.filter(_record('block %d', 1, name='mempool'))
+
+
+def test_rate_limit_prunes_expired_windows(clock):
+    limit = RateLimitFilter(burst=1, period=60, max_keys=2)
+    limit.filter(_record('a'))
+    limit.filter(_record('b'))
+
+    clock.now += 60
+    limit.filter(_record('c'))
+
+    assert set(key[2] for key in limit._windows) == {'c'}
+
+
+def test_full_queue_drops_without_blocking_and_counts_the_drops():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+
+    for n in range(5):
+        handler.handle(_record('tick %d', n))
+    assert handler.dropped == 3
+
+    log_queue.get_nowait()
+    handler.handle(_record('tick %d', 5))
+
+    kept = [log_queue.get_nowait() for _ in range(2)]
+    assert [record.msg for record in kept] == ['tick 1', 'tick 5']
+    assert kept[1].dropped_before == 3 and handler.dropped == 0
+
+
+def test_queued_records_are_resolved_for_the_listener_thread():
+    log_queue = queue.Queue()
+    handler = DroppingQueueHandler(log_queue)
+    try:
+        raise ValueError("bad payload")
+    except ValueError:
+        record = _record('block %d failed', 7, exc_info=sys.exc_info())
+    handler.handle(record)
+
+    queued = log_queue.get_nowait()
+    assert (queued.msg, queued.args, queued.exc_info) == ('block 7 failed', None, None)
+    assert 'ValueError: bad payload' in queued.exc_text
+    assert 'ValueError: bad payload' in JsonFormatter().format(queued)
+
+
+def test_file_rotates_by_size(tmp_path):
+    path = tmp_path / 'monitor.log'
+    handler = SizeAndTimeRotatingFileHandler(str(path), max_bytes=100, backup_count=2)
+    try:
+        for n in range(12):
+            handler.handle(_record('x' * 30 + str(n)))
+    finally:
+        handler.close()
+
+    # Three records fit per file; only backup_count old files are kept
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['monitor.log', 'monitor.log.1', 'monitor.log.2']
+    assert path.read_text().splitlines()[-1].endswith('11')
+
+
+def test_file_rotates_by_age(tmp_path, clock):
+    path = tmp_path / 'monitor.log'
+    handler = SizeAndTimeRotatingFileHandler(str(path), backup_count=5, interval=3600)
+    try:
+        handler.handle(_record('first'))
+        clock.now += 3599
+        handler.handle(_record('same file'))
+        clock.now += 1
+        handler.handle(_record('rotated'))
+        clock.now += 3599
+        handler.handle(_record('interval restarts at the rotation'))
+    finally:
+        handler.close()
+
+    assert (tmp_path / 'monitor.log.1').read_text().splitlines() == ['first', 'same file']
+    assert path.read_text().splitlines() == ['rotated', 'interval restarts at the rotation']
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from eth_abi import encode_abi
+from eth_utils import to_checksum_address
+
+from mempool import MempoolWatcher, Watchlist
+
+CORE, VAULT = '0x' + 'c0' * 19 + 'aB', '0x' + '7a' * 20
+OTHER = '0x' + 'ee' * 20
+CONTRACTS = {'core': CORE, 'vault': VAULT}
+
+
+@pytest.fixture
+def watchlist():
+    return Watchlist.from_config(CONTRACTS)
+
+
+def _calldata(watchlist, contract, function, *args):
+    watched = next(call for call in watchlist.calls.values() if call.contract == contract and call.function == function)
+    return watched.selector + encode_abi(watched.arg_types, args).hex()
+
+
+def _tx(to, data='0x', tx_hash='0x' + '11' * 32):
+    # Field order as geth renders a full pending transaction
+    return {
+        'blockHash': None, 'blockNumber': None, 'from': '0x' + 'f0' * 20, 'gas': '0x5208',
+        'gasPrice': '0x3b9aca00', 'hash': tx_hash, 'input': data, 'nonce': '0x1', 'to': to,
+        'transactionIndex': None, 'value': '0x0', 'type': '0x0', 'chainId': '0x1',
+        'v': '0x25', 'r': '0x' + '22' * 32, 's': '0x' + '33' * 32,
+    }
+
+
+def _message(tx, **dumps):
+    return json.dumps({
+        'jsonrpc': '2.0', 'method': 'eth_subscription',
+        'params': {'subscription': '0x' + '9f' * 16, 'result': tx},
+    }, **dumps)
+
+
+SPACINGS = {
+    'geth': {'separators': (',', ':')},
+    'json.dumps': {},
+    'indented': {'indent': 2},
+    'space before colon': {'separators': (', ', ' : ')},
+}
+
+
+@pytest.mark.parametrize('spacing', SPACINGS.values(), ids=list(SPACINGS))
+@pytest.mark.parametrize('to', [CORE, CORE.lower(), CORE.upper().replace('0X', '0x'), to_checksum_address(VAULT)])
+def test_transactions_to_watched_contracts_are_addressed(watchlist, spacing, to):
+    assert watchlist.addressed(_message(_tx(to), **spacing))
+
+
+@pytest.mark.parametrize('spacing', SPACINGS.values(), ids=list(SPACINGS))
+def test_other_transactions_and_contract_creations_are_not(watchlist, spacing):
+    assert not watchlist.addressed(_message(_tx(OTHER), **spacing))
+    assert not watchlist.addressed(_message(_tx(None, data='0x' + CORE[2:] * 3), **spacing))
+    assert not watchlist.addressed(_message('0x' + '11' * 32, **spacing))  # hash-only stream
+
+
+@pytest.mark.parametrize('spacing', SPACINGS.values(), ids=list(SPACINGS))
+def test_fast_path_never_rejects_a_watched_call(watchlist, spacing):
+    for watched in watchlist.calls.values():
+        for to in (watched.address, to_checksum_address(watched.address)):
+            raw = _message(_tx(to, data=watched.selector), **spacing)
+            assert watchlist.match(json.loads(raw)['params']['result']) is watched
+            assert watchlist.addressed(raw)
+
+
+@pytest.fixture
+def watcher(watchlist):
+    return MempoolWatcher('ethereum', {'ws_url': 'ws://node'}, watchlist, min_amount_wei=10 ** 18)
+
+
+def test_check_decodes_matches_and_reports_each_hash_once(watchlist, watcher):
+    tx = _tx(to_checksum_address(CORE), data=_calldata(watchlist, 'core', 'withdraw', 3, 2 * 10 ** 18))
+
+    call = watcher._check(tx)
+
+    assert (call.watched.contract, call.watched.function) == ('core', 'withdraw')
+    assert call.args == (3, 2 * 10 ** 18) and call.amount_wei == 2 * 10 ** 18
+    assert watcher._check(tx) is None
+    assert (watcher.matched, watcher.reported) == (1, 1)
+
+
+def test_check_skips_small_amounts_and_undecodable_calls(watchlist, watcher):
+    small = _tx(CORE, data=_calldata(watchlist, 'core', 'withdraw', 3, 10 ** 17))
+    truncated = _tx(VAULT, data=_calldata(watchlist, 'vault', 'withdraw', 10 ** 19)[:20], tx_hash='0x' + '44' * 32)
+
+    assert watcher._check(small) is None
+    assert watcher._check(truncated) is None
+    assert watcher._check(_tx(CORE, data='0xdeadbeef')) is None
+    # Thresholded and undecodable calls still count as matched
+    assert (watcher.matched, watcher.reported) == (2, 0)
+
+
+def test_admin_calls_are_reported_whatever_their_arguments(watchlist, watcher):
+    call = watcher._check(_tx(VAULT, data=_calldata(watchlist, 'vault', 'pause')))
+    assert call.watched.level == 'critical' and call.amount_wei is None
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+
+from reload import ConfigReloader, Rollback, diff_config
+
+CONFIG = {
+    'networks': {'ethereum': {'rpc_url': 'http://eth'}, 'polygon': {'rpc_url': 'http://polygon'}},
+    'contracts': {'ethereum': {'core': '0x01'}, 'polygon': {'core': '0x02'}},
+    'thresholds': {'tvl_drop_percent': 10},
+    'api': {'base_url': 'http://api'},
+}
+
+
+def _changed(**sections):
+    return {**json.loads(json.dumps(CONFIG)), **sections}
+
+
+def test_identical_configs_have_no_changes():
+    diff = diff_config(CONFIG, json.loads(json.dumps(CONFIG)))
+    assert not diff.changed
+    assert not diff.networks and not diff.networks_touched
+
+
+def test_sections_are_diffed_by_value():
+    new = _changed(thresholds={'tvl_drop_percent': 20}, reload={'watch_interval_seconds': 0})
+    del new['api']
+
+    diff = diff_config(CONFIG, new)
+
+    assert diff.sections.changed == {'thresholds'}
+    assert diff.sections.added == {'reload'}
+    assert diff.sections.removed == {'api'}
+    assert diff.changed == {'thresholds', 'reload', 'api'}
+
+
+def test_networks_are_diffed_one_by_one():
+    new = _changed(
+        networks={'ethereum': {'rpc_url': 'http://eth-2'}, 'arbitrum': {'rpc_url': 'http://arb'}},
+        contracts={'ethereum': {'core': '0x01'}, 'polygon': {'core': '0x03'}},
+    )
+
+    diff = diff_config(CONFIG, new)
+
+    assert diff.networks.added == {'arbitrum'}
+    assert diff.networks.removed == {'polygon'}
+    assert diff.networks.changed == {'ethereum'}
+    assert diff.contracts.changed == {'polygon'}
+    assert diff.networks_touched == {'arbitrum', 'polygon', 'ethereum'}
+
+
+def test_contract_changes_touch_a_network_with_unchanged_connection():
+    diff = diff_config(CONFIG, _changed(contracts={'ethereum': {'core': '0x01'}, 'polygon': {'core': '0x03'}}))
+    assert not diff.networks
+    assert diff.networks_touched == {'polygon'}
+
+
+def test_rollback_releases_newest_first_only_on_failure():
+    released = []
+
+    async def _close_pool():
+        released.append('pool')
+
+    async def _fail():
+        async with Rollback() as rollback:
+            rollback.on_failure(lambda: released.append('client'))
+            rollback.on_failure(_close_pool)
+            raise RuntimeError("bad state backend")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_fail())
+    assert released == ['pool', 'client']
+
+    async def _succeed():
+        async with Rollback() as rollback:
+            rollback.on_failure(lambda: released.append('kept'))
+
+    asyncio.run(_succeed())
+    assert 'kept' not in released
+
+
+def test_rollback_keeps_releasing_after_a_release_fails():
+    released = []
+
+    def _broken():
+        raise OSError("already closed")
+
+    async def _fail():
+        async with Rollback() as rollback:
+            rollback.on_failure(lambda: released.append('client'))
+            rollback.on_failure(_broken)
+            raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(_fail())
+    assert released == ['client']
+
+
+def test_reloader_keeps_running_after_a_bad_file_or_a_failed_apply(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(CONFIG))
+    applied, outcomes = [], iter([RuntimeError("pool refused"), None])
+
+    async def _apply(config):
+        applied.append(config)
+        outcome = next(outcomes)
+        if outcome is not None:
+            raise outcome
+
+    async def _scenario():
+        reloader = ConfigReloader(str(path), _apply, watch_interval=0)
+        task = asyncio.ensure_future(reloader.run())
+        try:
+            for content in ('{"networks": ', json.dumps(CONFIG), json.dumps(_changed(api={'base_url': 'http://b'}))):
+                path.write_text(content)
+                reloader._requested.set()
+                await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(_scenario())
+    # The half-written file was skipped; the failed apply did not stop the next one
+    assert [config['api']['base_url'] for config in applied] == ['http://api', 'http://b']
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from anomaly import AnomalyDetector
+from replay import MetricsReplay
+from rules import Sample
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeMonitor:
+    """Records what the replay feeds it, in order, and when the detector is refitted"""
+
+    def __init__(self):
+        self.seen = []
+        self.refits = []
+        self.replay_alerts = self.replay_time = None
+        self.anomaly_detector = AnomalyDetector()
+        apply_fit = self.anomaly_detector.apply_fit
+
+        def _apply_fit(fitted):
+            self.refits.append(self.seen[-1][1])
+            apply_fit(fitted)
+
+        self.anomaly_detector.apply_fit = _apply_fit
+
+    async def _evaluate_metrics(self, metrics):
+        assert self.replay_time == metrics.timestamp and self.replay_alerts is not None
+        self.seen.append(('metric', metrics.timestamp.timestamp() - START.timestamp()))
+
+    async def _evaluate_rules(self, samples):
+        sample, = samples
+        self.seen.append(('event', sample.timestamp - START.timestamp()))
+
+
+async def _stream(items):
+    for item in items:
+        yield item
+
+
+def _metrics(*offsets):
+    return _stream([(START.timestamp() + offset, SimpleNamespace(timestamp=START + timedelta(seconds=offset)))
+                    for offset in offsets])
+
+
+def _events(*offsets):
+    return _stream([(START.timestamp() + offset, Sample('core_deposit', 1.0, {}, START.timestamp() + offset))
+                    for offset in offsets])
+
+
+def _replay(metrics, events, refit_interval=3600):
+    monitor = FakeMonitor()
+    summary = asyncio.run(MetricsReplay(monitor, refit_interval=refit_interval)._merge(metrics, events))
+    return monitor, summary
+
+
+def test_streams_are_merged_in_time_order_metrics_first_on_ties():
+    monitor, summary = _replay(_metrics(0, 10, 20, 30), _events(5, 10, 25, 40))
+
+    assert monitor.seen == [
+        ('metric', 0), ('event', 5), ('metric', 10), ('event', 10),
+        ('metric', 20), ('event', 25), ('metric', 30), ('event', 40),
+    ]
+    assert (summary.samples, summary.events) == (4, 4)
+    assert (summary.first, summary.last) == (START, START + timedelta(seconds=30))
+    # Capture-only mode is switched off again afterwards
+    assert monitor.replay_alerts is None and monitor.replay_time is None
+
+
+def test_either_stream_may_run_out_first():
+    monitor, _ = _replay(_metrics(0, 50, 60), _events(1))
+    assert [at for _, at in monitor.seen] == [0, 1, 50, 60]
+
+    monitor, summary = _replay(_metrics(), _events(3, 4))
+    assert monitor.seen == [('event', 3), ('event', 4)]
+    assert summary.first is None
+
+    monitor, _ = _replay(_metrics(7), None)
+    assert monitor.seen == [('metric', 7)]
+
+
+def test_refits_once_per_interval_of_replayed_time():
+    monitor, _ = _replay(_metrics(*range(0, 510, 30)), None, refit_interval=100)
+
+    # Counted from the first sample, and again from each refit
+    assert monitor.refits == [120, 240, 360, 480]
+
+
+def test_events_advance_the_refit_clock_too():
+    monitor, _ = _replay(_metrics(0, 250), _events(50, 100, 150, 200), refit_interval=100)
+    assert monitor.refits == [100, 200]
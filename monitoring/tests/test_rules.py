@@ -0,0 +1,88 @@
+import pytest
+
+from rules import AlertRule, RuleEngine, Sample
+
+
+def _engine(*specs):
+    return RuleEngine.from_config(specs)
+
+
+def _gas(threshold, level):
+    return {'name': f"gas_{level}", 'metric': 'gas', 'comparator': '>', 'threshold': threshold, 'level': level}
+
+
+def test_ladder_fires_only_the_strictest_rule():
+    engine = _engine(_gas(100, 'warning'), _gas(200, 'critical'), _gas(500, 'emergency'))
+
+    assert engine.evaluate([Sample('gas', 50, {}, 1)]) == []
+    assert [m.rule.level for m in engine.evaluate([Sample('gas', 150, {}, 2)])] == ['warning']
+    assert [m.rule.level for m in engine.evaluate([Sample('gas', 250, {}, 3)])] == ['critical']
+    assert [m.rule.level for m in engine.evaluate([Sample('gas', 900, {}, 4)])] == ['emergency']
+
+
+@pytest.mark.parametrize('comparator,value,expected', [
+    ('>', 10, 'b'), ('>=', 10, 'a'), ('<', 10, None), ('<=', 10, 'a'), ('<', 4, 'b'), ('>', 3, None),
+])
+def test_comparators_at_the_boundary(comparator, value, expected):
+    engine = _engine(
+        {'name': 'a', 'metric': 'm', 'comparator': comparator, 'threshold': 10},
+        {'name': 'b', 'metric': 'm', 'comparator': comparator, 'threshold': 5},
+    )
+    matches = engine.evaluate([Sample('m', value, {}, 1)])
+    assert [m.rule.name for m in matches] == ([expected] if expected else [])
+
+
+def test_label_matchers_select_series():
+    engine = _engine({'name': 'eth_gas', 'metric': 'gas', 'comparator': '>', 'threshold': 1,
+                      'labels': {'network': 'ethereum'}})
+
+    assert engine.evaluate([Sample('gas', 5, {'network': 'polygon'}, 1)]) == []
+    match, = engine.evaluate([Sample('gas', 5, {'network': 'ethereum', 'pool': '1'}, 1)])
+    assert match.key == 'eth_gas_ethereum_1'
+
+
+def test_pct_change_window_survives_one_late_poll():
+    # Sized as the monitor does: 2.5 poll intervals of 60s
+    engine = _engine({'name': 'tvl_drop', 'metric': 'tvl', 'aggregation': 'pct_change', 'window': 150,
+                      'comparator': '<', 'threshold': -20, 'message': 'TVL changed by {value:.1f}% in {window:.0f}s'})
+
+    assert engine.evaluate([Sample('tvl', 100, {}, 0)]) == []
+    # The next poll took 100s instead of 60s
+    match, = engine.evaluate([Sample('tvl', 70, {}, 100)])
+    assert match.value == pytest.approx(-30)
+    assert match.message == 'TVL changed by -30.0% in 150s'
+
+
+def test_context_fills_messages_without_splitting_series():
+    engine = _engine({'name': 'api_status', 'metric': 'api_status_ok', 'comparator': '<', 'threshold': 1,
+                      'message': '{endpoint} returned status {status}'})
+
+    match, = engine.evaluate([Sample('api_status_ok', 0, {'endpoint': '/health'}, 1, {'status': 502})])
+    assert match.message == '/health returned status 502'
+    engine.evaluate([Sample('api_status_ok', 0, {'endpoint': '/health'}, 2, {'status': 503})])
+    assert len(engine._series) == 1
+    # Unknown fields are left as placeholders rather than raising
+    assert _engine({'name': 'x', 'metric': 'm', 'comparator': '>', 'threshold': 0, 'message': '{nope}'}) \
+        .evaluate([Sample('m', 1, {}, 1)])[0].message == '{nope}'
+
+
+def test_windows_survive_export_and_import():
+    spec = {'name': 'sum', 'metric': 'm', 'aggregation': 'sum', 'window': 100, 'comparator': '>', 'threshold': 10}
+    engine = _engine(spec)
+    engine.evaluate([Sample('m', 6, {}, 1)])
+
+    restored = _engine(spec)
+    restored.import_windows(engine.export_windows())
+    assert [m.value for m in restored.evaluate([Sample('m', 6, {}, 2)])] == [12]
+
+
+@pytest.mark.parametrize('spec', [
+    {'metric': 'm', 'comparator': '==', 'threshold': 1},
+    {'metric': 'm', 'comparator': '>', 'threshold': 1, 'aggregation': 'median', 'window': 5},
+    {'metric': 'm', 'comparator': '>', 'threshold': 1, 'aggregation': 'avg'},
+    {'metric': 'm', 'comparator': '>', 'threshold': 1, 'level': 'panic'},
+    {'metric': 'm', 'comparator': '>'},
+])
+def test_invalid_rules_are_rejected(spec):
+    with pytest.raises(ValueError):
+        AlertRule.from_dict(spec)
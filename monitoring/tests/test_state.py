@@ -0,0 +1,71 @@
+import os
+import zlib
+
+import pytest
+
+import state
+from state import MAGIC, STATE_VERSION, FileStateStore, StateFormatError, decode_state, encode_state
+
+STATE = {'saved_at': 1700000000.5, 'windows': {'tvl': [[1, 2.5], [2, 3.0]]}, 'active_alerts': ['tvl_drop']}
+
+
+def test_round_trip():
+    data = encode_state(STATE)
+    assert data.startswith(MAGIC + bytes([STATE_VERSION]))
+    assert decode_state(data) == STATE
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    MAGIC,
+    b'{"saved_at": 1}',
+    b'\x89PNG\r\n\x1a\n' + b'\0' * 32,
+])
+def test_foreign_bytes_are_rejected(data):
+    with pytest.raises(StateFormatError, match='not a monitor state snapshot'):
+        decode_state(data)
+
+
+def test_other_versions_are_rejected():
+    data = encode_state(STATE)
+    newer = data[:len(MAGIC)] + bytes([STATE_VERSION + 1]) + data[len(MAGIC) + 1:]
+    with pytest.raises(StateFormatError, match=f'version {STATE_VERSION + 1}'):
+        decode_state(newer)
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:-5],  # truncated
+    lambda data: data[:len(MAGIC) + 1] + b'garbage',
+    lambda data: data[:len(MAGIC) + 1] + zlib.compress(b'{not json'),
+])
+def test_corrupt_snapshots_raise_the_format_error(corrupt):
+    with pytest.raises(StateFormatError):
+        decode_state(corrupt(encode_state(STATE)))
+
+
+def test_file_store_round_trip_and_missing_file(tmp_path):
+    store = FileStateStore(str(tmp_path / 'state.bin'))
+    assert store.load() is None
+
+    store.save(encode_state(STATE))
+    store.save(encode_state({**STATE, 'saved_at': 2.0}))
+
+    assert decode_state(store.load())['saved_at'] == 2.0
+    assert os.listdir(tmp_path) == ['state.bin']
+
+
+def test_failed_write_keeps_the_previous_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / 'state.bin'
+    store = FileStateStore(str(path))
+    store.save(encode_state(STATE))
+
+    def _crash(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(state.os, 'fsync', _crash)
+    with pytest.raises(OSError):
+        store.save(encode_state({**STATE, 'saved_at': 2.0}))
+
+    # The old snapshot is intact and the temporary file is gone
+    assert decode_state(path.read_bytes()) == STATE
+    assert os.listdir(tmp_path) == ['state.bin']
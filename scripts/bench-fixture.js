@@ -0,0 +1,118 @@
+const { ethers, network } = require("hardhat");
+const fs = require("fs");
+
+/**
+ * Cataklism Benchmark Fixture
+ * Deploys the protocol to a local node and seeds it with pools, stakers and
+ * vault positions for the CLI benchmarks (cli/benchmarks). `hardhat run`
+ * takes no script arguments, so the fixture size comes from the environment:
+ *
+ *   BENCH_POOLS             staking pools; pool 0 stakes CTKL, the rest mock tokens
+ *   BENCH_STAKERS           funded staker wallets, spread round-robin over the pools
+ *   BENCH_VAULT_POSITIONS   stakers that also hold a vault position
+ *   BENCH_FIXTURE           where to write the deployed addresses (JSON)
+ */
+
+const MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11";
+
+// Staker keys are derived from their index, so repeated runs seed identical state
+function stakerWallet(index) {
+  const key = ethers.utils.hexZeroPad(ethers.utils.hexlify(0xbe7c0000 + index), 32);
+  return new ethers.Wallet(key, ethers.provider);
+}
+
+async function main() {
+  const poolCount = parseInt(process.env.BENCH_POOLS || "10", 10);
+  const stakerCount = parseInt(process.env.BENCH_STAKERS || "100", 10);
+  const vaultPositions = Math.min(parseInt(process.env.BENCH_VAULT_POSITIONS || "50", 10), stakerCount);
+  const output = process.env.BENCH_FIXTURE || "bench-fixture.json";
+
+  const [deployer] = await ethers.getSigners();
+  const treasury = stakerWallet(1000000).address;
+  const emergencyDAO = stakerWallet(1000001).address;
+  console.log(`🏗️  Seeding ${poolCount} pools, ${stakerCount} stakers, ${vaultPositions} vault positions`);
+
+  // 1. Protocol contracts
+  const CataklismToken = await ethers.getContractFactory("CataklismToken");
+  const token = await CataklismToken.deploy(treasury, deployer.address, deployer.address);
+  await token.deployed();
+
+  const CataklismCore = await ethers.getContractFactory("CataklismCore");
+  const core = await CataklismCore.deploy(token.address, treasury, emergencyDAO);
+  await core.deployed();
+
+  const CataklismVault = await ethers.getContractFactory("CataklismVault");
+  const vault = await CataklismVault.deploy(token.address, treasury, deployer.address);
+  await vault.deployed();
+
+  await token.grantRole(await token.MINTER_ROLE(), core.address);
+  await token.mint(deployer.address, ethers.utils.parseEther("10000000"));
+
+  // 2. Multicall3 at its canonical address, which the CLI uses by default
+  const Multicall3 = await ethers.getContractFactory("Multicall3");
+  const multicall = await Multicall3.deploy();
+  await multicall.deployed();
+  await network.provider.send("hardhat_setCode", [MULTICALL3_ADDRESS, await ethers.provider.getCode(multicall.address)]);
+
+  // 3. Pools
+  const MockERC20 = await ethers.getContractFactory("MockERC20");
+  const stakingTokens = [token];
+  await core.addPool(token.address, ethers.utils.parseEther("10"), false);
+  for (let i = 1; i < poolCount; i++) {
+    const mock = await MockERC20.deploy(`Bench Token ${i}`, `BT${i}`, ethers.utils.parseEther("1000000000"));
+    await mock.deployed();
+    await core.addPool(mock.address, ethers.utils.parseEther(String(1 + (i % 5))), false);
+    stakingTokens.push(mock);
+  }
+
+  // 4. Stakers and vault positions
+  const stakers = [];
+  for (let i = 0; i < stakerCount; i++) {
+    const wallet = stakerWallet(i);
+    const poolId = i % poolCount;
+    const stakingToken = stakingTokens[poolId];
+    const amount = ethers.utils.parseEther(String(100 + (i % 97) * 10));
+
+    await network.provider.send("hardhat_setBalance", [wallet.address, "0x56BC75E2D63100000"]); // 100 ETH
+    await stakingToken.transfer(wallet.address, amount);
+    await stakingToken.connect(wallet).approve(core.address, amount);
+    await core.connect(wallet).deposit(poolId, amount);
+
+    if (i < vaultPositions) {
+      const vaultAmount = ethers.utils.parseEther(String(50 + (i % 31) * 5));
+      await token.transfer(wallet.address, vaultAmount);
+      await token.connect(wallet).approve(vault.address, vaultAmount);
+      await vault.connect(wallet).deposit(vaultAmount);
+    }
+
+    stakers.push(wallet.address);
+    if ((i + 1) % 100 === 0) {
+      console.log(`   • ${i + 1}/${stakerCount} stakers seeded`);
+    }
+  }
+
+  const fixture = {
+    network: network.name,
+    chainId: network.config.chainId,
+    block: await ethers.provider.getBlockNumber(),
+    pools: poolCount,
+    vaultPositions,
+    contracts: {
+      token: token.address,
+      core: core.address,
+      vault: vault.address,
+      multicall: MULTICALL3_ADDRESS,
+    },
+    deployer: deployer.address,
+    stakers,
+  };
+  fs.writeFileSync(output, JSON.stringify(fixture, null, 2));
+  console.log(`💾 Fixture written to ${output}`);
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });